@@ -0,0 +1,237 @@
+# app/benchmark/run_benchmark.py
+"""
+Benchmark da camada de persistência.
+
+Para cada tamanho de massa de dados, cria um DADOS.DB temporário, popula com
+dados sintéticos e mede o tempo das operações dos repositórios e de todos os
+métodos de relatório do DatabaseManager. O resultado é gravado em JSON para
+comparação entre execuções:
+
+    python -m app.benchmark.run_benchmark --sizes small,medium --output bench.json
+    python -m app.benchmark.run_benchmark --sizes small --compare bench.json
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from app.database.db import DatabaseManager
+from app.benchmark.synthetic_data import generate_dataset, resolve_counts
+
+
+def _time_call(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    rows = len(result) if isinstance(result, (list, tuple)) else None
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "rows": rows,
+    }
+
+
+def report_methods(db_manager):
+    """Descobre os métodos de relatório (get_*) do DatabaseManager e a forma de chamá-los."""
+    calls = {}
+    for name, method in inspect.getmembers(db_manager, inspect.ismethod):
+        if not name.startswith("get_") or name in ("get_connection", "get_report_connection"):
+            continue
+        parameters = inspect.signature(method).parameters
+        if "filters" in parameters:
+            calls[name] = (lambda m=method: m({}))
+        elif all(p.default is not inspect.Parameter.empty for p in parameters.values()):
+            calls[name] = method
+    return calls
+
+
+def repository_operations(db_manager):
+    """Operações de leitura e escrita dos repositórios, na forma de callables sem argumentos."""
+    from app.item.item_repository import ItemRepository
+    from app.supplier.supplier_repository import SupplierRepository
+    from app.stock.stock_repository import StockRepository
+    from app.sales.sale_repository import SaleRepository
+    from app.unit.unit_repository import UnitRepository
+    from app.production import order_operations, composition_operations
+    from app.production_line import line_operations
+
+    conn = db_manager.get_connection()
+    item_repository = ItemRepository()
+    supplier_repository = SupplierRepository()
+    stock_repository = StockRepository()
+    sale_repository = SaleRepository()
+    unit_repository = UnitRepository()
+
+    sample_item = conn.execute("SELECT ID FROM ITEM ORDER BY ID LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM ITEM)").fetchone()[0]
+    sample_product = conn.execute("SELECT ID_PRODUTO FROM COMPOSICAO ORDER BY ID LIMIT 1").fetchone()[0]
+    sample_entry = conn.execute("SELECT MAX(ID) FROM ENTRADANOTA").fetchone()[0]
+    sample_sale = conn.execute("SELECT MAX(ID) FROM SAIDA").fetchone()[0]
+    sample_op = conn.execute("SELECT MAX(ID) FROM ORDEMPRODUCAO").fetchone()[0]
+    sample_line = conn.execute("SELECT MIN(ID) FROM LINHAPRODUCAO").fetchone()[0]
+    sample_supplier = conn.execute("SELECT MIN(ID) FROM FORNECEDOR").fetchone()[0]
+    materials = [row[0] for row in conn.execute(
+        "SELECT ID FROM ITEM WHERE TIPO_ITEM IN ('Insumo', 'Ambos') ORDER BY ID LIMIT 50").fetchall()]
+    bom = [{"id_insumo": row['ID_INSUMO'], "quantidade": row['QUANTIDADE']}
+           for row in composition_operations.get_bom(sample_product)]
+    line_details = line_operations.get_production_line_details(sample_line)
+
+    entry_lines = [{"id_insumo": m, "id_fornecedor": sample_supplier, "quantidade": 10.0, "valor_unitario": 2.5} for m in materials]
+    sale_lines = [{"id_produto": sample_product, "quantidade": 1.0, "valor_unitario": 10.0}]
+    op_lines = [{"id_produto": sample_product, "quantidade": 1.0}]
+
+    def entry_cycle():
+        entry_id = stock_repository.create_entry("2024-12-31", "2024-12-31 08:00:00", "BENCH", None)
+        stock_repository.update_entry_items(entry_id, entry_lines)
+        entry_lines[0]["quantidade"] += 1
+        stock_repository.update_entry_items(entry_id, entry_lines)
+        stock_repository.finalize_entry(entry_id)
+        stock_repository.reopen_entry(entry_id)
+        stock_repository.delete_entry(entry_id)
+
+    def sale_cycle():
+        sale_id = sale_repository.create_sale("2024-12-31", None, 10.0)
+        sale_repository.update_sale_items(sale_id, sale_lines)
+        sale_repository.finalize_sale(sale_id)
+
+    def op_cycle():
+        op_id = order_operations.create_op("BENCH", "2024-12-31", op_lines)
+        order_operations.update_op(op_id, "BENCH", "2024-12-31", op_lines)
+        order_operations.finalize_op(op_id, 1.0)
+        order_operations.delete_op(op_id)
+
+    def manual_input():
+        item_repository.update_stock_and_cost(materials[0], 100.0, 1.0)
+        item_repository.add_stock_movement(materials[0], 'Entrada Manual', 1.0, 1.0)
+
+    return {
+        "item.get_all": item_repository.get_all,
+        "item.get_by_id": lambda: item_repository.get_by_id(sample_item),
+        "item.search_descricao": lambda: item_repository.search("DESCRICAO", "Sintético 00"),
+        "item.search_id": lambda: item_repository.search("ID", sample_item),
+        "item.manual_input": manual_input,
+        "unit.get_all": unit_repository.get_all,
+        "supplier.get_all": supplier_repository.get_all,
+        "supplier.search": lambda: supplier_repository.search("Fornecedor 0", "Nome Fantasia"),
+        "stock.list_entries": stock_repository.list_entries,
+        "stock.get_entry_details": lambda: stock_repository.get_entry_details(sample_entry),
+        "stock.entry_cycle": entry_cycle,
+        "sale.list_sales": sale_repository.list_sales,
+        "sale.get_sale_details": lambda: sale_repository.get_sale_details(sample_sale),
+        "sale.sale_cycle": sale_cycle,
+        "production.list_ops": order_operations.list_ops,
+        "production.get_op_details": lambda: order_operations.get_op_details(sample_op),
+        "production.op_cycle": op_cycle,
+        "composition.get_bom": lambda: composition_operations.get_bom(sample_product),
+        "composition.update_composition": lambda: composition_operations.update_composition(sample_product, bom),
+        "line.get_all": line_operations.get_all_production_lines,
+        "line.update": lambda: line_operations.update_production_line(
+            sample_line, line_details['master']['NOME'], line_details['master']['DESCRICAO'],
+            line_details['master']['STATUS'],
+            [{"id_produto": i['ID_PRODUTO'], "quantidade": i['QUANTIDADE']} for i in line_details['items']]),
+    }
+
+
+def run_size(size, repeat=5, seed=42, work_dir=None):
+    """Executa o benchmark completo para um tamanho de massa de dados."""
+    counts = resolve_counts(size)
+    label = size if isinstance(size, str) else "custom"
+    owns_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="minisis_bench_")
+    db_path = os.path.join(work_dir, "DADOS.DB")
+    results = []
+    try:
+        DatabaseManager.reset_instance()
+        db_manager = DatabaseManager(db_path)
+
+        start = time.perf_counter()
+        generated = generate_dataset(db_manager.get_connection(), counts, seed=seed)
+        generation_ms = (time.perf_counter() - start) * 1000
+
+        # Algumas operações usam print(); desviamos para stderr para não poluir o JSON em stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            for name, func in sorted(report_methods(db_manager).items()):
+                results.append({"size": label, "operation": f"report.{name}", **_time_call(func, repeat)})
+            for name, func in repository_operations(db_manager).items():
+                results.append({"size": label, "operation": f"repository.{name}", **_time_call(func, repeat)})
+
+        return {
+            "size": label,
+            "counts": generated,
+            "generation_ms": round(generation_ms, 3),
+            "db_size_bytes": os.path.getsize(db_path),
+            "results": results,
+        }
+    finally:
+        DatabaseManager.reset_instance()
+        if owns_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmark(sizes, repeat=5, seed=42):
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "runs": [run_size(size, repeat=repeat, seed=seed) for size in sizes],
+    }
+
+
+def compare(current, baseline):
+    """Retorna linhas (tamanho, operação, mediana base, mediana atual, razão) para operações presentes em ambos."""
+    def index(report):
+        return {(r["size"], r["operation"]): r for run in report["runs"] for r in run["results"]}
+    base, curr = index(baseline), index(current)
+    rows = []
+    for key in sorted(curr):
+        if key in base:
+            before, after = base[key]["median_ms"], curr[key]["median_ms"]
+            ratio = after / before if before else float("inf")
+            rows.append((key[0], key[1], before, after, ratio))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da camada de persistência do MiniSis.")
+    parser.add_argument("--sizes", default="small", help="Tamanhos separados por vírgula (tiny, small, medium, large).")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por operação.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark([s.strip() for s in args.sizes.split(",") if s.strip()], repeat=args.repeat, seed=args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for size, operation, before, after, ratio in compare(report, baseline):
+            print(f"{size:8} {operation:45} {before:10.3f} ms -> {after:10.3f} ms  ({ratio:5.2f}x)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# app/benchmark/synthetic_data.py
+"""
+Gerador de massa de dados sintética para o banco DADOS.DB.
+
+Os dados são gerados de forma determinística (semente fixa e data base fixa),
+para que execuções diferentes do benchmark possam ser comparadas entre si.
+O esquema é sempre criado pelo DatabaseManager; este módulo apenas insere linhas.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+BASE_DATE = date(2024, 12, 31)
+
+# bom_lines, lines_per_note e lines_per_sale são contagens por documento/produto
+
+PRESETS = {
+    "tiny": dict(suppliers=3, items=30, bom_lines=3, production_lines=2, entry_notes=10, lines_per_note=3,
+                 production_orders=10, sales=15, lines_per_sale=2, movements=50, days=90),
+    "small": dict(suppliers=20, items=300, bom_lines=4, production_lines=5, entry_notes=200, lines_per_note=5,
+                  production_orders=200, sales=400, lines_per_sale=3, movements=2000, days=365),
+    "medium": dict(suppliers=100, items=3000, bom_lines=6, production_lines=10, entry_notes=2000, lines_per_note=8,
+                   production_orders=2000, sales=5000, lines_per_sale=4, movements=20000, days=730),
+    "large": dict(suppliers=300, items=20000, bom_lines=8, production_lines=20, entry_notes=10000, lines_per_note=10,
+                  production_orders=10000, sales=30000, lines_per_sale=5, movements=200000, days=1095),
+}
+
+
+def resolve_counts(size):
+    """Aceita o nome de um preset ou um dicionário parcial de contagens."""
+    if isinstance(size, str):
+        if size not in PRESETS:
+            raise ValueError(f"Tamanho desconhecido: {size}. Opções: {', '.join(PRESETS)}")
+        return dict(PRESETS[size])
+    counts = dict(PRESETS["tiny"])
+    counts.update(size)
+    return counts
+
+
+def _random_date(rng, days):
+    return BASE_DATE - timedelta(days=rng.randrange(days))
+
+
+def generate_dataset(connection, size="small", seed=42):
+    """
+    Popula o banco com dados sintéticos e retorna as contagens efetivamente geradas.
+    A conexão deve apontar para um banco recém-criado pelo DatabaseManager.
+    """
+    counts = resolve_counts(size)
+    rng = random.Random(seed)
+    days = counts["days"]
+    cursor = connection.cursor()
+    generated = {}
+
+    unit_ids = [row[0] for row in cursor.execute("SELECT ID FROM UNIDADE").fetchall()]
+
+    # Fornecedores
+    suppliers = [
+        (f"Fornecedor Sintético {n:06d} Ltda", f"Fornecedor {n:06d}", None, 'Ativo', f"(11) 9{n:08d}",
+         f"contato{n}@fornecedor.com", "Rua Exemplo", str(n), None, "Centro", "São Paulo", "SP", "01000-000")
+        for n in range(1, counts["suppliers"] + 1)
+    ]
+    cursor.executemany(
+        """INSERT INTO FORNECEDOR (RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, STATUS, TELEFONE, EMAIL, LOGRADOURO, NUMERO,
+           COMPLEMENTO, BAIRRO, CIDADE, UF, CEP) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        suppliers
+    )
+    supplier_ids = [row[0] for row in cursor.execute("SELECT ID FROM FORNECEDOR").fetchall()]
+    generated["suppliers"] = len(supplier_ids)
+
+    # Itens: 40% insumos, 40% produtos, 20% ambos
+    item_rows = []
+    base_cost = {}
+    for n in range(1, counts["items"] + 1):
+        roll = rng.random()
+        item_type = 'Insumo' if roll < 0.4 else ('Produto' if roll < 0.8 else 'Ambos')
+        item_rows.append((f"CI{n:06d}", f"Item Sintético {n:06d}", item_type, rng.choice(unit_ids), rng.choice(supplier_ids)))
+    cursor.executemany(
+        "INSERT INTO ITEM (CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO) VALUES (?, ?, ?, ?, ?)",
+        item_rows
+    )
+    items = cursor.execute("SELECT ID, TIPO_ITEM FROM ITEM").fetchall()
+    materials = [row[0] for row in items if row[1] in ('Insumo', 'Ambos')]
+    products = [row[0] for row in items if row[1] in ('Produto', 'Ambos')]
+    for item_id, _ in items:
+        base_cost[item_id] = round(rng.uniform(0.5, 50.0), 4)
+    generated["items"] = len(items)
+
+    balance = {item_id: 0.0 for item_id, _ in items}
+    movements = []
+
+    def add_movement(item_id, movement_type, quantity, unit_value, op_id, movement_date, signed_quantity):
+        movements.append((item_id, movement_type, quantity, unit_value, op_id, movement_date))
+        balance[item_id] += signed_quantity
+
+    # Saldo de abertura para os insumos, para que OPs e vendas tenham estoque
+    opening_date = (BASE_DATE - timedelta(days=days)).isoformat()
+    for material_id in materials:
+        quantity = float(rng.randint(500, 5000))
+        add_movement(material_id, 'Entrada Manual', quantity, base_cost[material_id], None, opening_date, quantity)
+
+    # Composição (BOM)
+    bom = {}
+    bom_rows = []
+    for product_id in products:
+        candidates = [m for m in rng.sample(materials, min(len(materials), counts["bom_lines"] + 1)) if m != product_id]
+        lines = candidates[:counts["bom_lines"]]
+        bom[product_id] = [(material_id, round(rng.uniform(0.1, 5.0), 3)) for material_id in lines]
+        bom_rows.extend((product_id, material_id, quantity) for material_id, quantity in bom[product_id])
+    cursor.executemany("INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)", bom_rows)
+    for product_id, lines in bom.items():
+        base_cost[product_id] = round(sum(base_cost[m] * q for m, q in lines), 4) or base_cost[product_id]
+    generated["bom_lines"] = len(bom_rows)
+
+    # Linhas de produção
+    line_ids = []
+    for n in range(1, counts["production_lines"] + 1):
+        line_id = cursor.execute(
+            "INSERT INTO LINHAPRODUCAO (NOME, DESCRICAO, STATUS) VALUES (?, ?, ?)",
+            (f"Linha {n:03d}", f"Linha sintética {n}", 'Ativa')
+        ).lastrowid
+        line_ids.append(line_id)
+        line_products = rng.sample(products, min(len(products), 10))
+        cursor.executemany(
+            "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
+            [(line_id, product_id, float(rng.randint(10, 200))) for product_id in line_products]
+        )
+    generated["production_lines"] = len(line_ids)
+
+    # Notas de entrada
+    note_items = []
+    for n in range(1, counts["entry_notes"] + 1):
+        entry_date = _random_date(rng, days)
+        status = 'Finalizada' if rng.random() < 0.9 else 'Em Aberto'
+        lines = []
+        for material_id in rng.sample(materials, min(len(materials), counts["lines_per_note"])):
+            quantity = float(rng.randint(10, 500))
+            unit_value = round(base_cost[material_id] * rng.uniform(0.9, 1.1), 4)
+            lines.append((material_id, rng.choice(supplier_ids), quantity, unit_value))
+        total_value = sum(q * v for _, _, q, v in lines)
+        entry_id = cursor.execute(
+            """INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, VALOR_TOTAL, OBSERVACAO, STATUS)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (entry_date.isoformat(), f"{entry_date.isoformat()} 08:00:00", f"{n:09d}", total_value, None, status)
+        ).lastrowid
+        for material_id, supplier_id, quantity, unit_value in lines:
+            note_items.append((entry_id, material_id, supplier_id, quantity, unit_value))
+            if status == 'Finalizada':
+                add_movement(material_id, 'Entrada por Nota', quantity, unit_value, None, entry_date.isoformat(), quantity)
+    cursor.executemany(
+        "INSERT INTO ENTRADANOTA_ITENS (ID_ENTRADA, ID_INSUMO, ID_FORNECEDOR, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?, ?)",
+        note_items
+    )
+    generated["entry_notes"] = counts["entry_notes"]
+    generated["entry_note_lines"] = len(note_items)
+
+    # Ordens de produção
+    op_items = []
+    for n in range(1, counts["production_orders"] + 1):
+        created = datetime.combine(_random_date(rng, days), datetime.min.time()) + timedelta(hours=rng.randint(6, 18))
+        roll = rng.random()
+        status = 'Concluída' if roll < 0.7 else ('Em Andamento' if roll < 0.9 else 'Cancelada')
+        op_products = rng.sample(products, min(len(products), rng.randint(1, 2)))
+        quantity = float(rng.randint(5, 100))
+        total_cost = sum(base_cost[p] * quantity for p in op_products) if status == 'Concluída' else None
+        op_id = cursor.execute(
+            """INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS, QUANTIDADE_PRODUZIDA, CUSTO_TOTAL, ID_LINHA_PRODUCAO)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (f"OP-{n:06d}", created.strftime('%Y-%m-%d %H:%M:%S'), (created + timedelta(days=7)).strftime('%Y-%m-%d'),
+             status, quantity if status == 'Concluída' else None, total_cost, rng.choice(line_ids) if line_ids else None)
+        ).lastrowid
+        for product_id in op_products:
+            op_items.append((op_id, product_id, quantity))
+            if status != 'Concluída':
+                continue
+            movement_date = created.date().isoformat()
+            for material_id, bom_quantity in bom.get(product_id, []):
+                consumed = bom_quantity * quantity
+                add_movement(material_id, 'Saída por OP', consumed, base_cost[material_id], op_id, movement_date, -consumed)
+            add_movement(product_id, 'Entrada por OP', quantity, base_cost[product_id], op_id, movement_date, quantity)
+    cursor.executemany(
+        "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
+        op_items
+    )
+    generated["production_orders"] = counts["production_orders"]
+
+    # Saídas (vendas)
+    sale_items = []
+    for n in range(1, counts["sales"] + 1):
+        sale_date = _random_date(rng, days)
+        status = 'Finalizada' if rng.random() < 0.85 else 'Em Aberto'
+        lines = []
+        for product_id in rng.sample(products, min(len(products), counts["lines_per_sale"])):
+            quantity = float(rng.randint(1, 20))
+            lines.append((product_id, quantity, round(base_cost[product_id] * rng.uniform(1.2, 2.0), 2)))
+        sale_id = cursor.execute(
+            "INSERT INTO SAIDA (DATA_SAIDA, VALOR_TOTAL, OBSERVACAO, STATUS) VALUES (?, ?, ?, ?)",
+            (sale_date.isoformat(), sum(q * v for _, q, v in lines), None, status)
+        ).lastrowid
+        for product_id, quantity, unit_value in lines:
+            sale_items.append((sale_id, product_id, quantity, unit_value))
+            if status == 'Finalizada':
+                add_movement(product_id, 'Saída por Venda', -quantity, unit_value, None, sale_date.isoformat(), -quantity)
+    cursor.executemany(
+        "INSERT INTO SAIDA_ITENS (ID_SAIDA, ID_PRODUTO, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?)",
+        sale_items
+    )
+    generated["sales"] = counts["sales"]
+    generated["sale_lines"] = len(sale_items)
+
+    # Movimentos avulsos até atingir a contagem pedida
+    item_ids = list(balance)
+    while len(movements) < counts["movements"]:
+        item_id = rng.choice(item_ids)
+        quantity = float(rng.randint(1, 50))
+        add_movement(item_id, 'Entrada Manual', quantity, base_cost[item_id], None, _random_date(rng, days).isoformat(), quantity)
+
+    # Os movimentos são gravados em ordem cronológica, como aconteceria no uso real
+    movements.sort(key=lambda m: m[5])
+    cursor.executemany(
+        "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, ?, ?)",
+        movements
+    )
+    generated["movements"] = len(movements)
+
+    cursor.executemany(
+        "UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?",
+        [(balance[item_id], base_cost[item_id], item_id) for item_id in item_ids]
+    )
+    connection.commit()
+    return generated
@@ -0,0 +1,193 @@
+# app/database/archive.py
+"""
+Fechamento de período: move o histórico antigo para arquivos anuais.
+
+Documentos finalizados (notas de entrada, saídas e OPs concluídas/canceladas) e os
+movimentos de estoque anteriores à data de fechamento são transferidos, com os
+mesmos IDs, para DADOS_<ano>.DB na pasta do banco. Para cada item com movimentos
+arquivados fica na tabela MOVIMENTO um movimento 'Saldo Inicial' na véspera do
+fechamento, com o saldo e o custo médio naquela data; assim a operação diária e o
+recálculo de custo (app/stock/costing.py) usam apenas os dados do período aberto.
+
+Os relatórios do DatabaseManager anexam os arquivos (history_sources) apenas
+quando o intervalo de datas pedido alcança um período fechado.
+
+    python -m app.database.archive close 2025-01-01
+    python -m app.database.archive list
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from itertools import groupby
+
+from app.database import cdc
+from app.database.db import get_db_manager
+from app.database.queries import fetch_all
+from app.stock.costing import replay
+from app import events
+
+OPENING_BALANCE = 'Saldo Inicial'
+
+# Tabela -> (tabela temporária com os IDs selecionados, coluna que liga a linha ao ID selecionado)
+ARCHIVED_TABLES = [
+    ("ENTRADANOTA", "_ARQ_ENTRADA", "ID"),
+    ("ENTRADANOTA_ITENS", "_ARQ_ENTRADA", "ID_ENTRADA"),
+    ("SAIDA", "_ARQ_SAIDA", "ID"),
+    ("SAIDA_ITENS", "_ARQ_SAIDA", "ID_SAIDA"),
+    ("MOVIMENTO", "_ARQ_MOVIMENTO", "ID"),
+    ("ORDEMPRODUCAO_ITENS", "_ARQ_OP", "ID_ORDEM_PRODUCAO"),
+    ("ORDEMPRODUCAO", "_ARQ_OP", "ID"),
+]
+
+# Seleção do que será arquivado: (tabela temporária, consulta com ID e ANO, quantidade de parâmetros de data)
+_SELECTIONS = [
+    ("_ARQ_ENTRADA", """
+        SELECT ID, CAST(substr(DATA_ENTRADA, 1, 4) AS INTEGER) FROM ENTRADANOTA
+        WHERE STATUS = 'Finalizada' AND DATA_ENTRADA < ?""", 1),
+    ("_ARQ_SAIDA", """
+        SELECT ID, CAST(substr(DATA_SAIDA, 1, 4) AS INTEGER) FROM SAIDA
+        WHERE STATUS = 'Finalizada' AND DATA_SAIDA < ?""", 1),
+    # OPs encerradas que não têm movimentos no período aberto
+    ("_ARQ_OP", """
+        SELECT ID, CAST(substr(DATA_CRIACAO, 1, 4) AS INTEGER) FROM ORDEMPRODUCAO op
+        WHERE STATUS IN ('Concluída', 'Cancelada') AND DATA_CRIACAO < ?
+          AND NOT EXISTS (SELECT 1 FROM MOVIMENTO m WHERE m.ID_ORDEM_PRODUCAO = op.ID AND m.DATA_MOVIMENTO >= ?)""", 2),
+    ("_ARQ_MOVIMENTO", """
+        SELECT ID, CAST(substr(DATA_MOVIMENTO, 1, 4) AS INTEGER) FROM MOVIMENTO
+        WHERE DATA_MOVIMENTO < ? AND (ID_ORDEM_PRODUCAO IS NULL OR ID_ORDEM_PRODUCAO IN (SELECT ID FROM temp._ARQ_OP))""", 1),
+]
+
+
+def closed_until():
+    """Último dia já fechado (AAAA-MM-DD) ou None se nenhum período foi fechado."""
+    row = get_db_manager().get_connection().execute("SELECT MAX(DATA_FINAL) FROM ARQUIVO_PERIODO").fetchone()
+    return row[0] if row else None
+
+
+def is_closed(document_date):
+    last_closed = closed_until()
+    return last_closed is not None and str(document_date)[:10] <= last_closed
+
+
+def list_archives():
+    conn = get_db_manager().get_connection()
+    return fetch_all(conn, "SELECT * FROM ARQUIVO_PERIODO ORDER BY ANO")
+
+
+def _ensure_archive_table(conn, schema, table):
+    """Cria a tabela no arquivo (mesmas colunas, sem restrições) ou acrescenta colunas novas."""
+    columns = [(row[1], row[2]) for row in conn.execute(f"PRAGMA main.table_info({table})")]
+    archived = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+    if not archived:
+        conn.execute(f"CREATE TABLE {schema}.{table} AS SELECT * FROM main.{table} WHERE 0")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.IDX_{table}_ID ON {table} (ID)")
+    else:
+        for name, column_type in columns:
+            if name not in archived:
+                conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {name} {column_type}")
+    return [name for name, _ in columns]
+
+
+def _opening_balances(conn, closing_date):
+    """Saldo e custo de cada item ao fim do período fechado, a partir dos movimentos que serão arquivados."""
+    rows = conn.execute("""
+        SELECT ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO FROM MOVIMENTO
+        WHERE ID IN (SELECT ID FROM temp._ARQ_MOVIMENTO)
+        ORDER BY ID_ITEM, DATA_MOVIMENTO, ID
+    """)
+    opening_date = (date.fromisoformat(closing_date) - timedelta(days=1)).isoformat()
+    balances = []
+    for item_id, movements in groupby(rows, key=lambda row: row[0]):
+        balance, average_cost, _ = replay(row[1:] for row in movements)
+        balances.append((item_id, OPENING_BALANCE, balance, average_cost, opening_date))
+    return balances
+
+
+def close_period(closing_date):
+    """
+    Arquiva o histórico anterior a closing_date (AAAA-MM-DD). Retorna um dicionário
+    {ano: {tabela: linhas arquivadas}}.
+    """
+    closing_date = str(closing_date)[:10]
+    date.fromisoformat(closing_date)
+    last_closed = closed_until()
+    if last_closed and closing_date <= last_closed:
+        raise ValueError(f"O período até {last_closed} já está fechado.")
+
+    db_manager = get_db_manager()
+    conn = db_manager.get_connection()
+    conn.commit()
+
+    for temp_table, query, date_params in _SELECTIONS:
+        conn.execute(f"DROP TABLE IF EXISTS temp.{temp_table}")
+        conn.execute(f"CREATE TEMP TABLE {temp_table} (ID INTEGER PRIMARY KEY, ANO INTEGER NOT NULL)")
+        conn.execute(f"INSERT INTO temp.{temp_table} {query}", (closing_date,) * date_params)
+    conn.commit()
+    years = sorted({row[0] for temp_table, _, _ in _SELECTIONS
+                    for row in conn.execute(f"SELECT DISTINCT ANO FROM temp.{temp_table}")})
+    summary = {}
+    if not years:
+        return summary
+
+    # ATTACH não pode ocorrer dentro de uma transação: anexa e prepara os arquivos antes
+    schemas = {}
+    for year in years:
+        schemas[year] = db_manager.attach_archive(year, f"DADOS_{year}.DB")
+        for table, _, _ in ARCHIVED_TABLES:
+            _ensure_archive_table(conn, schemas[year], table)
+
+    balances = _opening_balances(conn, closing_date)
+    closing_year = int(closing_date[:4])
+    last_day = (date.fromisoformat(closing_date) - timedelta(days=1)).isoformat()
+    try:
+        with db_manager.transaction():
+            last_change = cdc.last_change_id(conn)
+            for year in years:
+                counts = summary.setdefault(year, {})
+                for table, temp_table, key_column in ARCHIVED_TABLES:
+                    columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})"))
+                    selected = f"SELECT ID FROM temp.{temp_table} WHERE ANO = {int(year)}"
+                    cursor = conn.execute(
+                        f"INSERT INTO {schemas[year]}.{table} ({columns}) "
+                        f"SELECT {columns} FROM main.{table} WHERE {key_column} IN ({selected})")
+                    counts[table] = cursor.rowcount
+                    conn.execute(f"DELETE FROM main.{table} WHERE {key_column} IN ({selected})")
+                conn.execute(
+                    "INSERT OR REPLACE INTO ARQUIVO_PERIODO (ANO, ARQUIVO, DATA_FINAL, DATA_FECHAMENTO) VALUES (?, ?, ?, ?)",
+                    (year, f"DADOS_{year}.DB", last_day if year == closing_year else f"{year:04d}-12-31",
+                     datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            # Para a extração incremental, as linhas foram arquivadas, não excluídas
+            cdc.mark_archived(conn, last_change)
+            conn.executemany(
+                "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, ?)",
+                balances)
+    finally:
+        for temp_table, _, _ in _SELECTIONS:
+            conn.execute(f"DROP TABLE IF EXISTS temp.{temp_table}")
+    # Documentos arquivados saem das tabelas principais: os assinantes recarregam
+    for table, _, _ in ARCHIVED_TABLES:
+        events.publish(table, events.DELETE)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fechamento de período e arquivos anuais do histórico.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    close_parser = subparsers.add_parser("close", help="Arquiva o histórico anterior à data (AAAA-MM-DD).")
+    close_parser.add_argument("closing_date")
+    subparsers.add_parser("list", help="Lista os arquivos de períodos fechados.")
+    args = parser.parse_args(argv)
+
+    if args.command == "close":
+        for year, counts in close_period(args.closing_date).items():
+            details = ", ".join(f"{table}: {count}" for table, count in counts.items())
+            print(f"{year}: {details}")
+        return 0
+
+    for archive in list_archives():
+        print(f"{archive['ANO']}  {archive['ARQUIVO']:16} até {archive['DATA_FINAL']}  (fechado em {archive['DATA_FECHAMENTO']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
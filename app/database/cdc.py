@@ -0,0 +1,355 @@
+# app/database/cdc.py
+"""
+Captura de alterações (CDC) e extração incremental para ferramentas de BI.
+
+Gatilhos nas tabelas de negócio (CAPTURED_TABLES, criados pela migração 7) gravam
+em CDC_LOG uma linha por inserção, alteração ou exclusão: tabela, ID da linha,
+operação ('I', 'U', 'D') e, nas tabelas com VERSAO, a versão gravada. Linhas
+movidas para os arquivos anuais pelo fechamento de período (app/database/archive.py)
+ficam com a operação 'A', para que o armazém de dados não as apague.
+
+O ID de CDC_LOG é a marca d'água. A extração lê, dentro de uma única transação de
+leitura, as alterações acima da marca do consumidor até a última registrada, uma
+linha por registro alterado (a operação mais recente) com os valores atuais, e as
+grava em fluxo, um arquivo por tabela (CSV, JSON lines ou Parquet), com um
+manifest.json com as marcas. Depois de carregar os arquivos, o consumidor confirma a
+marca final; o log é compactado até a menor marca confirmada entre os consumidores.
+Sem consumidores, o log guarda só os últimos RETENTION_DAYS dias (usados pelos
+relatórios agendados para saber se algo mudou); alterações com mais de
+MAX_RETENTION_DAYS dias saem mesmo sem confirmação, e o consumidor atrasado volta
+à carga completa. A manutenção (app/database/maintenance.py) compacta a cada ciclo.
+
+    python -m app.database.cdc status
+    python -m app.database.cdc extract --consumer dw --format parquet --output-dir carga
+    python -m app.database.cdc ack --consumer dw --watermark 1234
+    python -m app.database.cdc compact
+
+A primeira extração de um consumidor (ou --full) é uma carga completa das tabelas.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+
+from app.database.versioning import VERSIONED_TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional (formato parquet)
+    pa = pq = None
+
+BATCH_SIZE = 5000
+RETENTION_DAYS = 7
+MAX_RETENTION_DAYS = 90
+
+CAPTURED_TABLES = (
+    "UNIDADE", "ITEM", "FORNECEDOR", "ENTRADANOTA", "ENTRADANOTA_ITENS", "COMPOSICAO",
+    "ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "MOVIMENTO", "SAIDA", "SAIDA_ITENS",
+    "LINHAPRODUCAO", "LINHAPRODUCAO_ITEMS",
+)
+
+INSERT, UPDATE, DELETE, ARCHIVED = "I", "U", "D", "A"
+
+CHANGE_COLUMNS = ["CDC_ID", "CDC_OPERACAO", "CDC_ID_LINHA", "CDC_VERSAO"]
+
+FORMATS = {"csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}
+
+
+# --- Captura ---
+
+def trigger_statements(table):
+    """CREATE TRIGGER de inserção, alteração e exclusão de `table`."""
+    for suffix, event, operation, row in (("INS", "INSERT", INSERT, "NEW"),
+                                          ("UPD", "UPDATE", UPDATE, "NEW"),
+                                          ("DEL", "DELETE", DELETE, "OLD")):
+        version = f"{row}.VERSAO" if table in VERSIONED_TABLES else "NULL"
+        yield f"""
+            CREATE TRIGGER IF NOT EXISTS CDC_{table}_{suffix} AFTER {event} ON {table}
+            BEGIN
+                INSERT INTO CDC_LOG (TABELA, ID_LINHA, OPERACAO, VERSAO)
+                VALUES ('{table}', {row}.ID, '{operation}', {version});
+            END"""
+
+
+def install_triggers(conn, tables=CAPTURED_TABLES):
+    for table in tables:
+        for statement in trigger_statements(table):
+            conn.execute(statement)
+
+
+def last_change_id(conn):
+    """Maior ID já gravado em CDC_LOG (mesmo que compactado)."""
+    row = conn.execute("""
+        SELECT MAX(COALESCE((SELECT MAX(ID) FROM CDC_LOG), 0),
+                   COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'CDC_LOG'), 0))
+    """).fetchone()
+    return row[0]
+
+
+def first_change_id(conn):
+    """
+    Primeiro ID ainda disponível no log. Os IDs são contínuos (AUTOINCREMENT, e só a
+    compactação exclui linhas), então uma marca abaixo de first - 1 perdeu alterações.
+    """
+    row = conn.execute("SELECT MIN(ID) FROM CDC_LOG").fetchone()
+    return row[0] if row[0] is not None else last_change_id(conn) + 1
+
+
+def mark_archived(conn, after_id):
+    """Exclusões registradas depois de after_id passam a 'A' (linhas movidas para o arquivo anual)."""
+    return conn.execute("UPDATE CDC_LOG SET OPERACAO = ? WHERE ID > ? AND OPERACAO = ?",
+                        (ARCHIVED, after_id, DELETE)).rowcount
+
+
+# --- Extração ---
+
+def table_columns(conn, table):
+    """(nome, tipo declarado) das colunas da tabela."""
+    return [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA main.table_info({table})")]
+
+
+def _batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def iter_changes(conn, table, since, upto, batch_size=BATCH_SIZE):
+    """
+    Lotes de alterações de `table` com since < CDC_ID <= upto: a operação mais recente
+    de cada linha, seguida dos valores atuais (nulos quando a linha saiu da tabela).
+    """
+    columns = ", ".join(f"t.{name}" for name, _ in table_columns(conn, table))
+    cursor = conn.execute(f"""
+        SELECT c.ID, c.OPERACAO, c.ID_LINHA, c.VERSAO, {columns}
+        FROM CDC_LOG c
+        LEFT JOIN {table} t ON t.ID = c.ID_LINHA AND c.OPERACAO IN ('{INSERT}', '{UPDATE}')
+        WHERE c.ID IN (SELECT MAX(ID) FROM CDC_LOG
+                       WHERE TABELA = ? AND ID > ? AND ID <= ? GROUP BY ID_LINHA)
+        ORDER BY c.ID
+    """, (table, since, upto))
+    return _batches(cursor, batch_size)
+
+
+def iter_snapshot(conn, table, upto, batch_size=BATCH_SIZE):
+    """Lotes com todas as linhas de `table`, como inserções na marca upto (carga completa)."""
+    names = [name for name, _ in table_columns(conn, table)]
+    version = "VERSAO" if "VERSAO" in names else "NULL"
+    cursor = conn.execute(
+        f"SELECT ?, '{INSERT}', ID, {version}, {', '.join(names)} FROM {table} ORDER BY ID", (upto,))
+    return _batches(cursor, batch_size)
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = csv.writer(self.file, delimiter=";")
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonLinesWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", encoding="utf-8")
+        self.names = [name for name, _ in columns]
+
+    def write(self, rows):
+        self.file.writelines(json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        if pq is None:
+            raise RuntimeError("O formato parquet requer o pacote pyarrow (pip install pyarrow).")
+        self.schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        # Um row group por lote: as colunas são montadas a partir das tuplas do lote
+        arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _arrow_type(declared):
+    if "INT" in declared:
+        return pa.int64()
+    if any(kind in declared for kind in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+WRITERS = {"csv": _CsvWriter, "jsonl": _JsonLinesWriter, "parquet": _ParquetWriter}
+
+
+def acknowledged(conn, consumer):
+    """Última marca confirmada pelo consumidor (None se ainda não confirmou nenhuma)."""
+    row = conn.execute("SELECT ULTIMO_ID FROM CDC_CONSUMIDOR WHERE NOME = ?", (consumer,)).fetchone()
+    return row[0] if row else None
+
+
+def extract(db_manager, output_dir, fmt="jsonl", consumer=None, since=None, full=False,
+            tables=CAPTURED_TABLES, batch_size=BATCH_SIZE):
+    """
+    Grava em output_dir as alterações desde `since` (padrão: a marca confirmada pelo
+    consumidor) ou, com full (ou sem marca), todas as linhas das tabelas. Retorna o
+    manifesto, também gravado em manifest.json; a marca "ate" é a que deve ser confirmada.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Formato não suportado: {fmt}")
+    conn = db_manager.get_connection()
+    os.makedirs(output_dir, exist_ok=True)
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")  # marcas e valores lidos no mesmo instante do banco
+    try:
+        if since is None and consumer:
+            since = acknowledged(conn, consumer)
+        full = full or since is None
+        upto = last_change_id(conn)
+        if not full and since < first_change_id(conn) - 1:
+            raise ValueError(f"As alterações após a marca {since} já foram compactadas; faça uma carga completa.")
+        files = {}
+        for table in tables:
+            batches = iter_snapshot(conn, table, upto, batch_size) if full \
+                else iter_changes(conn, table, since, upto, batch_size)
+            columns = [(name, "INTEGER" if name != "CDC_OPERACAO" else "TEXT") for name in CHANGE_COLUMNS]
+            columns += table_columns(conn, table)
+            path, writer, rows = os.path.join(output_dir, f"{table}.{FORMATS[fmt]}"), None, 0
+            try:
+                for batch in batches:
+                    if writer is None:
+                        writer = WRITERS[fmt](path, columns)
+                    writer.write(batch)
+                    rows += len(batch)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if rows:
+                files[table] = {"arquivo": os.path.basename(path), "linhas": rows}
+    finally:
+        if own_transaction:
+            conn.rollback()
+    manifest = {"consumidor": consumer, "desde": None if full else since, "ate": upto, "completa": full,
+                "formato": fmt, "data": datetime.now().isoformat(timespec="seconds"), "arquivos": files}
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+# --- Confirmação e compactação ---
+
+def acknowledge(db_manager, consumer, watermark, compact_log=True):
+    """
+    Registra que o consumidor carregou as alterações até `watermark` e, com compact_log,
+    compacta o log. Retorna as linhas removidas do log.
+    """
+    conn = db_manager.get_connection()
+    with db_manager.transaction():
+        if watermark > last_change_id(conn):
+            raise ValueError(f"Marca {watermark} acima da última alteração registrada.")
+        conn.execute("""
+            INSERT INTO CDC_CONSUMIDOR (NOME, ULTIMO_ID, DATA_CONFIRMACAO) VALUES (?, ?, ?)
+            ON CONFLICT (NOME) DO UPDATE SET ULTIMO_ID = MAX(ULTIMO_ID, excluded.ULTIMO_ID),
+                                            DATA_CONFIRMACAO = excluded.DATA_CONFIRMACAO
+        """, (consumer, watermark, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return compact(conn) if compact_log else 0
+
+
+def compact(conn, retention_days=RETENTION_DAYS, max_retention_days=MAX_RETENTION_DAYS):
+    """
+    Remove do log o que todos os consumidores já confirmaram ou, sem consumidores, o que
+    tem mais de retention_days dias; o que tem mais de max_retention_days dias sai sempre.
+    Corta por ID, para que os IDs restantes continuem contínuos.
+    """
+    return conn.execute("""
+        DELETE FROM CDC_LOG WHERE ID <= MAX(
+            COALESCE((SELECT MIN(ULTIMO_ID) FROM CDC_CONSUMIDOR),
+                     (SELECT MAX(ID) FROM CDC_LOG WHERE DATA < datetime('now', ?)), 0),
+            COALESCE((SELECT MAX(ID) FROM CDC_LOG WHERE DATA < datetime('now', ?)), 0))
+    """, (f"-{retention_days} days", f"-{max_retention_days} days")).rowcount
+
+
+def remove_consumer(db_manager, consumer):
+    """Descadastra um consumidor (o log deixa de ser retido por ele)."""
+    with db_manager.transaction():
+        return db_manager.get_connection().execute(
+            "DELETE FROM CDC_CONSUMIDOR WHERE NOME = ?", (consumer,)).rowcount
+
+
+def status(conn):
+    count, oldest = conn.execute("SELECT COUNT(*), MIN(DATA) FROM CDC_LOG").fetchone()
+    return {
+        "ultima_marca": last_change_id(conn),
+        "primeira_disponivel": first_change_id(conn),
+        "linhas_no_log": count,
+        "alteracao_mais_antiga": oldest,
+        "consumidores": [dict(row) for row in conn.execute("SELECT * FROM CDC_CONSUMIDOR ORDER BY NOME")],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extração incremental (CDC) para ferramentas de BI.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="Marcas, tamanho do log e consumidores.")
+
+    extract_parser = subparsers.add_parser("extract", help="Grava as alterações desde a última marca confirmada.")
+    extract_parser.add_argument("--consumer", help="Nome do consumidor (ex.: dw).")
+    extract_parser.add_argument("--since", type=int, help="Marca inicial (sobrepõe a confirmada).")
+    extract_parser.add_argument("--full", action="store_true", help="Carga completa das tabelas.")
+    extract_parser.add_argument("--format", default="jsonl", choices=sorted(WRITERS))
+    extract_parser.add_argument("--output-dir", required=True)
+    extract_parser.add_argument("--table", action="append", dest="tables", choices=CAPTURED_TABLES)
+    extract_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    ack_parser = subparsers.add_parser("ack", help="Confirma a carga até a marca e compacta o log.")
+    ack_parser.add_argument("--consumer", required=True)
+    ack_parser.add_argument("--watermark", type=int, required=True, help='A marca "ate" do manifest.json.')
+    ack_parser.add_argument("--no-compact", action="store_true")
+
+    remove_parser = subparsers.add_parser("remove", help="Descadastra um consumidor.")
+    remove_parser.add_argument("--consumer", required=True)
+
+    compact_parser = subparsers.add_parser("compact", help="Compacta o log (confirmações e retenção).")
+    compact_parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS)
+    args = parser.parse_args(argv)
+
+    from app.database.db import DatabaseManager
+    if args.command in ("status", "extract"):
+        db_manager = DatabaseManager.open_read_only(args.db)
+        if args.command == "status":
+            result = status(db_manager.get_connection())
+        else:
+            result = extract(db_manager, args.output_dir, args.format, args.consumer, args.since, args.full,
+                             tuple(args.tables or CAPTURED_TABLES), args.batch_size)
+    elif args.command == "ack":
+        removed = acknowledge(DatabaseManager(args.db), args.consumer, args.watermark, not args.no_compact)
+        result = {"consumidor": args.consumer, "marca": args.watermark, "linhas_compactadas": removed}
+    elif args.command == "compact":
+        db_manager = DatabaseManager(args.db)
+        with db_manager.transaction():
+            result = {"linhas_compactadas": compact(db_manager.get_connection(), args.retention_days)}
+    else:
+        result = {"consumidor": args.consumer, "removido": bool(remove_consumer(DatabaseManager(args.db), args.consumer))}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# app/database/child_sync.py
+"""
+Sincronização das linhas filhas de um documento (itens da nota, da saída, da OP...).
+
+Em vez de apagar e reinserir todas as linhas a cada gravação, a lista recebida é
+comparada com as linhas existentes pela chave natural (ex.: ID_INSUMO dentro da
+nota) e somente as inserções, atualizações e exclusões necessárias são executadas,
+cada grupo em um único executemany.
+"""
+
+
+def sync_child_rows(cursor, table, parent_column, parent_id, key_columns, value_columns, rows):
+    """
+    Sincroniza as linhas de `table` cujo `parent_column` é `parent_id` com `rows`.
+
+    Cada linha recebida é uma tupla com os valores de key_columns seguidos dos de
+    value_columns. Linhas existentes com a mesma chave são atualizadas apenas se
+    algum valor mudou; chaves novas são inseridas e as ausentes, excluídas.
+    Retorna (inseridas, atualizadas, excluidas).
+    """
+    key_size = len(key_columns)
+    columns = ", ".join(key_columns + value_columns)
+    existing = {}
+    for row in cursor.execute(
+            f"SELECT rowid, {columns} FROM {table} WHERE {parent_column} = ? ORDER BY rowid", (parent_id,)):
+        row = tuple(row)
+        existing.setdefault(row[1:1 + key_size], []).append((row[0], row[1 + key_size:]))
+
+    inserts, updates = [], []
+    for row in rows:
+        key, values = tuple(row[:key_size]), tuple(row[key_size:])
+        matches = existing.get(key)
+        if matches:
+            rowid, current = matches.pop(0)
+            if current != values:
+                updates.append(values + (rowid,))
+        else:
+            inserts.append((parent_id,) + key + values)
+    deletes = [(rowid,) for matches in existing.values() for rowid, _ in matches]
+
+    if deletes:
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = ?", deletes)
+    if updates:
+        assignments = ", ".join(f"{column} = ?" for column in value_columns)
+        cursor.executemany(f"UPDATE {table} SET {assignments} WHERE rowid = ?", updates)
+    if inserts:
+        placeholders = ", ".join("?" * (1 + len(key_columns) + len(value_columns)))
+        cursor.executemany(f"INSERT INTO {table} ({parent_column}, {columns}) VALUES ({placeholders})", inserts)
+    return len(inserts), len(updates), len(deletes)
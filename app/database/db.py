@@ -3,6 +3,167 @@ import sqlite3
 import os
 import atexit
 import logging
+import time
+import zlib
+from pathlib import Path
+
+from app.database import migrations
+from app.database.unit_of_work import UnitOfWork
+from app.database.queries import REPORT_QUERIES, as_dict, fetch_all, fetch_one, shape_rows
+from app.reports import inventory_analytics
+
+# Tamanho do cache de instruções preparadas de cada conexão (o padrão do sqlite3 é 128)
+CACHED_STATEMENTS = 256
+
+# Tabelas do banco; a ordem é a de criação
+SCHEMA_TABLES = {
+    "UNIDADE": '''CREATE TABLE IF NOT EXISTS UNIDADE (
+                    ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE, SIGLA TEXT NOT NULL UNIQUE )''',
+    "ITEM": '''CREATE TABLE IF NOT EXISTS ITEM (
+                ID INTEGER PRIMARY KEY AUTOINCREMENT, CODIGO_INTERNO TEXT, DESCRICAO TEXT NOT NULL UNIQUE,
+                TIPO_ITEM TEXT NOT NULL CHECK(TIPO_ITEM IN ('Insumo', 'Produto', 'Ambos')), ID_UNIDADE INTEGER NOT NULL,
+                ID_FORNECEDOR_PADRAO INTEGER, SALDO_ESTOQUE REAL NOT NULL DEFAULT 0, CUSTO_MEDIO REAL NOT NULL DEFAULT 0,
+                VERSAO INTEGER NOT NULL DEFAULT 1,
+                FOREIGN KEY (ID_UNIDADE) REFERENCES UNIDADE (ID) ON DELETE RESTRICT,
+                FOREIGN KEY (ID_FORNECEDOR_PADRAO) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT )''',
+    "FORNECEDOR": '''CREATE TABLE IF NOT EXISTS FORNECEDOR (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, RAZAO_SOCIAL TEXT NOT NULL UNIQUE, NOME_FANTASIA TEXT,
+                        CNPJ TEXT UNIQUE, STATUS TEXT NOT NULL DEFAULT 'Ativo', TELEFONE TEXT, EMAIL TEXT,
+                        LOGRADOURO TEXT, NUMERO TEXT, COMPLEMENTO TEXT, BAIRRO TEXT, CIDADE TEXT, UF TEXT, CEP TEXT )''',
+    "ENTRADANOTA": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_ENTRADA TEXT NOT NULL, DATA_DIGITACAO TEXT,
+                        NUMERO_NOTA TEXT, VALOR_TOTAL REAL, OBSERVACAO TEXT,
+                        STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')),
+                        VERSAO INTEGER NOT NULL DEFAULT 1 )''',
+    "COMPOSICAO": '''CREATE TABLE IF NOT EXISTS COMPOSICAO (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_PRODUTO INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
+                        QUANTIDADE REAL NOT NULL, FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                        FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT, UNIQUE (ID_PRODUTO, ID_INSUMO) )''',
+    "ORDEMPRODUCAO": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO (
+                            ID INTEGER PRIMARY KEY AUTOINCREMENT, NUMERO TEXT, DATA_CRIACAO TEXT NOT NULL,
+                            DATA_PREVISTA TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Andamento', 'Concluída', 'Cancelada')),
+                            QUANTIDADE_PRODUZIDA REAL, CUSTO_TOTAL REAL, ID_LINHA_PRODUCAO INTEGER,
+                            VERSAO INTEGER NOT NULL DEFAULT 1,
+                            FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO(ID) ON DELETE SET NULL)''',
+    "ORDEMPRODUCAO_ITENS": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO_ITENS (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ORDEM_PRODUCAO INTEGER NOT NULL,
+                                ID_PRODUTO INTEGER NOT NULL, QUANTIDADE_PRODUZIR REAL NOT NULL,
+                                FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT,
+                                FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                                UNIQUE (ID_ORDEM_PRODUCAO, ID_PRODUTO) )''',
+    "MOVIMENTO": '''CREATE TABLE IF NOT EXISTS MOVIMENTO (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ITEM INTEGER NOT NULL, TIPO_MOVIMENTO TEXT NOT NULL,
+                        QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL, ID_ORDEM_PRODUCAO INTEGER, DATA_MOVIMENTO TEXT NOT NULL,
+                        FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                        FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT )''',
+    "ENTRADANOTA_ITENS": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA_ITENS (
+                            ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ENTRADA INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
+                            ID_FORNECEDOR INTEGER NOT NULL, QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
+                            FOREIGN KEY (ID_ENTRADA) REFERENCES ENTRADANOTA (ID) ON DELETE RESTRICT,
+                            FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                            FOREIGN KEY (ID_FORNECEDOR) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT,
+                            UNIQUE (ID_ENTRADA, ID_INSUMO) )''',
+    "SAIDA": '''CREATE TABLE IF NOT EXISTS SAIDA (
+                    ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_SAIDA TEXT NOT NULL, VALOR_TOTAL REAL,
+                    OBSERVACAO TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')),
+                    VERSAO INTEGER NOT NULL DEFAULT 1 )''',
+    "SAIDA_ITENS": '''CREATE TABLE IF NOT EXISTS SAIDA_ITENS (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_SAIDA INTEGER NOT NULL, ID_PRODUTO INTEGER NOT NULL,
+                        QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
+                        FOREIGN KEY (ID_SAIDA) REFERENCES SAIDA (ID) ON DELETE RESTRICT,
+                        FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                        UNIQUE (ID_SAIDA, ID_PRODUTO) )''',
+    "LINHAPRODUCAO": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE,
+                                DESCRICAO TEXT, STATUS TEXT NOT NULL DEFAULT 'Ativa' CHECK(STATUS IN ('Ativa', 'Inativa')) )''',
+    "LINHAPRODUCAO_ITEMS": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO_ITEMS (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_LINHA_PRODUCAO INTEGER NOT NULL,
+                                ID_PRODUTO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                                FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO (ID) ON DELETE CASCADE,
+                                FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                                UNIQUE (ID_LINHA_PRODUCAO, ID_PRODUTO) )''',
+    "CHECKPOINT_CUSTO": '''CREATE TABLE IF NOT EXISTS CHECKPOINT_CUSTO (
+                            ID_ITEM INTEGER NOT NULL, PERIODO TEXT NOT NULL,
+                            SALDO REAL NOT NULL, CUSTO_MEDIO REAL NOT NULL,
+                            PRIMARY KEY (ID_ITEM, PERIODO),
+                            FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE CASCADE )''',
+    "ARQUIVO_PERIODO": '''CREATE TABLE IF NOT EXISTS ARQUIVO_PERIODO (
+                            ANO INTEGER PRIMARY KEY, ARQUIVO TEXT NOT NULL, DATA_FINAL TEXT NOT NULL,
+                            DATA_FECHAMENTO TEXT NOT NULL )''',
+    "PARAMETRO_REPOSICAO": '''CREATE TABLE IF NOT EXISTS PARAMETRO_REPOSICAO (
+                            ID_ITEM INTEGER PRIMARY KEY, PERIODO TEXT,
+                            DEMANDA_MENSAL REAL NOT NULL DEFAULT 0, DESVIO_MEDIO REAL NOT NULL DEFAULT 0,
+                            PRAZO_DIAS REAL NOT NULL DEFAULT 15, ESTOQUE_SEGURANCA REAL NOT NULL DEFAULT 0,
+                            PONTO_PEDIDO REAL NOT NULL DEFAULT 0,
+                            FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE CASCADE )''',
+    "MIGRACAO_LOG": '''CREATE TABLE IF NOT EXISTS MIGRACAO_LOG (
+                        VERSAO INTEGER NOT NULL, PASSO TEXT NOT NULL, LINHAS INTEGER, DURACAO_MS REAL NOT NULL,
+                        DATA_EXECUCAO TEXT NOT NULL, PRIMARY KEY (VERSAO, PASSO) )''',
+    "CDC_LOG": '''CREATE TABLE IF NOT EXISTS CDC_LOG (
+                    ID INTEGER PRIMARY KEY AUTOINCREMENT, TABELA TEXT NOT NULL, ID_LINHA INTEGER NOT NULL,
+                    OPERACAO TEXT NOT NULL CHECK(OPERACAO IN ('I', 'U', 'D', 'A')), VERSAO INTEGER,
+                    DATA TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP )''',
+    "CDC_CONSUMIDOR": '''CREATE TABLE IF NOT EXISTS CDC_CONSUMIDOR (
+                        NOME TEXT PRIMARY KEY, ULTIMO_ID INTEGER NOT NULL, DATA_CONFIRMACAO TEXT NOT NULL )''',
+    "SYNC_SITE": '''CREATE TABLE IF NOT EXISTS SYNC_SITE (
+                    ID TEXT PRIMARY KEY, NOME TEXT, LOCAL INTEGER NOT NULL DEFAULT 0,
+                    ULTIMA_MARCA_RECEBIDA INTEGER NOT NULL DEFAULT 0, DATA_RECEBIMENTO TEXT )''',
+    "SYNC_REGISTRO": '''CREATE TABLE IF NOT EXISTS SYNC_REGISTRO (
+                        TABELA TEXT NOT NULL, ID_LOCAL INTEGER NOT NULL, SITE_ORIGEM TEXT NOT NULL,
+                        ID_ORIGEM INTEGER NOT NULL, VERSAO INTEGER NOT NULL, SITE_VERSAO TEXT NOT NULL, HASH TEXT,
+                        MARCA INTEGER, PRIMARY KEY (TABELA, ID_LOCAL) )''',
+    "SYNC_MAPA": '''CREATE TABLE IF NOT EXISTS SYNC_MAPA (
+                    TABELA TEXT NOT NULL, SITE_ORIGEM TEXT NOT NULL, ID_ORIGEM INTEGER NOT NULL,
+                    ID_LOCAL INTEGER NOT NULL, PRIMARY KEY (TABELA, SITE_ORIGEM, ID_ORIGEM) )''',
+    "MOVIMENTO_REMOTO": '''CREATE TABLE IF NOT EXISTS MOVIMENTO_REMOTO (
+                            ID INTEGER PRIMARY KEY AUTOINCREMENT, SITE_ORIGEM TEXT NOT NULL, ID_ORIGEM INTEGER NOT NULL,
+                            ID_ITEM INTEGER NOT NULL, TIPO_MOVIMENTO TEXT NOT NULL, QUANTIDADE REAL NOT NULL,
+                            VALOR_UNITARIO REAL, DATA_MOVIMENTO TEXT NOT NULL,
+                            FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                            UNIQUE (SITE_ORIGEM, ID_ORIGEM) )''',
+    "AGENDAMENTO_RELATORIO": '''CREATE TABLE IF NOT EXISTS AGENDAMENTO_RELATORIO (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE, RELATORIO TEXT NOT NULL,
+                                FILTROS TEXT NOT NULL DEFAULT '{}', FORMATO TEXT NOT NULL DEFAULT 'pdf'
+                                CHECK(FORMATO IN ('pdf', 'xlsx', 'csv')), AGENDA TEXT NOT NULL,
+                                ATIVO INTEGER NOT NULL DEFAULT 1, SOMENTE_ALTERADO INTEGER NOT NULL DEFAULT 1,
+                                RETENCAO_DIAS INTEGER NOT NULL DEFAULT 30, PROXIMA_EXECUCAO TEXT, ULTIMA_EXECUCAO TEXT,
+                                ULTIMA_MARCA INTEGER, ULTIMO_ARQUIVO TEXT, ULTIMO_STATUS TEXT )'''
+}
+
+SEED_UNITS = [('Grama', 'g'), ('Quilograma', 'kg'), ('Mililitro', 'ml'), ('Litro', 'L'), ('Unidade', 'un')]
+
+# Versão da última migração (app/database/migrations.py)
+SCHEMA_VERSION = migrations.LATEST_VERSION
+
+
+def schema_fingerprint():
+    """
+    Impressão digital do esquema esperado (tabelas, unidades iniciais e versão),
+    gravada em PRAGMA application_id. Inteiro de 32 bits com sinal, nunca zero.
+    """
+    text = "\n".join([*(" ".join(sql.split()) for sql in SCHEMA_TABLES.values()), repr(SEED_UNITS), str(SCHEMA_VERSION)])
+    value = zlib.crc32(text.encode("utf-8")) or 1
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+def create_tables(conn):
+    """Cria as tabelas que faltam e as unidades iniciais."""
+    cursor = conn.cursor()
+    for table_sql in SCHEMA_TABLES.values():
+        cursor.execute(table_sql)
+    # Seed initial data
+    for nome, sigla in SEED_UNITS:
+        cursor.execute("SELECT ID FROM UNIDADE WHERE NOME = ?", (nome,))
+        if cursor.fetchone() is None:
+            cursor.execute("INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)", (nome, sigla))
+
+
+def connect_read_only(db_path, cached_statements=CACHED_STATEMENTS):
+    """Abre uma conexão somente leitura (URI mode=ro) com o banco informado."""
+    uri = Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+    connection = sqlite3.connect(uri, uri=True, cached_statements=cached_statements)
+    connection.row_factory = sqlite3.Row
+    return connection
 
 class DatabaseManager:
     _instance = None
@@ -12,15 +173,67 @@ class DatabaseManager:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, db_path=None, cached_statements=CACHED_STATEMENTS, migration_progress=None):
         if not hasattr(self, 'initialized'):
-            self.db_path = self._get_db_path()
+            self.db_path = db_path or self._get_db_path()
+            self.cached_statements = cached_statements
+            # progress(versão, passo, feitas, total) durante migrações demoradas
+            self.migration_progress = migration_progress
             self.connection = None
+            self.read_only = False
+            self.report_mode = None
+            self.report_connection = None
+            self.sales_analytics = None
+            self.columnar_history = None
             self.initialize_database()
             atexit.register(self.close_connection)
             self.initialized = True
 
-    def _get_db_path(self):
+    @classmethod
+    def open_read_only(cls, db_path=None, cached_statements=CACHED_STATEMENTS):
+        """
+        Cria uma instância independente do singleton, com conexão somente leitura.
+        Usada para gerar relatórios fora da interface (CLI, processos de trabalho).
+        """
+        db_path = db_path or cls._get_db_path()
+        return cls._independent(db_path, connect_read_only(db_path, cached_statements), cached_statements, True)
+
+    @classmethod
+    def open_worker(cls, db_path=None, cached_statements=CACHED_STATEMENTS):
+        """
+        Instância independente do singleton, com conexão própria de leitura e escrita.
+        Usada por rotinas em threads de fundo (manutenção, relatórios do servidor), fora da conexão principal.
+        """
+        db_path = db_path or cls._get_db_path()
+        connection = sqlite3.connect(db_path, timeout=30, cached_statements=cached_statements)
+        connection.row_factory = sqlite3.Row
+        return cls._independent(db_path, connection, cached_statements, False)
+
+    @classmethod
+    def _independent(cls, db_path, connection, cached_statements, read_only):
+        manager = super(DatabaseManager, cls).__new__(cls)
+        manager.db_path = db_path
+        manager.cached_statements = cached_statements
+        manager.connection = connection
+        manager.unit_of_work = UnitOfWork(manager.connection)
+        manager.read_only = read_only
+        manager.report_mode = None
+        manager.report_connection = None
+        manager.sales_analytics = None
+        manager.columnar_history = None
+        manager.migration_progress = None
+        manager.initialized = True
+        return manager
+
+    @classmethod
+    def reset_instance(cls):
+        """Fecha a conexão atual e descarta o singleton (usado por testes e benchmarks)."""
+        if cls._instance is not None:
+            cls._instance.close_connection()
+            cls._instance = None
+
+    @staticmethod
+    def _get_db_path():
         # Build a path relative to the project root
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
         return os.path.join(project_root, "Gestão de Produção", "Dados", "DADOS.DB")
@@ -30,765 +243,272 @@ class DatabaseManager:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
         
-        self.connection = sqlite3.connect(self.db_path)
+        self.connection = sqlite3.connect(self.db_path, cached_statements=self.cached_statements)
         self.connection.row_factory = sqlite3.Row
+        self.unit_of_work = UnitOfWork(self.connection)
+        if self._schema_is_current():
+            logging.info(f"Banco de dados aberto em: {self.db_path}")
+            return
         self._create_tables()
         self._run_migrations()
+        self.connection.execute(f"PRAGMA application_id = {schema_fingerprint()}")
         self.connection.commit()
         logging.info(f"Banco de dados inicializado em: {self.db_path}")
 
+    def _schema_is_current(self):
+        """
+        Uma única consulta: versão das migrações e impressão digital do esquema. Se
+        ambas conferem, criação de tabelas, unidades iniciais e migrações são puladas.
+        """
+        version, fingerprint = self.connection.execute(
+            "SELECT user_version, application_id FROM pragma_user_version, pragma_application_id").fetchone()
+        return version == SCHEMA_VERSION and fingerprint == schema_fingerprint()
+
     def get_connection(self):
         if self.connection is None:
             raise Exception("A conexão com o banco de dados não foi inicializada.")
         return self.connection
 
+    def transaction(self):
+        """Unidade de trabalho (app/database/unit_of_work.py): um commit no fim, SAVEPOINT se aninhada."""
+        return self.unit_of_work.transaction()
+
+    def publish(self, table, operation, ids=()):
+        """Evento de alteração; dentro de uma transação, só é publicado depois dela."""
+        self.unit_of_work.publish(table, operation, ids)
+
+    def enable_sales_analytics(self):
+        """Passa a responder os relatórios de lucro pelo cache colunar de vendas (app/reports/sales_analytics.py)."""
+        if self.sales_analytics is None:
+            from app.reports.sales_analytics import SalesAnalyticsCache
+            self.sales_analytics = SalesAnalyticsCache(self)
+        return self.sales_analytics
+
+    def enable_columnar_history(self, directory=None):
+        """
+        Passa a responder os relatórios de lucro e de produção por período pelo histórico
+        em Parquet/DuckDB (app/reports/columnar_history.py), somado à cauda viva do SQLite.
+        """
+        if self.columnar_history is None:
+            from app.reports.columnar_history import ColumnarHistory
+            self.columnar_history = ColumnarHistory(self, directory)
+        return self.columnar_history
+
+    def set_report_mode(self, mode=None, replica_refresh_seconds=300):
+        """
+        Define a conexão usada pelos métodos de relatório (get_*):
+        None       - a própria conexão das gravações;
+        'readonly' - conexão somente leitura separada; o banco passa para o modo WAL,
+                     em que leituras longas e gravações não se bloqueiam;
+        'replica'  - cópia em memória feita com a API de backup, renovada quando
+                     tiver mais de replica_refresh_seconds segundos.
+        """
+        if mode not in (None, "readonly", "replica"):
+            raise ValueError(f"Modo de relatório inválido: {mode}")
+        self._close_report_connection()
+        self.report_mode = None if self.read_only else mode
+        self.replica_refresh_seconds = replica_refresh_seconds
+        if self.report_mode == "readonly":
+            conn = self.get_connection()
+            conn.commit()
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    def get_report_connection(self):
+        if self.report_mode is None:
+            return self.get_connection()
+        if self.report_connection is None:
+            if self.report_mode == "readonly":
+                self.report_connection = connect_read_only(self.db_path, self.cached_statements)
+            else:
+                self.report_connection = sqlite3.connect("file:minisis_replica?mode=memory", uri=True,
+                                                         cached_statements=self.cached_statements)
+                self.report_connection.row_factory = sqlite3.Row
+                self._replica_refreshed_at = None
+        if self.report_mode == "replica" and (
+                self._replica_refreshed_at is None
+                or time.monotonic() - self._replica_refreshed_at > self.replica_refresh_seconds):
+            self.refresh_replica()
+        return self.report_connection
+
+    def refresh_replica(self):
+        """Atualiza a réplica em memória a partir do banco, em passos de poucas páginas."""
+        if self.report_mode != "replica" or self.report_connection is None:
+            return
+        source = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            source.backup(self.report_connection, pages=256)
+        finally:
+            source.close()
+        self._replica_refreshed_at = time.monotonic()
+
+    def _close_report_connection(self):
+        if self.report_connection is not None:
+            self.report_connection.close()
+            self.report_connection = None
+
+    def archive_path(self, filename):
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), filename)
+
+    def attach_archive(self, year, filename, connection=None):
+        """
+        Anexa à conexão (uma única vez) o arquivo de período fechado do ano, como esquema
+        arq_<ano>. Conexões de relatório anexam o arquivo somente para leitura.
+        """
+        schema = f"arq_{int(year)}"
+        connection = connection or self.get_connection()
+        if schema not in {row[1] for row in connection.execute("PRAGMA database_list")}:
+            path = self.archive_path(filename)
+            read_only = self.read_only or connection is not self.connection
+            target = Path(path).as_uri() + "?mode=ro" if read_only else path
+            connection.execute(f"ATTACH DATABASE ? AS {schema}", (target,))
+        return schema
+
+    def _archive_schemas(self, date_from=None, date_to=None):
+        """Anexa e retorna os arquivos de períodos fechados alcançados pelo intervalo de datas."""
+        conn = self.get_report_connection()
+        try:
+            archives = conn.execute(
+                "SELECT ANO, ARQUIVO, DATA_FINAL FROM ARQUIVO_PERIODO ORDER BY ANO").fetchall()
+        except sqlite3.OperationalError:
+            return []  # banco anterior ao fechamento de períodos
+        schemas = []
+        for year, filename, last_date in archives:
+            if date_from and str(date_from)[:10] > last_date:
+                continue
+            if date_to and str(date_to)[:4] < f"{year:04d}":
+                continue
+            if not os.path.exists(self.archive_path(filename)):
+                logging.warning(f"Arquivo de período {filename} não encontrado; histórico de {year} ignorado.")
+                continue
+            schemas.append(self.attach_archive(year, filename, conn))
+        return schemas
+
+    def history_sources(self, *tables, date_from=None, date_to=None):
+        """
+        Fonte SQL de cada tabela de histórico para o intervalo de datas: a própria tabela
+        ou, se o intervalo alcança períodos fechados, um UNION ALL com os arquivos anuais.
+        """
+        schemas = self._archive_schemas(date_from, date_to)
+        if not schemas:
+            return {table: table for table in tables}
+        conn = self.get_report_connection()
+        sources = {}
+        for table in tables:
+            columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+            parts = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+            for schema in schemas:
+                archived = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+                if archived:
+                    select = ", ".join(c if c in archived else f"NULL AS {c}" for c in columns)
+                    parts.append(f"SELECT {select} FROM {schema}.{table}")
+            sources[table] = "(" + " UNION ALL ".join(parts) + ")"
+        return sources
+
     def close_connection(self):
+        self._close_report_connection()
         if self.connection:
             self.connection.close()
             self.connection = None
             logging.info("Conexão com o banco de dados fechada.")
 
     def _create_tables(self):
-        cursor = self.connection.cursor()
-        # Define all CREATE TABLE statements
-        tables = {
-            "UNIDADE": '''CREATE TABLE IF NOT EXISTS UNIDADE (
-                            ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE, SIGLA TEXT NOT NULL UNIQUE )''',
-            "ITEM": '''CREATE TABLE IF NOT EXISTS ITEM (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT, CODIGO_INTERNO TEXT, DESCRICAO TEXT NOT NULL UNIQUE,
-                        TIPO_ITEM TEXT NOT NULL CHECK(TIPO_ITEM IN ('Insumo', 'Produto', 'Ambos')), ID_UNIDADE INTEGER NOT NULL,
-                        ID_FORNECEDOR_PADRAO INTEGER, SALDO_ESTOQUE REAL NOT NULL DEFAULT 0, CUSTO_MEDIO REAL NOT NULL DEFAULT 0,
-                        FOREIGN KEY (ID_UNIDADE) REFERENCES UNIDADE (ID) ON DELETE RESTRICT,
-                        FOREIGN KEY (ID_FORNECEDOR_PADRAO) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT )''',
-            "FORNECEDOR": '''CREATE TABLE IF NOT EXISTS FORNECEDOR (
-                                ID INTEGER PRIMARY KEY AUTOINCREMENT, RAZAO_SOCIAL TEXT NOT NULL UNIQUE, NOME_FANTASIA TEXT,
-                                CNPJ TEXT UNIQUE, STATUS TEXT NOT NULL DEFAULT 'Ativo', TELEFONE TEXT, EMAIL TEXT,
-                                LOGRADOURO TEXT, NUMERO TEXT, COMPLEMENTO TEXT, BAIRRO TEXT, CIDADE TEXT, UF TEXT, CEP TEXT )''',
-            "ENTRADANOTA": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA (
-                                ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_ENTRADA TEXT NOT NULL, DATA_DIGITACAO TEXT,
-                                NUMERO_NOTA TEXT, VALOR_TOTAL REAL, OBSERVACAO TEXT,
-                                STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')) )''',
-            "COMPOSICAO": '''CREATE TABLE IF NOT EXISTS COMPOSICAO (
-                                ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_PRODUTO INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
-                                QUANTIDADE REAL NOT NULL, FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT, UNIQUE (ID_PRODUTO, ID_INSUMO) )''',
-            "ORDEMPRODUCAO": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO (
-                                    ID INTEGER PRIMARY KEY AUTOINCREMENT, NUMERO TEXT, DATA_CRIACAO TEXT NOT NULL,
-                                    DATA_PREVISTA TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Andamento', 'Concluída', 'Cancelada')),
-                                    QUANTIDADE_PRODUZIDA REAL, CUSTO_TOTAL REAL, ID_LINHA_PRODUCAO INTEGER,
-                                    FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO(ID) ON DELETE SET NULL)''',
-            "ORDEMPRODUCAO_ITENS": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO_ITENS (
-                                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ORDEM_PRODUCAO INTEGER NOT NULL,
-                                        ID_PRODUTO INTEGER NOT NULL, QUANTIDADE_PRODUZIR REAL NOT NULL,
-                                        FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT,
-                                        FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                        UNIQUE (ID_ORDEM_PRODUCAO, ID_PRODUTO) )''',
-            "MOVIMENTO": '''CREATE TABLE IF NOT EXISTS MOVIMENTO (
-                                ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ITEM INTEGER NOT NULL, TIPO_MOVIMENTO TEXT NOT NULL,
-                                QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL, ID_ORDEM_PRODUCAO INTEGER, DATA_MOVIMENTO TEXT NOT NULL,
-                                FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT )''',
-            "ENTRADANOTA_ITENS": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA_ITENS (
-                                    ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ENTRADA INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
-                                    ID_FORNECEDOR INTEGER NOT NULL, QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
-                                    FOREIGN KEY (ID_ENTRADA) REFERENCES ENTRADANOTA (ID) ON DELETE RESTRICT,
-                                    FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                    FOREIGN KEY (ID_FORNECEDOR) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT,
-                                    UNIQUE (ID_ENTRADA, ID_INSUMO) )''',
-            "SAIDA": '''CREATE TABLE IF NOT EXISTS SAIDA (
-                            ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_SAIDA TEXT NOT NULL, VALOR_TOTAL REAL,
-                            OBSERVACAO TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')) )''',
-            "SAIDA_ITENS": '''CREATE TABLE IF NOT EXISTS SAIDA_ITENS (
-                                ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_SAIDA INTEGER NOT NULL, ID_PRODUTO INTEGER NOT NULL,
-                                QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
-                                FOREIGN KEY (ID_SAIDA) REFERENCES SAIDA (ID) ON DELETE RESTRICT,
-                                FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                UNIQUE (ID_SAIDA, ID_PRODUTO) )''',
-            "LINHAPRODUCAO": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO (
-                                        ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE,
-                                        DESCRICAO TEXT, STATUS TEXT NOT NULL DEFAULT 'Ativa' CHECK(STATUS IN ('Ativa', 'Inativa')) )''',
-            "LINHAPRODUCAO_ITEMS": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO_ITEMS (
-                                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_LINHA_PRODUCAO INTEGER NOT NULL,
-                                        ID_PRODUTO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
-                                        FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO (ID) ON DELETE CASCADE,
-                                        FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                        UNIQUE (ID_LINHA_PRODUCAO, ID_PRODUTO) )'''
-        }
-        for table_sql in tables.values():
-            cursor.execute(table_sql)
-        # Seed initial data
-        unidades = [('Grama', 'g'), ('Quilograma', 'kg'), ('Mililitro', 'ml'), ('Litro', 'L'), ('Unidade', 'un')]
-        for nome, sigla in unidades:
-            cursor.execute("SELECT ID FROM UNIDADE WHERE NOME = ?", (nome,))
-            if cursor.fetchone() is None:
-                cursor.execute("INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)", (nome, sigla))
+        create_tables(self.connection)
 
     def _run_migrations(self):
-        cursor = self.connection.cursor()
-        # Migration versioning
-        cursor.execute("PRAGMA user_version")
-        db_version = cursor.fetchone()[0]
-
-        if db_version < 1:
-            self._migrate_v1(cursor)
-            cursor.execute("PRAGMA user_version = 1")
-        
-        if db_version < 2:
-            self._migrate_v2(cursor)
-            cursor.execute("PRAGMA user_version = 2")
+        migrations.run_pending(self.connection, self.migration_progress)
 
-        if db_version < 3:
-            self._migrate_v3(cursor)
-            cursor.execute("PRAGMA user_version = 3")
+    def run_query(self, name, filters=None, row_factory=as_dict):
+        """Executa uma consulta do registro (app/database/queries.py) na conexão de relatórios."""
+        sql, params = REPORT_QUERIES[name].build(self, filters or {})
+        return fetch_all(self.get_report_connection(), sql, params, row_factory)
 
-        self.connection.commit()
+    def get_stock_entries(self, filters, row_factory=as_dict):
+        return self.run_query("stock_entries", filters, row_factory)
 
-    def _migrate_v1(self, cursor):
-        """Migrations for version 1 of the database."""
-        # Fix table renames from old schema
-        table_rename_map = {
-            "TUNIDADE": "UNIDADE", "TITEM": "ITEM", "TFORNECEDOR": "FORNECEDOR",
-            "TENTRADANOTA": "ENTRADANOTA", "TCOMPOSICAO": "COMPOSICAO",
-            "TORDEMPRODUCAO": "ORDEMPRODUCAO", "TORDEMPRODUCAO_ITENS": "ORDEMPRODUCAO_ITENS",
-            "TMOVIMENTO": "MOVIMENTO", "TENTRADANOTA_ITENS": "ENTRADANOTA_ITENS"
-        }
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        for old_name, new_name in table_rename_map.items():
-            if old_name in tables and new_name not in tables:
-                cursor.execute(f"ALTER TABLE {old_name} RENAME TO {new_name}")
-
-        # Fix supplier table columns
-        cursor.execute("PRAGMA table_info(FORNECEDOR)")
-        supplier_columns = {col[1] for col in cursor.fetchall()}
-        if 'NOME' in supplier_columns and 'RAZAO_SOCIAL' not in supplier_columns:
-            cursor.execute('ALTER TABLE FORNECEDOR RENAME COLUMN NOME TO RAZAO_SOCIAL')
-        address_columns = ['LOGRADOURO', 'NUMERO', 'COMPLEMENTO', 'BAIRRO', 'CIDADE', 'UF', 'CEP']
-        for col in address_columns:
-            if col not in supplier_columns:
-                cursor.execute(f'ALTER TABLE FORNECEDOR ADD COLUMN {col} TEXT')
-
-        # Fix entry items table
-        cursor.execute("PRAGMA table_info(ENTRADANOTA_ITENS)")
-        entry_items_columns = {col[1] for col in cursor.fetchall()}
-        if 'ID_FORNECEDOR' not in entry_items_columns:
-            cursor.execute('ALTER TABLE ENTRADANOTA_ITENS ADD COLUMN ID_FORNECEDOR INTEGER REFERENCES FORNECEDOR(ID)')
-            if self._column_exists(cursor, 'ENTRADANOTA', 'ID_FORNECEDOR'):
-                cursor.execute("""
-                    UPDATE ENTRADANOTA_ITENS SET ID_FORNECEDOR = (
-                        SELECT ID_FORNECEDOR FROM ENTRADANota WHERE ENTRADANOTA.ID = ENTRADANOTA_ITENS.ID_ENTRADA)
-                """)
-        
-        # Non-destructive migration for ENTRADANOTA
-        self._migrate_entradanota_table(cursor)
-        # Non-destructive migration for ITEM
-        self._migrate_item_table(cursor)
-
-    def _migrate_v2(self, cursor):
-        """Migrations for version 2 of the database."""
-        # Recriar a tabela ORDEMPRODUCAO para atualizar a restrição CHECK e adicionar colunas
-        temp_table = "ORDEMPRODUCAO_temp_migration"
-        cursor.execute(f"DROP TABLE IF EXISTS {temp_table}")
-        cursor.execute(f"ALTER TABLE ORDEMPRODUCAO RENAME TO {temp_table}")
-
-        # Recriar a tabela com a nova estrutura
-        self._create_tables()
+    def get_product_cost_report(self, filters, row_factory=as_dict):
+        return self.run_query("product_cost", filters, row_factory)
 
-        # Copiar os dados da tabela temporária para a nova tabela
-        cursor.execute(f"""
-            INSERT INTO ORDEMPRODUCAO (ID, NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS)
-            SELECT ID, NUMERO, DATA_CRIACAO, DATA_PREVISTA,
-                   CASE
-                       WHEN STATUS = 'Planejada' THEN 'Em Andamento'
-                       WHEN STATUS = 'Concluída' THEN 'Concluída'
-                       ELSE STATUS
-                   END
-            FROM {temp_table}
-        """)
-        cursor.execute(f"DROP TABLE {temp_table}")
-
-    def _migrate_v3(self, cursor):
-        """Migrations for version 3 of the database."""
-        # Adicionar a coluna ID_LINHA_PRODUCAO na tabela ORDEMPRODUCAO
-        if not self._column_exists(cursor, 'ORDEMPRODUCAO', 'ID_LINHA_PRODUCAO'):
-            cursor.execute('''
-                ALTER TABLE ORDEMPRODUCAO
-                ADD COLUMN ID_LINHA_PRODUCAO INTEGER REFERENCES LINHAPRODUCAO(ID) ON DELETE SET NULL
-            ''')
-
-    def _column_exists(self, cursor, table_name, column_name):
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        return any(column[1] == column_name for column in cursor.fetchall())
-
-    def _migrate_entradanota_table(self, cursor):
-        if self._column_exists(cursor, 'ENTRADANOTA', 'ID_FORNECEDOR'):
-            temp_table = "ENTRADANOTA_temp_migration"
-            cursor.execute(f"DROP TABLE IF EXISTS {temp_table}")
-            cursor.execute(f"ALTER TABLE ENTRADANOTA RENAME TO {temp_table}")
-            
-            # Recreate with correct schema
-            self._create_tables() 
-            
-            # Copy data
-            cursor.execute(f"""
-                INSERT INTO ENTRADANOTA (ID, DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, VALOR_TOTAL, OBSERVACAO, STATUS)
-                SELECT ID, DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, VALOR_TOTAL, OBSERVACAO, STATUS FROM {temp_table}
-            """)
-            cursor.execute(f"DROP TABLE {temp_table}")
-
-    def _migrate_item_table(self, cursor):
-        # This migration is to remove the UNIQUE constraint from CODIGO_INTERNO.
-        # It's complex to check for a constraint directly, so we rebuild the table.
-        temp_table = "ITEM_temp_migration"
-        cursor.execute(f"DROP TABLE IF EXISTS {temp_table}")
-        cursor.execute(f"ALTER TABLE ITEM RENAME TO {temp_table}")
-
-        # Recreate with correct schema
-        self._create_tables()
+    def get_entry_items_report(self, filters, row_factory=as_dict):
+        return self.run_query("entry_items", filters, row_factory)
 
-        # Copy data
-        cursor.execute(f"""
-            INSERT INTO ITEM (ID, CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO, SALDO_ESTOQUE, CUSTO_MEDIO)
-            SELECT ID, CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO, SALDO_ESTOQUE, CUSTO_MEDIO FROM {temp_table}
-        """)
-        cursor.execute(f"DROP TABLE {temp_table}")
+    def get_stock_movements(self, filters, row_factory=as_dict):
+        return self.run_query("stock_movements", filters, row_factory)
 
-    def get_stock_entries(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                en.ID,
-                en.NUMERO_NOTA as numero,
-                f.RAZAO_SOCIAL as fornecedor,
-                en.DATA_ENTRADA as data,
-                en.VALOR_TOTAL as total
-            FROM ENTRADANOTA en
-            LEFT JOIN ENTRADANOTA_ITENS eni ON en.ID = eni.ID_ENTRADA
-            LEFT JOIN FORNECEDOR f ON eni.ID_FORNECEDOR = f.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("numero_de"):
-            where_clauses.append("en.NUMERO_NOTA >= ?")
-            params.append(filters["numero_de"])
-            
-        if filters.get("numero_ate"):
-            where_clauses.append("en.NUMERO_NOTA <= ?")
-            params.append(filters["numero_ate"])
-        
-        if filters.get("fornecedor"):
-            where_clauses.append("f.RAZAO_SOCIAL LIKE ?")
-            params.append(f'%{filters["fornecedor"]}%')
-            
-        if filters.get("data_inicial"):
-            where_clauses.append("en.DATA_ENTRADA >= ?")
-            params.append(filters["data_inicial"])
-            
-        if filters.get("data_final"):
-            where_clauses.append("en.DATA_ENTRADA <= ?")
-            params.append(filters["data_final"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        query += " GROUP BY en.ID"
-        
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_current_stock(self, row_factory=as_dict):
+        return self.run_query("current_stock", row_factory=row_factory)
 
-    def get_product_cost_report(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                i.DESCRICAO as produto,
-                i.CUSTO_MEDIO as custo_medio
-            FROM ITEM i
-            WHERE i.TIPO_ITEM = 'Produto' OR i.TIPO_ITEM = 'Ambos'
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("produto_de"):
-            where_clauses.append("i.DESCRICAO >= ?")
-            params.append(filters["produto_de"])
-            
-        if filters.get("produto_ate"):
-            where_clauses.append("i.DESCRICAO <= ?")
-            params.append(filters["produto_ate"])
-
-        if where_clauses:
-            query += " AND " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_entry_items_report(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                eni.ID_ENTRADA as nota,
-                i.DESCRICAO as insumo,
-                eni.QUANTIDADE as quantidade,
-                eni.VALOR_UNITARIO as valor_unitario,
-                (eni.QUANTIDADE * eni.VALOR_UNITARIO) as valor_total
-            FROM ENTRADANOTA_ITENS eni
-            JOIN ITEM i ON eni.ID_INSUMO = i.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("nota_de"):
-            where_clauses.append("eni.ID_ENTRADA >= ?")
-            params.append(filters["nota_de"])
-
-        if filters.get("nota_ate"):
-            where_clauses.append("eni.ID_ENTRADA <= ?")
-            params.append(filters["nota_ate"])
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_production_orders(self, filters, row_factory=as_dict):
+        return self.run_query("production_orders", filters, row_factory)
 
-    def get_stock_movements(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                i.DESCRICAO as item,
-                m.TIPO_MOVIMENTO as tipo_movimento,
-                m.QUANTIDADE as quantidade,
-                m.VALOR_UNITARIO as valor_unitario,
-                m.DATA_MOVIMENTO as data_movimento
-            FROM MOVIMENTO m
-            LEFT JOIN ITEM i ON m.ID_ITEM = i.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("item_de"):
-            where_clauses.append("i.DESCRICAO >= ?")
-            params.append(filters["item_de"])
-            
-        if filters.get("item_ate"):
-            where_clauses.append("i.DESCRICAO <= ?")
-            params.append(filters["item_ate"])
-            
-        if filters.get("periodo_de"):
-            where_clauses.append("m.DATA_MOVIMENTO >= ?")
-            params.append(filters["periodo_de"])
-            
-        if filters.get("periodo_ate"):
-            where_clauses.append("m.DATA_MOVIMENTO <= ?")
-            params.append(filters["periodo_ate"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_production_by_period(self, filters, row_factory=as_dict):
+        if self.columnar_history is not None:
+            self.columnar_history.refresh()
+            return shape_rows(*self.columnar_history.production_by_period(filters), row_factory)
+        return self.run_query("production_by_period", filters, row_factory)
 
-    def get_current_stock(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = "SELECT DESCRICAO, SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM"
-        
-        cursor.execute(query)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_production_by_line(self, filters, row_factory=as_dict):
+        return self.run_query("production_by_line", filters, row_factory)
 
-    def get_production_orders(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                op.ID as id,
-                i.DESCRICAO as produto,
-                op.STATUS as status,
-                op.DATA_CRIACAO as data_criacao,
-                opi.QUANTIDADE_PRODUZIR as quantidade
-            FROM ORDEMPRODUCAO op
-            LEFT JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
-            LEFT JOIN ITEM i ON opi.ID_PRODUTO = i.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("id_de"):
-            where_clauses.append("op.ID >= ?")
-            params.append(filters["id_de"])
-            
-        if filters.get("id_ate"):
-            where_clauses.append("op.ID <= ?")
-            params.append(filters["id_ate"])
-        
-        if filters.get("produto_de"):
-            where_clauses.append("i.DESCRICAO >= ?")
-            params.append(filters["produto_de"])
-            
-        if filters.get("produto_ate"):
-            where_clauses.append("i.DESCRICAO <= ?")
-            params.append(filters["produto_ate"])
-            
-        if filters.get("status"):
-            where_clauses.append("op.STATUS LIKE ?")
-            params.append(f'%{filters["status"]}%')
-            
-        if filters.get("periodo_de"):
-            where_clauses.append("op.DATA_CRIACAO >= ?")
-            params.append(filters["periodo_de"])
-
-        if filters.get("periodo_ate"):
-            where_clauses.append("op.DATA_CRIACAO <= ?")
-            params.append(filters["periodo_ate"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_product_composition(self, filters, row_factory=as_dict):
+        return self.run_query("product_composition", filters, row_factory)
 
-    def get_production_by_period(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                i.DESCRICAO as produto,
-                SUM(opi.QUANTIDADE_PRODUZIR) as quantidade_produzida,
-                op.DATA_CRIACAO as data_producao
-            FROM ORDEMPRODUCAO op
-            JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
-            JOIN ITEM i ON opi.ID_PRODUTO = i.ID
-        """
-        
-        where_clauses = []
-        params = []
-        if filters.get("periodo_de"):
-            where_clauses.append("op.DATA_CRIACAO >= ?")
-            params.append(filters["periodo_de"])
-            
-        if filters.get("periodo_ate"):
-            where_clauses.append("op.DATA_CRIACAO <= ?")
-            params.append(filters["periodo_ate"])
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        query += " GROUP BY i.ID"
-        
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_suppliers_report(self, filters=None, row_factory=as_dict):
+        return self.run_query("suppliers", row_factory=row_factory)
 
-    def get_production_by_line(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                lpm.NOME as linha,
-                i.DESCRICAO as produto,
-                SUM(opi.QUANTIDADE_PRODUZIR) as quantidade
-            FROM ORDEMPRODUCAO op
-            LEFT JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
-            LEFT JOIN ITEM i ON opi.ID_PRODUTO = i.ID
-            LEFT JOIN LINHAPRODUCAO lpm ON op.ID_LINHA_PRODUCAO = lpm.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("linha_de"):
-            where_clauses.append("lpm.NOME >= ?")
-            params.append(filters["linha_de"])
-            
-        if filters.get("linha_ate"):
-            where_clauses.append("lpm.NOME <= ?")
-            params.append(filters["linha_ate"])
-            
-        if filters.get("periodo_de"):
-            where_clauses.append("op.DATA_CRIACAO >= ?")
-            params.append(filters["periodo_de"])
-            
-        if filters.get("periodo_ate"):
-            where_clauses.append("op.DATA_CRIACAO <= ?")
-            params.append(filters["periodo_ate"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        query += " GROUP BY lpm.ID, i.ID"
-        
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+    def get_items_report(self, filters=None, row_factory=as_dict):
+        return self.run_query("items", row_factory=row_factory)
 
-    def get_product_composition(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                i_produto.DESCRICAO as produto,
-                i_insumo.DESCRICAO as insumo,
-                c.QUANTIDADE as quantidade,
-                u.SIGLA as unidade
-            FROM COMPOSICAO c
-            LEFT JOIN ITEM i_produto ON c.ID_PRODUTO = i_produto.ID
-            LEFT JOIN ITEM i_insumo ON c.ID_INSUMO = i_insumo.ID
-            LEFT JOIN UNIDADE u ON i_insumo.ID_UNIDADE = u.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("produto_de"):
-            where_clauses.append("i_produto.DESCRICAO >= ?")
-            params.append(filters["produto_de"])
-            
-        if filters.get("produto_ate"):
-            where_clauses.append("i_produto.DESCRICAO <= ?")
-            params.append(filters["produto_ate"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_suppliers_report(self, filters=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = "SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, STATUS FROM FORNECEDOR"
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_items_report(self, filters=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = "SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA as unidade, i.SALDO_ESTOQUE, i.CUSTO_MEDIO FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID"
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_low_stock_report(self, threshold=10):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = "SELECT DESCRICAO, SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE SALDO_ESTOQUE < ?"
-        cursor.execute(query, (threshold,))
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_yield_report(self, filters=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = """
-            SELECT 
-                op.ID, 
-                op.NUMERO, 
-                op.DATA_CRIACAO, 
-                SUM(opi.QUANTIDADE_PRODUZIR) as qtd_planejada, 
-                op.QUANTIDADE_PRODUZIDA as qtd_produzida,
-                CASE WHEN SUM(opi.QUANTIDADE_PRODUZIR) > 0 
-                     THEN (op.QUANTIDADE_PRODUZIDA / SUM(opi.QUANTIDADE_PRODUZIR)) * 100 
-                     ELSE 0 END as rendimento
-            FROM ORDEMPRODUCAO op
-            JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
-            WHERE op.STATUS = 'Concluída'
-            GROUP BY op.ID
+    def get_low_stock_report(self, threshold=10, row_factory=as_dict):
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_material_requirements_report(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = """
-            SELECT 
-                i_insumo.DESCRICAO as insumo,
-                u.SIGLA as unidade,
-                SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) as qtd_necessaria,
-                i_insumo.SALDO_ESTOQUE as qtd_estoque,
-                CASE WHEN SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) > i_insumo.SALDO_ESTOQUE 
-                     THEN SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) - i_insumo.SALDO_ESTOQUE 
-                     ELSE 0 END as falta
-            FROM ORDEMPRODUCAO op
-            JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
-            JOIN COMPOSICAO c ON opi.ID_PRODUTO = c.ID_PRODUTO
-            JOIN ITEM i_insumo ON c.ID_INSUMO = i_insumo.ID
-            JOIN UNIDADE u ON i_insumo.ID_UNIDADE = u.ID
-            WHERE op.STATUS = 'Em Andamento'
-            GROUP BY i_insumo.ID
+        Itens abaixo do ponto de pedido; `threshold` vale para itens ainda sem histórico de consumo.
+        Os pontos de pedido são atualizados pela manutenção (app/stock/replenishment.py), não aqui.
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_abc_curve_report(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = """
-            SELECT 
-                DESCRICAO,
-                SALDO_ESTOQUE,
-                CUSTO_MEDIO,
-                (SALDO_ESTOQUE * CUSTO_MEDIO) as valor_total
-            FROM ITEM
-            ORDER BY valor_total DESC
+        return self.run_query("low_stock", {"limite": threshold}, row_factory)
+
+    def get_yield_report(self, filters=None, row_factory=as_dict):
+        return self.run_query("yield", row_factory=row_factory)
+
+    def get_material_requirements_report(self, row_factory=as_dict):
+        return self.run_query("material_requirements", row_factory=row_factory)
+
+    def get_inventory_analytics(self, reference_date=None, row_factory=as_dict, **options):
+        return shape_rows(*inventory_analytics.analyze_inventory(self, reference_date, **options), row_factory)
+
+    def get_abc_curve_report(self, row_factory=as_dict):
+        return shape_rows(*inventory_analytics.abc_curve(self), row_factory)
+
+    def get_inactive_items_report(self, days=30, row_factory=as_dict):
+        return shape_rows(*inventory_analytics.inactive_items(self, days), row_factory)
+
+    def get_pivot_data(self, filters):
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
-
-    def get_inactive_items_report(self, days=30):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        query = """
-            SELECT 
-                i.DESCRICAO,
-                i.SALDO_ESTOQUE,
-                MAX(m.DATA_MOVIMENTO) as ultima_movimentacao
-            FROM ITEM i
-            LEFT JOIN MOVIMENTO m ON i.ID = m.ID_ITEM
-            GROUP BY i.ID
-            HAVING ultima_movimentacao < date('now', '-' || ? || ' days') OR ultima_movimentacao IS NULL
+        Combinações agregadas de um pivô (app/reports/pivot.py); o cross-tab é montado por
+        quem chama. Filtros: fato, linhas, colunas, medida, periodo_de, periodo_ate.
         """
-        cursor.execute(query, (days,))
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+        from app.reports import pivot
+        return pivot.grouped_rows(self, filters.get("fato", "movimentos"), filters.get("linhas") or ["item"],
+                                  filters.get("colunas", ["mes"]), filters.get("medida", "quantidade"),
+                                  filters.get("periodo_de"), filters.get("periodo_ate"))
 
     def get_profit_by_product(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                i.DESCRICAO as produto,
-                i.CUSTO_MEDIO as custo_unitario,
-                si.VALOR_UNITARIO as preco_venda,
-                SUM(si.QUANTIDADE) as quantidade_vendida,
-                (si.VALOR_UNITARIO - i.CUSTO_MEDIO) as lucro_unitario,
-                SUM(si.QUANTIDADE) * (si.VALOR_UNITARIO - i.CUSTO_MEDIO) as lucro_total
-            FROM SAIDA_ITENS si
-            LEFT JOIN ITEM i ON si.ID_PRODUTO = i.ID
-            LEFT JOIN SAIDA s ON si.ID_SAIDA = s.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("produto_de"):
-            where_clauses.append("i.DESCRICAO >= ?")
-            params.append(filters["produto_de"])
-            
-        if filters.get("produto_ate"):
-            where_clauses.append("i.DESCRICAO <= ?")
-            params.append(filters["produto_ate"])
-            
-        if filters.get("periodo_de"):
-            where_clauses.append("s.DATA_SAIDA >= ?")
-            params.append(filters["periodo_de"])
-            
-        if filters.get("periodo_ate"):
-            where_clauses.append("s.DATA_SAIDA <= ?")
-            params.append(filters["periodo_ate"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        query += " GROUP BY i.ID"
-        
-        cursor.execute(query, params)
-        
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        return [dict(zip(column_names, row)) for row in rows]
+        if self.columnar_history is not None:
+            self.columnar_history.refresh()
+            return self.columnar_history.profit_by_product(filters)
+        if self.sales_analytics is not None:
+            self.sales_analytics.refresh()
+            return self.sales_analytics.profit_by_product(filters)
+        return self.run_query("profit_by_product", filters)
 
     def get_profit_by_period(self, filters):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT
-                SUM(s.VALOR_TOTAL) as total_vendas,
-                SUM(i.CUSTO_MEDIO * si.QUANTIDADE) as custo_total,
-                (SUM(s.VALOR_TOTAL) - SUM(i.CUSTO_MEDIO * si.QUANTIDADE)) as lucro_final
-            FROM SAIDA s
-            LEFT JOIN SAIDA_ITENS si ON s.ID = si.ID_SAIDA
-            LEFT JOIN ITEM i ON si.ID_PRODUTO = i.ID
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if filters.get("data_inicial"):
-            where_clauses.append("s.DATA_SAIDA >= ?")
-            params.append(filters["data_inicial"])
-            
-        if filters.get("data_final"):
-            where_clauses.append("s.DATA_SAIDA <= ?")
-            params.append(filters["data_final"])
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        cursor.execute(query, params)
-        
-        row = cursor.fetchone()
-        if row:
-            column_names = [description[0] for description in cursor.description]
-            return dict(zip(column_names, row))
-        return {"total_vendas": 0, "custo_total": 0, "lucro_final": 0}
+        if self.columnar_history is not None:
+            self.columnar_history.refresh()
+            return self.columnar_history.profit_by_period(filters)
+        if self.sales_analytics is not None:
+            self.sales_analytics.refresh()
+            return self.sales_analytics.profit_by_period(filters)
+        sql, params = REPORT_QUERIES["profit_by_period"].build(self, filters)
+        row = fetch_one(self.get_report_connection(), sql, params)
+        return row or {"total_vendas": 0, "custo_total": 0, "lucro_final": 0}
 
 def get_db_manager():
     return DatabaseManager()
@@ -0,0 +1,253 @@
+# app/database/maintenance.py
+"""
+Backup online, snapshots, compactação e atualização dos pontos de pedido do
+DADOS.DB sem fechar a aplicação.
+
+Todas as rotinas abrem a própria conexão com o banco. A cópia usa a API de backup
+online do SQLite em passos de poucas páginas, liberando o banco entre um passo e
+outro para que a interface continue gravando. O MaintenanceService executa as
+rotinas em uma thread de fundo (uma por vez) e agenda snapshots periódicos,
+mantendo apenas os mais recentes; a cada ciclo (e na abertura) atualiza também
+PARAMETRO_REPOSICAO, que os relatórios de estoque apenas leem, e compacta o CDC_LOG.
+"""
+import glob
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.database import cdc
+from app.database.db import DatabaseManager
+from app.stock import replenishment
+
+SNAPSHOT_PATTERN = "DADOS_????????_??????*.DB"
+DEFAULT_PAGES = 256
+
+
+def default_backup_dir(db_path=None):
+    db_path = db_path or DatabaseManager._get_db_path()
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "Backups")
+
+
+def _connect(db_path):
+    # timeout alto: a manutenção espera os bloqueios da aplicação em vez de falhar
+    return sqlite3.connect(db_path or DatabaseManager._get_db_path(), timeout=30)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def backup_database(destination, db_path=None, pages=DEFAULT_PAGES, pause=0.005, progress=None):
+    """
+    Copia o banco para destination com a API de backup online, `pages` páginas por
+    passo e uma pausa entre passos. A cópia é gravada em um arquivo temporário e só
+    substitui o destino quando completa. progress(copiadas, total) é opcional.
+    """
+    temp_path = destination + ".tmp"
+    _remove_quietly(temp_path)
+    source = _connect(db_path)
+    target = sqlite3.connect(temp_path)
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if pause:
+            time.sleep(pause)
+
+    try:
+        source.backup(target, pages=pages, progress=on_step)
+    except Exception:
+        target.close()
+        _remove_quietly(temp_path)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(temp_path, destination)
+    return destination
+
+
+def vacuum_into(destination, db_path=None):
+    """Gera uma cópia compactada e desfragmentada do banco (VACUUM INTO)."""
+    temp_path = destination + ".tmp"
+    _remove_quietly(temp_path)
+    conn = _connect(db_path)
+    try:
+        conn.execute("VACUUM INTO ?", (temp_path,))
+    except Exception:
+        _remove_quietly(temp_path)
+        raise
+    finally:
+        conn.close()
+    os.replace(temp_path, destination)
+    return destination
+
+
+def optimize_database(db_path=None, analyze=False):
+    """Atualiza as estatísticas do otimizador (ANALYZE completo, se pedido, e PRAGMA optimize)."""
+    conn = _connect(db_path)
+    try:
+        if analyze:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def refresh_reorder_points(db_path=None, reference_date=None):
+    """Atualiza os pontos de pedido (app/stock/replenishment.py) com uma conexão própria."""
+    worker = DatabaseManager.open_worker(db_path)
+    try:
+        return replenishment.refresh_reorder_points(reference_date, db_manager=worker)
+    finally:
+        worker.close_connection()
+
+
+def compact_change_log(db_path=None):
+    """Compacta o CDC_LOG (app/database/cdc.py), mesmo sem consumidores cadastrados."""
+    conn = _connect(db_path)
+    try:
+        removed = cdc.compact(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return removed
+
+
+def database_stats(db_path=None):
+    """Tamanho do arquivo e proporção de páginas livres (fragmentação)."""
+    conn = _connect(db_path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "size_bytes": page_size * page_count,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "free_ratio": freelist_count / page_count if page_count else 0.0,
+    }
+
+
+def list_snapshots(directory=None):
+    """Snapshots existentes, do mais antigo para o mais recente."""
+    directory = directory or default_backup_dir()
+    return sorted(glob.glob(os.path.join(directory, SNAPSHOT_PATTERN)))
+
+
+def prune_snapshots(directory=None, keep=7):
+    """Remove os snapshots mais antigos, mantendo os `keep` mais recentes. Retorna os removidos."""
+    snapshots = list_snapshots(directory)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in removed:
+        _remove_quietly(path)
+    return removed
+
+
+def create_snapshot(directory=None, keep=7, db_path=None, compact=False, **backup_options):
+    """Cria um snapshot datado (backup online ou, com compact=True, VACUUM INTO) e aplica a retenção."""
+    directory = directory or default_backup_dir(db_path)
+    os.makedirs(directory, exist_ok=True)
+    # Microssegundos no nome: backup e cópia compactada no mesmo segundo não colidem
+    path = os.path.join(directory, f"DADOS_{datetime.now():%Y%m%d_%H%M%S_%f}.DB")
+    if compact:
+        vacuum_into(path, db_path)
+    else:
+        backup_database(path, db_path, **backup_options)
+    prune_snapshots(directory, keep)
+    return path
+
+
+class MaintenanceService:
+    """
+    Executa as rotinas de manutenção em segundo plano. on_finished(tarefa, sucesso,
+    mensagem) é chamado na thread de manutenção ao fim de cada tarefa.
+    """
+
+    def __init__(self, db_path=None, backup_dir=None, interval_hours=24, keep=7, startup_delay=60, on_finished=None):
+        self.db_path = db_path or DatabaseManager._get_db_path()
+        self.backup_dir = backup_dir or default_backup_dir(self.db_path)
+        self.interval = interval_hours * 3600
+        self.keep = keep
+        self.startup_delay = startup_delay
+        self.on_finished = on_finished
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maintenance")
+        self._stop = threading.Event()
+        self._scheduler = None
+
+    def submit(self, task, func, *args, **kwargs):
+        future = self._executor.submit(func, *args, **kwargs)
+        future.add_done_callback(lambda f: self._finished(task, f))
+        return future
+
+    def _finished(self, task, future):
+        if future.cancelled():
+            return  # descartada por stop()
+        error = future.exception()
+        if error:
+            logging.error(f"Manutenção '{task}' falhou: {error}")
+            message = f"Falha na manutenção ({task}): {error}"
+        else:
+            logging.info(f"Manutenção '{task}' concluída: {future.result()}")
+            message = f"Manutenção ({task}) concluída."
+            if isinstance(future.result(), str):
+                message = f"Manutenção ({task}) concluída: {os.path.basename(future.result())}"
+        if self.on_finished:
+            self.on_finished(task, error is None, message)
+
+    def backup_now(self):
+        return self.submit("backup", create_snapshot, self.backup_dir, self.keep, self.db_path)
+
+    def compact_now(self):
+        return self.submit("compactação", create_snapshot, self.backup_dir, self.keep, self.db_path, compact=True)
+
+    def optimize_now(self, analyze=True):
+        return self.submit("otimização", optimize_database, self.db_path, analyze)
+
+    def refresh_reorder_points_now(self):
+        return self.submit("pontos de pedido", refresh_reorder_points, self.db_path)
+
+    def compact_change_log_now(self):
+        return self.submit("log de alterações", compact_change_log, self.db_path)
+
+    def _seconds_until_next_snapshot(self):
+        snapshots = list_snapshots(self.backup_dir)
+        if not snapshots:
+            return self.startup_delay
+        elapsed = time.time() - os.path.getmtime(snapshots[-1])
+        return max(self.interval - elapsed, self.startup_delay)
+
+    def _run_scheduler(self):
+        if self._stop.wait(self.startup_delay):
+            return
+        self._run_tasks(self.refresh_reorder_points_now, self.compact_change_log_now)
+        while not self._stop.wait(self._seconds_until_next_snapshot()):
+            self._run_tasks(self.refresh_reorder_points_now, self.compact_change_log_now, self.backup_now)
+
+    def _run_tasks(self, *tasks):
+        """Executa as tarefas em sequência; a falha de uma não interrompe as outras nem o agendamento."""
+        for task in tasks:
+            try:
+                task().result()
+            except Exception:
+                pass  # já registrado em _finished
+
+    def start(self):
+        """Inicia o agendamento dos snapshots periódicos e da atualização dos pontos de pedido."""
+        if self._scheduler is None and self.interval > 0:
+            self._scheduler = threading.Thread(target=self._run_scheduler, name="maintenance-scheduler", daemon=True)
+            self._scheduler.start()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,367 @@
+# app/database/migrations.py
+"""
+Migrações do esquema do DADOS.DB.
+
+Cada migração (Migration) declara seus passos; o executor roda os passos das
+versões acima de PRAGMA user_version, um por vez, e grava em MIGRACAO_LOG o tempo
+e as linhas de cada passo concluído. Uma migração interrompida (queda de energia,
+aplicação fechada) recomeça do passo em que parou: passos já registrados são
+pulados e a cópia de tabelas continua do último ID copiado.
+
+Tabelas reconstruídas (rebuild_table) são copiadas para <TABELA>_NOVA em lotes de
+batch_size linhas, com um commit e um aviso de progresso por lote, sem segurar o
+banco inteiro em uma única transação. Ao final a tabela antiga é removida e a nova
+renomeada, recriando os índices e gatilhos que existiam.
+
+dry_run executa as migrações pendentes em uma cópia do banco (VACUUM INTO) para
+medir a duração antes de atualizar a instalação:
+
+    python -m app.database.migrations status
+    python -m app.database.migrations dry-run
+    python -m app.database.migrations run
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from app.database import cdc
+
+BATCH_SIZE = 5000
+
+
+class Step:
+    """Passo de migração: run(conn, context) retorna as linhas afetadas (ou None); when(conn) decide se roda."""
+    __slots__ = ("name", "run", "when")
+
+    def __init__(self, name, run, when=None):
+        self.name = name
+        self.run = run
+        self.when = when
+
+
+class Migration:
+    __slots__ = ("version", "description", "steps")
+
+    def __init__(self, version, description, steps):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+
+class StepContext:
+    """O que o executor passa a cada passo: tamanho do lote e aviso de progresso."""
+    __slots__ = ("version", "step", "batch_size", "progress")
+
+    def __init__(self, version, step, batch_size=BATCH_SIZE, progress=None):
+        self.version = version
+        self.step = step
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def report(self, done, total):
+        if self.progress:
+            self.progress(self.version, self.step, done, total)
+
+
+def _column_exists(conn, table_name, column_name):
+    return any(column[1] == column_name for column in conn.execute(f"PRAGMA table_info({table_name})"))
+
+
+def _table_exists(conn, table_name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone() is not None
+
+
+def sql_step(name, *statements, when=None):
+    """Passo com instruções SQL simples (devem poder ser repetidas)."""
+    def run(conn, context):
+        for statement in statements:
+            conn.execute(statement)
+    return Step(name, run, when)
+
+
+def rebuild_table(table, columns, expressions=None, when=None):
+    """
+    Passos para reconstruir `table` com a definição atual de SCHEMA_TABLES, copiando
+    `columns` (ou as `expressions` correspondentes) da tabela antiga, em lotes pelo ID.
+    """
+    new_table = f"{table}_NOVA"
+    select = ", ".join(expressions or columns)
+
+    def create(conn, context):
+        from app.database.db import SCHEMA_TABLES
+        sql = SCHEMA_TABLES[table].replace(f"EXISTS {table} (", f"EXISTS {new_table} (", 1)
+        conn.execute(sql)
+
+    def copy(conn, context):
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        last_id = conn.execute(f"SELECT COALESCE(MAX(ID), 0) FROM {new_table}").fetchone()[0]
+        done = conn.execute(f"SELECT COUNT(*) FROM {new_table}").fetchone()[0]
+        while True:
+            cursor = conn.execute(f"""
+                INSERT INTO {new_table} ({', '.join(columns)})
+                SELECT {select} FROM {table} WHERE ID > ? ORDER BY ID LIMIT ?
+            """, (last_id, context.batch_size))
+            conn.commit()
+            if cursor.rowcount <= 0:
+                break
+            done += cursor.rowcount
+            last_id = conn.execute(f"SELECT MAX(ID) FROM {new_table}").fetchone()[0]
+            context.report(done, total)
+        return done
+
+    def replace(conn, context):
+        # Sem a tabela nova, a troca já foi feita (interrompida antes do registro em MIGRACAO_LOG)
+        if not _table_exists(conn, new_table):
+            return None
+        # Índices e gatilhos da tabela antiga somem com o DROP; são recriados na nova
+        dependents = [row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+            (table,))]
+        conn.execute("BEGIN")
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        for sql in dependents:
+            conn.execute(sql)
+        conn.commit()
+
+    return [
+        Step(f"{table}: criar tabela nova", create, when),
+        Step(f"{table}: copiar linhas", copy, when),
+        Step(f"{table}: substituir tabela", replace, when),
+    ]
+
+
+# --- Migrações ---
+
+_LEGACY_TABLES = {
+    "TUNIDADE": "UNIDADE", "TITEM": "ITEM", "TFORNECEDOR": "FORNECEDOR",
+    "TENTRADANOTA": "ENTRADANOTA", "TCOMPOSICAO": "COMPOSICAO",
+    "TORDEMPRODUCAO": "ORDEMPRODUCAO", "TORDEMPRODUCAO_ITENS": "ORDEMPRODUCAO_ITENS",
+    "TMOVIMENTO": "MOVIMENTO", "TENTRADANOTA_ITENS": "ENTRADANOTA_ITENS"
+}
+
+
+def _rename_legacy_tables(conn, context):
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    for old_name, new_name in _LEGACY_TABLES.items():
+        if old_name in tables and new_name not in tables:
+            conn.execute(f"ALTER TABLE {old_name} RENAME TO {new_name}")
+
+
+def _supplier_columns(conn, context):
+    columns = {col[1] for col in conn.execute("PRAGMA table_info(FORNECEDOR)")}
+    if 'NOME' in columns and 'RAZAO_SOCIAL' not in columns:
+        conn.execute('ALTER TABLE FORNECEDOR RENAME COLUMN NOME TO RAZAO_SOCIAL')
+    for col in ['LOGRADOURO', 'NUMERO', 'COMPLEMENTO', 'BAIRRO', 'CIDADE', 'UF', 'CEP']:
+        if col not in columns:
+            conn.execute(f'ALTER TABLE FORNECEDOR ADD COLUMN {col} TEXT')
+
+
+def _entry_item_supplier(conn, context):
+    if not _column_exists(conn, 'ENTRADANOTA_ITENS', 'ID_FORNECEDOR'):
+        conn.execute('ALTER TABLE ENTRADANOTA_ITENS ADD COLUMN ID_FORNECEDOR INTEGER REFERENCES FORNECEDOR(ID)')
+    if not _column_exists(conn, 'ENTRADANOTA', 'ID_FORNECEDOR'):
+        return 0
+    return conn.execute("""
+        UPDATE ENTRADANOTA_ITENS SET ID_FORNECEDOR = (
+            SELECT ID_FORNECEDOR FROM ENTRADANOTA WHERE ENTRADANOTA.ID = ENTRADANOTA_ITENS.ID_ENTRADA)
+        WHERE ID_FORNECEDOR IS NULL
+    """).rowcount
+
+
+def _entry_has_supplier(conn):
+    # ENTRADANOTA antiga, com o fornecedor no cabeçalho (passou para ENTRADANOTA_ITENS)
+    return _column_exists(conn, 'ENTRADANOTA', 'ID_FORNECEDOR')
+
+
+def _item_code_is_unique(conn):
+    # ITEM antiga, com UNIQUE em CODIGO_INTERNO
+    for index in conn.execute("PRAGMA index_list(ITEM)"):
+        if index[2] and index[3] == 'u':
+            if [col[2] for col in conn.execute(f"PRAGMA index_info('{index[1]}')")] == ['CODIGO_INTERNO']:
+                return True
+    return False
+
+
+def _add_production_line(conn, context):
+    if not _column_exists(conn, 'ORDEMPRODUCAO', 'ID_LINHA_PRODUCAO'):
+        conn.execute('''
+            ALTER TABLE ORDEMPRODUCAO
+            ADD COLUMN ID_LINHA_PRODUCAO INTEGER REFERENCES LINHAPRODUCAO(ID) ON DELETE SET NULL
+        ''')
+
+
+def _add_version_column(table):
+    def run(conn, context):
+        if not _column_exists(conn, table, 'VERSAO'):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN VERSAO INTEGER NOT NULL DEFAULT 1")
+    return Step(f"{table}: coluna VERSAO", run)
+
+
+MIGRATIONS = [
+    Migration(1, "Esquema antigo (tabelas T*, fornecedor por item da nota, código interno repetível)", [
+        Step("renomear tabelas antigas", _rename_legacy_tables),
+        Step("colunas de endereço do fornecedor", _supplier_columns),
+        Step("fornecedor nos itens da nota", _entry_item_supplier),
+        *rebuild_table("ENTRADANOTA",
+                       ["ID", "DATA_ENTRADA", "DATA_DIGITACAO", "NUMERO_NOTA", "VALOR_TOTAL", "OBSERVACAO", "STATUS"],
+                       when=_entry_has_supplier),
+        *rebuild_table("ITEM",
+                       ["ID", "CODIGO_INTERNO", "DESCRICAO", "TIPO_ITEM", "ID_UNIDADE", "ID_FORNECEDOR_PADRAO",
+                        "SALDO_ESTOQUE", "CUSTO_MEDIO"],
+                       when=_item_code_is_unique),
+    ]),
+    # Nova restrição CHECK de STATUS ('Planejada' passa a 'Em Andamento')
+    Migration(2, "Status da ordem de produção", rebuild_table(
+        "ORDEMPRODUCAO",
+        ["ID", "NUMERO", "DATA_CRIACAO", "DATA_PREVISTA", "STATUS"],
+        ["ID", "NUMERO", "DATA_CRIACAO", "DATA_PREVISTA",
+         "CASE WHEN STATUS = 'Planejada' THEN 'Em Andamento' ELSE STATUS END"])),
+    Migration(3, "Linha de produção da ordem", [
+        Step("coluna ID_LINHA_PRODUCAO", _add_production_line),
+    ]),
+    # Reprocessar a movimentação de um item em ordem cronológica (app/stock/costing.py)
+    Migration(4, "Índice de movimentos por item e data", [
+        sql_step("IDX_MOVIMENTO_ITEM_DATA",
+                 "CREATE INDEX IF NOT EXISTS IDX_MOVIMENTO_ITEM_DATA ON MOVIMENTO (ID_ITEM, DATA_MOVIMENTO, ID)"),
+    ]),
+    # Exclusão de OP e fechamento de período (app/database/archive.py)
+    Migration(5, "Índice de movimentos por OP", [
+        sql_step("IDX_MOVIMENTO_OP", "CREATE INDEX IF NOT EXISTS IDX_MOVIMENTO_OP ON MOVIMENTO (ID_ORDEM_PRODUCAO)"),
+    ]),
+    # Concorrência otimista entre terminais (app/database/versioning.py)
+    Migration(6, "Versão das linhas de itens e documentos", [
+        _add_version_column(table) for table in ("ITEM", "ENTRADANOTA", "SAIDA", "ORDEMPRODUCAO")
+    ]),
+    # Extração incremental para BI (app/database/cdc.py)
+    Migration(7, "Captura de alterações (CDC_LOG)", [
+        sql_step("IDX_CDC_LOG_TABELA", "CREATE INDEX IF NOT EXISTS IDX_CDC_LOG_TABELA ON CDC_LOG (TABELA, ID)"),
+        Step("gatilhos de captura", lambda conn, context: cdc.install_triggers(conn)),
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# --- Execução ---
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending(conn, migrations=None):
+    """Migrações acima da versão do banco."""
+    version = current_version(conn)
+    return [migration for migration in (migrations or MIGRATIONS) if migration.version > version]
+
+
+def run_pending(conn, progress=None, migrations=None, batch_size=BATCH_SIZE):
+    """
+    Executa as migrações pendentes, passo a passo. progress(versão, passo, feitas,
+    total) é chamado a cada lote copiado. Retorna a lista de passos executados com
+    linhas e duração.
+    """
+    todo = pending(conn, migrations)
+    if not todo:
+        return []
+    conn.commit()
+    finished = {(row[0], row[1]) for row in conn.execute("SELECT VERSAO, PASSO FROM MIGRACAO_LOG")}
+    executed = []
+    for migration in todo:
+        logging.info(f"Migração {migration.version}: {migration.description}")
+        for step in migration.steps:
+            if (migration.version, step.name) in finished:
+                continue
+            start = time.perf_counter()
+            rows = None
+            if step.when is None or step.when(conn):
+                rows = step.run(conn, StepContext(migration.version, step.name, batch_size, progress))
+            duration = (time.perf_counter() - start) * 1000
+            conn.execute("INSERT OR REPLACE INTO MIGRACAO_LOG VALUES (?, ?, ?, ?, ?)",
+                         (migration.version, step.name, rows, round(duration, 3), datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+            logging.info(f"Migração {migration.version} / {step.name}: {duration:.0f} ms")
+            executed.append({"versao": migration.version, "passo": step.name, "linhas": rows,
+                             "duracao_ms": round(duration, 3)})
+        conn.execute(f"PRAGMA user_version = {migration.version}")
+        conn.commit()
+    return executed
+
+
+def dry_run(db_path=None, progress=None, batch_size=BATCH_SIZE):
+    """
+    Copia o banco com VACUUM INTO e executa na cópia, como na inicialização, a
+    criação das tabelas e as migrações pendentes. O banco original não é alterado;
+    a cópia é removida no final. Retorna a versão atual, os tempos de cada passo e o total.
+    """
+    from app.database.db import DatabaseManager, create_tables
+    db_path = db_path or DatabaseManager._get_db_path()
+    copy_path = db_path + ".simulacao"
+    if os.path.exists(copy_path):
+        os.remove(copy_path)
+    start = time.perf_counter()
+    source = sqlite3.connect(db_path, timeout=30)
+    try:
+        source.execute("VACUUM INTO ?", (copy_path,))
+    finally:
+        source.close()
+    copy_ms = (time.perf_counter() - start) * 1000
+    conn = sqlite3.connect(copy_path)
+    try:
+        version = current_version(conn)
+        start = time.perf_counter()
+        create_tables(conn)
+        steps = run_pending(conn, progress, batch_size=batch_size)
+        total_ms = (time.perf_counter() - start) * 1000
+    finally:
+        conn.close()
+        os.remove(copy_path)
+    return {"versao": version, "versao_final": LATEST_VERSION, "copia_ms": round(copy_ms, 3),
+            "passos": steps, "duracao_ms": round(total_ms, 3)}
+
+
+def _print_progress(version, step, done, total):
+    print(f"\r[{version}] {step}: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrações do esquema do banco.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="Versão do banco, migrações pendentes e passos já registrados.")
+    subparsers.add_parser("dry-run", help="Executa as migrações pendentes em uma cópia e mostra os tempos.")
+    subparsers.add_parser("run", help="Executa as migrações pendentes.")
+    args = parser.parse_args(argv)
+
+    if args.command == "dry-run":
+        result = dry_run(args.db, _print_progress, args.batch_size)
+        print(file=sys.stderr)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0
+
+    from app.database.db import DatabaseManager
+    if args.command == "run":
+        db_manager = DatabaseManager(args.db, migration_progress=_print_progress)
+        print(file=sys.stderr)
+    else:
+        db_manager = DatabaseManager.open_read_only(args.db)
+    conn = db_manager.get_connection()
+    log = []
+    if _table_exists(conn, "MIGRACAO_LOG"):
+        log = [dict(row) for row in conn.execute("SELECT * FROM MIGRACAO_LOG ORDER BY VERSAO, DATA_EXECUCAO")]
+    print(json.dumps({
+        "versao": current_version(conn),
+        "pendentes": [migration.version for migration in pending(conn)],
+        "log": log,
+    }, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
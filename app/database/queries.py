@@ -0,0 +1,372 @@
+# app/database/queries.py
+"""
+Registro das consultas de relatório e formatos de linha.
+
+Cada consulta é definida uma única vez (SQL base, condições fixas, filtros opcionais
+e complemento GROUP BY/ORDER BY). O texto gerado para uma mesma combinação de
+filtros é sempre idêntico, de modo que o cache de instruções preparadas do sqlite3
+(cached_statements da conexão) reaproveita a compilação entre execuções.
+
+O formato das linhas é escolhido por quem chama. Um formato recebe a tupla com os
+nomes das colunas e retorna o conversor de cada linha (ou None para manter as
+tuplas do sqlite3, o caminho mais rápido):
+
+    as_tuple            tuplas simples
+    as_namedtuple       namedtuple com os nomes das colunas
+    as_record(Classe)   instâncias de uma classe (ex.: dataclass com slots=True)
+    as_dict             dicionários, formato esperado pelas janelas de relatório
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+
+def as_tuple(columns):
+    return None
+
+
+def as_dict(columns):
+    return lambda row: dict(zip(columns, row))
+
+
+@lru_cache(maxsize=64)
+def _namedtuple_class(columns):
+    return namedtuple("Linha", columns, rename=True)
+
+
+def as_namedtuple(columns):
+    return _namedtuple_class(columns)._make
+
+
+def as_record(cls):
+    """Formato que cria cls(*linha); os campos da classe devem seguir a ordem das colunas."""
+    def shape(columns):
+        return lambda row: cls(*row)
+    return shape
+
+
+def shape_rows(columns, rows, row_factory=as_dict):
+    """Aplica um formato a linhas (tuplas) calculadas fora do SQL."""
+    convert = row_factory(tuple(columns))
+    return rows if convert is None else list(map(convert, rows))
+
+
+def fetch_all(conn, sql, params=(), row_factory=as_dict):
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    return shape_rows([description[0] for description in cursor.description], cursor.fetchall(), row_factory)
+
+
+def fetch_one(conn, sql, params=(), row_factory=as_dict):
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    convert = row_factory(tuple(description[0] for description in cursor.description))
+    return row if convert is None else convert(row)
+
+
+def _contains(value):
+    return f"%{value}%"
+
+
+class ReportQuery:
+    """
+    Consulta de relatório. `sql` pode referenciar as tabelas de histórico como
+    {TABELA}, substituídas pelas fontes de DatabaseManager.history_sources.
+    Cada filtro é (chave, condição, conversão opcional) e só entra quando a chave
+    tem valor; `params` são chaves obrigatórias, ligadas depois dos filtros.
+    """
+    __slots__ = ("sql", "where", "filters", "suffix", "history", "period", "params")
+
+    def __init__(self, sql, where=(), filters=(), suffix="", history=(), period=(None, None), params=()):
+        self.sql = sql
+        self.where = where
+        self.filters = filters
+        self.suffix = suffix
+        self.history = history
+        self.period = period
+        self.params = params
+
+    def build(self, db_manager, filters):
+        """Retorna (sql, parâmetros) para os filtros informados."""
+        sql = self.sql
+        if self.history:
+            date_from, date_to = (filters.get(key) if key else None for key in self.period)
+            sql = sql.format(**db_manager.history_sources(*self.history, date_from=date_from, date_to=date_to))
+        conditions = list(self.where)
+        params = []
+        for key, condition, *convert in self.filters:
+            value = filters.get(key)
+            if value:
+                conditions.append(condition)
+                params.append(convert[0](value) if convert else value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if self.suffix:
+            sql += " " + self.suffix
+        params.extend(filters[key] for key in self.params)
+        return sql, params
+
+
+REPORT_QUERIES = {
+    "stock_entries": ReportQuery(
+        """SELECT en.ID, en.NUMERO_NOTA as numero, f.RAZAO_SOCIAL as fornecedor,
+                  en.DATA_ENTRADA as data, en.VALOR_TOTAL as total
+           FROM {ENTRADANOTA} en
+           LEFT JOIN {ENTRADANOTA_ITENS} eni ON en.ID = eni.ID_ENTRADA
+           LEFT JOIN FORNECEDOR f ON eni.ID_FORNECEDOR = f.ID""",
+        filters=(
+            ("numero_de", "en.NUMERO_NOTA >= ?"),
+            ("numero_ate", "en.NUMERO_NOTA <= ?"),
+            ("fornecedor", "f.RAZAO_SOCIAL LIKE ?", _contains),
+            ("data_inicial", "en.DATA_ENTRADA >= ?"),
+            ("data_final", "en.DATA_ENTRADA <= ?"),
+        ),
+        suffix="GROUP BY en.ID",
+        history=("ENTRADANOTA", "ENTRADANOTA_ITENS"), period=("data_inicial", "data_final")),
+
+    "product_cost": ReportQuery(
+        "SELECT i.DESCRICAO as produto, i.CUSTO_MEDIO as custo_medio FROM ITEM i",
+        where=("(i.TIPO_ITEM = 'Produto' OR i.TIPO_ITEM = 'Ambos')",),
+        filters=(
+            ("produto_de", "i.DESCRICAO >= ?"),
+            ("produto_ate", "i.DESCRICAO <= ?"),
+        )),
+
+    "entry_items": ReportQuery(
+        """SELECT eni.ID_ENTRADA as nota, i.DESCRICAO as insumo, eni.QUANTIDADE as quantidade,
+                  eni.VALOR_UNITARIO as valor_unitario, (eni.QUANTIDADE * eni.VALOR_UNITARIO) as valor_total
+           FROM {ENTRADANOTA_ITENS} eni
+           JOIN ITEM i ON eni.ID_INSUMO = i.ID""",
+        filters=(
+            ("nota_de", "eni.ID_ENTRADA >= ?"),
+            ("nota_ate", "eni.ID_ENTRADA <= ?"),
+        ),
+        history=("ENTRADANOTA_ITENS",)),
+
+    # 'Saldo Inicial' resume períodos fechados, cujos movimentos vêm dos arquivos anuais
+    "stock_movements": ReportQuery(
+        """SELECT i.DESCRICAO as item, m.TIPO_MOVIMENTO as tipo_movimento, m.QUANTIDADE as quantidade,
+                  m.VALOR_UNITARIO as valor_unitario, m.DATA_MOVIMENTO as data_movimento
+           FROM {MOVIMENTO} m
+           LEFT JOIN ITEM i ON m.ID_ITEM = i.ID""",
+        where=("m.TIPO_MOVIMENTO <> 'Saldo Inicial'",),
+        filters=(
+            ("item_de", "i.DESCRICAO >= ?"),
+            ("item_ate", "i.DESCRICAO <= ?"),
+            ("periodo_de", "m.DATA_MOVIMENTO >= ?"),
+            ("periodo_ate", "m.DATA_MOVIMENTO <= ?"),
+        ),
+        history=("MOVIMENTO",), period=("periodo_de", "periodo_ate")),
+
+    "current_stock": ReportQuery("SELECT DESCRICAO, SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM"),
+
+    "production_orders": ReportQuery(
+        """SELECT op.ID as id, i.DESCRICAO as produto, op.STATUS as status,
+                  op.DATA_CRIACAO as data_criacao, opi.QUANTIDADE_PRODUZIR as quantidade
+           FROM {ORDEMPRODUCAO} op
+           LEFT JOIN {ORDEMPRODUCAO_ITENS} opi ON op.ID = opi.ID_ORDEM_PRODUCAO
+           LEFT JOIN ITEM i ON opi.ID_PRODUTO = i.ID""",
+        filters=(
+            ("id_de", "op.ID >= ?"),
+            ("id_ate", "op.ID <= ?"),
+            ("produto_de", "i.DESCRICAO >= ?"),
+            ("produto_ate", "i.DESCRICAO <= ?"),
+            ("status", "op.STATUS LIKE ?", _contains),
+            ("periodo_de", "op.DATA_CRIACAO >= ?"),
+            ("periodo_ate", "op.DATA_CRIACAO <= ?"),
+        ),
+        history=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS"), period=("periodo_de", "periodo_ate")),
+
+    "production_by_period": ReportQuery(
+        """SELECT i.DESCRICAO as produto, SUM(opi.QUANTIDADE_PRODUZIR) as quantidade_produzida,
+                  MAX(op.DATA_CRIACAO) as data_producao
+           FROM {ORDEMPRODUCAO} op
+           JOIN {ORDEMPRODUCAO_ITENS} opi ON op.ID = opi.ID_ORDEM_PRODUCAO
+           JOIN ITEM i ON opi.ID_PRODUTO = i.ID""",
+        filters=(
+            ("periodo_de", "op.DATA_CRIACAO >= ?"),
+            ("periodo_ate", "op.DATA_CRIACAO <= ?"),
+        ),
+        suffix="GROUP BY i.ID",
+        history=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS"), period=("periodo_de", "periodo_ate")),
+
+    "production_by_line": ReportQuery(
+        """SELECT lpm.NOME as linha, i.DESCRICAO as produto, SUM(opi.QUANTIDADE_PRODUZIR) as quantidade
+           FROM {ORDEMPRODUCAO} op
+           LEFT JOIN {ORDEMPRODUCAO_ITENS} opi ON op.ID = opi.ID_ORDEM_PRODUCAO
+           LEFT JOIN ITEM i ON opi.ID_PRODUTO = i.ID
+           LEFT JOIN LINHAPRODUCAO lpm ON op.ID_LINHA_PRODUCAO = lpm.ID""",
+        filters=(
+            ("linha_de", "lpm.NOME >= ?"),
+            ("linha_ate", "lpm.NOME <= ?"),
+            ("periodo_de", "op.DATA_CRIACAO >= ?"),
+            ("periodo_ate", "op.DATA_CRIACAO <= ?"),
+        ),
+        suffix="GROUP BY lpm.ID, i.ID",
+        history=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS"), period=("periodo_de", "periodo_ate")),
+
+    "product_composition": ReportQuery(
+        """SELECT i_produto.DESCRICAO as produto, i_insumo.DESCRICAO as insumo,
+                  c.QUANTIDADE as quantidade, u.SIGLA as unidade
+           FROM COMPOSICAO c
+           LEFT JOIN ITEM i_produto ON c.ID_PRODUTO = i_produto.ID
+           LEFT JOIN ITEM i_insumo ON c.ID_INSUMO = i_insumo.ID
+           LEFT JOIN UNIDADE u ON i_insumo.ID_UNIDADE = u.ID""",
+        filters=(
+            ("produto_de", "i_produto.DESCRICAO >= ?"),
+            ("produto_ate", "i_produto.DESCRICAO <= ?"),
+        )),
+
+    "suppliers": ReportQuery("SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, STATUS FROM FORNECEDOR"),
+
+    "items": ReportQuery(
+        """SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA as unidade, i.SALDO_ESTOQUE, i.CUSTO_MEDIO
+           FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID"""),
+
+    "low_stock": ReportQuery(
+        """SELECT i.DESCRICAO, i.SALDO_ESTOQUE, i.CUSTO_MEDIO,
+                  p.ESTOQUE_SEGURANCA as estoque_seguranca, p.PONTO_PEDIDO as ponto_pedido
+           FROM ITEM i
+           LEFT JOIN PARAMETRO_REPOSICAO p ON p.ID_ITEM = i.ID AND (p.DEMANDA_MENSAL > 0 OR p.DESVIO_MEDIO > 0)""",
+        where=("i.SALDO_ESTOQUE < COALESCE(p.PONTO_PEDIDO, ?)",), params=("limite",)),
+
+    "yield": ReportQuery(
+        """SELECT op.ID, op.NUMERO, op.DATA_CRIACAO,
+                  SUM(opi.QUANTIDADE_PRODUZIR) as qtd_planejada,
+                  op.QUANTIDADE_PRODUZIDA as qtd_produzida,
+                  CASE WHEN SUM(opi.QUANTIDADE_PRODUZIR) > 0
+                       THEN (op.QUANTIDADE_PRODUZIDA / SUM(opi.QUANTIDADE_PRODUZIR)) * 100
+                       ELSE 0 END as rendimento
+           FROM {ORDEMPRODUCAO} op
+           JOIN {ORDEMPRODUCAO_ITENS} opi ON op.ID = opi.ID_ORDEM_PRODUCAO""",
+        where=("op.STATUS = 'Concluída'",),
+        suffix="GROUP BY op.ID",
+        history=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS")),
+
+    "material_requirements": ReportQuery(
+        """SELECT i_insumo.DESCRICAO as insumo, u.SIGLA as unidade,
+                  SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) as qtd_necessaria,
+                  i_insumo.SALDO_ESTOQUE as qtd_estoque,
+                  COALESCE(p.ESTOQUE_SEGURANCA, 0) as estoque_seguranca,
+                  CASE WHEN SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) + COALESCE(p.ESTOQUE_SEGURANCA, 0) > i_insumo.SALDO_ESTOQUE
+                       THEN SUM(opi.QUANTIDADE_PRODUZIR * c.QUANTIDADE) + COALESCE(p.ESTOQUE_SEGURANCA, 0) - i_insumo.SALDO_ESTOQUE
+                       ELSE 0 END as falta
+           FROM ORDEMPRODUCAO op
+           JOIN ORDEMPRODUCAO_ITENS opi ON op.ID = opi.ID_ORDEM_PRODUCAO
+           JOIN COMPOSICAO c ON opi.ID_PRODUTO = c.ID_PRODUTO
+           JOIN ITEM i_insumo ON c.ID_INSUMO = i_insumo.ID
+           JOIN UNIDADE u ON i_insumo.ID_UNIDADE = u.ID
+           LEFT JOIN PARAMETRO_REPOSICAO p ON p.ID_ITEM = i_insumo.ID""",
+        where=("op.STATUS = 'Em Andamento'",),
+        suffix="GROUP BY i_insumo.ID"),
+
+    # Só saídas finalizadas; preço de venda médio ponderado pela quantidade (como app/reports/sales_analytics.py)
+    "profit_by_product": ReportQuery(
+        """SELECT i.DESCRICAO as produto, COALESCE(i.CUSTO_MEDIO, 0) as custo_unitario,
+                  SUM(si.QUANTIDADE * si.VALOR_UNITARIO) / SUM(si.QUANTIDADE) as preco_venda,
+                  SUM(si.QUANTIDADE) as quantidade_vendida,
+                  SUM(si.QUANTIDADE * si.VALOR_UNITARIO) / SUM(si.QUANTIDADE) - COALESCE(i.CUSTO_MEDIO, 0) as lucro_unitario,
+                  SUM(si.QUANTIDADE * si.VALOR_UNITARIO) - SUM(si.QUANTIDADE) * COALESCE(i.CUSTO_MEDIO, 0) as lucro_total
+           FROM {SAIDA_ITENS} si
+           JOIN {SAIDA} s ON si.ID_SAIDA = s.ID
+           LEFT JOIN ITEM i ON si.ID_PRODUTO = i.ID""",
+        where=("s.STATUS = 'Finalizada'",),
+        filters=(
+            ("produto_de", "i.DESCRICAO >= ?"),
+            ("produto_ate", "i.DESCRICAO <= ?"),
+            ("periodo_de", "s.DATA_SAIDA >= ?"),
+            ("periodo_ate", "s.DATA_SAIDA <= ?"),
+        ),
+        suffix="GROUP BY si.ID_PRODUTO HAVING SUM(si.QUANTIDADE) <> 0 ORDER BY si.ID_PRODUTO",
+        history=("SAIDA", "SAIDA_ITENS"), period=("periodo_de", "periodo_ate")),
+
+    "profit_by_period": ReportQuery(
+        """SELECT SUM(si.QUANTIDADE * si.VALOR_UNITARIO) as total_vendas,
+                  SUM(si.QUANTIDADE * COALESCE(i.CUSTO_MEDIO, 0)) as custo_total,
+                  SUM(si.QUANTIDADE * si.VALOR_UNITARIO) - SUM(si.QUANTIDADE * COALESCE(i.CUSTO_MEDIO, 0)) as lucro_final
+           FROM {SAIDA} s
+           JOIN {SAIDA_ITENS} si ON s.ID = si.ID_SAIDA
+           LEFT JOIN ITEM i ON si.ID_PRODUTO = i.ID""",
+        where=("s.STATUS = 'Finalizada'",),
+        filters=(
+            ("data_inicial", "s.DATA_SAIDA >= ?"),
+            ("data_final", "s.DATA_SAIDA <= ?"),
+        ),
+        history=("SAIDA", "SAIDA_ITENS"), period=("data_inicial", "data_final")),
+}
+
+
+class SearchQuery:
+    """
+    Busca das janelas de pesquisa por uma coluna escolhida pelo usuário. `fields` é
+    {campo: (coluna, conversão)}: com conversão a busca é exata (coluna = ?), ou por
+    faixa se a conversão devolver (mínimo, limite); sem ela é por trecho (LIKE). Só as
+    colunas registradas chegam ao SQL.
+    """
+    __slots__ = ("sql", "fields", "suffix", "ids_column")
+
+    def __init__(self, sql, fields, suffix="", ids_column=None):
+        self.sql = sql
+        self.fields = fields
+        self.suffix = suffix
+        self.ids_column = ids_column
+
+    def build(self, field, text, ids=None):
+        """Retorna (sql, parâmetros); ValueError para campo desconhecido ou texto que não converte."""
+        if field not in self.fields:
+            raise ValueError(f"Campo de busca inválido: {field}")
+        column, convert = self.fields[field]
+        value = convert(text) if convert else None
+        if isinstance(value, tuple):
+            conditions, params = [f"{column} >= ? AND {column} < ?"], list(value)
+        elif convert:
+            conditions, params = [f"{column} = ?"], [value]
+        else:
+            conditions, params = [f"{column} LIKE ?"], [_contains(text)]
+        if ids is not None:
+            conditions.append(f"{self.ids_column} IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        sql = self.sql + " WHERE " + " AND ".join(conditions)
+        if self.suffix:
+            sql += " " + self.suffix
+        return sql, params
+
+
+def _value_range(text):
+    """Valores aproximados: 12,3 encontra de 12,3 até 13,3 (exclusive)."""
+    value = float(text.replace(',', '.'))
+    return value, value + 1
+
+
+SEARCH_QUERIES = {
+    "items": SearchQuery(
+        """SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA, i.SALDO_ESTOQUE, i.CUSTO_MEDIO
+           FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID""",
+        {"ID": ("i.ID", int), "CODIGO_INTERNO": ("i.CODIGO_INTERNO", None), "DESCRICAO": ("i.DESCRICAO", None)},
+        suffix="ORDER BY i.DESCRICAO", ids_column="i.ID"),
+
+    "suppliers": SearchQuery(
+        "SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR",
+        {"Razão Social": ("RAZAO_SOCIAL", None), "Nome Fantasia": ("NOME_FANTASIA", None), "CNPJ": ("CNPJ", str)},
+        ids_column="ID"),
+
+    "stock_entries": SearchQuery(
+        "SELECT T.ID, T.DATA_ENTRADA, T.DATA_DIGITACAO, T.NUMERO_NOTA, T.VALOR_TOTAL, T.STATUS FROM ENTRADANOTA T",
+        {"ID": ("T.ID", int), "Nº Nota": ("T.NUMERO_NOTA", None), "Data Entrada": ("T.DATA_ENTRADA", None),
+         "Valor Total": ("T.VALOR_TOTAL", _value_range), "Status": ("T.STATUS", None)},
+        suffix="ORDER BY T.ID DESC"),
+
+    "sales": SearchQuery(
+        "SELECT ID, DATA_SAIDA, VALOR_TOTAL, STATUS FROM SAIDA",
+        {"id": ("ID", int), "status": ("STATUS", None)},
+        suffix="ORDER BY ID DESC"),
+
+    "production_orders": SearchQuery(
+        "SELECT ID, NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS FROM ORDEMPRODUCAO",
+        {"ID": ("ID", int), "STATUS": ("STATUS", None), "NUMERO": ("NUMERO", None)},
+        suffix="ORDER BY ID DESC"),
+}
@@ -0,0 +1,568 @@
+# app/database/site_sync.py
+"""
+Sincronização entre plantas: cada planta tem o próprio DADOS.DB e troca pacotes
+(arquivos .jsonl.gz, que podem ir por pen drive ou e-mail) com as outras.
+
+O pacote de uma planta para outra leva as alterações registradas em CDC_LOG
+(app/database/cdc.py) desde o último pacote enviado àquela planta:
+
+- cadastros (FORNECEDOR, ITEM, COMPOSICAO): a linha inteira, identificada pela
+  origem (planta, ID na planta onde foi criada) e com referências às outras linhas
+  também pela origem. Saldo e custo médio são de cada planta e não viajam;
+- movimentos de estoque criados na planta, gravados no destino em
+  MOVIMENTO_REMOTO (o estoque e o custo do destino não mudam) e consultados no
+  fato plantas da tabela dinâmica (app/reports/pivot.py).
+
+Conflitos de cadastro são resolvidos pela versão de sincronização de cada linha
+(SYNC_REGISTRO): ao exportar, uma linha cujo conteúdo mudou recebe a versão
+seguinte, marcada com a planta que a alterou; ao importar, a linha recebida só é
+aplicada se a sua (versão, planta) for maior que a local. Alterações simultâneas
+nas duas plantas convergem para a da planta de maior ID. A VERSAO de ITEM não serve
+para isso: ela muda a cada movimento de estoque.
+
+Na primeira vez que uma origem aparece, a linha é procurada pela chave natural
+(descrição do item, CNPJ ou razão social do fornecedor, produto e insumo da
+composição) antes de ser inserida; a correspondência fica em SYNC_MAPA.
+
+O pacote é aplicado em lotes de batch_size registros, um lote por transação, com
+os movimentos gravados por executemany. Reaplicar um pacote (inteiro ou depois de
+uma interrupção) não duplica nada.
+
+    python -m app.database.site_sync info --name "Planta Norte"
+    python -m app.database.site_sync add-peer <id> "Planta Sul"
+    python -m app.database.site_sync export --peer "Planta Sul" --output-dir pacotes
+    python -m app.database.site_sync import pacotes/<arquivo>.jsonl.gz
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from datetime import datetime
+from itertools import islice
+
+from app import events
+from app.database import cdc
+
+BUNDLE_FORMAT = 1
+BATCH_SIZE = 5000
+
+# Cadastros sincronizados, na ordem em que são gravados no pacote (dependências antes)
+SYNCED_TABLES = ("FORNECEDOR", "ITEM", "COMPOSICAO")
+MOVEMENTS = "MOVIMENTO"
+
+_SUPPLIER_COLUMNS = ("RAZAO_SOCIAL", "NOME_FANTASIA", "CNPJ", "STATUS", "TELEFONE", "EMAIL",
+                     "LOGRADOURO", "NUMERO", "COMPLEMENTO", "BAIRRO", "CIDADE", "UF", "CEP")
+_MOVEMENT_COLUMNS = ("TIPO_MOVIMENTO", "QUANTIDADE", "VALOR_UNITARIO", "DATA_MOVIMENTO")
+
+# Referências de cada cadastro a outros cadastros sincronizados
+_DEPENDENCIES = {
+    "FORNECEDOR": [],
+    "ITEM": [("FORNECEDOR", "ID_FORNECEDOR_PADRAO")],
+    "COMPOSICAO": [("ITEM", "ID_PRODUTO"), ("ITEM", "ID_INSUMO")],
+}
+
+# Linhas que impedem a exclusão de um cadastro recebida de outra planta
+_REFERENCES = {
+    "ITEM": [("COMPOSICAO", "ID_PRODUTO"), ("COMPOSICAO", "ID_INSUMO"), ("MOVIMENTO", "ID_ITEM"),
+             ("MOVIMENTO_REMOTO", "ID_ITEM"), ("ENTRADANOTA_ITENS", "ID_INSUMO"), ("SAIDA_ITENS", "ID_PRODUTO"),
+             ("ORDEMPRODUCAO_ITENS", "ID_PRODUTO"), ("LINHAPRODUCAO_ITEMS", "ID_PRODUTO")],
+    "FORNECEDOR": [("ITEM", "ID_FORNECEDOR_PADRAO"), ("ENTRADANOTA_ITENS", "ID_FORNECEDOR")],
+    "COMPOSICAO": [],
+}
+
+
+# --- Plantas ---
+
+def local_site(db_manager, name=None):
+    """ID desta planta (criado na primeira chamada); name renomeia."""
+    conn = db_manager.get_connection()
+    row = conn.execute("SELECT ID FROM SYNC_SITE WHERE LOCAL = 1").fetchone()
+    if row and name is None:
+        return row[0]
+    with db_manager.transaction():
+        if row is None:
+            site_id = uuid.uuid4().hex
+            conn.execute("INSERT INTO SYNC_SITE (ID, NOME, LOCAL) VALUES (?, ?, 1)", (site_id, name))
+            return site_id
+        conn.execute("UPDATE SYNC_SITE SET NOME = ? WHERE ID = ?", (name, row[0]))
+        return row[0]
+
+
+def add_peer(db_manager, site_id, name=None):
+    with db_manager.transaction():
+        db_manager.get_connection().execute("""
+            INSERT INTO SYNC_SITE (ID, NOME) VALUES (?, ?)
+            ON CONFLICT (ID) DO UPDATE SET NOME = COALESCE(excluded.NOME, NOME)
+        """, (site_id, name))
+
+
+def find_peer(conn, peer):
+    """ID da planta pelo ID ou pelo nome."""
+    row = conn.execute("SELECT ID FROM SYNC_SITE WHERE LOCAL = 0 AND (ID = ? OR NOME = ?)", (peer, peer)).fetchone()
+    if row is None:
+        raise ValueError(f"Planta não cadastrada: {peer}")
+    return row[0]
+
+
+def _consumer(peer_id):
+    # O que já foi enviado à planta fica registrado como consumidor do CDC_LOG
+    return f"site:{peer_id}"
+
+
+# --- Registro de versões ---
+
+class _Registry:
+    """SYNC_REGISTRO e SYNC_MAPA em memória durante uma exportação ou importação."""
+
+    def __init__(self, conn, site):
+        self.conn = conn
+        self.site = site
+        # (tabela, id local) -> [site origem, id origem, versão, site da versão, hash, marca]
+        self.entries = {(row[0], row[1]): list(row[2:]) for row in conn.execute(
+            "SELECT TABELA, ID_LOCAL, SITE_ORIGEM, ID_ORIGEM, VERSAO, SITE_VERSAO, HASH, MARCA FROM SYNC_REGISTRO")}
+        self.aliases = {(row[0], row[1], row[2]): row[3] for row in conn.execute(
+            "SELECT TABELA, SITE_ORIGEM, ID_ORIGEM, ID_LOCAL FROM SYNC_MAPA")}
+        self.dirty = set()
+        self.new_aliases = {}
+        self.touched = set()
+
+    def entry(self, table, local_id):
+        return self.entries.get((table, local_id))
+
+    def set_entry(self, table, local_id, entry):
+        self.entries[(table, local_id)] = entry
+        self.dirty.add((table, local_id))
+
+    def origin(self, table, local_id):
+        entry = self.entry(table, local_id)
+        return [entry[0], entry[1]] if entry else [self.site, local_id]
+
+    def resolve(self, table, origin):
+        """ID local da linha de origem `origin` (None se ainda não existe aqui)."""
+        site, origin_id = origin
+        local_id = self.aliases.get((table, site, origin_id))
+        if local_id is None and site == self.site and _exists(self.conn, table, origin_id):
+            return origin_id
+        return local_id
+
+    def alias(self, table, origin, local_id):
+        key = (table, origin[0], origin[1])
+        if key != (table, self.site, local_id) and self.aliases.get(key) != local_id:
+            self.aliases[key] = local_id
+            self.new_aliases[key] = local_id
+
+    def flush(self, marca=None):
+        """Grava as entradas alteradas; as tocadas por importação recebem a marca atual do CDC_LOG."""
+        for key in self.touched:
+            self.entries[key][5] = marca
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO SYNC_REGISTRO (TABELA, ID_LOCAL, SITE_ORIGEM, ID_ORIGEM, VERSAO, SITE_VERSAO, HASH, MARCA)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(*key, *self.entries[key]) for key in self.dirty | self.touched])
+        self.conn.executemany("INSERT OR REPLACE INTO SYNC_MAPA (TABELA, SITE_ORIGEM, ID_ORIGEM, ID_LOCAL) VALUES (?, ?, ?, ?)",
+                              [(*key, local_id) for key, local_id in self.new_aliases.items()])
+        self.dirty, self.touched, self.new_aliases = set(), set(), {}
+
+
+def _exists(conn, table, row_id):
+    return conn.execute(f"SELECT 1 FROM {table} WHERE ID = ?", (row_id,)).fetchone() is not None
+
+
+def _hash(payload):
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _payload(conn, registry, table, local_id):
+    """Conteúdo sincronizado da linha, com as referências pela origem (None se a linha não existe)."""
+    if table == "FORNECEDOR":
+        row = conn.execute(f"SELECT {', '.join(_SUPPLIER_COLUMNS)} FROM FORNECEDOR WHERE ID = ?", (local_id,)).fetchone()
+        return dict(zip(_SUPPLIER_COLUMNS, row)) if row else None
+    if table == "ITEM":
+        row = conn.execute("""
+            SELECT i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.NOME, u.SIGLA, i.ID_FORNECEDOR_PADRAO
+            FROM ITEM i JOIN UNIDADE u ON u.ID = i.ID_UNIDADE WHERE i.ID = ?
+        """, (local_id,)).fetchone()
+        if row is None:
+            return None
+        supplier = registry.origin("FORNECEDOR", row[5]) if row[5] is not None else None
+        return {"CODIGO_INTERNO": row[0], "DESCRICAO": row[1], "TIPO_ITEM": row[2],
+                "UNIDADE": [row[3], row[4]], "FORNECEDOR_PADRAO": supplier}
+    row = conn.execute("SELECT ID_PRODUTO, ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID = ?", (local_id,)).fetchone()
+    if row is None:
+        return None
+    return {"PRODUTO": registry.origin("ITEM", row[0]), "INSUMO": registry.origin("ITEM", row[1]), "QUANTIDADE": row[2]}
+
+
+# --- Exportação ---
+
+class _Export:
+    def __init__(self, conn, registry, since, upto):
+        self.conn = conn
+        self.registry = registry
+        self.since = since
+        self.upto = upto
+        self.records = {table: {} for table in SYNCED_TABLES}
+
+    def changed(self, table, local_id, operation):
+        if operation == cdc.DELETE:
+            self.deleted(table, local_id)
+        elif operation in (cdc.INSERT, cdc.UPDATE):
+            self.ensure(table, local_id)
+
+    def ensure(self, table, local_id):
+        """
+        Inclui a linha (e os cadastros que ela referencia) no pacote se for nova para a
+        sincronização, se o conteúdo mudou desde a última versão ou se a versão atual
+        ainda não foi enviada a este destino. Só saldo ou custo alterados não contam.
+        """
+        if local_id in self.records[table]:
+            return
+        self.records[table][local_id] = None
+        for dependency, column in _DEPENDENCIES[table]:
+            row = self.conn.execute(f"SELECT {column} FROM {table} WHERE ID = ?", (local_id,)).fetchone()
+            if row and row[0] is not None:
+                self.ensure(dependency, row[0])
+        payload = _payload(self.conn, self.registry, table, local_id)
+        if payload is None:
+            del self.records[table][local_id]
+            return
+        digest = _hash(payload)
+        entry = self.registry.entry(table, local_id)
+        if entry is None:
+            entry = [self.registry.site, local_id, 1, self.registry.site, digest, self.upto]
+            self.registry.set_entry(table, local_id, entry)
+        elif entry[4] != digest:
+            entry = [entry[0], entry[1], entry[2] + 1, self.registry.site, digest, self.upto]
+            self.registry.set_entry(table, local_id, entry)
+        elif self.since is not None and (entry[5] or 0) <= self.since:
+            del self.records[table][local_id]
+            return
+        self.records[table][local_id] = {"tabela": table, "op": cdc.UPDATE, "origem": entry[:2],
+                                         "versao": entry[2:4], "dados": payload}
+
+    def deleted(self, table, local_id):
+        entry = self.registry.entry(table, local_id)
+        if entry is None:
+            return  # criada e excluída sem nunca ter sido enviada
+        if entry[4] is not None:
+            entry = [entry[0], entry[1], entry[2] + 1, self.registry.site, None, self.upto]
+            self.registry.set_entry(table, local_id, entry)
+        elif self.since is not None and (entry[5] or 0) <= self.since:
+            return
+        self.records[table][local_id] = {"tabela": table, "op": cdc.DELETE, "origem": entry[:2], "versao": entry[2:4]}
+
+
+def export_bundle(db_manager, peer, output_dir, since=None, full=False, batch_size=BATCH_SIZE):
+    """
+    Grava o pacote com as alterações desde o último envio à planta `peer` (ID ou nome)
+    e registra o envio. Retorna o resumo (arquivo, marcas e linhas por tabela).
+    """
+    conn = db_manager.get_connection()
+    site = local_site(db_manager)
+    peer_id = find_peer(conn, peer)
+    consumer = _consumer(peer_id)
+    os.makedirs(output_dir, exist_ok=True)
+    with db_manager.transaction():
+        if since is None and not full:
+            since = cdc.acknowledged(conn, consumer)
+        full = full or since is None
+        upto = cdc.last_change_id(conn)
+        if not full and since < cdc.first_change_id(conn) - 1:
+            raise ValueError(f"As alterações após a marca {since} já foram compactadas; envie um pacote completo.")
+        registry = _Registry(conn, site)
+        export = _Export(conn, registry, None if full else since, upto)
+        for table in SYNCED_TABLES:
+            batches = cdc.iter_snapshot(conn, table, upto, batch_size) if full \
+                else cdc.iter_changes(conn, table, since, upto, batch_size)
+            for batch in batches:
+                for row in batch:
+                    export.changed(table, row[2], row[1])
+        if full:
+            movement_items = conn.execute("SELECT DISTINCT ID_ITEM FROM MOVIMENTO")
+        else:
+            movement_items = conn.execute("""
+                SELECT DISTINCT m.ID_ITEM FROM CDC_LOG c JOIN MOVIMENTO m ON m.ID = c.ID_LINHA
+                WHERE c.TABELA = 'MOVIMENTO' AND c.ID > ? AND c.ID <= ?
+            """, (since, upto))
+        for (item_id,) in movement_items.fetchall():
+            export.ensure("ITEM", item_id)
+
+        path = os.path.join(output_dir, f"pacote_{site[:8]}_{peer_id[:8]}_{upto}.jsonl.gz")
+        header = {"formato": BUNDLE_FORMAT, "origem": site, "destino": peer_id, "desde": None if full else since,
+                  "ate": upto, "completo": full, "data": datetime.now().isoformat(timespec="seconds")}
+        counts = {}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for table in SYNCED_TABLES:
+                records = [record for record in export.records[table].values() if record]
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                counts[table] = len(records)
+            counts[MOVEMENTS] = 0
+            for batch in _movement_batches(conn, full, since, upto, batch_size):
+                f.writelines(json.dumps(_movement_record(registry, site, row), ensure_ascii=False) + "\n"
+                             for row in batch if row[1] != cdc.ARCHIVED)
+                counts[MOVEMENTS] += sum(1 for row in batch if row[1] != cdc.ARCHIVED)
+        registry.flush(upto)
+        cdc.acknowledge(db_manager, consumer, upto)
+    return {"arquivo": path, "destino": peer_id, "desde": header["desde"], "ate": upto, "completo": full,
+            "linhas": counts}
+
+
+def _movement_batches(conn, full, since, upto, batch_size):
+    columns = ", ".join(f"m.{name}" for name in _MOVEMENT_COLUMNS)
+    if full:
+        cursor = conn.execute(f"SELECT m.ID, 'U', m.ID_ITEM, {columns} FROM MOVIMENTO m ORDER BY m.ID")
+    else:
+        cursor = conn.execute(f"""
+            SELECT c.ID_LINHA, c.OPERACAO, m.ID_ITEM, {columns}
+            FROM CDC_LOG c LEFT JOIN MOVIMENTO m ON m.ID = c.ID_LINHA AND c.OPERACAO IN ('I', 'U')
+            WHERE c.ID IN (SELECT MAX(ID) FROM CDC_LOG
+                           WHERE TABELA = 'MOVIMENTO' AND ID > ? AND ID <= ? GROUP BY ID_LINHA)
+            ORDER BY c.ID
+        """, (since, upto))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _movement_record(registry, site, row):
+    movement_id, operation, item_id = row[0], row[1], row[2]
+    if operation == cdc.DELETE or item_id is None:
+        return {"tabela": MOVEMENTS, "op": cdc.DELETE, "origem": [site, movement_id]}
+    data = dict(zip(_MOVEMENT_COLUMNS, row[3:]))
+    data["ITEM"] = registry.origin("ITEM", item_id)
+    return {"tabela": MOVEMENTS, "op": cdc.UPDATE, "origem": [site, movement_id], "dados": data}
+
+
+# --- Importação ---
+
+def read_header(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+
+def _records(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class _Import:
+    def __init__(self, conn, registry, db_manager):
+        self.conn = conn
+        self.registry = registry
+        self.db_manager = db_manager
+        self.stats = {"aplicadas": 0, "ignoradas": 0, "conflitos": 0, "movimentos": 0, "movimentos_sem_item": 0}
+        self.changed_tables = set()
+
+    def apply_master(self, record):
+        table, origin = record["tabela"], record["origem"]
+        incoming = tuple(record["versao"])
+        local_id = self.registry.resolve(table, origin)
+        if local_id is None and record["op"] != cdc.DELETE:
+            local_id = self._natural_match(table, record["dados"])
+            if local_id is not None:
+                self.registry.alias(table, origin, local_id)
+        entry = self.registry.entry(table, local_id) if local_id is not None else None
+        if entry is None and local_id is not None:
+            # Linha local que nunca foi exportada: vale como a primeira versão desta planta
+            entry = [self.registry.site, local_id, 1, self.registry.site,
+                     _hash(_payload(self.conn, self.registry, table, local_id)), None]
+        if entry is not None and incoming <= (entry[2], entry[3]):
+            self.stats["ignoradas"] += 1
+            return
+        try:
+            with self.db_manager.transaction():
+                if record["op"] == cdc.DELETE:
+                    if local_id is not None:
+                        self._delete(table, local_id)
+                    digest = None
+                else:
+                    local_id = self._write(table, local_id, record["dados"])
+                    self.registry.alias(table, origin, local_id)
+                    digest = _hash(_payload(self.conn, self.registry, table, local_id))
+        except (sqlite3.IntegrityError, _Skip):
+            self.stats["conflitos"] += 1
+            return
+        if local_id is None:
+            self.stats["ignoradas"] += 1
+            return
+        origin_of_row = entry[:2] if entry else list(origin)
+        self.registry.set_entry(table, local_id, [*origin_of_row, *incoming, digest, None])
+        self.registry.touched.add((table, local_id))
+        self.changed_tables.add(table)
+        self.stats["aplicadas"] += 1
+
+    def _natural_match(self, table, data):
+        if table == "ITEM":
+            row = self.conn.execute("SELECT ID FROM ITEM WHERE DESCRICAO = ?", (data["DESCRICAO"],)).fetchone()
+        elif table == "FORNECEDOR":
+            row = self.conn.execute(
+                "SELECT ID FROM FORNECEDOR WHERE CNPJ = ? OR RAZAO_SOCIAL = ? ORDER BY CNPJ = ? DESC LIMIT 1",
+                (data["CNPJ"], data["RAZAO_SOCIAL"], data["CNPJ"])).fetchone()
+        else:
+            product = self.registry.resolve("ITEM", data["PRODUTO"])
+            material = self.registry.resolve("ITEM", data["INSUMO"])
+            row = self.conn.execute("SELECT ID FROM COMPOSICAO WHERE ID_PRODUTO = ? AND ID_INSUMO = ?",
+                                    (product, material)).fetchone()
+        return row[0] if row else None
+
+    def _unit(self, name, symbol):
+        row = self.conn.execute("SELECT ID FROM UNIDADE WHERE SIGLA = ?", (symbol,)).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute("INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)", (name, symbol)).lastrowid
+
+    def _write(self, table, local_id, data):
+        if table == "FORNECEDOR":
+            columns, values = _SUPPLIER_COLUMNS, [data[name] for name in _SUPPLIER_COLUMNS]
+        elif table == "ITEM":
+            supplier = data["FORNECEDOR_PADRAO"]
+            columns = ("CODIGO_INTERNO", "DESCRICAO", "TIPO_ITEM", "ID_UNIDADE", "ID_FORNECEDOR_PADRAO")
+            values = [data["CODIGO_INTERNO"], data["DESCRICAO"], data["TIPO_ITEM"], self._unit(*data["UNIDADE"]),
+                      self.registry.resolve("FORNECEDOR", supplier) if supplier else None]
+        else:
+            product = self.registry.resolve("ITEM", data["PRODUTO"])
+            material = self.registry.resolve("ITEM", data["INSUMO"])
+            if product is None or material is None:
+                raise _Skip()
+            columns, values = ("ID_PRODUTO", "ID_INSUMO", "QUANTIDADE"), [product, material, data["QUANTIDADE"]]
+        if local_id is not None and _exists(self.conn, table, local_id):
+            version = ", VERSAO = VERSAO + 1" if table == "ITEM" else ""
+            assignments = ", ".join(f"{name} = ?" for name in columns)
+            self.conn.execute(f"UPDATE {table} SET {assignments}{version} WHERE ID = ?", (*values, local_id))
+            return local_id
+        return self.conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                 values).lastrowid
+
+    def _delete(self, table, local_id):
+        for referencing, column in _REFERENCES[table]:
+            if self.conn.execute(f"SELECT 1 FROM {referencing} WHERE {column} = ? LIMIT 1", (local_id,)).fetchone():
+                raise _Skip()
+        self.conn.execute(f"DELETE FROM {table} WHERE ID = ?", (local_id,))
+
+    def apply_movements(self, records):
+        upserts, deletes = [], []
+        for record in records:
+            site, origin_id = record["origem"]
+            if record["op"] == cdc.DELETE:
+                deletes.append((site, origin_id))
+                continue
+            data = record["dados"]
+            item_id = self.registry.resolve("ITEM", data["ITEM"])
+            if item_id is None:
+                self.stats["movimentos_sem_item"] += 1
+                continue
+            upserts.append((site, origin_id, item_id, *(data[name] for name in _MOVEMENT_COLUMNS)))
+        self.conn.executemany(f"""
+            INSERT INTO MOVIMENTO_REMOTO (SITE_ORIGEM, ID_ORIGEM, ID_ITEM, {', '.join(_MOVEMENT_COLUMNS)})
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (SITE_ORIGEM, ID_ORIGEM) DO UPDATE SET
+                ID_ITEM = excluded.ID_ITEM, TIPO_MOVIMENTO = excluded.TIPO_MOVIMENTO, QUANTIDADE = excluded.QUANTIDADE,
+                VALOR_UNITARIO = excluded.VALOR_UNITARIO, DATA_MOVIMENTO = excluded.DATA_MOVIMENTO
+        """, upserts)
+        self.conn.executemany("DELETE FROM MOVIMENTO_REMOTO WHERE SITE_ORIGEM = ? AND ID_ORIGEM = ?", deletes)
+        self.stats["movimentos"] += len(upserts) + len(deletes)
+
+
+class _Skip(Exception):
+    """Registro que não pode ser aplicado (referência ausente ou linha em uso)."""
+
+
+def import_bundle(db_manager, path, batch_size=BATCH_SIZE):
+    """
+    Aplica o pacote em lotes de batch_size registros, um lote por transação. Pacotes já
+    aplicados são ignorados; um pacote que pula alterações (pacote anterior não
+    aplicado) é recusado. Retorna o resumo da aplicação.
+    """
+    conn = db_manager.get_connection()
+    site = local_site(db_manager)
+    header = read_header(path)
+    if header.get("formato") != BUNDLE_FORMAT:
+        raise ValueError(f"Formato de pacote não suportado: {header.get('formato')}")
+    if header["destino"] != site:
+        raise ValueError("O pacote foi gerado para outra planta.")
+    origin = header["origem"]
+    row = conn.execute("SELECT ULTIMA_MARCA_RECEBIDA FROM SYNC_SITE WHERE ID = ?", (origin,)).fetchone()
+    received = row[0] if row else 0
+    summary = {"origem": origin, "desde": header["desde"], "ate": header["ate"], "ja_aplicado": False}
+    if not header["completo"]:
+        if header["ate"] <= received:
+            summary["ja_aplicado"] = True
+            return summary
+        if header["desde"] > received:
+            raise ValueError(f"Faltam pacotes anteriores da planta de origem (recebido até {received}, "
+                             f"pacote desde {header['desde']}).")
+
+    registry = _Registry(conn, site)
+    importer = _Import(conn, registry, db_manager)
+    records = _records(path)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        with db_manager.transaction():
+            for record in batch:
+                if record["tabela"] != MOVEMENTS:
+                    importer.apply_master(record)
+            importer.apply_movements([record for record in batch if record["tabela"] == MOVEMENTS])
+            registry.flush(cdc.last_change_id(conn))
+    with db_manager.transaction():
+        conn.execute("""
+            INSERT INTO SYNC_SITE (ID, ULTIMA_MARCA_RECEBIDA, DATA_RECEBIMENTO) VALUES (?, ?, ?)
+            ON CONFLICT (ID) DO UPDATE SET ULTIMA_MARCA_RECEBIDA = excluded.ULTIMA_MARCA_RECEBIDA,
+                                          DATA_RECEBIMENTO = excluded.DATA_RECEBIMENTO
+        """, (origin, header["ate"], datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+    for table in importer.changed_tables:
+        db_manager.publish(table, events.UPDATE)
+    summary.update(importer.stats)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincronização de cadastros e movimentos entre plantas.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    info_parser = subparsers.add_parser("info", help="ID desta planta e plantas cadastradas.")
+    info_parser.add_argument("--name", help="Define o nome desta planta.")
+    peer_parser = subparsers.add_parser("add-peer", help="Cadastra outra planta.")
+    peer_parser.add_argument("site_id")
+    peer_parser.add_argument("name", nargs="?")
+    export_parser = subparsers.add_parser("export", help="Gera o pacote para outra planta.")
+    export_parser.add_argument("--peer", required=True, help="ID ou nome da planta de destino.")
+    export_parser.add_argument("--output-dir", required=True)
+    export_parser.add_argument("--since", type=int, help="Marca inicial (reenvio de um pacote perdido).")
+    export_parser.add_argument("--full", action="store_true", help="Pacote com todos os cadastros e movimentos.")
+    import_parser = subparsers.add_parser("import", help="Aplica pacotes recebidos, na ordem informada.")
+    import_parser.add_argument("bundles", nargs="+")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.database.db import DatabaseManager
+    db_manager = DatabaseManager(args.db)
+    if args.command == "info":
+        site = local_site(db_manager, args.name)
+        sites = [dict(row) for row in db_manager.get_connection().execute("SELECT * FROM SYNC_SITE ORDER BY LOCAL DESC, NOME")]
+        print(json.dumps({"planta": site, "plantas": sites}, ensure_ascii=False, indent=2))
+    elif args.command == "add-peer":
+        add_peer(db_manager, args.site_id, args.name)
+    elif args.command == "export":
+        print(json.dumps(export_bundle(db_manager, args.peer, args.output_dir, args.since, args.full),
+                         ensure_ascii=False, indent=2))
+    else:
+        for bundle in args.bundles:
+            print(json.dumps(import_bundle(db_manager, bundle, args.batch_size), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
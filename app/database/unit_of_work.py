@@ -0,0 +1,68 @@
+# app/database/unit_of_work.py
+"""
+Unidade de trabalho sobre a conexão do DatabaseManager.
+
+Os serviços abrem uma transação por operação de negócio e os repositórios se
+alistam nela em vez de fazer commit:
+
+    with db_manager.transaction():
+        repository.update_stock_and_cost(...)
+        repository.add_stock_movement(...)
+
+O nível mais externo abre a transação (BEGIN IMMEDIATE) e faz um único commit no
+fim; os níveis internos viram SAVEPOINTs, de modo que uma falha dentro deles
+desfaz só o que gravaram. O servidor (app/server/server.py) usa o mesmo
+mecanismo para o commit em grupo: o grupo é o nível externo e cada pedido, um
+SAVEPOINT. Os eventos de alteração (app/events.py) publicados por publish()
+ficam retidos até o fim da unidade e são descartados com o que foi desfeito.
+"""
+from contextlib import contextmanager
+
+from app import events
+
+
+class UnitOfWork:
+    def __init__(self, connection):
+        self.connection = connection
+        self.depth = 0
+        self.pending_events = []
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection
+        events_mark = len(self.pending_events)
+        outermost = self.depth == 0
+        # Dentro de outra transação (inclusive uma implícita deixada aberta): SAVEPOINT
+        savepoint = f"uow_{self.depth}" if conn.in_transaction else None
+        conn.execute(f"SAVEPOINT {savepoint}" if savepoint else "BEGIN IMMEDIATE")
+        self.depth += 1
+        try:
+            yield self
+            if savepoint:
+                conn.execute(f"RELEASE {savepoint}")
+            if outermost:
+                conn.commit()
+        except BaseException:
+            del self.pending_events[events_mark:]
+            if savepoint and conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            elif not savepoint:
+                conn.rollback()
+            raise
+        finally:
+            self.depth -= 1
+            if outermost:
+                self._flush_events()
+
+    def publish(self, table, operation, ids=()):
+        """Publica o evento agora ou, dentro de uma transação, quando ela terminar."""
+        if self.depth:
+            self.pending_events.append((table, operation, tuple(ids)))
+        else:
+            events.publish(table, operation, ids)
+
+    def _flush_events(self):
+        pending, self.pending_events = self.pending_events, []
+        for table, operation, ids in pending:
+            events.publish(table, operation, ids)
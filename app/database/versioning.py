@@ -0,0 +1,52 @@
+# app/database/versioning.py
+"""
+Concorrência otimista pela coluna VERSAO de ITEM, ENTRADANOTA, SAIDA e ORDEMPRODUCAO.
+
+Toda gravação nessas tabelas incrementa VERSAO. Quem leu a linha e vai gravar com
+base no que leu (a janela que editou a nota, o cálculo do novo custo médio)
+informa a versão lida; a gravação só acontece se a linha ainda estiver nela
+(compare-and-swap). Caso contrário, outro terminal gravou no meio do caminho e
+ConcurrencyError é levantada: a unidade de trabalho é desfeita e quem chamou
+recarrega os dados, sem travar a tabela entre a leitura e a gravação.
+"""
+
+VERSIONED_TABLES = ("ITEM", "ENTRADANOTA", "SAIDA", "ORDEMPRODUCAO")
+
+
+class ConcurrencyError(Exception):
+    """A linha foi alterada (ou excluída) em outro terminal depois de lida."""
+
+    def __init__(self, table, row_id, expected_version, current_version=None):
+        self.table = table
+        self.row_id = row_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        if current_version is None:
+            message = f"{table} #{row_id} foi excluído em outro terminal."
+        else:
+            message = (f"{table} #{row_id} foi alterado em outro terminal "
+                       f"(versão {current_version}, esperada {expected_version}).")
+        super().__init__(message)
+
+
+def update_versioned(conn, table, row_id, assignments, params=(), expected_version=None):
+    """
+    UPDATE table SET <assignments>, VERSAO = VERSAO + 1 WHERE ID = row_id, condicionado
+    a VERSAO = expected_version quando informada. Retorna a nova versão (None se a
+    linha não existe e nenhuma versão era esperada).
+    """
+    sql = f"UPDATE {table} SET {assignments}, VERSAO = VERSAO + 1 WHERE ID = ?"
+    params = (*params, row_id)
+    if expected_version is not None:
+        sql += " AND VERSAO = ?"
+        params += (expected_version,)
+    if conn.execute(sql, params).rowcount:
+        return expected_version + 1 if expected_version is not None else current_version(conn, table, row_id)
+    if expected_version is not None:
+        raise ConcurrencyError(table, row_id, expected_version, current_version(conn, table, row_id))
+    return None
+
+
+def current_version(conn, table, row_id):
+    row = conn.execute(f"SELECT VERSAO FROM {table} WHERE ID = ?", (row_id,)).fetchone()
+    return row[0] if row else None
@@ -0,0 +1,99 @@
+# app/events.py
+"""
+Barramento de eventos de alteração de dados, dentro do processo.
+
+Os repositórios publicam um ChangeEvent (tabela, operação, IDs afetados) depois
+do commit. Janelas e caches assinam as tabelas que exibem e atualizam apenas as
+linhas afetadas, em vez de recarregar tudo. Um evento sem IDs indica uma
+alteração ampla (ex.: recálculo de custos), em que o assinante deve recarregar.
+
+Os assinantes são guardados por referência fraca quando são métodos, de modo que
+uma janela destruída deixa de receber eventos sem precisar cancelar a assinatura.
+O callback é chamado na thread que publicou o evento; janelas Qt devem usar o
+ChangeEventRelay (app/utils/ui_utils.py), que repassa o evento à thread da interface.
+"""
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+ALL_TABLES = "*"
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    table: str
+    operation: str
+    ids: tuple = ()
+
+    def affects(self, item_id):
+        return not self.ids or item_id in self.ids
+
+
+def _reference(callback):
+    if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+        return weakref.WeakMethod(callback)
+    return lambda: callback
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, tables, callback):
+        """Assina as tabelas informadas (ou ALL_TABLES). Retorna o próprio callback."""
+        if isinstance(tables, str):
+            tables = (tables,)
+        with self._lock:
+            for table in tables:
+                self._subscribers.setdefault(table, []).append(_reference(callback))
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            for table, references in self._subscribers.items():
+                self._subscribers[table] = [ref for ref in references if ref() not in (None, callback)]
+
+    def publish(self, table, operation, ids=()):
+        event = ChangeEvent(table, operation, tuple(i for i in ids if i is not None))
+        with self._lock:
+            references = self._subscribers.get(table, []) + self._subscribers.get(ALL_TABLES, [])
+        dead = False
+        for reference in references:
+            callback = reference()
+            if callback is None:
+                dead = True
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"Erro ao notificar alteração em {table}: {e}")
+        if dead:
+            with self._lock:
+                for name, refs in self._subscribers.items():
+                    self._subscribers[name] = [ref for ref in refs if ref() is not None]
+        return event
+
+
+_bus = EventBus()
+
+
+def get_event_bus():
+    return _bus
+
+
+def publish(table, operation, ids=()):
+    return _bus.publish(table, operation, ids)
+
+
+def subscribe(tables, callback):
+    return _bus.subscribe(tables, callback)
+
+
+def unsubscribe(callback):
+    _bus.unsubscribe(callback)
@@ -1,6 +1,10 @@
 import sqlite3
 # app/item/item_repository.py
 from app.database.db import get_db_manager
+from app.database.queries import SEARCH_QUERIES, as_record, fetch_all
+from app.database.versioning import update_versioned
+from app.models import Item
+from app import events
 
 class ItemRepository:
     def __init__(self):
@@ -10,25 +14,28 @@ class ItemRepository:
     def add(self, codigo_interno, description, item_type, unit_id, id_fornecedor_padrao):
         cursor = self.connection.cursor()
         try:
-            cursor.execute(
-                "INSERT INTO ITEM (CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO) VALUES (?, ?, ?, ?, ?)",
-                (codigo_interno, description, item_type, unit_id, id_fornecedor_padrao)
-            )
-            self.connection.commit()
+            with self.db_manager.transaction():
+                cursor.execute(
+                    "INSERT INTO ITEM (CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO) VALUES (?, ?, ?, ?, ?)",
+                    (codigo_interno, description, item_type, unit_id, id_fornecedor_padrao)
+                )
+                self.db_manager.publish("ITEM", events.INSERT, [cursor.lastrowid])
             return cursor.lastrowid
         except sqlite3.IntegrityError:
-            self.connection.rollback()
             return None
 
-    def get_all(self):
-        cursor = self.connection.cursor()
-        cursor.execute("""
+    def get_all(self, ids=None):
+        """Todos os itens ou, com ids, apenas os informados (atualização incremental das janelas)."""
+        query = """
             SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA, i.SALDO_ESTOQUE, i.CUSTO_MEDIO
             FROM ITEM i
             JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
-            ORDER BY i.DESCRICAO
-        """)
-        return cursor.fetchall()
+        """
+        params = ()
+        if ids is not None:
+            query += f" WHERE i.ID IN ({', '.join('?' * len(ids))})"
+            params = tuple(ids)
+        return fetch_all(self.connection, query + " ORDER BY i.DESCRICAO", params, as_record(Item))
 
     def get_by_id(self, item_id):
         cursor = self.connection.cursor()
@@ -38,20 +45,22 @@ class ItemRepository:
     def update(self, item_id, codigo_interno, description, item_type, unit_id, id_fornecedor_padrao):
         cursor = self.connection.cursor()
         try:
-            cursor.execute(
-                "UPDATE ITEM SET CODIGO_INTERNO = ?, DESCRICAO = ?, TIPO_ITEM = ?, ID_UNIDADE = ?, ID_FORNECEDOR_PADRAO = ? WHERE ID = ?",
-                (codigo_interno, description, item_type, unit_id, id_fornecedor_padrao, item_id)
-            )
-            self.connection.commit()
+            with self.db_manager.transaction():
+                cursor.execute(
+                    "UPDATE ITEM SET CODIGO_INTERNO = ?, DESCRICAO = ?, TIPO_ITEM = ?, ID_UNIDADE = ?, ID_FORNECEDOR_PADRAO = ?, VERSAO = VERSAO + 1 WHERE ID = ?",
+                    (codigo_interno, description, item_type, unit_id, id_fornecedor_padrao, item_id)
+                )
+                self.db_manager.publish("ITEM", events.UPDATE, [item_id])
             return True
         except sqlite3.IntegrityError:
-            self.connection.rollback()
             return False
 
     def delete(self, item_id):
         cursor = self.connection.cursor()
-        cursor.execute("DELETE FROM ITEM WHERE ID = ?", (item_id,))
-        self.connection.commit()
+        with self.db_manager.transaction():
+            cursor.execute("DELETE FROM ITEM WHERE ID = ?", (item_id,))
+            if cursor.rowcount > 0:
+                self.db_manager.publish("ITEM", events.DELETE, [item_id])
         return cursor.rowcount > 0
 
     def is_item_in_composition(self, item_id):
@@ -74,37 +83,21 @@ class ItemRepository:
         cursor.execute("SELECT 1 FROM COMPOSICAO WHERE ID_PRODUTO = ?", (item_id,))
         return cursor.fetchone() is not None
 
-    def search(self, search_type, search_text):
-        cursor = self.connection.cursor()
-        query = "SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA, i.SALDO_ESTOQUE, i.CUSTO_MEDIO FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID"
-        
-        allowed_types = {
-            "ID": "i.ID",
-            "CODIGO_INTERNO": "i.CODIGO_INTERNO",
-            "DESCRICAO": "i.DESCRICAO"
-        }
-        
-        column = allowed_types.get(search_type)
-        if not column:
-            return [] # Ou raise ValueError
+    def search(self, search_type, search_text, ids=None):
+        try:
+            query, params = SEARCH_QUERIES["items"].build(search_type, search_text, ids)
+        except ValueError:
+            return []
+        return fetch_all(self.connection, query, params, as_record(Item))
 
-        if search_type == "ID":
-            query += f" WHERE {column} = ?"
-            params = (search_text,)
-        else:
-            query += f" WHERE {column} LIKE ?"
-            params = (f"%{search_text}%",)
-            
-        query += " ORDER BY i.DESCRICAO"
-        cursor.execute(query, params)
-        return cursor.fetchall()
-        
-    def update_stock_and_cost(self, item_id, new_balance, new_average_cost):
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_balance, new_average_cost, item_id))
-        self.connection.commit()
+    def update_stock_and_cost(self, item_id, new_balance, new_average_cost, expected_version=None):
+        """Grava saldo e custo; com expected_version, só se o item não mudou desde a leitura (ConcurrencyError)."""
+        with self.db_manager.transaction():
+            update_versioned(self.connection, "ITEM", item_id, "SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?",
+                             (new_balance, new_average_cost), expected_version)
+            self.db_manager.publish("ITEM", events.UPDATE, [item_id])
 
     def add_stock_movement(self, item_id, movement_type, quantity, unit_value):
-        cursor = self.connection.cursor()
-        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, date('now'))", (item_id, movement_type, quantity, unit_value))
-        self.connection.commit()
+        with self.db_manager.transaction():
+            cursor = self.connection.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, date('now'))", (item_id, movement_type, quantity, unit_value))
+            self.db_manager.publish("MOVIMENTO", events.INSERT, [cursor.lastrowid])
@@ -20,9 +20,9 @@ class ItemService:
         except Exception as e:
             return {"success": False, "message": f"Erro ao adicionar item: {e}"}
 
-    def get_all_items(self):
+    def get_all_items(self, ids=None):
         try:
-            items = self.item_repository.get_all()
+            items = self.item_repository.get_all(ids)
             return {"success": True, "data": items}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar itens: {e}"}
@@ -70,9 +70,9 @@ class ItemService:
         except Exception as e:
             return {"success": False, "message": f"Erro no banco de dados ao tentar excluir o item: {e}"}
 
-    def search_items(self, search_type, search_text):
+    def search_items(self, search_type, search_text, ids=None):
         try:
-            items = self.item_repository.search(search_type, search_text)
+            items = self.item_repository.search(search_type, search_text, ids)
             return {"success": True, "data": items}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar itens: {e}"}
@@ -85,21 +85,23 @@ class ItemService:
             return {"success": False, "message": "Quantidade e valor total devem ser positivos."}
 
         try:
-            item = self.item_repository.get_by_id(item_id)
-            if not item or item['TIPO_ITEM'] not in ('Insumo', 'Ambos'):
-                return {"success": False, "message": "Apenas itens do tipo 'Insumo' ou 'Ambos' podem ter entrada manual."}
+            # Saldo lido e gravado na mesma transação, com um único commit
+            with self.item_repository.db_manager.transaction():
+                item = self.item_repository.get_by_id(item_id)
+                if not item or item['TIPO_ITEM'] not in ('Insumo', 'Ambos'):
+                    return {"success": False, "message": "Apenas itens do tipo 'Insumo' ou 'Ambos' podem ter entrada manual."}
+
+                old_balance = item['SALDO_ESTOQUE']
+                old_average_cost = item['CUSTO_MEDIO']
+
+                new_balance = old_balance + quantity
+                input_unit_value = total_value / quantity
+
+                new_average_cost = ((old_balance * old_average_cost) + (quantity * input_unit_value)) / new_balance
+
+                self.item_repository.update_stock_and_cost(item_id, new_balance, new_average_cost, item['VERSAO'])
+                self.item_repository.add_stock_movement(item_id, 'Entrada Manual', quantity, input_unit_value)
 
-            old_balance = item['SALDO_ESTOQUE']
-            old_average_cost = item['CUSTO_MEDIO']
-            
-            new_balance = old_balance + quantity
-            input_unit_value = total_value / quantity
-            
-            new_average_cost = ((old_balance * old_average_cost) + (quantity * input_unit_value)) / new_balance
-            
-            self.item_repository.update_stock_and_cost(item_id, new_balance, new_average_cost)
-            self.item_repository.add_stock_movement(item_id, 'Entrada Manual', quantity, input_unit_value)
-            
             return {"success": True, "message": f"Entrada de {quantity} un. do item ID {item_id} registrada. Novo saldo: {new_balance}."}
 
         except Exception as e:
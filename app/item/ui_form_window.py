@@ -5,8 +5,7 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QLabel, QDoubleSpinBox, QAbstractItemView
 )
 from PySide6.QtCore import Qt
-from app.item.service import ItemService
-from app.production import composition_operations
+from app.server import backend
 from app.utils.ui_utils import (
     NumericTableWidgetItem, show_error_message, show_success_message, 
     show_confirmation_message, show_warning_message, show_custom_confirmation
@@ -31,9 +30,10 @@ from app.styles.input_styles import (
 class ItemFormWindow(QWidget):
     def __init__(self, item_id=None):
         super().__init__()
+        self.composition_operations = backend.service("composition_operations")
         self.setAttribute(Qt.WA_DeleteOnClose)
 
-        self.item_service = ItemService()
+        self.item_service = backend.service("ItemService")
         self.current_item_id = item_id
         self.has_unsaved_changes = False
 
@@ -284,8 +284,7 @@ class ItemFormWindow(QWidget):
 
                 self.selected_supplier_id = item['ID_FORNECEDOR_PADRAO']
                 if self.selected_supplier_id:
-                    from app.supplier.service import SupplierService
-                    supplier_service = SupplierService()
+                    supplier_service = backend.service("SupplierService")
                     supplier_response = supplier_service.get_supplier_by_id(self.selected_supplier_id)
                     if supplier_response["success"]:
                         supplier = supplier_response["data"]
@@ -298,7 +297,7 @@ class ItemFormWindow(QWidget):
     def load_composition_data(self):
         self.composition_table.setRowCount(0)
         if self.current_item_id:
-            composition = composition_operations.get_bom(self.current_item_id)
+            composition = self.composition_operations.get_bom(self.current_item_id)
             for comp_item in composition:
                 self.add_row_to_composition_grid(
                     comp_item['ID_INSUMO'], 
@@ -353,7 +352,7 @@ class ItemFormWindow(QWidget):
         material_id = self.selected_material['ID']
 
         # VALIDAÇÃO: Movida para o módulo de operações
-        is_valid, error_message = composition_operations.validate_bom_item(
+        is_valid, error_message = self.composition_operations.validate_bom_item(
             self.current_item_id, material_id
         )
         if not is_valid:
@@ -536,7 +535,7 @@ class ItemFormWindow(QWidget):
                 quantity = float(self.composition_table.item(row, 2).text())
                 new_composition.append({'id_insumo': material_id, 'quantidade': quantity})
             
-            composition_operations.update_composition(self.current_item_id, new_composition)
+            self.composition_operations.update_composition(self.current_item_id, new_composition)
         
         show_success_message(self, "Sucesso", "Item salvo com sucesso!")
         self.setWindowTitle(f"Editando Item #{self.current_item_id}")
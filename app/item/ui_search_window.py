@@ -4,10 +4,10 @@ from PySide6.QtWidgets import (
     QComboBox, QPushButton, QTableView, QHeaderView, QAbstractItemView
 )
 from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QStandardItemModel, QStandardItem
 
-from app.item.service import ItemService
-from app.utils.ui_utils import show_error_message, configure_table_columns
+from app.server import backend
+from app.utils.ui_utils import show_error_message, configure_table_columns, ChangeEventRelay
+from app.utils.table_models import RecordTableModel, RawSortProxyModel, TableColumn, decimal_2, upper_text
 
 from app.styles.buttons_styles import (
     button_style, GREEN, BLUE
@@ -30,7 +30,7 @@ class ItemSearchWindow(QWidget):
     def __init__(self, selection_mode=False, item_type_filter=None):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.item_service = ItemService()
+        self.item_service = backend.service("ItemService")
         self.edit_window = None # Para manter referência da janela de edição
         self.selection_mode = selection_mode
         self.item_type_filter = item_type_filter # Lista de tipos de item a exibir
@@ -52,6 +52,10 @@ class ItemSearchWindow(QWidget):
         # Carrega os itens na inicialização
         self.load_items()
 
+        # Alterações gravadas em outras janelas atualizam apenas as linhas afetadas
+        self.change_relay = ChangeEventRelay(("ITEM", "UNIDADE"), self)
+        self.change_relay.changed.connect(self.on_data_changed)
+
     def create_search_group(self):
         search_group = QGroupBox("Pesquisa")
         search_layout = QHBoxLayout()
@@ -85,9 +89,17 @@ class ItemSearchWindow(QWidget):
         results_layout = QVBoxLayout()
 
         self.table_view = QTableView()
-        self.table_model = QStandardItemModel()
-        self.table_model.setHorizontalHeaderLabels(["ID", "Descrição", "Código Interno", "Tipo", "Un.", "Quantidade", "Custo Unit."])
-        self.table_view.setModel(self.table_model)
+        self.table_model = RecordTableModel([
+            TableColumn("ID", "ID"),
+            TableColumn("Descrição", "DESCRICAO"),
+            TableColumn("Código Interno", "CODIGO_INTERNO"),
+            TableColumn("Tipo", "TIPO_ITEM"),
+            TableColumn("Un.", "SIGLA", upper_text),
+            TableColumn("Quantidade", "SALDO_ESTOQUE", decimal_2),
+            TableColumn("Custo Unit.", "CUSTO_MEDIO", decimal_2),
+        ], parent=self)
+        self.proxy_model = RawSortProxyModel(self.table_model, self)
+        self.table_view.setModel(self.proxy_model)
         self.table_view.setAlternatingRowColors(True)
         self.table_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         header = self.table_view.horizontalHeader()
@@ -97,6 +109,7 @@ class ItemSearchWindow(QWidget):
         self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table_view.verticalHeader().setVisible(False)
         self.table_view.setSortingEnabled(True)
+        header.setSortIndicator(-1, Qt.AscendingOrder)  # mantém a ordem da consulta até o usuário ordenar
         self.table_view.doubleClicked.connect(self.handle_double_click)
 
         results_layout.addWidget(self.table_view)
@@ -107,66 +120,59 @@ class ItemSearchWindow(QWidget):
         super().showEvent(event)
         configure_table_columns(self.table_view, total_width=self.table_view.viewport().width())
 
-    def load_items(self):
-        """Carrega os itens na tabela, usando o ItemService."""
-        search_type_text = self.search_field_combo.currentText()
-        search_content = self.search_text.text()
-        self.table_model.removeRows(0, self.table_model.rowCount())
-        
+    def _fetch_items(self, ids=None):
+        """Executa a pesquisa atual (opcionalmente restrita a ids) e aplica o filtro de tipo."""
+        search_type, search_content = self.current_search
         if search_content:
-            search_type_map = {
-                "Descrição": "DESCRICAO",
-                "Código Interno": "CODIGO_INTERNO",
-                "Tipo": "TIPO_ITEM",
-                "ID": "ID"
-            }
-            search_type = search_type_map.get(search_type_text, "DESCRICAO")
-            response = self.item_service.search_items(search_type, search_content)
+            response = self.item_service.search_items(search_type, search_content, ids)
         else:
-            response = self.item_service.get_all_items()
+            response = self.item_service.get_all_items(ids)
 
         if not response["success"]:
             show_error_message(self, "Error", response["message"])
-            return
+            return None
 
         # Aplica o filtro de tipo de item, se existir
         items = response["data"]
         if self.item_type_filter:
             items = [item for item in items if item['TIPO_ITEM'] in self.item_type_filter]
-            
-        for item in items:
-            id_item = QStandardItem(str(item['ID']))
-            id_item.setData(item['ID'], Qt.DisplayRole)
-
-            qty_item = QStandardItem(f"{item['SALDO_ESTOQUE']:.2f}" if item['SALDO_ESTOQUE'] is not None else "")
-            cost_item = QStandardItem(f"{item['CUSTO_MEDIO']:.2f}" if item['CUSTO_MEDIO'] is not None else "")
-
-            row = [
-                id_item,
-                QStandardItem(item['DESCRICAO']),
-                QStandardItem(item['CODIGO_INTERNO'] or ""),
-                QStandardItem(item['TIPO_ITEM']),
-                QStandardItem(item['SIGLA'].upper()),
-                qty_item,
-                cost_item
-            ]
-            self.table_model.appendRow(row)
-
-            full_item_data = {
-                'ID': item['ID'],
-                'DESCRICAO': item['DESCRICAO'],
-                'CODIGO_INTERNO': item.get('CODIGO_INTERNO'),
-                'TIPO_ITEM': item['TIPO_ITEM'],
-                'SIGLA': item['SIGLA'],
-                'SALDO_ESTOQUE': item['SALDO_ESTOQUE'],
-                'CUSTO_MEDIO': item['CUSTO_MEDIO']
-            }
-            self.table_model.item(self.table_model.rowCount() - 1, 0).setData(full_item_data, Qt.UserRole)
+        return items
+
+    def load_items(self):
+        """Carrega os itens na tabela, usando o ItemService."""
+        search_type_map = {
+            "Descrição": "DESCRICAO",
+            "Código Interno": "CODIGO_INTERNO",
+            "Tipo": "TIPO_ITEM",
+            "ID": "ID"
+        }
+        search_type = search_type_map.get(self.search_field_combo.currentText(), "DESCRICAO")
+        self.current_search = (search_type, self.search_text.text())
+        self.table_model.set_rows(self._fetch_items() or [])
+
+    def on_data_changed(self, event):
+        """Atualiza, inclui ou remove somente as linhas dos itens alterados."""
+        if event.table != "ITEM" or not event.ids:
+            self.load_items()
+            return
+        items = self._fetch_items(list(event.ids))
+        if items is None:
+            return
+        current = {item['ID']: item for item in items}
+        for item_id in event.ids:
+            row = self.table_model.find(item_id)
+            if item_id not in current:
+                if row is not None:
+                    self.table_model.remove_row(row)
+            elif row is None:
+                self.table_model.append_row(current[item_id])
+            else:
+                self.table_model.update_row(row, current[item_id])
 
     def handle_double_click(self, model_index):
         if self.selection_mode:
-            item_data = self.table_model.item(model_index.row(), 0).data(Qt.UserRole)
-            self.item_selected.emit(item_data)
+            item_data = self.proxy_model.row_data(model_index)
+            self.item_selected.emit(item_data.as_dict())
             self.close()
         else:
             self.open_edit_item_window(model_index)
@@ -177,7 +183,7 @@ class ItemSearchWindow(QWidget):
 
     def open_edit_item_window(self, model_index):
         # Pega o ID do item da tabela e passa para a janela de edição
-        item_data = self.table_model.item(model_index.row(), 0).data(Qt.UserRole)
+        item_data = self.proxy_model.row_data(model_index)
         self.show_edit_window(item_id=item_data['ID'])
 
     def show_edit_window(self, item_id):
@@ -198,6 +204,5 @@ class ItemSearchWindow(QWidget):
         self.edit_window.show()
 
     def on_edit_window_closed(self):
-        """Slot para limpar a referência da janela de edição e recarregar os itens."""
+        """Slot para limpar a referência da janela de edição (as alterações chegam por on_data_changed)."""
         self.edit_window = None
-        self.load_items()
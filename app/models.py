@@ -0,0 +1,90 @@
+# app/models.py
+"""
+Registros de domínio compactos (dataclasses com __slots__).
+
+Os registros aceitam também o acesso por nome de coluna usado pelas janelas
+(item['SALDO_ESTOQUE'], item.get('CODIGO_INTERNO'), 'FORNECEDOR' in item,
+dict(item)), de modo que substituem sqlite3.Row e os dicionários sem alterar
+quem os consome. Os campos seguem a ordem das colunas das consultas que os
+carregam, com os nomes das colunas em minúsculas.
+"""
+from dataclasses import dataclass
+
+
+class Record:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.__match_args__[key])
+        try:
+            return getattr(self, key.lower())
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key.lower() in self.__match_args__
+
+    def keys(self):
+        return [name.upper() for name in self.__match_args__]
+
+    def as_dict(self):
+        return {name.upper(): getattr(self, name) for name in self.__match_args__}
+
+
+@dataclass(slots=True)
+class Item(Record):
+    id: int
+    codigo_interno: str
+    descricao: str
+    tipo_item: str
+    sigla: str
+    saldo_estoque: float
+    custo_medio: float
+
+
+@dataclass(slots=True)
+class EntryLine(Record):
+    id: int
+    id_insumo: int
+    id_fornecedor: int
+    fornecedor: str
+    descricao: str
+    sigla: str
+    quantidade: float
+    valor_unitario: float
+
+
+@dataclass(slots=True)
+class SaleLine(Record):
+    id: int
+    id_produto: int
+    descricao: str
+    sigla: str
+    quantidade: float
+    valor_unitario: float
+
+
+@dataclass(slots=True)
+class OPLine(Record):
+    id_produto: int
+    descricao: str
+    quantidade_produzir: float
+    unidade: str
+    custo_medio: float = 0.0
+
+
+@dataclass(slots=True)
+class BomLine(Record):
+    id: int
+    id_insumo: int
+    descricao: str
+    quantidade: float
+    sigla: str
+    custo_medio: float
@@ -1,6 +1,10 @@
 # app/production/composition_operations.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.child_sync import sync_child_rows
+from app.database.queries import as_record, fetch_all
+from app.models import BomLine
+from app import events
 
 def validate_bom_item(product_id, material_id):
     """
@@ -21,7 +25,7 @@ def validate_bom_item(product_id, material_id):
 def get_bom(product_id):
     """Busca a Composição (BOM) de um determinado produto."""
     conn = get_db_manager().get_connection()
-    bom = conn.execute('''
+    return fetch_all(conn, '''
         SELECT 
             C.ID, 
             I.ID as ID_INSUMO, 
@@ -33,53 +37,54 @@ def get_bom(product_id):
         JOIN ITEM I ON C.ID_INSUMO = I.ID
         JOIN UNIDADE U ON I.ID_UNIDADE = U.ID
         WHERE C.ID_PRODUTO = ?
-    ''', (product_id,)).fetchall()
-    return bom
+    ''', (product_id,), as_record(BomLine))
 
 def add_bom_item(product_id, material_id, quantity):
     """Adiciona um novo item à Composição (BOM)."""
+    db_manager = get_db_manager()
     try:
-        conn = get_db_manager().get_connection()
-        conn.execute(
-            'INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)',
-            (product_id, material_id, quantity)
-        )
-        conn.commit()
+        with db_manager.transaction():
+            db_manager.get_connection().execute(
+                'INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)',
+                (product_id, material_id, quantity)
+            )
+            db_manager.publish("COMPOSICAO", events.INSERT, [product_id])
         return True
     except sqlite3.IntegrityError:
-        get_db_manager().get_connection().rollback()
         return False
 
 def update_bom_item(bom_id, quantity):
     """Atualiza a quantidade de um item na Composição (BOM)."""
-    conn = get_db_manager().get_connection()
-    conn.execute(
-        'UPDATE COMPOSICAO SET QUANTIDADE = ? WHERE ID = ?',
-        (quantity, bom_id)
-    )
-    conn.commit()
+    db_manager = get_db_manager()
+    with db_manager.transaction():
+        db_manager.get_connection().execute(
+            'UPDATE COMPOSICAO SET QUANTIDADE = ? WHERE ID = ?',
+            (quantity, bom_id)
+        )
+        db_manager.publish("COMPOSICAO", events.UPDATE)
 
 def delete_bom_item(bom_id):
     """Exclui um item da Composição (BOM)."""
-    conn = get_db_manager().get_connection()
-    conn.execute('DELETE FROM COMPOSICAO WHERE ID = ?', (bom_id,))
-    conn.commit()
+    db_manager = get_db_manager()
+    with db_manager.transaction():
+        db_manager.get_connection().execute('DELETE FROM COMPOSICAO WHERE ID = ?', (bom_id,))
+        db_manager.publish("COMPOSICAO", events.DELETE)
 
 def update_composition(product_id, new_composition):
     """
     Atualiza a composição de um produto.
-    Apaga a composição antiga e insere a nova.
+    Grava apenas as diferenças entre a composição atual e a nova.
     """
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
     try:
-        with conn:
-            cursor.execute("DELETE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
-            if new_composition:
-                cursor.executemany(
-                    "INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)",
-                    [(product_id, item['id_insumo'], item['quantidade']) for item in new_composition]
-                )
+        with db_manager.transaction():
+            sync_child_rows(
+                cursor, "COMPOSICAO", "ID_PRODUTO", product_id,
+                ["ID_INSUMO"], ["QUANTIDADE"],
+                [(item['id_insumo'], item['quantidade']) for item in new_composition or []]
+            )
+            db_manager.publish("COMPOSICAO", events.UPDATE, [product_id])
         print(f"Composição do produto ID {product_id} atualizada com sucesso.")
         return True
     except sqlite3.Error as e:
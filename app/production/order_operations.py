@@ -1,82 +1,97 @@
 # app/production/order_operations.py
-from datetime import datetime
+from datetime import date, datetime
 from app.database.db import get_db_manager
+from app.database.child_sync import sync_child_rows
+from app.database.queries import SEARCH_QUERIES, as_record, fetch_all
+from app.database.versioning import ConcurrencyError, update_versioned
+from app.models import OPLine
+from app.stock import costing
+from app import events
+
+CONFLICT_MESSAGE = "Esta Ordem de Produção foi alterada em outro terminal. Recarregue-a e tente novamente."
 
 def create_op(numero, due_date, items_to_produce, id_linha_producao=None):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
     try:
-        current_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        op_id = cursor.execute(
-            "INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS, ID_LINHA_PRODUCAO) VALUES (?, ?, ?, 'Em Andamento', ?)",
-            (numero, current_date, due_date, id_linha_producao)
-        ).lastrowid
-        for item in items_to_produce:
-            cursor.execute(
+        with db_manager.transaction():
+            current_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            op_id = cursor.execute(
+                "INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS, ID_LINHA_PRODUCAO) VALUES (?, ?, ?, 'Em Andamento', ?)",
+                (numero, current_date, due_date, id_linha_producao)
+            ).lastrowid
+            cursor.executemany(
                 "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
-                (op_id, item['id_produto'], item['quantidade'])
+                [(op_id, item['id_produto'], item['quantidade']) for item in items_to_produce]
             )
-        conn.commit()
+            db_manager.publish("ORDEMPRODUCAO", events.INSERT, [op_id])
         return op_id
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao criar Ordem de Produção: {e}")
         return None
 
-def update_op(op_id, numero, due_date, items_to_produce):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+def update_op(op_id, numero, due_date, items_to_produce, version=None):
+    """
+    Grava número, previsão e itens da OP. Com version (VERSAO lida com a OP), só grava
+    se nenhum outro terminal alterou a OP depois. Retorna (sucesso, mensagem).
+    """
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
     try:
-        cursor.execute("UPDATE ORDEMPRODUCAO SET NUMERO = ?, DATA_PREVISTA = ? WHERE ID = ?", (numero, due_date, op_id))
-        
-        cursor.execute("DELETE FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+        with db_manager.transaction():
+            if update_versioned(cursor, "ORDEMPRODUCAO", op_id, "NUMERO = ?, DATA_PREVISTA = ?",
+                                (numero, due_date), version) is None:
+                raise Exception("Ordem de Produção não encontrada.")
 
-        for item in items_to_produce:
-            cursor.execute(
-                "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
-                (op_id, item['id_produto'], item['quantidade'])
+            sync_child_rows(
+                cursor, "ORDEMPRODUCAO_ITENS", "ID_ORDEM_PRODUCAO", op_id,
+                ["ID_PRODUTO"], ["QUANTIDADE_PRODUZIR"],
+                [(item['id_produto'], item['quantidade']) for item in items_to_produce]
             )
-            
-        conn.commit()
-        return True
+            db_manager.publish("ORDEMPRODUCAO", events.UPDATE, [op_id])
+        return True, "Ordem de Produção atualizada."
+    except ConcurrencyError:
+        return False, CONFLICT_MESSAGE
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao atualizar Ordem de Produção: {e}")
-        return False
+        return False, str(e)
 
-def finalize_op(op_id, produced_quantity):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+def finalize_op(op_id, produced_quantity, version=None):
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
     try:
-        # Obter detalhes da OP
-        op_details = get_op_details(op_id)
-        if not op_details:
-            raise Exception("Ordem de Produção não encontrada.")
+        # Consumo, entrada do produto e status da OP: uma transação, um commit
+        with db_manager.transaction():
+            op_details = get_op_details(op_id)
+            if not op_details:
+                raise Exception("Ordem de Produção não encontrada.")
 
-        total_cost = 0
-        for item in op_details['items']:
-            # Verificar estoque antes de consumir
-            can_produce, message = check_stock_for_production(item['ID_PRODUTO'], produced_quantity)
-            if not can_produce:
-                raise Exception(message)
-
-            # Consumir insumos e calcular custo
-            cost = consume_stock_for_production(op_id, item['ID_PRODUTO'], produced_quantity)
-            total_cost += cost
-            
-            # Dar entrada no produto acabado
-            increase_product_stock(op_id, item['ID_PRODUTO'], produced_quantity, cost)
-
-        # Atualizar a OP com o status, quantidade produzida e custo
-        cursor.execute(
-            "UPDATE ORDEMPRODUcao SET STATUS = 'Concluída', QUANTIDADE_PRODUZIDA = ?, CUSTO_TOTAL = ? WHERE ID = ?",
-            (produced_quantity, total_cost, op_id)
-        )
-        
-        conn.commit()
+            total_cost = 0
+            for item in op_details['items']:
+                # Verificar estoque antes de consumir
+                can_produce, message = check_stock_for_production(item['ID_PRODUTO'], produced_quantity)
+                if not can_produce:
+                    raise Exception(message)
+
+                # Consumir insumos e calcular custo
+                cost = consume_stock_for_production(op_id, item['ID_PRODUTO'], produced_quantity)
+                total_cost += cost
+
+                # Dar entrada no produto acabado
+                increase_product_stock(op_id, item['ID_PRODUTO'], produced_quantity, cost)
+
+            # Atualizar a OP com o status, quantidade produzida e custo
+            update_versioned(cursor, "ORDEMPRODUCAO", op_id,
+                             "STATUS = 'Concluída', QUANTIDADE_PRODUZIDA = ?, CUSTO_TOTAL = ?",
+                             (produced_quantity, total_cost), version)
+            item_ids = _op_item_ids(cursor, op_id)
+            # Itens com movimentos de data futura (ex.: notas lançadas adiante): reprocessa
+            costing.recompute_if_backdated(item_ids, date.today())
+            _publish_op_stock_change(db_manager, op_id, item_ids)
         return True, "Ordem de Produção finalizada com sucesso."
+    except ConcurrencyError:
+        return False, CONFLICT_MESSAGE
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao finalizar Ordem de Produção: {e}")
         return False, str(e)
 
@@ -85,42 +100,40 @@ def get_op_details(op_id):
     op_master = conn.execute("SELECT * FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,)).fetchone()
     if not op_master:
         return None
-    op_items = conn.execute("""
+    op_items = fetch_all(conn, """
         SELECT OPI.ID_PRODUTO, I.DESCRICAO, OPI.QUANTIDADE_PRODUZIR, U.SIGLA AS UNIDADE
         FROM ORDEMPRODUCAO_ITENS OPI
         JOIN ITEM I ON OPI.ID_PRODUTO = I.ID
         JOIN UNIDADE U ON I.ID_UNIDADE = U.ID
         WHERE OPI.ID_ORDEM_PRODUCAO = ?
-    """, (op_id,)).fetchall()
-    
-    items_with_cost = []
+    """, (op_id,), as_record(OPLine))
+
     for item in op_items:
-        item_dict = dict(item)
-        item_dict['CUSTO_MEDIO'] = calculate_product_cost(item_dict['ID_PRODUTO'])
-        items_with_cost.append(item_dict)
+        item.custo_medio = calculate_product_cost(item.id_produto)
 
-    return {"master": dict(op_master), "items": items_with_cost}
+    return {"master": dict(op_master), "items": op_items}
 
 def list_ops(search_term="", search_field="id"):
     conn = get_db_manager().get_connection()
-    query = "SELECT ID, NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS FROM ORDEMPRODUCAO"
-    params = ()
-    if search_term:
-        allowed_fields = {"ID": "ID", "STATUS": "STATUS", "NUMERO": "NUMERO"}
-        column = allowed_fields.get(search_field.upper(), "ID")
-        if column == "ID":
-            try:
-                int(search_term)
-                query += f" WHERE {column} = ?"
-                params = (search_term,)
-            except ValueError:
-                return []
-        else:
-            query += f" WHERE {column} LIKE ?"
-            params = (f"%{search_term}%",)
-    query += " ORDER BY ID DESC"
-    orders = conn.execute(query, params).fetchall()
-    return [dict(row) for row in orders]
+    search = SEARCH_QUERIES["production_orders"]
+    if not search_term:
+        return fetch_all(conn, f"{search.sql} {search.suffix}")
+    field = search_field.upper() if search_field.upper() in search.fields else "ID"
+    try:
+        query, params = search.build(field, search_term)
+    except ValueError:
+        return []
+    return fetch_all(conn, query, params)
+
+def _op_item_ids(cursor, op_id):
+    """Itens movimentados pela OP (produtos e insumos consumidos)."""
+    cursor.execute("SELECT DISTINCT ID_ITEM FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+def _publish_op_stock_change(db_manager, op_id, item_ids):
+    db_manager.publish("ORDEMPRODUCAO", events.UPDATE, [op_id])
+    db_manager.publish("ITEM", events.UPDATE, item_ids)
+    db_manager.publish("MOVIMENTO", events.INSERT)
 
 def check_stock_for_production(product_id, quantity):
     conn = get_db_manager().get_connection()
@@ -135,51 +148,54 @@ def check_stock_for_production(product_id, quantity):
     return True, ""
 
 def consume_stock_for_production(op_id, product_id, quantity):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT ID_INSUMO, QUANTIDADE, I.CUSTO_MEDIO FROM COMPOSICAO C JOIN ITEM I ON C.ID_INSUMO = I.ID WHERE C.ID_PRODUTO = ?", (product_id,))
-    composition = cursor.fetchall()
-    total_cost = 0
-    for insumo in composition:
-        consumed_quantity = insumo['QUANTIDADE'] * quantity
-        unit_cost = insumo['CUSTO_MEDIO']
-        cost = unit_cost * consumed_quantity
-        total_cost += cost
-        cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ? WHERE ID = ?", (consumed_quantity, insumo['ID_INSUMO']))
-        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Saída por OP', ?, ?, ?, date('now'))", (insumo['ID_INSUMO'], consumed_quantity, unit_cost, op_id))
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
+    with db_manager.transaction():
+        cursor.execute("SELECT ID_INSUMO, QUANTIDADE, I.CUSTO_MEDIO FROM COMPOSICAO C JOIN ITEM I ON C.ID_INSUMO = I.ID WHERE C.ID_PRODUTO = ?", (product_id,))
+        composition = cursor.fetchall()
+        total_cost = 0
+        for insumo in composition:
+            consumed_quantity = insumo['QUANTIDADE'] * quantity
+            unit_cost = insumo['CUSTO_MEDIO']
+            cost = unit_cost * consumed_quantity
+            total_cost += cost
+            cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ?, VERSAO = VERSAO + 1 WHERE ID = ?", (consumed_quantity, insumo['ID_INSUMO']))
+            cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Saída por OP', ?, ?, ?, date('now'))", (insumo['ID_INSUMO'], consumed_quantity, unit_cost, op_id))
     return total_cost
 
 def increase_product_stock(op_id, product_id, quantity, cost):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
-    
-    # Get current stock and average cost
-    cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (product_id,))
-    current_stock, current_avg_cost = cursor.fetchone()
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
+    with db_manager.transaction():
+        # Get current stock and average cost
+        cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO, VERSAO FROM ITEM WHERE ID = ?", (product_id,))
+        current_stock, current_avg_cost, version = cursor.fetchone()
 
-    # Calculate new average cost
-    new_stock = current_stock + quantity
-    if new_stock > 0:
-        new_avg_cost = ((current_stock * current_avg_cost) + cost) / new_stock
-    else:
-        new_avg_cost = current_avg_cost
+        # Calculate new average cost
+        new_stock = current_stock + quantity
+        if new_stock > 0:
+            new_avg_cost = ((current_stock * current_avg_cost) + cost) / new_stock
+        else:
+            new_avg_cost = current_avg_cost
 
-    unit_cost = cost / quantity if quantity > 0 else 0
-    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_stock, new_avg_cost, product_id))
-    cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Entrada por OP', ?, ?, ?, date('now'))", (product_id, quantity, unit_cost, op_id))
+        unit_cost = cost / quantity if quantity > 0 else 0
+        update_versioned(cursor, "ITEM", product_id, "SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?", (new_stock, new_avg_cost), version)
+        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Entrada por OP', ?, ?, ?, date('now'))", (product_id, quantity, unit_cost, op_id))
 
 def return_stock_for_production(op_id, product_id, quantity):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
-    composition = cursor.fetchall()
-    for insumo in composition:
-        returned_quantity = insumo['QUANTIDADE'] * quantity
-        cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE + ? WHERE ID = ?", (returned_quantity, insumo['ID_INSUMO']))
-        # We should probably also record a movement for return, but the original code didn't do it clearly for all cases.
-        # Original code used 'Retorno por OP' in some places.
-        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Retorno por OP', ?, ?, date('now'))", (insumo['ID_INSUMO'], returned_quantity, op_id))
-    conn.commit()
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
+    with db_manager.transaction():
+        cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
+        composition = cursor.fetchall()
+        for insumo in composition:
+            returned_quantity = insumo['QUANTIDADE'] * quantity
+            cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE + ?, VERSAO = VERSAO + 1 WHERE ID = ?", (returned_quantity, insumo['ID_INSUMO']))
+            # We should probably also record a movement for return, but the original code didn't do it clearly for all cases.
+            # Original code used 'Retorno por OP' in some places.
+            cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Retorno por OP', ?, ?, date('now'))", (insumo['ID_INSUMO'], returned_quantity, op_id))
+        db_manager.publish("ITEM", events.UPDATE, [insumo['ID_INSUMO'] for insumo in composition])
+        db_manager.publish("MOVIMENTO", events.INSERT)
 
 def calculate_product_cost(product_id):
     conn = get_db_manager().get_connection()
@@ -194,21 +210,20 @@ def calculate_product_cost(product_id):
     return result['CUSTO_TOTAL'] if result and result['CUSTO_TOTAL'] is not None else 0
 
 def cancel_op(op_id):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+    db_manager = get_db_manager()
     try:
-        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Cancelada' WHERE ID = ?", (op_id,))
-        conn.commit()
+        with db_manager.transaction():
+            update_versioned(db_manager.get_connection(), "ORDEMPRODUCAO", op_id, "STATUS = 'Cancelada'")
+            db_manager.publish("ORDEMPRODUCAO", events.UPDATE, [op_id])
         return True, "Ordem de Produção cancelada com sucesso."
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao cancelar Ordem de Produção: {e}")
         return False, str(e)
 
 def _reverse_production_stock_update(cursor, product_id, produced_quantity, production_cost):
     # Get current stock and average cost
-    cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (product_id,))
-    current_stock, current_avg_cost = cursor.fetchone()
+    cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO, VERSAO FROM ITEM WHERE ID = ?", (product_id,))
+    current_stock, current_avg_cost, version = cursor.fetchone()
 
     # Calculate new average cost by removing the production cost
     new_stock = current_stock - produced_quantity
@@ -220,77 +235,79 @@ def _reverse_production_stock_update(cursor, product_id, produced_quantity, prod
     else:
         new_avg_cost = 0 # If stock is zero, cost is zero
 
-    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_stock, new_avg_cost, product_id))
+    update_versioned(cursor, "ITEM", product_id, "SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?", (new_stock, new_avg_cost), version)
 
 
 def delete_op(op_id):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+    db_manager = get_db_manager()
+    cursor = db_manager.get_connection().cursor()
     try:
-        # Get OP details before deleting
-        cursor.execute("SELECT * FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,))
-        op_master = cursor.fetchone()
-        
-        if not op_master:
-            raise Exception("Ordem de Produção não encontrada.")
-
-        op_details = get_op_details(op_id)
-
-        status = op_master['STATUS']
-        
-        if status == 'Concluída':
-            produced_quantity = op_master['QUANTIDADE_PRODUZIDA']
-            
-            if produced_quantity and produced_quantity > 0:
-                for item in op_details['items']:
-                    product_id = item['ID_PRODUTO']
-                    
-                    # Get production cost for this specific item from MOVIMENTO
-                    cursor.execute(
-                        "SELECT (QUANTIDADE * VALOR_UNITARIO) as total_item_cost FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ? AND ID_ITEM = ? AND TIPO_MOVIMENTO = 'Entrada por OP'",
-                        (op_id, product_id)
-                    )
-                    row = cursor.fetchone()
-                    if row:
-                        item_production_cost = row['total_item_cost']
-                    else:
-                        # Fallback for old records without VALOR_UNITARIO in MOVIMENTO
-                        item_production_cost = op_master['CUSTO_TOTAL'] / len(op_details['items']) if op_master['CUSTO_TOTAL'] else 0
-
-                    # Revert stock and cost for the produced item
-                    _reverse_production_stock_update(cursor, product_id, produced_quantity, item_production_cost)
-                    
-                    # Return consumed components to stock
-                    cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
-                    composition = cursor.fetchall()
-                    for insumo in composition:
-                        returned_quantity = insumo['QUANTIDADE'] * produced_quantity
-                        cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE + ? WHERE ID = ?", (returned_quantity, insumo['ID_INSUMO']))
-
-        # Delete all movements related to this OP
-        cursor.execute("DELETE FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
-        
-        # Delete items from the production order
-        cursor.execute("DELETE FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
-        
-        # Finally, delete the production order itself
-        cursor.execute("DELETE FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,))
-        
-        conn.commit()
+        with db_manager.transaction():
+            # Get OP details before deleting
+            cursor.execute("SELECT * FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,))
+            op_master = cursor.fetchone()
+
+            if not op_master:
+                raise Exception("Ordem de Produção não encontrada.")
+
+            op_details = get_op_details(op_id)
+            affected_items = _op_item_ids(cursor, op_id)
+
+            status = op_master['STATUS']
+
+            if status == 'Concluída':
+                produced_quantity = op_master['QUANTIDADE_PRODUZIDA']
+
+                if produced_quantity and produced_quantity > 0:
+                    for item in op_details['items']:
+                        product_id = item['ID_PRODUTO']
+
+                        # Get production cost for this specific item from MOVIMENTO
+                        cursor.execute(
+                            "SELECT (QUANTIDADE * VALOR_UNITARIO) as total_item_cost FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ? AND ID_ITEM = ? AND TIPO_MOVIMENTO = 'Entrada por OP'",
+                            (op_id, product_id)
+                        )
+                        row = cursor.fetchone()
+                        if row:
+                            item_production_cost = row['total_item_cost']
+                        else:
+                            # Fallback for old records without VALOR_UNITARIO in MOVIMENTO
+                            item_production_cost = op_master['CUSTO_TOTAL'] / len(op_details['items']) if op_master['CUSTO_TOTAL'] else 0
+
+                        # Revert stock and cost for the produced item
+                        _reverse_production_stock_update(cursor, product_id, produced_quantity, item_production_cost)
+
+                        # Return consumed components to stock
+                        cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
+                        composition = cursor.fetchall()
+                        for insumo in composition:
+                            returned_quantity = insumo['QUANTIDADE'] * produced_quantity
+                            cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE + ?, VERSAO = VERSAO + 1 WHERE ID = ?", (returned_quantity, insumo['ID_INSUMO']))
+
+            # Delete all movements related to this OP
+            cursor.execute("DELETE FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+
+            # Delete items from the production order
+            cursor.execute("DELETE FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+
+            # Finally, delete the production order itself
+            cursor.execute("DELETE FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,))
+
+            db_manager.publish("ORDEMPRODUCAO", events.DELETE, [op_id])
+            db_manager.publish("ITEM", events.UPDATE, affected_items)
+            db_manager.publish("MOVIMENTO", events.DELETE)
         return True, "Ordem de Produção excluída com sucesso."
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao excluir Ordem de Produção: {e}")
         return False, str(e)
 
 def reopen_op(op_id):
-    conn = get_db_manager().get_connection()
-    cursor = conn.cursor()
+    db_manager = get_db_manager()
     try:
-        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Em Andamento' WHERE ID = ?", (op_id,))
-        conn.commit()
+        with db_manager.transaction():
+            update_versioned(db_manager.get_connection(), "ORDEMPRODUCAO", op_id, "STATUS = 'Em Andamento'")
+            db_manager.publish("ORDEMPRODUCAO", events.UPDATE, [op_id])
         return True, "Ordem de Produção reaberta com sucesso."
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao reabrir Ordem de Produção: {e}")
         return False, str(e)
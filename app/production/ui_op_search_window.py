@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtGui import QStandardItemModel, QStandardItem
-from app.production import order_operations
+from app.server import backend
 from app.utils.date_utils import format_date_for_display
 
 from app.styles.buttons_styles import (
@@ -26,6 +26,7 @@ class OPSearchWindow(QWidget):
     
     def __init__(self, selection_mode=False):
         super().__init__()
+        self.order_operations = backend.service("order_operations")
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.selection_mode = selection_mode
         self.production_order_window = None
@@ -84,7 +85,7 @@ class OPSearchWindow(QWidget):
         self.table_model.removeRows(0, self.table_model.rowCount())
         search_term = self.search_term.text()
         search_field = self.search_field.currentText().upper()
-        ops = order_operations.list_ops(search_term, search_field)
+        ops = self.order_operations.list_ops(search_term, search_field)
         for op in ops:
             row = [
                 QStandardItem(str(op['ID'])),
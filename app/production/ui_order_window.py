@@ -6,7 +6,7 @@ from PySide6.QtWidgets import (
     QDialog, QDoubleSpinBox
 )
 from PySide6.QtCore import QDate, Qt
-from app.production import order_operations
+from app.server import backend
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
 from app.utils.ui_utils import (
@@ -65,8 +65,10 @@ class FinalizeOrderDialog(QDialog):
 class ProductionOrderWindow(QWidget):
     def __init__(self, op_id=None):
         super().__init__()
+        self.order_operations = backend.service("order_operations")
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.current_op_id = op_id
+        self.current_version = None
         self.search_item_window = None
         self.search_op_window = None
         self.setWindowTitle("Ordem de Produção")
@@ -166,6 +168,7 @@ class ProductionOrderWindow(QWidget):
 
     def new_op(self):
         self.current_op_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Ordem de Produção")
         self.op_id_display.setText("(Nova)")
         self.numero_input.clear()
@@ -191,13 +194,15 @@ class ProductionOrderWindow(QWidget):
                   'quantidade': float(self.items_table.item(r, 2).text())}
                  for r in range(self.items_table.rowCount())]
         if self.current_op_id:
-            if order_operations.update_op(self.current_op_id, numero, due_date, items):
-                show_success_message(self, "Sucesso", "Ordem de Produção atualizada.")
+            success, message = self.order_operations.update_op(self.current_op_id, numero, due_date, items,
+                                                               self.current_version)
+            if success:
+                show_success_message(self, "Sucesso", message)
                 self.load_op_data()
             else:
-                show_error_message(self, "Erro", "Não foi possível atualizar a Ordem de Produção.")
+                show_error_message(self, "Erro", f"Não foi possível atualizar a Ordem de Produção. {message}")
         else:
-            new_id = order_operations.create_op(numero, due_date, items)
+            new_id = self.order_operations.create_op(numero, due_date, items)
             if new_id:
                 self.current_op_id = new_id
                 show_success_message(self, "Sucesso", f"Ordem de Produção #{new_id} criada.")
@@ -207,9 +212,10 @@ class ProductionOrderWindow(QWidget):
 
     def load_op_data(self):
         if not self.current_op_id: return
-        details = order_operations.get_op_details(self.current_op_id)
+        details = self.order_operations.get_op_details(self.current_op_id)
         if details:
             master = details['master']
+            self.current_version = master.get('VERSAO')
             self.setWindowTitle(f"Editando Ordem de Produção #{self.current_op_id}")
             self.op_id_display.setText(str(master['ID']))
             self.numero_input.setText(master.get('NUMERO', ''))
@@ -268,7 +274,7 @@ class ProductionOrderWindow(QWidget):
         item_data['ID_PRODUTO'] = item_data['ID']
         item_data['QUANTIDADE_PRODUZIR'] = 1.0
         item_data['UNIDADE'] = item_data['SIGLA']
-        item_data['CUSTO_MEDIO'] = order_operations.calculate_product_cost(item_data['ID'])
+        item_data['CUSTO_MEDIO'] = self.order_operations.calculate_product_cost(item_data['ID'])
         self.add_item_to_table(item_data)
 
     def add_item_to_table(self, item):
@@ -356,7 +362,7 @@ class ProductionOrderWindow(QWidget):
         
         if dialog.exec():
             produced_qty = dialog.get_value()
-            success, message = order_operations.finalize_op(self.current_op_id, produced_qty)
+            success, message = self.order_operations.finalize_op(self.current_op_id, produced_qty, self.current_version)
             if success:
                 show_success_message(self, "Sucesso", message)
                 self.load_op_data()
@@ -390,7 +396,7 @@ class ProductionOrderWindow(QWidget):
                                      "Tem certeza que deseja cancelar esta Ordem de Produção?")
 
         if reply == QMessageBox.Yes:
-            success, message = order_operations.cancel_op(self.current_op_id)
+            success, message = self.order_operations.cancel_op(self.current_op_id)
             if success:
                 show_success_message(self, "Sucesso", message)
                 self.load_op_data()
@@ -413,7 +419,7 @@ class ProductionOrderWindow(QWidget):
                                      "Tem certeza que deseja excluir esta Ordem de Produção? Esta ação não pode ser desfeita.")
 
         if reply == QMessageBox.Yes:
-            success, message = order_operations.delete_op(self.current_op_id)
+            success, message = self.order_operations.delete_op(self.current_op_id)
             if success:
                 show_success_message(self, "Sucesso", message)
                 self.new_op()  # Clear the form after deletion
@@ -428,7 +434,7 @@ class ProductionOrderWindow(QWidget):
                                      "Tem certeza que deseja reabrir esta Ordem de Produção?")
 
         if reply == QMessageBox.Yes:
-            success, message = order_operations.reopen_op(self.current_op_id)
+            success, message = self.order_operations.reopen_op(self.current_op_id)
             if success:
                 show_success_message(self, "Sucesso", message)
                 self.load_op_data()
@@ -1,6 +1,8 @@
 import sqlite3
 # app/production_line/line_operations.py
 from app.database.db import get_db_manager
+from app.database.child_sync import sync_child_rows
+from app import events
 
 def create_production_line(name, description, status, items):
     """
@@ -11,28 +13,27 @@ def create_production_line(name, description, status, items):
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            "INSERT INTO LINHAPRODUCAO (NOME, DESCRICAO, STATUS) VALUES (?, ?, ?)",
-            (name, description, status)
-        )
-        line_id = cursor.lastrowid
-        if items:
-            item_data = [
-                (line_id, item['id_produto'], item['quantidade'])
-                for item in items
-            ]
-            cursor.executemany(
-                "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
-                item_data
+        with db_manager.transaction():
+            cursor.execute(
+                "INSERT INTO LINHAPRODUCAO (NOME, DESCRICAO, STATUS) VALUES (?, ?, ?)",
+                (name, description, status)
             )
-        conn.commit()
+            line_id = cursor.lastrowid
+            if items:
+                item_data = [
+                    (line_id, item['id_produto'], item['quantidade'])
+                    for item in items
+                ]
+                cursor.executemany(
+                    "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
+                    item_data
+                )
+            db_manager.publish("LINHAPRODUCAO", events.INSERT, [line_id])
         return line_id
     except sqlite3.IntegrityError as e:
-        conn.rollback()
         print(f"Erro de integridade ao criar linha de produção: {e}")
         return None
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao criar linha de produção: {e}")
         return None
 
@@ -95,30 +96,23 @@ def update_production_line(line_id, name, description, status, items):
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     try:
-        # Atualiza o mestre
-        cursor.execute(
-            "UPDATE LINHAPRODUCAO SET NOME = ?, DESCRICAO = ?, STATUS = ? WHERE ID = ?",
-            (name, description, status, line_id)
-        )
-        
-        # Remove itens antigos
-        cursor.execute("DELETE FROM LINHAPRODUCAO_ITEMS WHERE ID_LINHA_PRODUCAO = ?", (line_id,))
-        
-        # Insere novos itens
-        if items:
-            item_data = [
-                (line_id, item['id_produto'], item['quantidade'])
-                for item in items
-            ]
-            cursor.executemany(
-                "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
-                item_data
+        with db_manager.transaction():
+            # Atualiza o mestre
+            cursor.execute(
+                "UPDATE LINHAPRODUCAO SET NOME = ?, DESCRICAO = ?, STATUS = ? WHERE ID = ?",
+                (name, description, status, line_id)
             )
-            
-        conn.commit()
+
+            # Sincroniza os itens (insere, atualiza e remove apenas o que mudou)
+            sync_child_rows(
+                cursor, "LINHAPRODUCAO_ITEMS", "ID_LINHA_PRODUCAO", line_id,
+                ["ID_PRODUTO"], ["QUANTIDADE"],
+                [(item['id_produto'], item['quantidade']) for item in items or []]
+            )
+
+            db_manager.publish("LINHAPRODUCAO", events.UPDATE, [line_id])
         return True
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao atualizar a linha de produção: {e}")
         return False
 
@@ -131,10 +125,10 @@ def delete_production_line(line_id):
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("DELETE FROM LINHAPRODUCAO WHERE ID = ?", (line_id,))
-        conn.commit()
+        with db_manager.transaction():
+            cursor.execute("DELETE FROM LINHAPRODUCAO WHERE ID = ?", (line_id,))
+            db_manager.publish("LINHAPRODUCAO", events.DELETE, [line_id])
         return True
     except Exception as e:
-        conn.rollback()
         print(f"Erro ao excluir a linha de produção: {e}")
         return False
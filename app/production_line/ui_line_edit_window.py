@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
     QHeaderView, QAbstractItemView, QTextEdit
 )
 from PySide6.QtCore import Qt
-from app.production_line import line_operations
+from app.server import backend
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.ui_utils import (
     NumericTableWidgetItem, show_error_message, show_success_message, 
@@ -28,6 +28,7 @@ from app.styles.search_field_style import (
 class LineEditWindow(QWidget):
     def __init__(self, line_id=None, parent=None):
         super().__init__()
+        self.line_operations = backend.service("line_operations")
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.parent = parent  # To refresh the list view
         self.current_line_id = line_id
@@ -103,7 +104,7 @@ class LineEditWindow(QWidget):
         self.main_layout.addLayout(action_buttons_layout)
 
     def load_line_data(self):
-        details = line_operations.get_production_line_details(self.current_line_id)
+        details = self.line_operations.get_production_line_details(self.current_line_id)
         if details:
             master = details['master']
             self.name_input.setText(master.get('NOME', ''))
@@ -131,10 +132,10 @@ class LineEditWindow(QWidget):
             })
 
         if self.current_line_id:
-            success = line_operations.update_production_line(self.current_line_id, name, description, status, items)
+            success = self.line_operations.update_production_line(self.current_line_id, name, description, status, items)
             message = "Linha de produção atualizada com sucesso." if success else "Falha ao atualizar a linha de produção."
         else:
-            line_id = line_operations.create_production_line(name, description, status, items)
+            line_id = self.line_operations.create_production_line(name, description, status, items)
             success = line_id is not None
             message = "Linha de produção criada com sucesso." if success else "Falha ao criar a linha de produção."
 
@@ -4,10 +4,9 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
 )
 from PySide6.QtCore import Qt
-from app.production_line import line_operations
+from app.server import backend
 from app.production_line.ui_line_edit_window import LineEditWindow
 from app.production.ui_order_window import ProductionOrderWindow
-from app.production import order_operations
 from app.utils.ui_utils import (
     show_error_message, show_success_message, 
     show_confirmation_message, show_warning_message
@@ -23,6 +22,8 @@ from app.styles.windows_style import (
 class LineListWindow(QWidget):
     def __init__(self):
         super().__init__()
+        self.line_operations = backend.service("line_operations")
+        self.order_operations = backend.service("order_operations")
         self.edit_window = None
         self.order_window = None
         self.setWindowTitle("Linhas de Produção")
@@ -72,7 +73,7 @@ class LineListWindow(QWidget):
 
     def load_lines(self):
         self.lines_table.setRowCount(0)
-        lines = line_operations.get_all_production_lines()
+        lines = self.line_operations.get_all_production_lines()
         for line in lines:
             row = self.lines_table.rowCount()
             self.lines_table.insertRow(row)
@@ -129,7 +130,7 @@ class LineListWindow(QWidget):
             f"Tem certeza que deseja excluir a linha de produção '{line_name}'?"
         )
         if reply == QMessageBox.Yes:
-            if line_operations.delete_production_line(line_id):
+            if self.line_operations.delete_production_line(line_id):
                 show_success_message(self, "Sucesso", "Linha de produção excluída.")
                 self.load_lines()
             else:
@@ -148,7 +149,7 @@ class LineListWindow(QWidget):
             show_warning_message(self, "Atenção", "Não é possível iniciar a produção a partir de uma linha inativa.")
             return
 
-        line_details = line_operations.get_production_line_details(line_id)
+        line_details = self.line_operations.get_production_line_details(line_id)
         if not line_details or not line_details['items']:
             show_warning_message(self, "Atenção", "Esta linha de produção não tem produtos para produzir.")
             return
@@ -160,7 +161,7 @@ class LineListWindow(QWidget):
         
         numero_op = f"LP-{line_id}-{self.lines_table.item(selected_row, 1).text()}"
 
-        new_op_id = order_operations.create_op(numero_op, None, items_to_produce, id_linha_producao=line_id)
+        new_op_id = self.order_operations.create_op(numero_op, None, items_to_produce, id_linha_producao=line_id)
         
         if new_op_id:
             show_success_message(self, "Ordem de Produção Criada", f"Ordem de Produção #{new_op_id} foi criada. Por favor, revise e finalize.")
@@ -0,0 +1,138 @@
+# app/reports/cli.py
+"""
+Execução de relatórios sem a interface Qt.
+
+Exemplos:
+    python -m app.reports.cli list
+    python -m app.reports.cli run stock_movement_report --filter periodo_de=2024-01-01 --format csv --output mov.csv
+    python -m app.reports.cli batch jobs.json --workers 4
+
+Formato do arquivo de jobs:
+    {"output_dir": "relatorios", "jobs": [
+        {"report": "current_stock_report", "format": "xlsx"},
+        {"report": "profit_by_product_report", "filters": {"periodo_de": "2024-01-01"}, "format": "pdf", "output": "lucro.pdf"}
+    ]}
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from app.database.db import DatabaseManager
+from app.reports.registry import REPORTS, EXPORTERS, execute, export
+
+# Conexão somente leitura de cada processo de trabalho
+_worker_db = None
+
+
+def run_report(db_manager, report_id, filters=None):
+    """Executa um relatório do registro e retorna (chaves das colunas, linhas com os valores brutos)."""
+    result = execute(db_manager, report_id, filters)
+    return result.report.keys, result.rows
+
+
+def _default_output(report_id, fmt, output_dir):
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.join(output_dir or ".", f"{report_id}_{stamp}.{fmt}")
+
+
+def execute_job(db_manager, job, output_dir=None):
+    """Executa um job ({report, filters, format, output}) e grava o arquivo de saída."""
+    fmt = job.get("format", "csv").lower()
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Formato não suportado: {fmt}")
+    output = job.get("output") or _default_output(job["report"], fmt, output_dir)
+    if output_dir and not os.path.dirname(output):
+        output = os.path.join(output_dir, output)
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    start = time.perf_counter()
+    result = execute(db_manager, job["report"], job.get("filters"))
+    export(result, output, fmt)
+    return {"report": job["report"], "output": output, "rows": len(result), "seconds": round(time.perf_counter() - start, 3)}
+
+
+def _init_worker(db_path):
+    global _worker_db
+    _worker_db = DatabaseManager.open_read_only(db_path)
+
+
+def _run_worker_job(job, output_dir):
+    return execute_job(_worker_db, job, output_dir)
+
+
+def run_batch(jobs, db_path=None, output_dir=None, workers=None):
+    """
+    Executa vários jobs em paralelo, um processo por job, cada processo com sua
+    própria conexão somente leitura. Retorna a lista de resultados (ou erros).
+    """
+    db_path = db_path or DatabaseManager._get_db_path()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        futures = {pool.submit(_run_worker_job, job, output_dir): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"report": futures[future].get("report"), "error": str(e)})
+    return results
+
+
+def _parse_filters(pairs):
+    filters = {}
+    for pair in pairs or []:
+        if "=" not in pair:
+            raise ValueError(f"Filtro inválido (use chave=valor): {pair}")
+        key, value = pair.split("=", 1)
+        filters[key.strip()] = value.strip()
+    return filters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geração de relatórios do MiniSis sem interface gráfica.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: banco da aplicação).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Lista os relatórios disponíveis.")
+
+    run_parser = subparsers.add_parser("run", help="Executa um relatório.")
+    run_parser.add_argument("report", choices=sorted(REPORTS))
+    run_parser.add_argument("--filter", action="append", dest="filters", help="Filtro no formato chave=valor.")
+    run_parser.add_argument("--format", default="csv", choices=sorted(EXPORTERS))
+    run_parser.add_argument("--output", help="Arquivo de saída.")
+
+    batch_parser = subparsers.add_parser("batch", help="Executa os relatórios de um arquivo de jobs JSON.")
+    batch_parser.add_argument("job_file")
+    batch_parser.add_argument("--workers", type=int, help="Número de processos (padrão: número de CPUs).")
+    batch_parser.add_argument("--output-dir", help="Pasta de saída (sobrepõe a do arquivo de jobs).")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for report_id, report in sorted(REPORTS.items()):
+            filters = ", ".join(spec.key for spec in report.filters)
+            print(f"{report_id:32} {report.title}" + (f"  [{filters}]" if filters else ""))
+        return 0
+
+    if args.command == "run":
+        db_manager = DatabaseManager.open_read_only(args.db)
+        job = {"report": args.report, "filters": _parse_filters(args.filters), "format": args.format, "output": args.output}
+        result = execute_job(db_manager, job)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+
+    with open(args.job_file, encoding="utf-8") as f:
+        job_file = json.load(f)
+    output_dir = args.output_dir or job_file.get("output_dir")
+    results = run_batch(job_file["jobs"], db_path=args.db, output_dir=output_dir, workers=args.workers)
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
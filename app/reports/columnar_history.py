@@ -0,0 +1,370 @@
+# app/reports/columnar_history.py
+"""
+Histórico colunar (Parquet + DuckDB) para os relatórios de lucro e de produção.
+
+Os meses fechados (anteriores ao mês corrente) são exportados para arquivos
+Parquet, um por mês e conjunto, na pasta Historico ao lado do DADOS.DB:
+
+    Historico/vendas/AAAA-MM.parquet     linhas das saídas finalizadas
+    Historico/producao/AAAA-MM.parquet   linhas das ordens de produção
+
+A exportação é incremental: refresh() exporta os meses fechados que ainda não têm
+arquivo e reexporta os meses tocados por alterações registradas em CDC_LOG
+(app/database/cdc.py) desde a última exportação, inclusive o mês antigo de um
+documento cuja data mudou. O histórico dos períodos fechados (app/database/archive.py)
+entra pelas mesmas fontes dos relatórios (history_sources).
+
+Nos relatórios, a parte histórica é agregada pelo DuckDB, lendo apenas os arquivos
+dos meses do intervalo pedido, e somada à cauda viva (o mês corrente em diante),
+agregada no SQLite. Descrição e custo médio dos produtos vêm sempre do ITEM atual.
+Os resultados têm o formato e a semântica do cache de vendas
+(app/reports/sales_analytics.py): só saídas finalizadas, preço médio ponderado.
+
+DuckDB e pyarrow são opcionais; sem eles os relatórios continuam no SQLite.
+
+    python -m app.reports.columnar_history refresh
+    python -m app.reports.columnar_history status
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from app import events
+from app.database import cdc
+
+try:
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # DuckDB e pyarrow são opcionais
+    duckdb = pa = pq = None
+
+CONSUMER = "historico_colunar"
+MANIFEST = "manifest.json"
+
+
+class Dataset:
+    """
+    Conjunto exportado: linhas filhas (child) de documentos (parent), com a data do
+    documento. `columns` são (nome, tipo) na ordem do SELECT de `query`.
+    """
+    __slots__ = ("name", "parent", "child", "parent_key", "date_column", "query", "columns", "where", "by_day")
+
+    def __init__(self, name, parent, child, parent_key, date_column, query, columns, where="", by_day=False):
+        self.name = name
+        self.parent = parent
+        self.child = child
+        self.parent_key = parent_key
+        self.date_column = date_column
+        self.query = query
+        self.columns = columns
+        self.where = where
+        # Filtros de período pelo dia (como o cache de vendas) ou pelo texto completo da data (como o SQL)
+        self.by_day = by_day
+
+
+DATASETS = {
+    "vendas": Dataset(
+        "vendas", "SAIDA", "SAIDA_ITENS", "ID_SAIDA", "DATA_SAIDA",
+        "SELECT c.ID, c.ID_SAIDA, c.ID_PRODUTO, c.QUANTIDADE, c.VALOR_UNITARIO, p.DATA_SAIDA "
+        "FROM {SAIDA_ITENS} c JOIN {SAIDA} p ON p.ID = c.ID_SAIDA",
+        [("ID", "int64"), ("ID_SAIDA", "int64"), ("ID_PRODUTO", "int64"), ("QUANTIDADE", "float64"),
+         ("VALOR_UNITARIO", "float64"), ("DATA_SAIDA", "string")],
+        where="p.STATUS = 'Finalizada'", by_day=True),
+    "producao": Dataset(
+        "producao", "ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "ID_ORDEM_PRODUCAO", "DATA_CRIACAO",
+        "SELECT c.ID, c.ID_ORDEM_PRODUCAO, c.ID_PRODUTO, c.QUANTIDADE_PRODUZIR, p.DATA_CRIACAO, p.STATUS "
+        "FROM {ORDEMPRODUCAO_ITENS} c JOIN {ORDEMPRODUCAO} p ON p.ID = c.ID_ORDEM_PRODUCAO",
+        [("ID", "int64"), ("ID_ORDEM_PRODUCAO", "int64"), ("ID_PRODUTO", "int64"),
+         ("QUANTIDADE_PRODUZIR", "float64"), ("DATA_CRIACAO", "string"), ("STATUS", "string")]),
+}
+
+
+def available():
+    return duckdb is not None
+
+
+def _month_start(month):
+    return f"{month}-01"
+
+
+def _next_month(month):
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def _sql_list(paths):
+    return "[" + ", ".join("'" + path.replace("'", "''") + "'" for path in paths) + "]"
+
+
+class ColumnarHistory:
+    def __init__(self, db_manager, directory=None, refresh_interval=300, cutoff=None):
+        if not available():
+            raise RuntimeError("O histórico colunar requer os pacotes duckdb e pyarrow (pip install duckdb pyarrow).")
+        self.db_manager = db_manager
+        self.directory = directory or db_manager.archive_path("Historico")
+        self.refresh_interval = refresh_interval
+        # Primeiro mês da cauda viva (AAAA-MM); padrão: o mês corrente
+        self.fixed_cutoff = cutoff
+        self.engine = duckdb.connect()
+        self.manifest = self._load_manifest()
+        self._refreshed_at = None
+        events.subscribe(tuple(table for dataset in DATASETS.values() for table in (dataset.parent, dataset.child)),
+                         self.on_change)
+
+    # --- Exportação ---
+
+    @property
+    def cutoff(self):
+        return self.fixed_cutoff or date.today().strftime("%Y-%m")
+
+    def _load_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        return {"marca": None, "meses": {name: {} for name in DATASETS}}
+
+    def _save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _path(self, dataset, month):
+        return os.path.join(self.directory, dataset, f"{month}.parquet")
+
+    def on_change(self, event):
+        self._refreshed_at = None
+
+    def refresh(self, force=False):
+        """
+        Exporta os meses fechados pendentes ou alterados. Sem force, não faz nada se não
+        houve eventos de alteração nem virada de mês e a última verificação tiver menos de
+        refresh_interval segundos (gravações de outros processos). Retorna
+        {conjunto: [meses exportados]}.
+        """
+        if not force and self._refreshed_at is not None and self.manifest.get("corte") == self.cutoff \
+                and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return {}
+        conn = self.db_manager.get_report_connection()
+        mark = cdc.last_change_id(conn)
+        previous = self.manifest["marca"]
+        rebuild_all = previous is None or previous < cdc.first_change_id(conn) - 1
+        exported = {}
+        for name, dataset in DATASETS.items():
+            known = self.manifest["meses"].setdefault(name, {})
+            closed = self._closed_months(conn, dataset)
+            todo = closed if rebuild_all else (closed - set(known)) | (self._changed_months(conn, dataset, previous) & closed)
+            # Meses que ficaram sem linhas (documentos excluídos ou reabertos) perdem o arquivo
+            todo |= set(known) - closed
+            for month in sorted(todo):
+                rows = self._export_month(conn, dataset, month)
+                if rows:
+                    known[month] = rows
+                else:
+                    known.pop(month, None)
+            if todo:
+                exported[name] = sorted(todo)
+        self.manifest["marca"] = mark
+        self.manifest["corte"] = self.cutoff
+        self._save_manifest()
+        if not self.db_manager.read_only:
+            cdc.acknowledge(self.db_manager, CONSUMER, mark)
+        self._refreshed_at = time.monotonic()
+        return exported
+
+    def _closed_months(self, conn, dataset):
+        source = self.db_manager.history_sources(dataset.parent, date_to=_month_start(self.cutoff))[dataset.parent]
+        where = f" AND {dataset.where}" if dataset.where else ""
+        return {row[0] for row in conn.execute(
+            f"SELECT DISTINCT substr(p.{dataset.date_column}, 1, 7) FROM {source} p "
+            f"WHERE p.{dataset.date_column} < ?{where}", (_month_start(self.cutoff),))}
+
+    def _changed_months(self, conn, dataset, since):
+        """Meses (no arquivo e no banco) dos documentos e linhas alterados desde a marca `since`."""
+        changes = conn.execute("""
+            SELECT TABELA, ID_LINHA FROM CDC_LOG WHERE ID > ? AND TABELA IN (?, ?) AND OPERACAO <> ?
+        """, (since, dataset.parent, dataset.child, cdc.ARCHIVED)).fetchall()
+        parents = [row_id for table, row_id in changes if table == dataset.parent]
+        children = [row_id for table, row_id in changes if table == dataset.child]
+        if not parents and not children:
+            return set()
+        self.engine.register("_pais", pa.table({"ID": pa.array(parents, pa.int64())}))
+        self.engine.register("_filhas", pa.table({"ID": pa.array(children, pa.int64())}))
+        months = set()
+        files = self._files(dataset.name)
+        if files:
+            months |= {row[0] for row in self.engine.execute(f"""
+                SELECT DISTINCT substr({dataset.date_column}, 1, 7) FROM read_parquet({_sql_list(files)}) h
+                WHERE h.{dataset.parent_key} IN (SELECT ID FROM _pais) OR h.ID IN (SELECT ID FROM _filhas)
+            """).fetchall()}
+        self.engine.unregister("_pais")
+        self.engine.unregister("_filhas")
+        live = (
+            (parents, f"SELECT DISTINCT substr({dataset.date_column}, 1, 7) FROM {dataset.parent} WHERE ID IN ({{}})"),
+            (children, f"SELECT DISTINCT substr(p.{dataset.date_column}, 1, 7) FROM {dataset.child} c "
+                       f"JOIN {dataset.parent} p ON p.ID = c.{dataset.parent_key} WHERE c.ID IN ({{}})"),
+        )
+        for ids, sql in live:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                months |= {row[0] for row in conn.execute(sql.format(", ".join("?" * len(chunk))), chunk)}
+        return months
+
+    def _export_month(self, conn, dataset, month):
+        start, end = _month_start(month), _month_start(_next_month(month))
+        sources = self.db_manager.history_sources(dataset.parent, dataset.child, date_from=start, date_to=end)
+        conditions = [f"p.{dataset.date_column} >= ?", f"p.{dataset.date_column} < ?"]
+        if dataset.where:
+            conditions.append(dataset.where)
+        rows = conn.execute(dataset.query.format(**sources) + " WHERE " + " AND ".join(conditions) + " ORDER BY c.ID",
+                            (start, end)).fetchall()
+        path = self._path(dataset.name, month)
+        if not rows:
+            if os.path.exists(path):
+                os.remove(path)
+            return 0
+        columns = list(zip(*rows))
+        table = pa.table({name: pa.array(values, getattr(pa, kind)())
+                          for (name, kind), values in zip(dataset.columns, columns)})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return len(rows)
+
+    # --- Consultas ---
+
+    def _files(self, dataset, date_from=None, date_to=None):
+        """Arquivos dos meses exportados (anteriores ao corte) que cruzam o intervalo."""
+        first = str(date_from)[:7] if date_from else None
+        last = str(date_to)[:7] if date_to else None
+        return [self._path(dataset, month) for month in sorted(self.manifest["meses"].get(dataset, {}))
+                if month < self.cutoff and (not first or month >= first) and (not last or month <= last)]
+
+    def _aggregate(self, dataset_name, measures, group_by, date_from=None, date_to=None):
+        """
+        {chave: [medidas]} somando o histórico (DuckDB) e a cauda viva (SQLite). `measures`
+        são somas ou máximos, em SQL válido nos dois motores, sobre as colunas do conjunto.
+        """
+        dataset = DATASETS[dataset_name]
+        column = f"substr({dataset.date_column}, 1, 10)" if dataset.by_day else dataset.date_column
+        conditions, params = [], []
+        if date_from:
+            conditions.append(f"{column} >= ?")
+            params.append(str(date_from)[:10] if dataset.by_day else date_from)
+        if date_to:
+            conditions.append(f"{column} <= ?")
+            params.append(str(date_to)[:10] if dataset.by_day else date_to)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        select = f"SELECT {', '.join(group_by)}, {', '.join(measures)}"
+        suffix = f" GROUP BY {', '.join(group_by)}"
+        totals = {}
+
+        def add(rows):
+            for row in rows:
+                key, values = tuple(row[:len(group_by)]), list(row[len(group_by):])
+                current = totals.get(key)
+                totals[key] = values if current is None else [
+                    max(a, b) if isinstance(a, str) else a + b for a, b in zip(current, values)]
+
+        files = self._files(dataset_name, date_from, date_to)
+        if files:
+            add(self.engine.execute(f"{select} FROM read_parquet({_sql_list(files)}){where}{suffix}", params).fetchall())
+
+        if not date_to or str(date_to)[:7] >= self.cutoff:
+            # Cauda viva: do mês de corte em diante, ainda não exportada
+            live = dataset.query.format(**{dataset.parent: dataset.parent, dataset.child: dataset.child})
+            tail = [f"p.{dataset.date_column} >= ?"] + ([dataset.where] if dataset.where else [])
+            add(self.db_manager.get_report_connection().execute(
+                f"{select} FROM ({live} WHERE {' AND '.join(tail)}){where}{suffix}",
+                [_month_start(self.cutoff), *params]).fetchall())
+        return totals
+
+    def _products(self):
+        conn = self.db_manager.get_report_connection()
+        return {row[0]: (row[1], row[2] or 0.0) for row in conn.execute("SELECT ID, DESCRICAO, CUSTO_MEDIO FROM ITEM")}
+
+    @staticmethod
+    def _in_range(description, product_from, product_to):
+        return (not product_from or description >= product_from) and (not product_to or description <= product_to)
+
+    def profit_by_product(self, filters):
+        """Mesmo formato de DatabaseManager.get_profit_by_product."""
+        totals = self._aggregate("vendas", ["SUM(QUANTIDADE)", "SUM(QUANTIDADE * VALOR_UNITARIO)"], ["ID_PRODUTO"],
+                                 filters.get("periodo_de"), filters.get("periodo_ate"))
+        products = self._products()
+        result = []
+        for (product_id,), (quantity, revenue) in sorted(totals.items()):
+            description, cost = products.get(product_id, ("", 0.0))
+            if not quantity or not self._in_range(description, filters.get("produto_de"), filters.get("produto_ate")):
+                continue
+            price = revenue / quantity
+            result.append({
+                "produto": description,
+                "custo_unitario": cost,
+                "preco_venda": price,
+                "quantidade_vendida": quantity,
+                "lucro_unitario": price - cost,
+                "lucro_total": quantity * (price - cost),
+            })
+        return result
+
+    def profit_by_period(self, filters):
+        """Mesmo formato de DatabaseManager.get_profit_by_period."""
+        totals = self._aggregate("vendas", ["SUM(QUANTIDADE)", "SUM(QUANTIDADE * VALOR_UNITARIO)"], ["ID_PRODUTO"],
+                                 filters.get("data_inicial"), filters.get("data_final"))
+        if not any(quantity for quantity, _ in totals.values()):
+            return {"total_vendas": None, "custo_total": None, "lucro_final": None}
+        products = self._products()
+        total_sales = sum(revenue for _, revenue in totals.values())
+        total_cost = sum(quantity * products.get(product_id, ("", 0.0))[1]
+                         for (product_id,), (quantity, _) in totals.items())
+        return {"total_vendas": total_sales, "custo_total": total_cost, "lucro_final": total_sales - total_cost}
+
+    def production_by_period(self, filters):
+        """
+        Colunas e linhas de DatabaseManager.get_production_by_period (produto, quantidade,
+        data da última ordem). Como no JOIN do SQL, produtos que não estão no ITEM ficam de fora.
+        """
+        totals = self._aggregate("producao", ["SUM(QUANTIDADE_PRODUZIR)", "MAX(DATA_CRIACAO)"], ["ID_PRODUTO"],
+                                 filters.get("periodo_de"), filters.get("periodo_ate"))
+        products = self._products()
+        rows = [(products[product_id][0], quantity, last_date)
+                for (product_id,), (quantity, last_date) in sorted(totals.items()) if product_id in products]
+        return ["produto", "quantidade_produzida", "data_producao"], rows
+
+    def status(self):
+        return {"pasta": self.directory, "corte": self.cutoff, "marca": self.manifest["marca"],
+                "meses": {name: len(months) for name, months in self.manifest["meses"].items()},
+                "linhas": {name: sum(months.values()) for name, months in self.manifest["meses"].items()}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Histórico colunar (Parquet) dos relatórios de lucro e produção.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    parser.add_argument("--dir", help="Pasta dos arquivos Parquet (padrão: Historico, ao lado do banco).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("refresh", help="Exporta os meses fechados pendentes ou alterados.")
+    subparsers.add_parser("status", help="Meses e linhas exportados.")
+    args = parser.parse_args(argv)
+
+    from app.database.db import DatabaseManager
+    db_manager = DatabaseManager(args.db)
+    history = db_manager.enable_columnar_history(args.dir)
+    if args.command == "refresh":
+        start = time.perf_counter()
+        exported = history.refresh(force=True)
+        print(json.dumps({"exportados": exported, "segundos": round(time.perf_counter() - start, 3)},
+                         ensure_ascii=False, indent=2))
+    else:
+        print(json.dumps(history.status(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
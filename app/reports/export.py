@@ -1,4 +1,5 @@
 
+import csv
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 from reportlab.lib import colors
@@ -44,8 +45,9 @@ def export_to_pdf(filename, data, headers):
     doc.build(elements, onFirstPage=_footer_canvas, onLaterPages=_footer_canvas)
 
 def export_to_excel(filename, data, headers):
-    workbook = Workbook()
-    sheet = workbook.active
+    # write_only grava as linhas em fluxo, sem manter todas as células em memória
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
     
     sheet.append(headers)
     
@@ -53,3 +55,10 @@ def export_to_excel(filename, data, headers):
         sheet.append(row)
         
     workbook.save(filename)
+
+def export_to_csv(filename, data, headers):
+    with open(filename, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(headers)
+        for row in data:
+            writer.writerow(row)
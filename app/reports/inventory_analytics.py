@@ -0,0 +1,178 @@
+# app/reports/inventory_analytics.py
+"""
+Análise de estoque: curva ABC/XYZ, giro, dias de cobertura e itens sem giro.
+
+O histórico de MOVIMENTO é lido em uma única varredura, agregada pelo SQLite por
+item e mês (consumo do mês e última movimentação). A partir daí o consumo mensal
+de todos os itens é montado em uma matriz itens x meses e as medidas são
+calculadas de forma vetorizada com NumPy; sem o NumPy o cálculo é feito em Python
+sobre os mesmos vetores.
+
+Consumo é toda saída de estoque ('Saída por OP' e 'Saída por Venda') nos últimos
+`months` meses até a data de referência, valorizada pelo custo médio atual.
+
+    ABC   participação acumulada no valor de consumo (A até 80%, B até 95%, C o resto)
+    XYZ   coeficiente de variação do consumo mensal (X até 0,5, Y até 1,0, Z acima
+          disso ou sem consumo)
+    giro  consumo anualizado / saldo em estoque
+    dias_cobertura   saldo / consumo médio diário
+    sem_giro         nenhuma movimentação (exceto 'Saldo Inicial') há mais de dead_days
+"""
+from array import array
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+ABC_LIMITS = (0.80, 0.95)
+XYZ_LIMITS = (0.5, 1.0)
+CONSUMPTION_TYPES = ("Saída por OP", "Saída por Venda")
+
+COLUMNS = (
+    "ID", "DESCRICAO", "TIPO_ITEM", "SALDO_ESTOQUE", "CUSTO_MEDIO", "valor_estoque",
+    "quantidade_consumida", "valor_consumo", "participacao", "participacao_acumulada",
+    "classe_abc", "coeficiente_variacao", "classe_xyz", "giro", "dias_cobertura",
+    "ultima_movimentacao", "dias_sem_movimento", "sem_giro",
+)
+
+
+def _month_key(d):
+    return d.year * 12 + d.month - 1
+
+
+def _demand_stats(keys, quantities, size, months):
+    """Consumo total e coeficiente de variação do consumo mensal de cada item."""
+    if np is not None:
+        matrix = np.bincount(np.frombuffer(keys, dtype=np.int64), weights=np.frombuffer(quantities, dtype=np.float64),
+                             minlength=size * months).astype(np.float64).reshape(size, months)
+        totals = matrix.sum(axis=1)
+        means = totals / months
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variation = np.where(means > 0, matrix.std(axis=1) / means, np.nan)
+        return totals.tolist(), [None if v != v else v for v in variation.tolist()]
+
+    matrix = [0.0] * (size * months)
+    for key, quantity in zip(keys, quantities):
+        matrix[key] += quantity
+    totals, variation = [], []
+    for start in range(0, size * months, months):
+        demand = matrix[start:start + months]
+        total = sum(demand)
+        mean = total / months
+        totals.append(total)
+        if mean > 0:
+            variance = sum((q - mean) ** 2 for q in demand) / months
+            variation.append(variance ** 0.5 / mean)
+        else:
+            variation.append(None)
+    return totals, variation
+
+
+def _abc_classes(values, limits):
+    """Participação, participação acumulada e classe ABC de cada posição de `values`."""
+    order = sorted(range(len(values)), key=lambda i: -values[i])
+    total = sum(values)
+    shares, cumulative, classes = [0.0] * len(values), [0.0] * len(values), ["C"] * len(values)
+    running = 0.0
+    for i in order:
+        before = running / total if total else 1.0
+        running += values[i]
+        if total:
+            shares[i] = values[i] / total
+            cumulative[i] = running / total
+        if values[i] > 0:
+            classes[i] = "A" if before < limits[0] else "B" if before < limits[1] else "C"
+    return order, shares, cumulative, classes
+
+
+def analyze_inventory(db_manager, reference_date=None, months=12, dead_days=90,
+                      abc_limits=ABC_LIMITS, xyz_limits=XYZ_LIMITS):
+    """
+    Retorna (COLUMNS, linhas) com uma linha por item, ordenadas pelo valor de
+    consumo (maior primeiro), como na curva ABC.
+    """
+    reference = date.fromisoformat(str(reference_date)[:10]) if reference_date else date.today()
+    last_month = _month_key(reference)
+    first_month = last_month - months + 1
+    year, month = divmod(first_month, 12)
+    window_start = date(year, month + 1, 1)
+    window_days = (reference - window_start).days + 1
+
+    conn = db_manager.get_report_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    items = cursor.execute("SELECT ID, DESCRICAO, TIPO_ITEM, SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM ORDER BY ID").fetchall()
+    index_by_id = {row[0]: index for index, row in enumerate(items)}
+    size = len(items)
+
+    window_end = reference + timedelta(days=1)
+    source = db_manager.history_sources("MOVIMENTO", date_to=reference.isoformat())["MOVIMENTO"]
+    consumption = ", ".join("?" * len(CONSUMPTION_TYPES))
+    # Antes da janela só interessa a última movimentação: um único grupo (mes = -1) por item.
+    # Movimentos posteriores à data de referência não entram.
+    rows = cursor.execute(f"""
+        SELECT ID_ITEM,
+               CASE WHEN DATA_MOVIMENTO >= ?
+                    THEN CAST(substr(DATA_MOVIMENTO, 1, 4) AS INTEGER) * 12 + CAST(substr(DATA_MOVIMENTO, 6, 2) AS INTEGER) - 1
+                    ELSE -1 END AS mes,
+               SUM(CASE WHEN TIPO_MOVIMENTO IN ({consumption}) THEN ABS(QUANTIDADE) ELSE 0 END),
+               MAX(DATA_MOVIMENTO)
+        FROM {source}
+        WHERE TIPO_MOVIMENTO <> 'Saldo Inicial' AND DATA_MOVIMENTO < ?
+        GROUP BY ID_ITEM, mes
+    """, (window_start.isoformat(),) + CONSUMPTION_TYPES + (window_end.isoformat(),))
+
+    keys, quantities = array('q'), array('d')
+    last_moves = [None] * size
+    for item_id, month_key, quantity, last_date in rows:
+        index = index_by_id.get(item_id)
+        if index is None:
+            continue
+        if last_moves[index] is None or last_date > last_moves[index]:
+            last_moves[index] = last_date
+        if quantity and first_month <= month_key <= last_month:
+            keys.append(index * months + month_key - first_month)
+            quantities.append(quantity)
+
+    totals, variation = _demand_stats(keys, quantities, size, months)
+    costs = [row[4] or 0.0 for row in items]
+    values = [total * cost for total, cost in zip(totals, costs)]
+    order, shares, cumulative, abc = _abc_classes(values, abc_limits)
+
+    result = []
+    for i in order:
+        item_id, description, item_type, stored_balance, cost = items[i]
+        balance = stored_balance or 0.0
+        total = totals[i]
+        cv = variation[i]
+        xyz = "Z" if cv is None else "X" if cv <= xyz_limits[0] else "Y" if cv <= xyz_limits[1] else "Z"
+        turnover = total * 12 / months / balance if balance > 0 else None
+        cover = balance / (total / window_days) if total > 0 else None
+        last = last_moves[i]
+        idle_days = (reference - date.fromisoformat(last[:10])).days if last else None
+        result.append((
+            item_id, description, item_type, stored_balance, cost, balance * costs[i],
+            total, values[i], shares[i], cumulative[i],
+            abc[i], cv, xyz, turnover, cover,
+            last, idle_days, idle_days is None or idle_days > dead_days,
+        ))
+    return COLUMNS, result
+
+
+ABC_COLUMNS = ("DESCRICAO", "SALDO_ESTOQUE", "CUSTO_MEDIO", "valor_total", "quantidade_consumida", "valor_consumo",
+               "participacao_acumulada", "classe_abc", "classe_xyz", "giro", "dias_cobertura")
+INACTIVE_COLUMNS = ("DESCRICAO", "SALDO_ESTOQUE", "ultima_movimentacao")
+
+
+def abc_curve(db_manager, reference_date=None, months=12):
+    """Curva ABC pelo valor de consumo, com classe XYZ, giro e cobertura."""
+    _, rows = analyze_inventory(db_manager, reference_date, months)
+    return ABC_COLUMNS, [(r[1], r[3], r[4], r[5], r[6], r[7], r[9], r[10], r[12], r[13], r[14]) for r in rows]
+
+
+def inactive_items(db_manager, days=30, reference_date=None):
+    """Itens sem movimentação há mais de `days` dias (ou nunca movimentados), pela ordem do ID."""
+    _, rows = analyze_inventory(db_manager, reference_date, dead_days=days)
+    return INACTIVE_COLUMNS, [(r[1], r[3], r[15]) for r in sorted(rows, key=lambda r: r[0]) if r[17]]
@@ -0,0 +1,273 @@
+# app/reports/pivot.py
+"""
+Tabela dinâmica (cross-tab) sobre movimentos, produção e vendas.
+
+Uma consulta de pivô escolhe um fato, as dimensões das linhas e das colunas, uma
+medida e, opcionalmente, o período. O agrupamento é feito no SQL (um GROUP BY por
+todas as dimensões, nas fontes de histórico de DatabaseManager.history_sources),
+de modo que só as combinações agregadas saem do banco; a matriz é montada em
+memória com NumPy (opcional; sem ele, em listas Python) e recebe totais por linha
+e por coluna. Nos movimentos, quantidade e valor levam o sentido do tipo de movimento
+(MOVEMENT_RULES, app/stock/costing.py): entradas somam e saídas subtraem, qualquer
+que seja o sinal gravado.
+
+O fato plantas consolida os movimentos desta planta com os recebidos das outras
+pela sincronização (MOVIMENTO_REMOTO, app/database/site_sync.py).
+
+Fatos, dimensões e medidas:
+
+    movimentos   item, tipo, dia, semana, mes, ano     quantidade, valor, registros
+    plantas      planta, item, tipo, dia, semana,      quantidade, valor, registros
+                 mes, ano
+    producao     produto, linha, status, dia, semana,  quantidade, ordens
+                 mes, ano
+    vendas       produto, status, dia, semana, mes,    quantidade, receita, lucro, saidas
+                 ano
+
+    python -m app.reports.pivot vendas --linhas produto --colunas mes --medida receita
+    python -m app.reports.pivot plantas --linhas item --colunas planta --medida quantidade
+    python -m app.reports.pivot movimentos --linhas item --colunas mes --de 2024-01-01 --ate 2024-12-31 --format xlsx --output giro.xlsx
+"""
+import argparse
+import json
+import sys
+
+from app.reports import registry
+from app.stock.costing import signed_quantity_sql
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+SEPARATOR = " / "
+_SIGNED_QUANTITY = signed_quantity_sql("m.QUANTIDADE", "m.TIPO_MOVIMENTO")
+
+
+def _calendar(column):
+    """Dimensões de tempo sobre uma coluna de data (texto AAAA-MM-DD ...)."""
+    return {
+        "dia": ("Dia", f"substr({column}, 1, 10)"),
+        "semana": ("Semana", f"strftime('%Y-S%W', {column})"),
+        "mes": ("Mês", f"substr({column}, 1, 7)"),
+        "ano": ("Ano", f"substr({column}, 1, 4)"),
+    }
+
+
+class Fact:
+    """
+    Fonte de um pivô. `sql` é o FROM/JOIN com as tabelas de histórico como {TABELA};
+    `dimensions` e `measures` mapeiam nome -> (rótulo, expressão SQL).
+    """
+    __slots__ = ("title", "sql", "history", "date_column", "where", "dimensions", "measures")
+
+    def __init__(self, title, sql, history, date_column, dimensions, measures, where=()):
+        self.title = title
+        self.sql = sql
+        self.history = history
+        self.date_column = date_column
+        self.where = where
+        self.dimensions = {**dimensions, **_calendar(date_column)}
+        self.measures = measures
+
+
+_MOVEMENT_DIMENSIONS = {"item": ("Item", "i.DESCRICAO"), "tipo": ("Tipo de Movimento", "m.TIPO_MOVIMENTO")}
+_MOVEMENT_MEASURES = {
+    "quantidade": ("Quantidade", f"SUM({_SIGNED_QUANTITY})"),
+    "valor": ("Valor", f"SUM(({_SIGNED_QUANTITY}) * COALESCE(m.VALOR_UNITARIO, 0))"),
+    "registros": ("Movimentos", "COUNT(*)"),
+}
+_MOVEMENT_COLUMNS = "ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO"
+
+FACTS = {
+    "movimentos": Fact(
+        "Movimentos de Estoque",
+        "FROM {MOVIMENTO} m LEFT JOIN ITEM i ON m.ID_ITEM = i.ID",
+        ("MOVIMENTO",), "m.DATA_MOVIMENTO", _MOVEMENT_DIMENSIONS, _MOVEMENT_MEASURES,
+        where=("m.TIPO_MOVIMENTO <> 'Saldo Inicial'",)),
+    "plantas": Fact(
+        "Movimentos de Todas as Plantas",
+        f"FROM (SELECT {_MOVEMENT_COLUMNS}, COALESCE((SELECT NOME FROM SYNC_SITE WHERE LOCAL = 1), 'Esta planta') AS PLANTA "
+        "FROM {MOVIMENTO} "
+        f"UNION ALL SELECT {_MOVEMENT_COLUMNS}, COALESCE(ss.NOME, r.SITE_ORIGEM) "
+        "FROM MOVIMENTO_REMOTO r LEFT JOIN SYNC_SITE ss ON ss.ID = r.SITE_ORIGEM) m "
+        "LEFT JOIN ITEM i ON m.ID_ITEM = i.ID",
+        ("MOVIMENTO",), "m.DATA_MOVIMENTO", {"planta": ("Planta", "m.PLANTA"), **_MOVEMENT_DIMENSIONS},
+        _MOVEMENT_MEASURES, where=("m.TIPO_MOVIMENTO <> 'Saldo Inicial'",)),
+    "producao": Fact(
+        "Produção",
+        "FROM {ORDEMPRODUCAO} op JOIN {ORDEMPRODUCAO_ITENS} opi ON op.ID = opi.ID_ORDEM_PRODUCAO "
+        "LEFT JOIN ITEM i ON opi.ID_PRODUTO = i.ID LEFT JOIN LINHAPRODUCAO lp ON op.ID_LINHA_PRODUCAO = lp.ID",
+        ("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS"), "op.DATA_CRIACAO",
+        {"produto": ("Produto", "i.DESCRICAO"), "linha": ("Linha de Produção", "COALESCE(lp.NOME, '(sem linha)')"),
+         "status": ("Status", "op.STATUS")},
+        {"quantidade": ("Quantidade", "SUM(opi.QUANTIDADE_PRODUZIR)"),
+         "ordens": ("Ordens", "COUNT(DISTINCT op.ID)")}),
+    "vendas": Fact(
+        "Vendas",
+        "FROM {SAIDA} s JOIN {SAIDA_ITENS} si ON s.ID = si.ID_SAIDA LEFT JOIN ITEM i ON si.ID_PRODUTO = i.ID",
+        ("SAIDA", "SAIDA_ITENS"), "s.DATA_SAIDA",
+        {"produto": ("Produto", "i.DESCRICAO"), "status": ("Status", "s.STATUS")},
+        {"quantidade": ("Quantidade", "SUM(si.QUANTIDADE)"),
+         "receita": ("Receita", "SUM(si.QUANTIDADE * si.VALOR_UNITARIO)"),
+         "lucro": ("Lucro", "SUM(si.QUANTIDADE * (si.VALOR_UNITARIO - COALESCE(i.CUSTO_MEDIO, 0)))"),
+         "saidas": ("Saídas", "COUNT(DISTINCT s.ID)")}),
+}
+
+
+def get_fact(name):
+    if name not in FACTS:
+        raise ValueError(f"Fato desconhecido: {name}")
+    return FACTS[name]
+
+
+def _validate(fact, rows, columns, measure):
+    for dimension in (*rows, *columns):
+        if dimension not in fact.dimensions:
+            raise ValueError(f"Dimensão desconhecida para {fact.title}: {dimension}")
+    if measure not in fact.measures:
+        raise ValueError(f"Medida desconhecida para {fact.title}: {measure}")
+    if not rows:
+        raise ValueError("Informe ao menos uma dimensão nas linhas.")
+
+
+def build_query(db_manager, fact_name, rows, columns, measure, date_from=None, date_to=None):
+    """Retorna (sql, parâmetros) do agrupamento por todas as dimensões."""
+    fact = get_fact(fact_name)
+    _validate(fact, rows, columns, measure)
+    dimensions = [fact.dimensions[name][1] for name in (*rows, *columns)]
+    sql = fact.sql.format(**db_manager.history_sources(*fact.history, date_from=date_from, date_to=date_to))
+    conditions, params = list(fact.where), []
+    if date_from:
+        conditions.append(f"{fact.date_column} >= ?")
+        params.append(date_from)
+    if date_to:
+        # Datas sem hora incluem o dia inteiro
+        conditions.append(f"{fact.date_column} <= ?")
+        params.append(date_to + " 23:59:59" if len(date_to) == 10 else date_to)
+    select = ", ".join(f"{expression} AS d{i}" for i, expression in enumerate(dimensions))
+    group = ", ".join(f"d{i}" for i in range(len(dimensions)))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {select}, {fact.measures[measure][1]} AS valor {sql}{where} GROUP BY {group}", params
+
+
+def grouped_rows(db_manager, fact_name, rows, columns, measure, date_from=None, date_to=None):
+    """Combinações agregadas no SQL: tuplas (dimensões das linhas..., das colunas..., valor)."""
+    sql, params = build_query(db_manager, fact_name, rows, columns, measure, date_from, date_to)
+    cursor = db_manager.get_report_connection().cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params).fetchall()
+
+
+def _label(value):
+    return "(vazio)" if value is None else str(value)
+
+
+def _index(keys):
+    """Posição de cada chave distinta, em ordem."""
+    distinct = sorted(set(keys), key=lambda key: tuple((value is None, value) for value in key))
+    return distinct, {key: i for i, key in enumerate(distinct)}
+
+
+class PivotTable:
+    """Cross-tab montado: chaves das linhas e das colunas, matriz de valores e totais."""
+
+    def __init__(self, fact_name, rows, columns, measure, row_keys, column_keys, values):
+        self.fact_name = fact_name
+        self.rows = rows
+        self.columns = columns
+        self.measure = measure
+        self.row_keys = row_keys
+        self.column_keys = column_keys
+        self.values = values
+
+    @classmethod
+    def build(cls, fact_name, rows, columns, measure, grouped):
+        split = len(rows)
+        row_keys, row_index = _index(tuple(record[:split]) for record in grouped)
+        column_keys, column_index = _index(tuple(record[split:-1]) for record in grouped)
+        if np is not None:
+            values = np.zeros((len(row_keys), len(column_keys)))
+            if grouped:
+                r = np.fromiter((row_index[tuple(record[:split])] for record in grouped), dtype=np.intp, count=len(grouped))
+                c = np.fromiter((column_index[tuple(record[split:-1])] for record in grouped), dtype=np.intp, count=len(grouped))
+                v = np.fromiter((record[-1] or 0.0 for record in grouped), dtype=float, count=len(grouped))
+                # As combinações já vêm agregadas (únicas); add.at tolera repetições
+                np.add.at(values, (r, c), v)
+        else:
+            values = [[0.0] * len(column_keys) for _ in row_keys]
+            for record in grouped:
+                values[row_index[tuple(record[:split])]][column_index[tuple(record[split:-1])]] += record[-1] or 0.0
+        return cls(fact_name, rows, columns, measure, row_keys, column_keys, values)
+
+    def row_totals(self):
+        if np is not None:
+            return self.values.sum(axis=1).tolist()
+        return [sum(row) for row in self.values]
+
+    def column_totals(self):
+        if np is not None:
+            return self.values.sum(axis=0).tolist()
+        return [sum(column) for column in zip(*self.values)] if self.values else [0.0] * len(self.column_keys)
+
+    def as_result(self):
+        """ReportResult (app/reports/registry.py) com uma coluna por chave de coluna e a linha de totais."""
+        fact = get_fact(self.fact_name)
+        kind = registry.INTEGER if self.measure in ("registros", "ordens", "saidas") else registry.DECIMAL
+        columns = [registry.Column(f"l{i}", fact.dimensions[name][0]) for i, name in enumerate(self.rows)]
+        columns += [registry.Column(f"c{i}", SEPARATOR.join(map(_label, key)) or fact.measures[self.measure][0], kind)
+                    for i, key in enumerate(self.column_keys)]
+        columns.append(registry.Column("total", "Total", kind))
+        report = registry.Report("pivot", f"{fact.title}: {fact.measures[self.measure][0]}", "Tabela Dinâmica", None, columns)
+        values = self.values.tolist() if np is not None else self.values
+        data = [tuple(map(_label, key)) + tuple(row) + (total,)
+                for key, row, total in zip(self.row_keys, values, self.row_totals())]
+        column_totals = self.column_totals()
+        data.append(("Total",) + ("",) * (len(self.rows) - 1) + tuple(column_totals) + (sum(column_totals),))
+        return registry.ReportResult(report, data)
+
+
+def pivot(db_manager, fact_name, rows, columns=(), measure="quantidade", date_from=None, date_to=None):
+    """
+    Executa o agrupamento no banco (DatabaseManager.get_pivot_data, também disponível no
+    servidor) e monta o cross-tab localmente.
+    """
+    rows, columns = list(rows), list(columns)
+    grouped = db_manager.get_pivot_data({"fato": fact_name, "linhas": rows, "colunas": columns, "medida": measure,
+                                         "periodo_de": date_from, "periodo_ate": date_to})
+    return PivotTable.build(fact_name, rows, columns, measure, grouped)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tabela dinâmica sobre movimentos, produção e vendas.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    parser.add_argument("fato", choices=sorted(FACTS))
+    parser.add_argument("--linhas", default="", help="Dimensões das linhas, separadas por vírgula.")
+    parser.add_argument("--colunas", default="", help="Dimensões das colunas, separadas por vírgula.")
+    parser.add_argument("--medida", default="quantidade")
+    parser.add_argument("--de", help="Data inicial (AAAA-MM-DD).")
+    parser.add_argument("--ate", help="Data final (AAAA-MM-DD).")
+    parser.add_argument("--format", choices=sorted(registry.EXPORTERS), help="Grava o resultado em vez de imprimir.")
+    parser.add_argument("--output", help="Arquivo de saída (com --format).")
+    args = parser.parse_args(argv)
+
+    from app.database.db import DatabaseManager
+    db_manager = DatabaseManager.open_read_only(args.db)
+    split = lambda value: [name.strip() for name in value.split(",") if name.strip()]
+    table = pivot(db_manager, args.fato, split(args.linhas) or ["item" if "item" in FACTS[args.fato].dimensions else "produto"],
+                  split(args.colunas), args.medida, args.de, args.ate)
+    result = table.as_result()
+    if args.format:
+        output = args.output or f"pivo_{args.fato}.{args.format}"
+        registry.export(result, output, args.format)
+        print(json.dumps({"output": output, "linhas": len(table.row_keys), "colunas": len(table.column_keys)},
+                         ensure_ascii=False))
+    else:
+        print("\t".join(result.headers))
+        for row in result.formatted():
+            print("\t".join(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+# app/reports/registry.py
+"""
+Registro declarativo dos relatórios.
+
+Cada relatório é descrito uma única vez: identificador (o mesmo das ações do menu),
+título, grupo do menu, método de consulta do DatabaseManager, filtros, colunas
+(chave, cabeçalho e tipo) e ordenação padrão. A partir da definição são montados
+os filtros da janela genérica (app/reports/ui/report_window.py), executada a
+consulta, mantido o cache de resultados e feita a exportação, tanto na interface
+quanto na linha de comando (app/reports/cli.py).
+
+Tipos de coluna e de filtro:
+
+    texto, inteiro, decimal, moeda, percentual, data
+
+As consultas devolvem os valores brutos; a formatação (R$, casas decimais, %) só é
+aplicada na visualização e no PDF. Excel e CSV recebem os números sem formatação.
+"""
+import threading
+import time
+from operator import itemgetter
+
+from app import events
+from app.reports.export import export_to_pdf, export_to_excel, export_to_csv
+
+TEXT = "texto"
+INTEGER = "inteiro"
+DECIMAL = "decimal"
+MONEY = "moeda"
+PERCENT = "percentual"
+DATE = "data"
+
+
+class Filter:
+    __slots__ = ("key", "label", "kind", "placeholder")
+
+    def __init__(self, key, label, kind=TEXT, placeholder=None):
+        self.key = key
+        self.label = label
+        self.kind = kind
+        self.placeholder = placeholder
+
+
+class Column:
+    """Coluna exibida. `scale` multiplica o valor na formatação; `empty` substitui None."""
+    __slots__ = ("key", "header", "kind", "decimals", "scale", "empty")
+
+    def __init__(self, key, header, kind=TEXT, decimals=2, scale=1, empty="-"):
+        self.key = key
+        self.header = header
+        self.kind = kind
+        self.decimals = decimals
+        self.scale = scale
+        self.empty = empty
+
+    def format(self, value):
+        if value is None:
+            return self.empty
+        if self.kind == MONEY:
+            return f"R$ {value * self.scale:.{self.decimals}f}"
+        if self.kind == DECIMAL:
+            return f"{value * self.scale:.{self.decimals}f}"
+        if self.kind == PERCENT:
+            return f"{value * self.scale:.{self.decimals}f}%"
+        return str(value)
+
+
+class Report:
+    """
+    Definição de um relatório. `method` é o get_* do DatabaseManager (também disponível
+    no servidor, app/server/backend.py); `args(filtros)` monta os argumentos posicionais
+    (padrão: os próprios filtros). `shaped` indica que o método aceita row_factory.
+    `setup` são métodos do DatabaseManager chamados antes de cada execução (devem ser idempotentes) e
+    `tables` as tabelas cujas alterações invalidam o cache. `sort` é (coluna, decrescente).
+    """
+    __slots__ = ("id", "title", "group", "method", "columns", "filters", "args", "shaped",
+                 "sort", "setup", "tables", "menu")
+
+    def __init__(self, id, title, group, method, columns, filters=(), args=None, shaped=True,
+                 sort=None, setup=(), tables=(), menu=None):
+        self.id = id
+        self.title = title
+        self.group = group
+        self.method = method
+        self.columns = columns
+        self.filters = filters
+        self.args = args or (lambda filters: (filters,))
+        self.shaped = shaped
+        self.sort = sort
+        self.setup = setup
+        self.tables = tables
+        self.menu = menu or title
+
+    @property
+    def keys(self):
+        return [column.key for column in self.columns]
+
+    @property
+    def headers(self):
+        return [column.header for column in self.columns]
+
+
+class ReportResult:
+    __slots__ = ("report", "rows")
+
+    def __init__(self, report, rows):
+        self.report = report
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def headers(self):
+        return self.report.headers
+
+    def formatted(self):
+        """Linhas com os valores formatados para exibição e PDF."""
+        columns = self.report.columns
+        return [[column.format(value) for column, value in zip(columns, row)] for row in self.rows]
+
+
+def _int_or(default):
+    def convert(value):
+        value = str(value or "").strip()
+        return int(value) if value.isdigit() else default
+    return convert
+
+
+def _float_or(default):
+    def convert(value):
+        try:
+            return float(str(value).replace(",", "."))
+        except (TypeError, ValueError):
+            return default
+    return convert
+
+
+PERIOD = (Filter("periodo_de", "Período (de):", DATE), Filter("periodo_ate", "Período (até):", DATE))
+PRODUCT_RANGE = (Filter("produto_de", "Produto (de):"), Filter("produto_ate", "Produto (até):"))
+
+_REPORT_LIST = [
+    Report("suppliers_report", "Fornecedores", "Cadastros", "get_suppliers_report", [
+        Column("ID", "ID", INTEGER), Column("RAZAO_SOCIAL", "Razão Social"), Column("NOME_FANTASIA", "Nome Fantasia"),
+        Column("CNPJ", "CNPJ"), Column("STATUS", "Status"),
+    ], tables=("FORNECEDOR",)),
+    Report("items_report", "Itens", "Cadastros", "get_items_report", [
+        Column("ID", "ID", INTEGER), Column("CODIGO_INTERNO", "Cód. Interno"), Column("DESCRICAO", "Descrição"),
+        Column("TIPO_ITEM", "Tipo"), Column("unidade", "Un."), Column("SALDO_ESTOQUE", "Saldo", DECIMAL),
+        Column("CUSTO_MEDIO", "Custo Médio", MONEY),
+    ], tables=("ITEM", "UNIDADE")),
+
+    Report("stock_entry_report", "Entradas (Compras)", "Estoque", "get_stock_entries", [
+        Column("numero", "Número"), Column("fornecedor", "Fornecedor"), Column("data", "Data", DATE),
+        Column("total", "Total", MONEY),
+    ], filters=(
+        Filter("numero_de", "Número (de):"), Filter("numero_ate", "Número (até):"), Filter("fornecedor", "Fornecedor:"),
+        Filter("data_inicial", "Data Inicial:", DATE), Filter("data_final", "Data Final:", DATE),
+    ), sort=("data", False), tables=("ENTRADANOTA", "ENTRADANOTA_ITENS", "FORNECEDOR")),
+    Report("entry_items_report", "Itens da Nota de Entrada", "Estoque", "get_entry_items_report", [
+        Column("nota", "Nota", INTEGER), Column("insumo", "Insumo"), Column("quantidade", "Quantidade", DECIMAL),
+        Column("valor_unitario", "Valor Unitário", MONEY), Column("valor_total", "Valor Total", MONEY),
+    ], filters=(Filter("nota_de", "Nota (de):"), Filter("nota_ate", "Nota (até):")),
+        sort=("nota", False), tables=("ENTRADANOTA_ITENS", "ITEM")),
+    Report("stock_movement_report", "Movimentação de Estoque", "Estoque", "get_stock_movements", [
+        Column("item", "Item"), Column("tipo_movimento", "Tipo de Movimento"), Column("quantidade", "Quantidade", DECIMAL),
+        Column("valor_unitario", "Valor Unitário", MONEY), Column("data_movimento", "Data", DATE),
+    ], filters=(Filter("item_de", "Item (de):"), Filter("item_ate", "Item (até):")) + PERIOD,
+        sort=("data_movimento", False), tables=("MOVIMENTO", "ITEM")),
+    Report("current_stock_report", "Estoque Atual", "Estoque", "get_current_stock", [
+        Column("DESCRICAO", "Item"), Column("SALDO_ESTOQUE", "Saldo em Estoque", DECIMAL),
+        Column("CUSTO_MEDIO", "Custo Médio", MONEY),
+    ], args=lambda filters: (), tables=("ITEM",)),
+    Report("low_stock_report", "Estoque Baixo", "Estoque", "get_low_stock_report", [
+        Column("DESCRICAO", "Item"), Column("SALDO_ESTOQUE", "Saldo em Estoque", DECIMAL),
+        Column("CUSTO_MEDIO", "Custo Médio", MONEY), Column("estoque_seguranca", "Estoque de Segurança", DECIMAL),
+        Column("ponto_pedido", "Ponto de Pedido", DECIMAL),
+    ], filters=(Filter("limite", "Limite sem histórico:", DECIMAL, "Padrão 10"),),
+        args=lambda filters: (_float_or(10)(filters.get("limite") or 10),),
+        tables=("ITEM", "MOVIMENTO", "PARAMETRO_REPOSICAO")),
+    Report("abc_report", "Curva ABC de Estoque", "Estoque", "get_abc_curve_report", [
+        Column("DESCRICAO", "Item"), Column("SALDO_ESTOQUE", "Saldo", DECIMAL), Column("CUSTO_MEDIO", "Custo Médio", MONEY),
+        Column("valor_total", "Valor em Estoque", MONEY), Column("valor_consumo", "Valor Consumido (12 meses)", MONEY),
+        Column("participacao_acumulada", "% Acumulado", PERCENT, decimals=1, scale=100),
+        Column("classe_abc", "ABC"), Column("classe_xyz", "XYZ"), Column("giro", "Giro", DECIMAL),
+        Column("dias_cobertura", "Dias de Cobertura", DECIMAL, decimals=0),
+    ], args=lambda filters: (), tables=("ITEM", "MOVIMENTO")),
+    Report("inactive_report", "Itens Sem Giro", "Estoque", "get_inactive_items_report", [
+        Column("DESCRICAO", "Item"), Column("SALDO_ESTOQUE", "Saldo em Estoque", DECIMAL),
+        Column("ultima_movimentacao", "Última Movimentação", DATE, empty="Nenhuma"),
+    ], filters=(Filter("dias", "Inativo há (dias):", INTEGER, "Dias (padrão 30)"),),
+        args=lambda filters: (_int_or(30)(filters.get("dias")),), tables=("ITEM", "MOVIMENTO")),
+
+    Report("production_orders_report", "Ordens de Produção", "Produção", "get_production_orders", [
+        Column("id", "ID", INTEGER), Column("produto", "Produto"), Column("status", "Status"),
+        Column("data_criacao", "Data de Criação", DATE), Column("quantidade", "Quantidade", DECIMAL),
+    ], filters=(Filter("id_de", "ID (de):"), Filter("id_ate", "ID (até):")) + PRODUCT_RANGE
+        + (Filter("status", "Status:"),) + PERIOD,
+        sort=("id", False), tables=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "ITEM")),
+    Report("production_by_period_report", "Produção por Período", "Produção", "get_production_by_period", [
+        Column("produto", "Produto"), Column("quantidade_produzida", "Quantidade Produzida", DECIMAL),
+        Column("data_producao", "Data da Produção", DATE),
+    ], filters=PERIOD, tables=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "ITEM")),
+    Report("production_by_line_report", "Produção por Linha", "Produção", "get_production_by_line", [
+        Column("linha", "Linha de Produção"), Column("produto", "Produto"), Column("quantidade", "Quantidade Produzida", DECIMAL),
+    ], filters=(Filter("linha_de", "Linha (de):"), Filter("linha_ate", "Linha (até):")) + PERIOD,
+        tables=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "ITEM", "LINHAPRODUCAO")),
+    Report("product_composition_report", "Composição / Estrutura de Produto", "Produção", "get_product_composition", [
+        Column("produto", "Produto"), Column("insumo", "Insumo"), Column("quantidade", "Quantidade", DECIMAL, decimals=4),
+        Column("unidade", "Un."),
+    ], filters=PRODUCT_RANGE, tables=("COMPOSICAO", "ITEM", "UNIDADE"), menu="Composição de Produto"),
+    Report("yield_report", "Rendimento de OP", "Produção", "get_yield_report", [
+        Column("ID", "ID OP", INTEGER), Column("NUMERO", "Número"), Column("DATA_CRIACAO", "Data Criação", DATE),
+        Column("qtd_planejada", "Qtd Planejada", DECIMAL), Column("qtd_produzida", "Qtd Produzida", DECIMAL),
+        Column("rendimento", "Rendimento (%)", PERCENT),
+    ], tables=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS")),
+    Report("requirements_report", "Necessidade de Insumos", "Produção", "get_material_requirements_report", [
+        Column("insumo", "Insumo"), Column("unidade", "Un."), Column("qtd_necessaria", "Qtd Necessária", DECIMAL),
+        Column("qtd_estoque", "Saldo em Estoque", DECIMAL), Column("estoque_seguranca", "Estoque de Segurança", DECIMAL),
+        Column("falta", "Falta", DECIMAL),
+    ], args=lambda filters: (), tables=("ORDEMPRODUCAO", "ORDEMPRODUCAO_ITENS", "COMPOSICAO", "ITEM", "MOVIMENTO")),
+
+    Report("product_cost_report", "Custo do Produto", "Financeiro", "get_product_cost_report", [
+        Column("produto", "Produto"), Column("custo_medio", "Custo Médio", MONEY),
+    ], filters=PRODUCT_RANGE, tables=("ITEM",)),
+    Report("profit_by_product_report", "Lucro por Produto", "Financeiro", "get_profit_by_product", [
+        Column("produto", "Produto"), Column("custo_unitario", "Custo Unit.", MONEY),
+        Column("preco_venda", "Preço Venda", MONEY), Column("quantidade_vendida", "Qtd Vendida", DECIMAL),
+        Column("lucro_unitario", "Lucro Unit.", MONEY), Column("lucro_total", "Lucro Total", MONEY),
+    ], filters=PRODUCT_RANGE + PERIOD, shaped=False,
+        setup=("enable_sales_analytics",), tables=("SAIDA", "SAIDA_ITENS", "ITEM")),
+    Report("profit_by_period_report", "Lucro por Período", "Financeiro", "get_profit_by_period", [
+        Column("total_vendas", "Total de Vendas", MONEY), Column("custo_total", "Custo Total", MONEY),
+        Column("lucro_final", "Lucro Final", MONEY),
+    ], filters=(Filter("data_inicial", "Data Inicial:", DATE), Filter("data_final", "Data Final:", DATE)),
+        shaped=False, setup=("enable_sales_analytics",), tables=("SAIDA", "SAIDA_ITENS", "ITEM")),
+]
+
+REPORTS = {report.id: report for report in _REPORT_LIST}
+GROUPS = list(dict.fromkeys(report.group for report in _REPORT_LIST))
+
+
+def get_report(report_id):
+    if report_id not in REPORTS:
+        raise ValueError(f"Relatório desconhecido: {report_id}")
+    return REPORTS[report_id]
+
+
+def reports_in_group(group):
+    return [report for report in _REPORT_LIST if report.group == group]
+
+
+def _as_columns(keys):
+    """Formato de linha (app/database/queries.py) que já devolve as colunas do relatório, na ordem."""
+    def shape(columns):
+        getter = itemgetter(*(columns.index(key) for key in keys))
+        return getter if len(keys) > 1 else lambda row: (getter(row),)
+    return shape
+
+
+def _is_local(db_manager):
+    from app.database.db import DatabaseManager
+    return isinstance(db_manager, DatabaseManager)
+
+
+def execute(db_manager, report_id, filters=None):
+    """Executa o relatório e retorna um ReportResult com os valores brutos, na ordem das colunas."""
+    report = get_report(report_id)
+    filters = filters or {}
+    for setup in report.setup:
+        getattr(db_manager, setup)()
+    method = getattr(db_manager, report.method)
+    keys = report.keys
+    if report.shaped and _is_local(db_manager):
+        rows = method(*report.args(filters), row_factory=_as_columns(keys))
+    else:
+        # Servidor remoto ou métodos que não aceitam row_factory: dicionários
+        result = method(*report.args(filters))
+        if isinstance(result, dict):
+            result = [result] if any(value is not None for value in result.values()) else []
+        rows = [tuple(row[key] for key in keys) for row in result]
+    if report.sort:
+        index = keys.index(report.sort[0])
+        rows = sorted(rows, key=lambda row: (row[index] is None, row[index]), reverse=report.sort[1])
+    return ReportResult(report, list(rows))
+
+
+class ReportCache:
+    """
+    Cache dos resultados por relatório e filtros. Alterações nas tabelas do relatório
+    (app/events.py) descartam os resultados; gravações de outros processos não geram
+    eventos e são lidas quando o resultado tiver mais de max_age segundos.
+    """
+
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._results = {}
+        self._lock = threading.Lock()
+        events.subscribe(events.ALL_TABLES, self.on_change)
+
+    def on_change(self, event):
+        with self._lock:
+            for key in [key for key in self._results if event.table in REPORTS[key[0]].tables]:
+                del self._results[key]
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def get(self, db_manager, report_id, filters=None):
+        key = (report_id, tuple(sorted((filters or {}).items())))
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[0] <= self.max_age:
+            return cached[1]
+        result = execute(db_manager, report_id, filters)
+        with self._lock:
+            self._results[key] = (time.monotonic(), result)
+        return result
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ReportCache()
+    return _cache
+
+
+EXPORTERS = {
+    "csv": export_to_csv,
+    "xlsx": export_to_excel,
+    "pdf": export_to_pdf,
+}
+
+
+def export(result, filename, fmt):
+    """Grava o resultado: PDF com os valores formatados; Excel e CSV com os valores brutos."""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Formato não suportado: {fmt}")
+    rows = result.formatted() if fmt == "pdf" else [list(row) for row in result.rows]
+    EXPORTERS[fmt](filename, rows, result.headers)
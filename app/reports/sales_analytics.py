@@ -0,0 +1,206 @@
+# app/reports/sales_analytics.py
+"""
+Cache analítico colunar das vendas finalizadas.
+
+As linhas de SAIDA_ITENS das saídas finalizadas são carregadas uma única vez
+em vetores compactos (array / NumPy) e atualizadas de forma incremental: a cada
+refresh apenas as saídas finalizadas desde a última carga são lidas. As
+consultas de lucro por produto/período são respondidas com agregação vetorizada,
+sem novos JOINs no banco. O NumPy é opcional; sem ele a agregação é feita em Python
+sobre os mesmos vetores.
+
+O cache assina o barramento de alterações (app/events.py): sem eventos de SAIDA,
+SAIDA_ITENS ou ITEM desde a última carga, o refresh não consulta o banco. Gravações
+feitas por outros processos não geram eventos e são lidas quando a última carga tiver
+mais de stale_after segundos.
+
+Como nas consultas SQL (app/database/queries.py), apenas saídas com STATUS 'Finalizada'
+entram no cálculo e o preço de venda é a média ponderada pela quantidade.
+"""
+import time
+from array import array
+from datetime import date
+
+from app import events
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+_CHUNK_SIZE = 500
+
+
+def _day_ordinal(value):
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def _column(values):
+    """Visão NumPy (sem cópia) de um vetor array.array."""
+    kind = "f" if values.typecode == "d" else "i"
+    return np.frombuffer(values, dtype=np.dtype(f"{kind}{values.itemsize}"))
+
+
+class SalesAnalyticsCache:
+    def __init__(self, db_manager, stale_after=300):
+        self.db_manager = db_manager
+        self.stale_after = stale_after
+        self._reset()
+        events.subscribe(("SAIDA", "SAIDA_ITENS", "ITEM"), self.on_change)
+
+    def _reset(self):
+        self._sales_changed = True
+        self._products_changed = True
+        self._loaded_at = None
+        self._loaded_sales = set()
+        # Colunas dos fatos (uma posição por linha de venda)
+        self.product_index = array('l')
+        self.days = array('l')
+        self.quantities = array('d')
+        self.revenues = array('d')
+        # Dimensão produto (índice denso -> dados do ITEM)
+        self._index_by_product = {}
+        self.product_ids = []
+        self.descriptions = []
+        self.costs = array('d')
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def invalidate(self):
+        self._reset()
+
+    def on_change(self, event):
+        if event.table == "ITEM":
+            self._products_changed = True
+        else:
+            self._sales_changed = True
+
+    def refresh(self):
+        """Carrega as vendas finalizadas ainda não presentes no cache e atualiza custo/descrição dos produtos."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at > self.stale_after:
+            self._sales_changed = self._products_changed = True
+        if not (self._sales_changed or self._products_changed):
+            return
+        conn = self.db_manager.get_report_connection()
+        if not self._sales_changed:
+            self._products_changed = False
+            self._refresh_products(conn)
+            return
+        sources = self.db_manager.history_sources("SAIDA", "SAIDA_ITENS")
+        finalized = {row[0] for row in conn.execute(f"SELECT ID FROM {sources['SAIDA']} WHERE STATUS = 'Finalizada'")}
+        if self._loaded_sales - finalized:
+            # Alguma venda deixou de estar finalizada: recarrega tudo
+            self.invalidate()
+
+        query = f"""
+            SELECT si.ID_SAIDA, si.ID_PRODUTO, si.QUANTIDADE, si.VALOR_UNITARIO, s.DATA_SAIDA
+            FROM {sources['SAIDA_ITENS']} si
+            JOIN {sources['SAIDA']} s ON si.ID_SAIDA = s.ID
+        """
+        new_sales = finalized - self._loaded_sales
+        if new_sales and not self._loaded_sales:
+            self._append_rows(conn.execute(query + " WHERE s.STATUS = 'Finalizada'"))
+        elif new_sales:
+            pending = sorted(new_sales)
+            for start in range(0, len(pending), _CHUNK_SIZE):
+                chunk = pending[start:start + _CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                self._append_rows(conn.execute(query + f" WHERE s.ID IN ({placeholders})", chunk))
+        self._loaded_sales |= new_sales
+        self._refresh_products(conn)
+        self._sales_changed = self._products_changed = False
+        self._loaded_at = time.monotonic()
+
+    def _append_rows(self, rows):
+        for sale_id, product_id, quantity, unit_value, sale_date in rows:
+            index = self._index_by_product.get(product_id)
+            if index is None:
+                index = len(self.product_ids)
+                self._index_by_product[product_id] = index
+                self.product_ids.append(product_id)
+                self.descriptions.append("")
+                self.costs.append(0.0)
+            self.product_index.append(index)
+            self.days.append(_day_ordinal(sale_date))
+            self.quantities.append(quantity)
+            self.revenues.append(quantity * unit_value)
+
+    def _refresh_products(self, conn):
+        if not self.product_ids:
+            return
+        for product_id, description, cost in conn.execute("SELECT ID, DESCRICAO, CUSTO_MEDIO FROM ITEM"):
+            index = self._index_by_product.get(product_id)
+            if index is not None:
+                self.descriptions[index] = description
+                self.costs[index] = cost or 0.0
+
+    def _selection(self, date_from, date_to, product_from=None, product_to=None):
+        """Linhas que atendem aos filtros: máscara booleana (NumPy) ou lista de posições."""
+        low = _day_ordinal(date_from) if date_from else None
+        high = _day_ordinal(date_to) if date_to else None
+        allowed = [
+            (not product_from or d >= product_from) and (not product_to or d <= product_to)
+            for d in self.descriptions
+        ]
+        if np is not None:
+            days = _column(self.days)
+            mask = np.asarray(allowed, dtype=bool)[_column(self.product_index)] if allowed else np.zeros(0, dtype=bool)
+            if low is not None:
+                mask &= days >= low
+            if high is not None:
+                mask &= days <= high
+            return mask
+        return [
+            i for i, (p, d) in enumerate(zip(self.product_index, self.days))
+            if allowed[p] and (low is None or d >= low) and (high is None or d <= high)
+        ]
+
+    def _sum_by(self, keys, weights, selection, size):
+        if np is not None:
+            return np.bincount(keys[selection], weights=_column(weights)[selection], minlength=size)
+        totals = [0.0] * size
+        for i in selection:
+            totals[keys[i]] += weights[i]
+        return totals
+
+    def _product_keys(self):
+        return _column(self.product_index) if np is not None else self.product_index
+
+    def profit_by_product(self, filters):
+        """Mesmo formato de DatabaseManager.get_profit_by_product."""
+        selection = self._selection(filters.get("periodo_de"), filters.get("periodo_ate"),
+                                    filters.get("produto_de"), filters.get("produto_ate"))
+        size = len(self.product_ids)
+        keys = self._product_keys()
+        quantities = self._sum_by(keys, self.quantities, selection, size)
+        revenues = self._sum_by(keys, self.revenues, selection, size)
+        result = []
+        for index in sorted(range(size), key=lambda i: self.product_ids[i]):
+            quantity = float(quantities[index])
+            if quantity == 0:
+                continue
+            cost = self.costs[index]
+            price = float(revenues[index]) / quantity
+            result.append({
+                "produto": self.descriptions[index],
+                "custo_unitario": cost,
+                "preco_venda": price,
+                "quantidade_vendida": quantity,
+                "lucro_unitario": price - cost,
+                "lucro_total": quantity * (price - cost),
+            })
+        return result
+
+    def profit_by_period(self, filters):
+        """Mesmo formato de DatabaseManager.get_profit_by_period."""
+        selection = self._selection(filters.get("data_inicial"), filters.get("data_final"))
+        size = len(self.product_ids)
+        keys = self._product_keys()
+        quantities = self._sum_by(keys, self.quantities, selection, size)
+        revenues = self._sum_by(keys, self.revenues, selection, size)
+        if not any(quantities):
+            return {"total_vendas": None, "custo_total": None, "lucro_final": None}
+        total_sales = float(sum(revenues))
+        total_cost = float(sum(q * c for q, c in zip(quantities, self.costs)))
+        return {"total_vendas": total_sales, "custo_total": total_cost, "lucro_final": total_sales - total_cost}
@@ -0,0 +1,399 @@
+# app/reports/scheduler.py
+"""
+Agendamento de relatórios do registro (app/reports/registry.py).
+
+Os agendamentos ficam na tabela AGENDAMENTO_RELATORIO com uma agenda no formato do
+cron (minuto hora dia mês dia-da-semana). O ReportScheduler verifica os agendamentos
+vencidos em uma thread de fundo, executa os relatórios com uma conexão somente leitura
+e grava a saída em Relatorios/AAAA-MM-DD/, ao lado do DADOS.DB. Um agendamento com
+SOMENTE_ALTERADO não é executado se as tabelas do relatório não mudaram desde a última
+execução (CDC_LOG, app/database/cdc.py). Os arquivos mais antigos que RETENCAO_DIAS
+são excluídos. Vários processos podem verificar o mesmo banco (aplicação, servidor,
+linha de comando): antes de executar, cada um reserva o agendamento avançando
+PROXIMA_EXECUCAO com um UPDATE condicionado ao valor lido, e só quem conseguiu executa.
+
+Exemplos:
+    python -m app.reports.scheduler add estoque_diario current_stock_report "0 7 * * 1-5" --format xlsx
+    python -m app.reports.scheduler list
+    python -m app.reports.scheduler run
+    python -m app.reports.scheduler remove estoque_diario
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time as dtime, timedelta
+
+from app.database import cdc
+from app.database.db import DatabaseManager
+from app.reports.registry import EXPORTERS, get_report, execute, export
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+FOLDER_FORMAT = "%Y-%m-%d"
+NAME_PATTERN = re.compile(r"^[\w\-]+$")
+
+OK, UNCHANGED = "ok", "sem alterações"
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (nome, mínimo, máximo); dia da semana 0 e 7 são domingo
+FIELDS = (("minuto", 0, 59), ("hora", 0, 23), ("dia", 1, 31), ("mês", 1, 12), ("dia da semana", 0, 7))
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(","):
+        span, _, step = part.partition("/")
+        try:
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = (int(value) for value in span.split("-", 1))
+            else:
+                start = end = int(span)
+                if step:
+                    end = high
+            step = int(step) if step else 1
+        except ValueError:
+            raise ValueError(f"Campo '{name}' inválido: {text}") from None
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Campo '{name}' fora do intervalo {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """Agenda no formato do cron. Com dia e dia da semana restritos, basta um dos dois (como no cron)."""
+
+    def __init__(self, text):
+        self.text = text.strip()
+        fields = ALIASES.get(self.text, self.text).split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"Agenda inválida (esperado 'minuto hora dia mês dia-da-semana'): {text}")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(field, *spec) for field, spec in zip(fields, FIELDS))
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = day.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_run(self, after):
+        """Primeiro horário da agenda depois de `after`."""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(366 * 5):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, dtime(hour, minute))
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Agenda sem próxima execução: {self.text}")
+
+
+def default_output_dir(db_path=None):
+    db_path = db_path or DatabaseManager._get_db_path()
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "Relatorios")
+
+
+def _connect(db_path):
+    # timeout alto: o agendador espera os bloqueios da aplicação em vez de falhar
+    conn = sqlite3.connect(db_path or DatabaseManager._get_db_path(), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# --- Cadastro ---
+
+def add_job(conn, name, report_id, schedule, fmt="pdf", filters=None, only_changed=True, retention_days=30):
+    """Cadastra (ou substitui) um agendamento. A primeira execução é o próximo horário da agenda."""
+    if not NAME_PATTERN.match(name or ""):
+        raise ValueError(f"Nome inválido (use letras, números, '_' ou '-'): {name}")
+    get_report(report_id)
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Formato não suportado: {fmt}")
+    next_run = CronSpec(schedule).next_run(datetime.now())
+    conn.execute("""
+        INSERT INTO AGENDAMENTO_RELATORIO (NOME, RELATORIO, FILTROS, FORMATO, AGENDA, SOMENTE_ALTERADO,
+                                           RETENCAO_DIAS, PROXIMA_EXECUCAO)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(NOME) DO UPDATE SET RELATORIO = excluded.RELATORIO, FILTROS = excluded.FILTROS,
+            FORMATO = excluded.FORMATO, AGENDA = excluded.AGENDA, ATIVO = 1,
+            SOMENTE_ALTERADO = excluded.SOMENTE_ALTERADO, RETENCAO_DIAS = excluded.RETENCAO_DIAS,
+            PROXIMA_EXECUCAO = excluded.PROXIMA_EXECUCAO, ULTIMA_MARCA = NULL
+    """, (name, report_id, json.dumps(filters or {}, ensure_ascii=False), fmt, schedule,
+          int(bool(only_changed)), retention_days, next_run.strftime(DATE_FORMAT)))
+    conn.commit()
+    return next_run
+
+
+def remove_job(conn, name):
+    removed = conn.execute("DELETE FROM AGENDAMENTO_RELATORIO WHERE NOME = ?", (name,)).rowcount
+    conn.commit()
+    return removed
+
+
+def list_jobs(conn):
+    return [dict(row) for row in conn.execute("SELECT * FROM AGENDAMENTO_RELATORIO ORDER BY NOME")]
+
+
+# --- Execução ---
+
+def _changed_since(conn, tables, mark):
+    """Se alguma das tabelas mudou depois da marca; sem como saber (marca compactada, tabela fora do CDC), assume que sim."""
+    if mark is None or not tables or any(table not in cdc.CAPTURED_TABLES for table in tables):
+        return True
+    if mark < cdc.first_change_id(conn) - 1:
+        return True
+    placeholders = ", ".join("?" for _ in tables)
+    row = conn.execute(f"SELECT 1 FROM CDC_LOG WHERE ID > ? AND TABELA IN ({placeholders}) LIMIT 1",
+                       (mark, *tables)).fetchone()
+    return row is not None
+
+
+def _output_path(output_dir, job, now):
+    """Relatorios/AAAA-MM-DD/<nome>_HHMMSS.<formato>; execuções no mesmo segundo ganham _2, _3..."""
+    folder = os.path.join(output_dir, now.strftime(FOLDER_FORMAT))
+    os.makedirs(folder, exist_ok=True)
+    stem = os.path.join(folder, f"{job['NOME']}_{now.strftime('%H%M%S')}")
+    path, copy = f"{stem}.{job['FORMATO']}", 1
+    while os.path.exists(path):
+        copy += 1
+        path = f"{stem}_{copy}.{job['FORMATO']}"
+    return path
+
+
+def prune_outputs(output_dir, name, retention_days, today=None):
+    """Exclui os arquivos do agendamento em pastas anteriores ao período de retenção e as pastas vazias."""
+    if retention_days is None or retention_days <= 0:
+        return []
+    limit = (today or date.today()) - timedelta(days=retention_days)
+    removed = []
+    output = re.compile(rf"{re.escape(name)}_\d{{6}}(_\d+)?\.\w+")
+    for folder in sorted(glob.glob(os.path.join(output_dir, "????-??-??"))):
+        try:
+            folder_date = datetime.strptime(os.path.basename(folder), FOLDER_FORMAT).date()
+        except ValueError:
+            continue
+        if folder_date >= limit:
+            continue
+        for path in glob.glob(os.path.join(glob.escape(folder), f"{glob.escape(name)}_*.*")):
+            if not output.fullmatch(os.path.basename(path)):
+                continue
+            os.remove(path)
+            removed.append(path)
+        if not os.listdir(folder):
+            os.rmdir(folder)
+    return removed
+
+
+def run_job(reader, job, output_dir, now):
+    """Executa um agendamento com a conexão somente leitura e retorna (status, arquivo, marca)."""
+    report = get_report(job["RELATORIO"])
+    reader_conn = reader.get_connection()
+    mark = cdc.last_change_id(reader_conn)
+    if job["SOMENTE_ALTERADO"] and not _changed_since(reader_conn, report.tables, job["ULTIMA_MARCA"]):
+        return UNCHANGED, None, job["ULTIMA_MARCA"]
+    result = execute(reader, report.id, json.loads(job["FILTROS"] or "{}"))
+    path = _output_path(output_dir, job, now)
+    export(result, path, job["FORMATO"])
+    return OK, path, mark
+
+
+def _claim(conn, job, next_run):
+    """Avança PROXIMA_EXECUCAO se ninguém a alterou desde a leitura; True se este processo reservou a execução."""
+    claimed = conn.execute("UPDATE AGENDAMENTO_RELATORIO SET PROXIMA_EXECUCAO = ? WHERE ID = ? AND PROXIMA_EXECUCAO IS ?",
+                           (next_run, job["ID"], job["PROXIMA_EXECUCAO"])).rowcount
+    conn.commit()
+    return claimed == 1
+
+
+def run_due(db_path=None, output_dir=None, now=None, names=None):
+    """
+    Executa os agendamentos vencidos (ou os de `names`, vencidos ou não) e retorna a
+    situação de cada um. Execuções perdidas (aplicação fechada) rodam uma única vez.
+    """
+    db_path = db_path or DatabaseManager._get_db_path()
+    output_dir = output_dir or default_output_dir(db_path)
+    now = now or datetime.now()
+    stamp = now.strftime(DATE_FORMAT)
+    conn = _connect(db_path)
+    reader = None
+    outcomes = []
+    try:
+        jobs = [job for job in conn.execute("SELECT * FROM AGENDAMENTO_RELATORIO WHERE ATIVO = 1 ORDER BY NOME")
+                if names is None or job["NOME"] in names]
+        for job in jobs:
+            try:
+                spec = CronSpec(job["AGENDA"])
+            except ValueError as error:
+                logging.error(f"Agendamento '{job['NOME']}': {error}")
+                continue
+            next_run = spec.next_run(now).strftime(DATE_FORMAT)
+            if names is None and (job["PROXIMA_EXECUCAO"] is None or job["PROXIMA_EXECUCAO"] > stamp):
+                if job["PROXIMA_EXECUCAO"] is None:
+                    _claim(conn, job, next_run)
+                continue
+            # Execuções pedidas pelo nome rodam mesmo que outro processo tenha acabado de executar
+            if not _claim(conn, job, next_run) and names is None:
+                continue
+
+            path, mark = job["ULTIMO_ARQUIVO"], job["ULTIMA_MARCA"]
+            try:
+                if reader is None:
+                    reader = DatabaseManager.open_read_only(db_path)
+                status, output, mark = run_job(reader, job, output_dir, now)
+                path = output or path
+            except Exception as error:
+                logging.error(f"Agendamento '{job['NOME']}' falhou: {error}")
+                status = f"erro: {error}"
+            conn.execute("""
+                UPDATE AGENDAMENTO_RELATORIO SET ULTIMA_EXECUCAO = ?, PROXIMA_EXECUCAO = ?, ULTIMA_MARCA = ?,
+                    ULTIMO_ARQUIVO = ?, ULTIMO_STATUS = ? WHERE ID = ?
+            """, (stamp, next_run, mark, path, status, job["ID"]))
+            conn.commit()
+            prune_outputs(output_dir, job["NOME"], job["RETENCAO_DIAS"], now.date())
+            outcomes.append({"agendamento": job["NOME"], "situacao": status,
+                             "arquivo": path if status == OK else None})
+    finally:
+        if reader is not None:
+            reader.close_connection()
+        conn.close()
+    return outcomes
+
+
+class ReportScheduler:
+    """
+    Verifica os agendamentos a cada poll_seconds em uma thread de fundo. on_finished(agendamento,
+    sucesso, mensagem) é chamado na thread do agendador para cada relatório gerado ou com erro.
+    """
+
+    def __init__(self, db_path=None, output_dir=None, poll_seconds=60, on_finished=None):
+        self.db_path = db_path or DatabaseManager._get_db_path()
+        self.output_dir = output_dir or default_output_dir(self.db_path)
+        self.poll_seconds = poll_seconds
+        self.on_finished = on_finished
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-scheduler")
+        self._stop = threading.Event()
+        self._scheduler = None
+
+    def run_now(self, names=None):
+        future = self._executor.submit(run_due, self.db_path, self.output_dir, None, names)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            logging.error(f"Agendador de relatórios falhou: {error}")
+            return
+        for outcome in future.result():
+            if outcome["situacao"] == UNCHANGED:
+                continue
+            success = outcome["situacao"] == OK
+            if success:
+                message = f"Relatório agendado '{outcome['agendamento']}' gerado: {os.path.basename(outcome['arquivo'])}"
+            else:
+                message = f"Falha no relatório agendado '{outcome['agendamento']}': {outcome['situacao']}"
+            if self.on_finished:
+                self.on_finished(outcome["agendamento"], success, message)
+
+    def _run_scheduler(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.run_now().result()
+            except Exception:
+                pass  # já registrado em _finished
+
+    def start(self):
+        """Inicia a verificação periódica dos agendamentos."""
+        if self._scheduler is None and self.poll_seconds > 0:
+            self._scheduler = threading.Thread(target=self._run_scheduler, name="report-scheduler", daemon=True)
+            self._scheduler.start()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _parse_filters(pairs):
+    filters = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Filtro inválido (use chave=valor): {pair}")
+        filters[key] = value
+    return filters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatórios agendados do MiniSis.")
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="Lista os agendamentos.")
+
+    add_parser = subparsers.add_parser("add", help="Cadastra ou substitui um agendamento.")
+    add_parser.add_argument("name")
+    add_parser.add_argument("report")
+    add_parser.add_argument("schedule", help='Agenda do cron, ex.: "0 7 * * 1-5" ou @daily.')
+    add_parser.add_argument("--format", default="pdf", choices=sorted(EXPORTERS))
+    add_parser.add_argument("--filter", action="append", dest="filters", metavar="CHAVE=VALOR")
+    add_parser.add_argument("--always", action="store_true", help="Gera mesmo sem alterações nas tabelas.")
+    add_parser.add_argument("--retention-days", type=int, default=30)
+
+    remove_parser = subparsers.add_parser("remove", help="Exclui um agendamento.")
+    remove_parser.add_argument("name")
+
+    run_parser = subparsers.add_parser("run", help="Executa os agendamentos vencidos (ou os informados).")
+    run_parser.add_argument("names", nargs="*")
+    run_parser.add_argument("--output-dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run_due(args.db, args.output_dir, names=args.names or None)
+    else:
+        conn = DatabaseManager(args.db).get_connection()
+        if args.command == "list":
+            result = list_jobs(conn)
+        elif args.command == "add":
+            try:
+                next_run = add_job(conn, args.name, args.report, args.schedule, args.format,
+                                   _parse_filters(args.filters), not args.always, args.retention_days)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                return 2
+            result = {"agendamento": args.name, "proxima_execucao": next_run.strftime(DATE_FORMAT)}
+        else:
+            result = {"agendamento": args.name, "removido": bool(remove_job(conn, args.name))}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
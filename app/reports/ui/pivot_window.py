@@ -0,0 +1,76 @@
+
+from PySide6.QtWidgets import QFormLayout, QComboBox, QDateEdit
+from PySide6.QtCore import QDate
+from app.server.backend import get_db_manager
+from app.reports import pivot, registry
+from app.reports.ui.report_window import ReportWindow
+
+from app.styles.input_styles import (
+    input_style, DEFAULTINPUT
+)
+
+NONE = ""
+
+
+class PivotWindow(ReportWindow):
+    """Tabela dinâmica (app/reports/pivot.py) com a mesma pré-visualização e exportação dos relatórios."""
+
+    def __init__(self):
+        super(ReportWindow, self).__init__()
+        self.report = None
+        self.setup_window("Tabela Dinâmica")
+
+    def setup_filters(self):
+        self.filters_layout = QFormLayout()
+        self.filters = {
+            "fato": QComboBox(),
+            "linhas": QComboBox(),
+            "linhas_2": QComboBox(),
+            "colunas": QComboBox(),
+            "medida": QComboBox(),
+            "periodo_de": QDateEdit(QDate.currentDate().addYears(-1)),
+            "periodo_ate": QDateEdit(QDate.currentDate()),
+        }
+        for name, fact in pivot.FACTS.items():
+            self.filters["fato"].addItem(fact.title, name)
+        self.filters["fato"].currentIndexChanged.connect(self.load_fact)
+        for key, label in (("fato", "Fato:"), ("linhas", "Linhas:"), ("linhas_2", "Linhas (2º nível):"),
+                           ("colunas", "Colunas:"), ("medida", "Medida:"),
+                           ("periodo_de", "Período (de):"), ("periodo_ate", "Período (até):")):
+            widget = self.filters[key]
+            if isinstance(widget, QDateEdit):
+                widget.setCalendarPopup(True)
+            widget.setStyleSheet(input_style(DEFAULTINPUT))
+            self.filters_layout.addRow(label, widget)
+        self.load_fact()
+        self.layout.addLayout(self.filters_layout)
+
+    def load_fact(self):
+        fact = pivot.get_fact(self.filters["fato"].currentData())
+        for key in ("linhas", "linhas_2", "colunas"):
+            combo = self.filters[key]
+            combo.clear()
+            if key != "linhas":
+                combo.addItem("(nenhuma)", NONE)
+            for name, (label, _) in fact.dimensions.items():
+                combo.addItem(label, name)
+        self.filters["colunas"].setCurrentIndex(self.filters["colunas"].findData("mes"))
+        self.filters["medida"].clear()
+        for name, (label, _) in fact.measures.items():
+            self.filters["medida"].addItem(label, name)
+
+    def filter_values(self):
+        values = {key: self.filters[key].currentData() for key in ("fato", "linhas", "linhas_2", "colunas", "medida")}
+        for key in ("periodo_de", "periodo_ate"):
+            values[key] = self.filters[key].date().toString("yyyy-MM-dd")
+        return values
+
+    def run_report(self):
+        values = self.filter_values()
+        rows = [name for name in (values["linhas"], values["linhas_2"]) if name]
+        columns = [values["colunas"]] if values["colunas"] else []
+        table = pivot.pivot(get_db_manager(), values["fato"], list(dict.fromkeys(rows)), columns, values["medida"],
+                            values["periodo_de"], values["periodo_ate"])
+        result = table.as_result()
+        # Só a linha de totais: nenhum dado no período
+        return result if table.row_keys else registry.ReportResult(result.report, [])
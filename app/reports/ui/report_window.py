@@ -0,0 +1,108 @@
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QFormLayout, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QDateEdit
+from app.server.backend import get_db_manager
+from app.reports import registry
+from app.utils.ui_utils import get_save_filename, show_success_message
+
+from app.styles.buttons_styles import (
+    button_style, BLUE, GREEN
+)
+from app.styles.windows_style import (
+    window_style, LIGHT
+)
+from app.styles.input_styles import (
+    input_style, DEFAULTINPUT
+)
+
+SAVE_FORMATS = {"PDF (*.pdf)": "pdf", "Excel (*.xlsx)": "xlsx", "CSV (*.csv)": "csv"}
+
+
+class ReportWindow(QWidget):
+    """Janela de relatório montada a partir da definição do registro (app/reports/registry.py)."""
+
+    def __init__(self, report_id):
+        super().__init__()
+        self.report = registry.get_report(report_id)
+        self.setup_window(f"Relatório de {self.report.title}")
+
+    def setup_window(self, title):
+        self.setWindowTitle(title)
+        self.setStyleSheet(window_style(LIGHT))
+        self.layout = QVBoxLayout(self)
+        self.setup_filters()
+        self.setup_buttons()
+
+    def setup_filters(self):
+        self.filters_layout = QFormLayout()
+        self.filters = {}
+        for spec in self.report.filters:
+            if spec.kind == registry.DATE:
+                widget = QDateEdit()
+                widget.setCalendarPopup(True)
+            else:
+                widget = QLineEdit()
+                if spec.placeholder:
+                    widget.setPlaceholderText(spec.placeholder)
+            widget.setStyleSheet(input_style(DEFAULTINPUT))
+            self.filters[spec.key] = widget
+            self.filters_layout.addRow(spec.label, widget)
+        self.layout.addLayout(self.filters_layout)
+
+    def setup_buttons(self):
+        self.generate_button = QPushButton("Gerar Relatório")
+        self.generate_button.setStyleSheet(button_style(BLUE))
+        self.generate_button.clicked.connect(self.generate_report)
+        self.layout.addWidget(self.generate_button)
+
+    def filter_values(self):
+        values = {}
+        for spec in self.report.filters:
+            widget = self.filters[spec.key]
+            if spec.kind == registry.DATE:
+                values[spec.key] = widget.date().toString("yyyy-MM-dd")
+            else:
+                values[spec.key] = widget.text()
+        return values
+
+    def run_report(self):
+        return registry.get_cache().get(get_db_manager(), self.report.id, self.filter_values())
+
+    def generate_report(self):
+        result = self.run_report()
+        if result.rows:
+            self.show_preview(result)
+        else:
+            show_success_message(self, "Relatório", "Nenhum dado encontrado para os filtros selecionados.")
+
+    def show_preview(self, result):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Pré-visualização do Relatório")
+        dialog.setStyleSheet(window_style(LIGHT))
+        dialog.setMinimumSize(800, 600)
+        layout = QVBoxLayout(dialog)
+
+        headers = result.headers
+        data = result.formatted()
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setRowCount(len(data))
+
+        for i, row in enumerate(data):
+            for j, item in enumerate(row):
+                table.setItem(i, j, QTableWidgetItem(item))
+
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(table)
+
+        save_button = QPushButton("Salvar")
+        save_button.setStyleSheet(button_style(GREEN))
+        save_button.clicked.connect(lambda: self.save_report(result))
+        layout.addWidget(save_button)
+
+        dialog.exec()
+
+    def save_report(self, result):
+        filename, selected_filter = get_save_filename(self, "Salvar Relatório", ";;".join(SAVE_FORMATS))
+        if filename:
+            registry.export(result, filename, SAVE_FORMATS.get(selected_filter, "pdf"))
@@ -1,6 +1,11 @@
 # app/sales/sale_repository.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.child_sync import sync_child_rows
+from app.database.queries import SEARCH_QUERIES, as_record, fetch_all
+from app.database.versioning import update_versioned
+from app.models import SaleLine
+from app import events
 
 class SaleRepository:
     def __init__(self):
@@ -9,44 +14,43 @@ class SaleRepository:
     def create_sale(self, sale_date, observacao, total_value):
         conn = self.db_manager.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO SAIDA (DATA_SAIDA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, 'Em Aberto', ?)",
-                (sale_date, observacao, total_value)
-            )
-            sale_id = cursor.lastrowid
-            conn.commit()
+            with self.db_manager.transaction():
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO SAIDA (DATA_SAIDA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, 'Em Aberto', ?)",
+                    (sale_date, observacao, total_value)
+                )
+                sale_id = cursor.lastrowid
+                self.db_manager.publish("SAIDA", events.INSERT, [sale_id])
             return sale_id
         except sqlite3.Error as e:
-            conn.rollback()
             print(f"Database error in create_sale: {e}")
             return None
 
-    def update_sale_master(self, sale_id, sale_date, observacao, total_value):
+    def update_sale_master(self, sale_id, sale_date, observacao, total_value, expected_version=None):
+        """Retorna a nova versão da saída (False em erro); ConcurrencyError se expected_version não confere."""
         conn = self.db_manager.get_connection()
         try:
-            conn.execute(
-                "UPDATE SAIDA SET DATA_SAIDA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
-                (sale_date, observacao, total_value, sale_id)
-            )
-            conn.commit()
-            return True
+            with self.db_manager.transaction():
+                version = update_versioned(conn, "SAIDA", sale_id, "DATA_SAIDA = ?, OBSERVACAO = ?, VALOR_TOTAL = ?",
+                                           (sale_date, observacao, total_value), expected_version)
+                self.db_manager.publish("SAIDA", events.UPDATE, [sale_id])
+            return version or False
         except sqlite3.Error as e:
-            conn.rollback()
             print(f"Database error in update_sale_master: {e}")
             return False
 
     def update_sale_items(self, sale_id, items):
         conn = self.db_manager.get_connection()
         try:
-            with conn:
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
-                cursor.execute("DELETE FROM SAIDA_ITENS WHERE ID_SAIDA = ?", (sale_id,))
-                if items:
-                    cursor.executemany(
-                        "INSERT INTO SAIDA_ITENS (ID_SAIDA, ID_PRODUTO, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?)",
-                        [(sale_id, item['id_produto'], item['quantidade'], item['valor_unitario']) for item in items]
-                    )
+                sync_child_rows(
+                    cursor, "SAIDA_ITENS", "ID_SAIDA", sale_id,
+                    ["ID_PRODUTO"], ["QUANTIDADE", "VALOR_UNITARIO"],
+                    [(item['id_produto'], item['quantidade'], item['valor_unitario']) for item in items or []]
+                )
+                self.db_manager.publish("SAIDA_ITENS", events.UPDATE, [sale_id])
             return True
         except sqlite3.Error as e:
             print(f"Database error in update_sale_items: {e}")
@@ -57,28 +61,25 @@ class SaleRepository:
         master = conn.execute("SELECT * FROM SAIDA WHERE ID = ?", (sale_id,)).fetchone()
         if not master:
             return None
-        items = conn.execute("""
+        items = fetch_all(conn, """
             SELECT si.ID, si.ID_PRODUTO, i.DESCRICAO, u.SIGLA, si.QUANTIDADE, si.VALOR_UNITARIO
             FROM SAIDA_ITENS si
             JOIN ITEM i ON si.ID_PRODUTO = i.ID
             JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
             WHERE si.ID_SAIDA = ?
-        """, (sale_id,)).fetchall()
-        return {"master": dict(master), "items": [dict(row) for row in items]}
+        """, (sale_id,), as_record(SaleLine))
+        return {"master": dict(master), "items": items}
 
     def list_sales(self, search_term="", search_field="id"):
         conn = self.db_manager.get_connection()
-        query = "SELECT ID, DATA_SAIDA, VALOR_TOTAL, STATUS FROM SAIDA"
-        params = ()
-        if search_term:
-            if search_field == "id" and search_term.isdigit():
-                query += " WHERE ID = ?"
-                params = (int(search_term),)
-            else:
-                query += f" WHERE {search_field} LIKE ?"
-                params = (f'%{search_term}%',)
-        query += " ORDER BY ID DESC"
-        return [dict(row) for row in conn.execute(query, params).fetchall()]
+        search = SEARCH_QUERIES["sales"]
+        if not search_term:
+            return fetch_all(conn, f"{search.sql} {search.suffix}")
+        try:
+            query, params = search.build(search_field, search_term)
+        except ValueError:
+            return []
+        return fetch_all(conn, query, params)
 
     def finalize_sale(self, sale_id):
         conn = self.db_manager.get_connection()
@@ -87,21 +88,25 @@ class SaleRepository:
             return False
 
         try:
-            with conn:
+            movement_ids = []
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
+                # Atualiza o status da saída, se ninguém a alterou (ou finalizou) depois da leitura
+                update_versioned(cursor, "SAIDA", sale_id, "STATUS = 'Finalizada'", (), details['master']['VERSAO'])
                 for item in details['items']:
                     produto_id, quantity = item['ID_PRODUTO'], item['QUANTIDADE']
                     # Deduz do stock
-                    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ? WHERE ID = ?", (quantity, produto_id))
+                    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ?, VERSAO = VERSAO + 1 WHERE ID = ?", (quantity, produto_id))
                     # Regista o movimento
                     cursor.execute(
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Saída por Venda', ?, ?, ?)",
                         (produto_id, -quantity, item['VALOR_UNITARIO'], details['master']['DATA_SAIDA'])
                     )
-                # Atualiza o status da saída
-                cursor.execute("UPDATE SAIDA SET STATUS = 'Finalizada' WHERE ID = ?", (sale_id,))
+                    movement_ids.append(cursor.lastrowid)
+                self.db_manager.publish("SAIDA", events.UPDATE, [sale_id])
+                self.db_manager.publish("ITEM", events.UPDATE, {item['ID_PRODUTO'] for item in details['items']})
+                self.db_manager.publish("MOVIMENTO", events.INSERT, movement_ids)
             return True
         except sqlite3.Error as e:
-            conn.rollback()
             print(f"Database error in finalize_sale: {e}")
             return False
@@ -1,5 +1,8 @@
 # app/sales/sale_service.py
 from app.sales.sale_repository import SaleRepository
+from app.database import archive
+from app.stock import costing
+from app.database.versioning import ConcurrencyError
 
 class SaleService:
     def __init__(self):
@@ -12,25 +15,33 @@ class SaleService:
         total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
         
         try:
-            sale_id = self.sale_repository.create_sale(sale_date, observacao, total_value)
+            with self.sale_repository.db_manager.transaction():
+                sale_id = self.sale_repository.create_sale(sale_date, observacao, total_value)
+                if sale_id and not self.sale_repository.update_sale_items(sale_id, items):
+                    raise RuntimeError("falha ao gravar os itens da saída")
             if sale_id:
-                self.sale_repository.update_sale_items(sale_id, items)
                 return {"success": True, "data": sale_id, "message": "Saída criada com sucesso."}
             else:
                 return {"success": False, "message": "Erro ao criar saída no banco de dados."}
         except Exception as e:
             return {"success": False, "message": f"Erro inesperado: {e}"}
 
-    def update_sale(self, sale_id, sale_date, observacao, items):
+    def update_sale(self, sale_id, sale_date, observacao, items, version=None):
+        """version: VERSAO lida com a saída; se outro terminal gravou depois, nada é gravado (conflict)."""
         if not all([sale_id, sale_date]):
             return {"success": False, "message": "ID da Saída e Data são obrigatórios."}
         
         total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
         
         try:
-            self.sale_repository.update_sale_master(sale_id, sale_date, observacao, total_value)
-            self.sale_repository.update_sale_items(sale_id, items)
-            return {"success": True, "message": "Saída atualizada com sucesso."}
+            with self.sale_repository.db_manager.transaction():
+                new_version = self.sale_repository.update_sale_master(sale_id, sale_date, observacao, total_value, version)
+                if not (new_version and self.sale_repository.update_sale_items(sale_id, items)):
+                    raise RuntimeError("falha ao gravar no banco de dados")
+            return {"success": True, "data": new_version, "message": "Saída atualizada com sucesso."}
+        except ConcurrencyError:
+            return {"success": False, "conflict": True,
+                    "message": "Esta saída foi alterada em outro terminal. Recarregue-a e tente novamente."}
         except Exception as e:
             return {"success": False, "message": f"Erro ao atualizar saída: {e}"}
 
@@ -64,12 +75,22 @@ class SaleService:
             return {"success": False, "message": "Esta saída já foi finalizada."}
         if not details['items']:
             return {"success": False, "message": "Não é possível finalizar uma saída sem itens."}
+        if archive.is_closed(details['master']['DATA_SAIDA']):
+            return {"success": False, "message": f"O período até {archive.closed_until()} está fechado. Altere a data da saída."}
 
         try:
-            success = self.sale_repository.finalize_sale(sale_id)
+            # Saída retroativa: os itens são reprocessados na mesma transação da finalização
+            with self.sale_repository.db_manager.transaction():
+                success = self.sale_repository.finalize_sale(sale_id)
+                if success:
+                    costing.recompute_if_backdated({item['ID_PRODUTO'] for item in details['items']},
+                                                   details['master']['DATA_SAIDA'])
             if success:
                 return {"success": True, "message": f"Saída #{sale_id} finalizada com sucesso."}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao finalizar a saída."}
+        except ConcurrencyError:
+            return {"success": False, "conflict": True,
+                    "message": "Esta saída foi alterada em outro terminal. Recarregue-a e tente novamente."}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
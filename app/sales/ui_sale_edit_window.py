@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
     QLabel, QDateEdit, QAbstractItemView
 )
 from PySide6.QtCore import QDate, Qt
-from app.sales.sale_service import SaleService
+from app.server import backend
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.ui_utils import (
     NumericTableWidgetItem, show_error_message, show_success_message, 
@@ -28,8 +28,9 @@ class SaleEditWindow(QWidget):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
 
-        self.sale_service = SaleService()
+        self.sale_service = backend.service("SaleService")
         self.current_sale_id = sale_id
+        self.current_version = None
         self.search_item_window = None
         
         title = f"Editando Saída #{sale_id}" if sale_id else "Nova Saída de Produto"
@@ -109,6 +110,7 @@ class SaleEditWindow(QWidget):
 
     def new_sale(self):
         self.current_sale_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Saída de Produto")
         self.sale_id_display.setText("(Nova)")
         self.date_input.setDate(QDate.currentDate())
@@ -131,7 +133,9 @@ class SaleEditWindow(QWidget):
             })
 
         if self.current_sale_id:
-            response = self.sale_service.update_sale(self.current_sale_id, sale_date, observacao, items)
+            response = self.sale_service.update_sale(self.current_sale_id, sale_date, observacao, items, self.current_version)
+            if response["success"]:
+                self.current_version = response["data"]
         else:
             response = self.sale_service.create_sale(sale_date, observacao, items)
             if response["success"]:
@@ -143,6 +147,8 @@ class SaleEditWindow(QWidget):
             show_success_message(self, "Sucesso", response["message"])
         else:
             show_error_message(self, "Erro", response["message"])
+            if response.get("conflict"):
+                self.load_sale_data()
 
     def load_sale_data(self):
         response = self.sale_service.get_sale_details(self.current_sale_id)
@@ -153,6 +159,7 @@ class SaleEditWindow(QWidget):
 
         details = response["data"]
         master = details['master']
+        self.current_version = master.get('VERSAO')
         self.sale_id_display.setText(str(master['ID']))
         self.date_input.setDate(QDate.fromString(master['DATA_SAIDA'], "yyyy-MM-dd"))
         self.observacao_input.setText(master.get('OBSERVACAO', ''))
@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtCore import Qt
-from app.sales.sale_service import SaleService
+from app.server import backend
 from app.utils.ui_utils import show_error_message, configure_table_columns
 from app.sales.ui_sale_edit_window import SaleEditWindow
 from app.utils.date_utils import format_date_for_display
@@ -27,7 +27,7 @@ class SaleSearchWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.sale_service = SaleService()
+        self.sale_service = backend.service("SaleService")
         self.edit_window = None
         self.setWindowTitle("Pesquisa de Saídas de Produto")
         self.setGeometry(200, 200, 800, 600)
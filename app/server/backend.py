@@ -0,0 +1,84 @@
+# app/server/backend.py
+"""
+Backend das janelas: local (DADOS.DB aberto neste processo) ou remoto (servidor
+app/server/server.py, que atende todos os terminais).
+
+As janelas obtêm serviços, módulos de operações e relatórios por service(nome)
+em vez de instanciá-los; no modo remoto recebem um proxy com os mesmos métodos,
+cujas chamadas vão ao servidor. SERVICES é também a lista do que o servidor expõe.
+"""
+import importlib
+
+SERVICES = {
+    "ItemService": ("app.item.service", "ItemService"),
+    "SupplierService": ("app.supplier.service", "SupplierService"),
+    "UnitService": ("app.unit.unit_service", "UnitService"),
+    "StockService": ("app.stock.service", "StockService"),
+    "SaleService": ("app.sales.sale_service", "SaleService"),
+    "order_operations": ("app.production.order_operations", None),
+    "composition_operations": ("app.production.composition_operations", None),
+    "line_operations": ("app.production_line.line_operations", None),
+    "reports": ("app.database.db", "get_db_manager"),
+}
+
+# Métodos de relatório que só preparam o servidor (o retorno não é enviado)
+REPORT_SETUP = ("enable_sales_analytics",)
+
+_remote = None
+
+
+def local_service(name):
+    module_name, attribute = SERVICES[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)() if attribute else module
+
+
+def exposed_method(name, target, method):
+    """
+    Método que pode ser chamado remotamente: os públicos dos serviços, as funções
+    definidas no próprio módulo de operações e os get_* dos relatórios.
+    """
+    function = getattr(target, method, None) if not method.startswith("_") else None
+    if name == "reports":
+        allowed = method in REPORT_SETUP or (
+            method.startswith("get_") and method not in ("get_connection", "get_report_connection"))
+    elif SERVICES[name][1] is None:
+        allowed = getattr(function, "__module__", None) == target.__name__
+    else:
+        allowed = function is not None
+    if not allowed or not callable(function):
+        raise AttributeError(f"{name}.{method} não está disponível no servidor.")
+    return function
+
+
+def use_remote(host, port=None, listen_events=True):
+    """Passa a usar o servidor; os eventos de alteração do servidor são republicados localmente."""
+    global _remote
+    from app.server.client import RemoteBackend
+    use_local()
+    _remote = RemoteBackend(host, port) if port else RemoteBackend(host)
+    if listen_events:
+        _remote.listen_events()
+    return _remote
+
+
+def use_local():
+    global _remote
+    if _remote is not None:
+        _remote.close()
+        _remote = None
+
+
+def is_remote():
+    return _remote is not None
+
+
+def service(name):
+    if name not in SERVICES:
+        raise KeyError(name)
+    return _remote.service(name) if _remote is not None else local_service(name)
+
+
+def get_db_manager():
+    """Para as janelas de relatório: o DatabaseManager local ou, no modo remoto, seus get_* no servidor."""
+    return service("reports")
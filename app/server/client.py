@@ -0,0 +1,97 @@
+# app/server/client.py
+"""
+Cliente do servidor (app/server/server.py) para as janelas.
+
+RemoteBackend mantém uma conexão para os pedidos (um por vez, protegida por
+lock) e, se pedido, uma segunda conexão que recebe os eventos de alteração e os
+republica no barramento local (app/events.py); assim as janelas abertas em um
+terminal se atualizam com as gravações feitas nos outros.
+"""
+import functools
+import logging
+import socket
+import threading
+
+from app import events
+from app.server.protocol import DEFAULT_PORT, decode, encode, from_wire
+
+
+class RemoteError(Exception):
+    """Erro levantado no servidor durante o pedido."""
+
+
+class RemoteBackend:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=120):
+        self.address = (host, port)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._file = None
+        self._next_id = 0
+        self._listener = None
+        self._closed = False
+
+    def _disconnect(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def call(self, target, method, *args, **kwargs):
+        with self._lock:
+            if self._socket is None:
+                self._socket = socket.create_connection(self.address, timeout=self.timeout)
+                self._file = self._socket.makefile("rb")
+            self._next_id += 1
+            try:
+                self._socket.sendall(encode({"id": self._next_id, "target": target, "method": method,
+                                             "args": args, "kwargs": kwargs}))
+                line = self._file.readline()
+            except OSError:
+                self._disconnect()
+                raise
+            if not line:
+                self._disconnect()
+                raise ConnectionError("O servidor encerrou a conexão.")
+        response = decode(line)
+        if "error" in response:
+            raise RemoteError(response["error"])
+        return from_wire(response["result"])
+
+    def service(self, name):
+        return RemoteService(self, name)
+
+    def listen_events(self):
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._receive_events, name="server-events", daemon=True)
+            self._listener.start()
+
+    def _receive_events(self):
+        try:
+            with socket.create_connection(self.address) as connection, connection.makefile("rb") as stream:
+                connection.sendall(encode({"subscribe": True}))
+                for line in stream:
+                    event = decode(line)["event"]
+                    events.publish(event["table"], event["operation"], event["ids"])
+        except OSError as e:
+            if not self._closed:
+                logging.error(f"Conexão de eventos com o servidor perdida: {e}")
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            self._disconnect()
+
+
+class RemoteService:
+    """Proxy de um serviço do servidor: service.metodo(...) vira um pedido."""
+    __slots__ = ("_backend", "_name")
+
+    def __init__(self, backend, name):
+        self._backend = backend
+        self._name = name
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return functools.partial(self._backend.call, self._name, method)
@@ -0,0 +1,64 @@
+# app/server/protocol.py
+"""
+Protocolo do servidor: uma mensagem JSON por linha (UTF-8) sobre TCP.
+
+    pedido     {"id": 1, "target": "ItemService", "method": "search_items", "args": [...], "kwargs": {...}}
+    resposta   {"id": 1, "result": ...}  ou  {"id": 1, "error": "mensagem"}
+    assinatura {"subscribe": true}
+    evento     {"event": {"table": "ITEM", "operation": "update", "ids": [3]}}
+
+Registros de app/models.py viajam como {"__record__": classe, "values": [...]} e
+chegam como o mesmo registro; sqlite3.Row vira dicionário, tuplas e contêineres
+por coluna viram listas e datas viram texto ISO.
+"""
+import json
+import sqlite3
+from datetime import date
+
+from app import models
+from app.models import Record
+
+DEFAULT_PORT = 8765
+
+RECORD_CLASSES = {name: value for name, value in vars(models).items()
+                  if isinstance(value, type) and issubclass(value, Record) and value is not Record}
+
+
+def to_wire(value):
+    if isinstance(value, Record):
+        return {"__record__": type(value).__name__, "values": [to_wire(getattr(value, name)) for name in value.__match_args__]}
+    if isinstance(value, sqlite3.Row):
+        return {key: to_wire(value[key]) for key in value.keys()}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: to_wire(item) for key, item in value.items()}
+        return {"__items__": [[to_wire(key), to_wire(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [to_wire(item) for item in value]
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _key(value):
+    return tuple(_key(item) for item in value) if isinstance(value, list) else value
+
+
+def from_wire(value):
+    if isinstance(value, list):
+        return [from_wire(item) for item in value]
+    if isinstance(value, dict):
+        if "__record__" in value:
+            return RECORD_CLASSES[value["__record__"]](*from_wire(value["values"]))
+        if "__items__" in value:
+            return {_key(from_wire(key)): from_wire(item) for key, item in value["__items__"]}
+        return {key: from_wire(item) for key, item in value.items()}
+    return value
+
+
+def encode(message):
+    return (json.dumps(to_wire(message), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def decode(line):
+    return json.loads(line)
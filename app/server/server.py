@@ -0,0 +1,268 @@
+# app/server/server.py
+"""
+Modo servidor: um único processo é dono do DADOS.DB e atende os terminais.
+
+Os terminais (app/server/client.py) enviam pedidos de serviço pela rede local
+(protocolo em app/server/protocol.py). O laço asyncio recebe os pedidos de todas
+as conexões e os entrega em grupos à thread do banco: cada grupo é uma unidade
+de trabalho (app/database/unit_of_work.py) com um único commit (commit em
+grupo), e cada pedido uma transação aninhada (SAVEPOINT), de modo que a falha de
+um pedido desfaz só o que ele gravou. As respostas e os eventos de alteração só
+são enviados depois do commit do grupo. Os relatórios (get_* de "reports") não
+entram nos grupos: rodam em outra thread, com conexão somente leitura (o banco
+fica em modo WAL), de modo que um relatório demorado não segura as gravações.
+
+O protocolo não tem autenticação: por padrão o servidor atende só a própria
+máquina (127.0.0.1). Para os terminais, informe o endereço da rede local em
+--host (ex.: o IP da máquina do servidor), nunca em uma rede não confiável.
+
+    python -m app.server.server
+    python -m app.server.server --host 192.168.0.10 --port 8765
+"""
+import argparse
+import asyncio
+import logging
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app import events
+from app.database.db import DatabaseManager
+from app.database.maintenance import MaintenanceService
+from app.reports import columnar_history
+from app.reports.scheduler import ReportScheduler
+from app.server import backend
+from app.server.protocol import DEFAULT_PORT, decode, encode, from_wire
+
+MAX_GROUP = 64
+
+
+class Server:
+    def __init__(self, db_path=None, max_group=MAX_GROUP):
+        self.db_path = db_path
+        self.max_group = max_group
+        self.address = None
+        self.stats = {"grupos": 0, "pedidos": 0}
+        # Todas as gravações acontecem nesta thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="server-db")
+        # Relatórios: conexão somente leitura própria, fora do commit em grupo
+        self._report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="server-reports")
+        self.report_manager = None
+        self._targets = {}
+        self._collected = []
+        self._subscribers = set()
+        self._loop = None
+        self._queue = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # --- Thread do banco ---
+
+    def _open(self):
+        DatabaseManager.reset_instance()
+        self.db_manager = DatabaseManager(self.db_path)
+        # WAL: as leituras da thread de relatórios e as gravações não se bloqueiam
+        self.db_manager.get_connection().execute("PRAGMA journal_mode=WAL")
+        events.subscribe(events.ALL_TABLES, self._collect)
+
+    def _close(self):
+        events.unsubscribe(self._collect)
+        DatabaseManager.reset_instance()
+
+    # --- Thread de relatórios ---
+
+    def _open_reports(self):
+        # Consultas pela conexão somente leitura; a conexão de escrita própria só confirma
+        # a marca de CDC do histórico colunar, sem passar pela thread das gravações
+        self.report_manager = DatabaseManager.open_worker(self.db_manager.db_path)
+        self.report_manager.set_report_mode("readonly")
+        if columnar_history.available():
+            self.report_manager.enable_columnar_history()
+
+    def _close_reports(self):
+        if self.report_manager is not None:
+            self.report_manager.close_connection()
+            self.report_manager = None
+
+    def _run_report(self, request):
+        """Executa um pedido de relatório na conexão somente leitura. Retorna (campo, valor)."""
+        try:
+            return "result", self._call("reports", self.report_manager, request)
+        except Exception as e:
+            logging.error(f"Relatório {request.get('method')} falhou: {e}")
+            return "error", str(e)
+
+    def _collect(self, event):
+        if threading.current_thread().name.startswith("server-db"):
+            self._collected.append(event)
+
+    def _dispatch(self, request):
+        name = request["target"]
+        if name not in backend.SERVICES:
+            raise AttributeError(f"Serviço desconhecido: {name}")
+        if name not in self._targets:
+            self._targets[name] = backend.local_service(name)
+        return self._call(name, self._targets[name], request)
+
+    @staticmethod
+    def _call(name, target, request):
+        method = request["method"]
+        function = backend.exposed_method(name, target, method)
+        result = function(*from_wire(request.get("args", [])), **from_wire(request.get("kwargs", {})))
+        return None if name == "reports" and method in backend.REPORT_SETUP else result
+
+    def _run_group(self, requests):
+        """Executa os pedidos em uma transação. Retorna ([(campo, valor)], eventos publicados)."""
+        results = []
+        try:
+            with self.db_manager.transaction():
+                for request in requests:
+                    try:
+                        with self.db_manager.transaction():
+                            results.append(("result", self._dispatch(request)))
+                    except Exception as e:
+                        logging.error(f"Pedido {request.get('target')}.{request.get('method')} falhou: {e}")
+                        results.append(("error", str(e)))
+        except sqlite3.Error as e:
+            logging.error(f"Falha no commit do grupo: {e}")
+            self._collected = []
+            return [("error", f"Falha ao gravar no banco: {e}")] * len(requests), []
+        # Os eventos retidos pela unidade de trabalho foram publicados após o commit
+        published, self._collected = self._collected, []
+        self.stats["grupos"] += 1
+        self.stats["pedidos"] += len(requests)
+        return results, published
+
+    # --- Laço asyncio ---
+
+    async def _group_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            group = [await self._queue.get()]
+            while len(group) < self.max_group and not self._queue.empty():
+                group.append(self._queue.get_nowait())
+            results, published = await loop.run_in_executor(
+                self._executor, self._run_group, [request for request, _ in group])
+            for (_, future), result in zip(group, results):
+                if not future.done():
+                    future.set_result(result)
+            for event in published:
+                self._broadcast({"event": {"table": event.table, "operation": event.operation, "ids": event.ids}})
+
+    def _broadcast(self, message):
+        data = encode(message)
+        for writer in list(self._subscribers):
+            if writer.is_closing():
+                self._subscribers.discard(writer)
+            else:
+                writer.write(data)
+
+    async def _answer(self, request, writer, lock):
+        loop = asyncio.get_running_loop()
+        if request.get("target") == "reports":
+            field, value = await loop.run_in_executor(self._report_executor, self._run_report, request)
+        else:
+            future = loop.create_future()
+            await self._queue.put((request, future))
+            field, value = await future
+        try:
+            data = encode({"id": request.get("id"), field: value})
+        except (TypeError, ValueError) as e:
+            data = encode({"id": request.get("id"), "error": f"Resposta não serializável: {e}"})
+        async with lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                request = decode(line)
+                if request.get("subscribe"):
+                    self._subscribers.add(writer)
+                    continue
+                task = asyncio.create_task(self._answer(request, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, ValueError) as e:
+            logging.warning(f"Conexão encerrada: {e}")
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            await self._loop.run_in_executor(self._executor, self._open)
+            await self._loop.run_in_executor(self._report_executor, self._open_reports)
+            self._queue = asyncio.Queue()
+            group_task = asyncio.create_task(self._group_loop())
+            server = await asyncio.start_server(self._handle_client, host, port)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            raise
+        self.address = server.sockets[0].getsockname()[:2]
+        logging.info(f"Servidor atendendo em {self.address[0]}:{self.address[1]}")
+        self._ready.set()
+        async with server:
+            await self._stopping.wait()
+        group_task.cancel()
+        for writer in list(self._subscribers):
+            writer.close()
+        await self._loop.run_in_executor(self._report_executor, self._close_reports)
+        await self._loop.run_in_executor(self._executor, self._close)
+
+    def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Inicia o servidor em uma thread própria e retorna o endereço (host, porta)."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self.serve(host, port),),
+                                        name="server-loop", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+        return self.address
+
+    def stop(self):
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown()
+        self._report_executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor do MiniSis para vários terminais.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Endereço atendido (padrão: só esta máquina; sem autenticação, use apenas na rede local).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", help="Caminho do DADOS.DB (padrão: o da aplicação).")
+    parser.add_argument("--max-group", type=int, default=MAX_GROUP, help="Pedidos por commit em grupo.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = Server(args.db, args.max_group)
+    # Manutenção (backup, pontos de pedido) e relatórios agendados rodam na máquina do servidor, ao lado do banco
+    maintenance = MaintenanceService(args.db)
+    maintenance.start()
+    report_scheduler = ReportScheduler(args.db)
+    report_scheduler.start()
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_scheduler.stop()
+        maintenance.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# app/stock/costing.py
+"""
+Motor de custo médio ponderado a partir do razão de estoque (MOVIMENTO).
+
+Saldo e custo médio de cada item são recalculados reproduzindo os movimentos em
+ordem cronológica (DATA_MOVIMENTO, ID), com uma única regra por tipo de movimento,
+em vez das fórmulas aplicadas no próprio ITEM por cada operação.
+
+Ao fim de cada mês fechado o estado do item é gravado em CHECKPOINT_CUSTO. Um
+documento com data retroativa só precisa reprocessar os itens afetados a partir
+do último checkpoint anterior à sua data (recompute_from). A reconstrução completa
+(rebuild_costs) distribui os itens entre processos, cada um com sua conexão
+somente leitura; a gravação é feita depois, em uma única transação.
+
+    python -m app.stock.costing rebuild --workers 4
+    python -m app.stock.costing rebuild --dry-run
+    python -m app.stock.costing recompute 2024-03-15 --item 12 --item 15
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import groupby
+
+from app.database.db import get_db_manager, connect_read_only
+from app import events
+
+# TIPO_MOVIMENTO -> (sentido, valorizado)
+# Movimentos valorizados entram (ou são estornados) pelo VALOR_UNITARIO gravado e alteram
+# o custo médio; os demais movimentam a quantidade pelo custo médio vigente.
+# O sentido vem da regra e não do sinal gravado: 'Saída por OP' é gravada positiva.
+MOVEMENT_RULES = {
+    'Entrada por Nota': (1, True),
+    'Estorno de Entrada': (-1, True),
+    'Entrada Manual': (1, True),
+    'Entrada por OP': (1, True),
+    'Retorno por OP': (1, False),
+    'Saída por OP': (-1, False),
+    'Saída por Venda': (-1, False),
+    # Gerado no fechamento de período (app/database/archive.py); o sinal gravado é o do saldo
+    'Saldo Inicial': (None, True),
+}
+
+_CHUNK_SIZE = 500
+
+
+def signed_quantity_sql(quantity="QUANTIDADE", movement_type="TIPO_MOVIMENTO"):
+    """Expressão SQL da quantidade com o sentido de MOVEMENT_RULES; tipos sem sentido mantêm o sinal gravado."""
+    cases = " ".join(f"WHEN '{kind}' THEN {'' if direction > 0 else '-'}ABS({quantity})"
+                     for kind, (direction, _) in MOVEMENT_RULES.items() if direction)
+    return f"CASE {movement_type} {cases} ELSE {quantity} END"
+
+
+def _period(movement_date):
+    return str(movement_date)[:7]
+
+
+def _period_end(period):
+    """Primeiro dia do mês seguinte ao período AAAA-MM (limite exclusivo)."""
+    year, month = int(period[:4]), int(period[5:7])
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01"
+
+
+def apply_movement(balance, average_cost, movement_type, quantity, unit_value):
+    """Aplica um movimento ao estado (saldo, custo médio) e retorna o novo estado."""
+    direction, valued = MOVEMENT_RULES.get(movement_type, (None, False))
+    direction = direction or (1 if quantity >= 0 else -1)
+    quantity = abs(quantity) * direction
+    new_balance = balance + quantity
+    if valued and unit_value is not None:
+        if quantity > 0:
+            # Saldo zerado ou negativo não carrega valor: a entrada define o custo
+            average_cost = unit_value if balance <= 0 else (balance * average_cost + quantity * unit_value) / new_balance
+        elif new_balance > 0:
+            average_cost = max((balance * average_cost + quantity * unit_value) / new_balance, 0.0)
+        else:
+            average_cost = 0.0
+    return new_balance, average_cost
+
+
+def replay(movements, balance=0.0, average_cost=0.0, open_period=None):
+    """
+    Reproduz movimentos (tipo, quantidade, valor_unitario, data) já ordenados.
+    Retorna (saldo, custo_medio, checkpoints), com um checkpoint (periodo, saldo, custo)
+    por mês anterior a open_period.
+    """
+    checkpoints = []
+    current = None
+    for movement_type, quantity, unit_value, movement_date in movements:
+        period = _period(movement_date)
+        if current is not None and period != current and (open_period is None or current < open_period):
+            checkpoints.append((current, balance, average_cost))
+        current = period
+        balance, average_cost = apply_movement(balance, average_cost, movement_type, quantity, unit_value)
+    if current is not None and (open_period is None or current < open_period):
+        checkpoints.append((current, balance, average_cost))
+    return balance, average_cost, checkpoints
+
+
+def _replay_items(conn, item_ids, open_period):
+    query = """
+        SELECT ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO
+        FROM MOVIMENTO
+        WHERE ID_ITEM IN ({})
+        ORDER BY ID_ITEM, DATA_MOVIMENTO, ID
+    """
+    results = {}
+    for start in range(0, len(item_ids), _CHUNK_SIZE):
+        chunk = item_ids[start:start + _CHUNK_SIZE]
+        rows = conn.execute(query.format(", ".join("?" * len(chunk))), chunk)
+        for item_id, movements in groupby(rows, key=lambda row: row[0]):
+            results[item_id] = replay((row[1:] for row in movements), open_period=open_period)
+    return results
+
+
+def _rebuild_worker(db_path, item_ids, open_period):
+    conn = connect_read_only(db_path)
+    try:
+        return _replay_items(conn, item_ids, open_period)
+    finally:
+        conn.close()
+
+
+def _store(conn, results, from_period=None):
+    """Grava saldo/custo no ITEM e substitui os checkpoints a partir de from_period (todos, se None)."""
+    db_manager = get_db_manager()
+    item_ids = [(item_id,) for item_id in results]
+    with db_manager.transaction():
+        conn.executemany("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?, VERSAO = VERSAO + 1 WHERE ID = ?",
+                         [(balance, cost, item_id) for item_id, (balance, cost, _) in results.items()])
+        if from_period is None:
+            conn.executemany("DELETE FROM CHECKPOINT_CUSTO WHERE ID_ITEM = ?", item_ids)
+        else:
+            conn.executemany("DELETE FROM CHECKPOINT_CUSTO WHERE ID_ITEM = ? AND PERIODO >= ?",
+                             [(item_id, from_period) for (item_id,) in item_ids])
+        conn.executemany(
+            "INSERT INTO CHECKPOINT_CUSTO (ID_ITEM, PERIODO, SALDO, CUSTO_MEDIO) VALUES (?, ?, ?, ?)",
+            [(item_id, period, balance, cost)
+             for item_id, (_, _, checkpoints) in results.items()
+             for period, balance, cost in checkpoints
+             if from_period is None or period >= from_period]
+        )
+        db_manager.publish("ITEM", events.UPDATE, list(results))
+
+
+def _differences(conn, results):
+    differences = []
+    for row in conn.execute("SELECT ID, DESCRICAO, SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM ORDER BY ID"):
+        if row['ID'] not in results:
+            continue
+        balance, cost, _ = results[row['ID']]
+        if abs(balance - (row['SALDO_ESTOQUE'] or 0)) > 1e-6 or abs(cost - (row['CUSTO_MEDIO'] or 0)) > 1e-6:
+            differences.append({
+                "id": row['ID'], "descricao": row['DESCRICAO'],
+                "saldo_atual": row['SALDO_ESTOQUE'], "saldo_recalculado": balance,
+                "custo_atual": row['CUSTO_MEDIO'], "custo_recalculado": cost,
+            })
+    return differences
+
+
+def rebuild_costs(workers=None, dry_run=False):
+    """
+    Recalcula saldo e custo médio de todos os itens com movimentação e regrava os
+    checkpoints. Itens sem nenhum movimento não são alterados. Retorna a lista de
+    itens cujo saldo/custo gravado divergia do razão.
+    """
+    db_manager = get_db_manager()
+    conn = db_manager.get_connection()
+    conn.commit()  # os processos de trabalho só enxergam dados já gravados
+    item_ids = [row[0] for row in conn.execute("SELECT DISTINCT ID_ITEM FROM MOVIMENTO ORDER BY ID_ITEM")]
+    open_period = _period(date.today().isoformat())
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(item_ids) < 2 or not os.path.exists(db_manager.db_path):
+        results = _replay_items(conn, item_ids, open_period)
+    else:
+        size = max(1, -(-len(item_ids) // (workers * 4)))
+        chunks = [item_ids[i:i + size] for i in range(0, len(item_ids), size)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_rebuild_worker, [db_manager.db_path] * len(chunks), chunks,
+                                    [open_period] * len(chunks)):
+                results.update(partial)
+
+    differences = _differences(conn, results)
+    if not dry_run:
+        with db_manager.transaction():
+            conn.execute("DELETE FROM CHECKPOINT_CUSTO")
+            _store(conn, results)
+    return differences
+
+
+def recompute_from(start_date, item_ids=None):
+    """
+    Reprocessa os itens a partir do último checkpoint anterior a start_date, após um
+    documento retroativo. Sem item_ids, considera todos os itens movimentados desde
+    start_date. Retorna a quantidade de itens recalculados.
+    """
+    conn = get_db_manager().get_connection()
+    from_period = _period(start_date)
+    if item_ids is None:
+        item_ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT ID_ITEM FROM MOVIMENTO WHERE DATA_MOVIMENTO >= ?", (str(start_date)[:10],))]
+    open_period = _period(date.today().isoformat())
+
+    results = {}
+    for item_id in sorted(set(item_ids)):
+        checkpoint = conn.execute(
+            "SELECT PERIODO, SALDO, CUSTO_MEDIO FROM CHECKPOINT_CUSTO WHERE ID_ITEM = ? AND PERIODO < ? "
+            "ORDER BY PERIODO DESC LIMIT 1", (item_id, from_period)).fetchone()
+        if checkpoint:
+            rows = conn.execute(
+                "SELECT TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO FROM MOVIMENTO "
+                "WHERE ID_ITEM = ? AND DATA_MOVIMENTO >= ? ORDER BY DATA_MOVIMENTO, ID",
+                (item_id, _period_end(checkpoint['PERIODO'])))
+            results[item_id] = replay(rows, checkpoint['SALDO'], checkpoint['CUSTO_MEDIO'], open_period)
+        else:
+            rows = conn.execute(
+                "SELECT TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO FROM MOVIMENTO "
+                "WHERE ID_ITEM = ? ORDER BY DATA_MOVIMENTO, ID", (item_id,))
+            results[item_id] = replay(rows, open_period=open_period)
+
+    if results:
+        _store(conn, results, from_period)
+    return len(results)
+
+
+def has_later_movements(item_ids, document_date):
+    """Indica se algum dos itens tem movimento com data posterior à do documento."""
+    if not item_ids:
+        return False
+    conn = get_db_manager().get_connection()
+    placeholders = ", ".join("?" * len(item_ids))
+    row = conn.execute(
+        f"SELECT 1 FROM MOVIMENTO WHERE ID_ITEM IN ({placeholders}) AND substr(DATA_MOVIMENTO, 1, 10) > ? LIMIT 1",
+        (*item_ids, str(document_date)[:10])).fetchone()
+    return row is not None
+
+
+def recompute_if_backdated(item_ids, document_date):
+    """
+    Documento com data anterior a movimentos já existentes dos itens: o custo aplicado pela
+    operação não segue a ordem cronológica, então os itens são reprocessados. Deve ser chamado
+    dentro da transação do documento, para que uma falha desfaça também a operação.
+    """
+    item_ids = list(item_ids)
+    if has_later_movements(item_ids, document_date):
+        return recompute_from(document_date, item_ids)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recálculo de saldo e custo médio a partir da movimentação.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Reconstrói saldo e custo de todos os itens.")
+    rebuild_parser.add_argument("--workers", type=int, help="Número de processos (padrão: número de CPUs).")
+    rebuild_parser.add_argument("--dry-run", action="store_true", help="Apenas lista as divergências.")
+
+    recompute_parser = subparsers.add_parser("recompute", help="Reprocessa a partir de uma data (AAAA-MM-DD).")
+    recompute_parser.add_argument("start_date")
+    recompute_parser.add_argument("--item", type=int, action="append", dest="items")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        differences = rebuild_costs(workers=args.workers, dry_run=args.dry_run)
+        for diff in differences:
+            print(f"{diff['id']:6} {diff['descricao'][:40]:40} saldo {diff['saldo_atual']} -> {diff['saldo_recalculado']:.4f}"
+                  f"  custo {diff['custo_atual']} -> {diff['custo_recalculado']:.4f}")
+        print(f"{len(differences)} item(ns) divergente(s).")
+        return 0
+
+    count = recompute_from(args.start_date, args.items)
+    print(f"{count} item(ns) recalculado(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# app/stock/replenishment.py
+"""
+Previsão de consumo e ponto de pedido por item.
+
+O consumo mensal de cada item ('Saída por OP' e 'Saída por Venda') é suavizado
+exponencialmente (nível e desvio absoluto médio), mês a mês, para todos os itens
+de uma vez. O estado de cada item fica em PARAMETRO_REPOSICAO junto com o último
+mês fechado incorporado (PERIODO); cada refresh lê apenas os meses fechados
+depois dele, de modo que no mesmo mês o refresh não faz nada e na virada do mês
+só o mês anterior é lido. Itens ainda sem estado partem dos últimos HISTORY_MONTHS
+meses. Com full=True o estado é recalculado do zero (ex.: após lançamentos
+retroativos em meses já incorporados). Itens sem nenhum consumo observado ficam
+com nível e desvio zerados e, no relatório de estoque baixo, seguem o limite fixo.
+
+    estoque de segurança = SERVICE_FACTOR * 1,25 * desvio * raiz(prazo / mês)
+    ponto de pedido      = consumo diário * prazo + estoque de segurança
+
+O prazo de reposição (PRAZO_DIAS) é informado por item (set_lead_time); o padrão
+é DEFAULT_LEAD_TIME dias. O refresh roda na manutenção (MaintenanceService, na
+abertura e a cada ciclo) ou pelo comando abaixo; os relatórios só leem o estado.
+
+    python -m app.stock.replenishment refresh
+    python -m app.stock.replenishment refresh --full
+    python -m app.stock.replenishment lead-time 12 20
+"""
+import argparse
+import json
+import sys
+from datetime import date
+
+from app.database.db import get_db_manager
+from app import events
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+ALPHA = 0.3
+SERVICE_FACTOR = 1.65  # nível de serviço de 95%
+DEFAULT_LEAD_TIME = 15
+HISTORY_MONTHS = 24
+CONSUMPTION_TYPES = ("Saída por OP", "Saída por Venda")
+DAYS_PER_MONTH = 365 / 12
+
+
+def _month_key(period):
+    return int(period[:4]) * 12 + int(period[5:7]) - 1
+
+
+def _period(month_key):
+    year, month = divmod(month_key, 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def _smooth(demand, start, level, deviation, alpha):
+    """
+    Suaviza as linhas de `demand` (consumo mensal por item) a partir da coluna
+    start[i]. Itens com level[i] None começam pelo primeiro mês com consumo a
+    partir de start[i]. Retorna (níveis, desvios).
+    """
+    if np is not None and demand:
+        matrix = np.asarray(demand, dtype=np.float64)
+        start = np.asarray(start)
+        fresh = np.array([value is None for value in level])
+        consumed = (matrix > 0) & (np.arange(matrix.shape[1]) >= start[:, None])
+        first_consumption = np.where(consumed.any(axis=1), np.argmax(consumed, axis=1), matrix.shape[1])
+        first = np.where(fresh, first_consumption, start)
+        levels = np.array([value or 0.0 for value in level])
+        deviations = np.array([value or 0.0 for value in deviation])
+        for column in range(matrix.shape[1]):
+            observed = matrix[:, column]
+            begin = fresh & (first == column)
+            active = (first <= column) & ~begin
+            error = observed - levels
+            deviations = np.where(active, (1 - alpha) * deviations + alpha * np.abs(error), deviations)
+            levels = np.where(active, levels + alpha * error, np.where(begin, observed, levels))
+        return levels.tolist(), deviations.tolist()
+
+    levels, deviations = [], []
+    for row, first, item_level, item_deviation in zip(demand, start, level, deviation):
+        item_deviation = item_deviation or 0.0
+        if item_level is None:
+            first = next((column for column in range(first, len(row)) if row[column] > 0), len(row))
+            if first < len(row):
+                item_level = row[first]
+                first += 1
+            else:
+                item_level = 0.0
+        for observed in row[first:]:
+            error = observed - item_level
+            item_deviation = (1 - alpha) * item_deviation + alpha * abs(error)
+            item_level += alpha * error
+        levels.append(item_level)
+        deviations.append(item_deviation)
+    return levels, deviations
+
+
+def reorder_levels(monthly_demand, deviation, lead_time, service_factor=SERVICE_FACTOR):
+    """(estoque de segurança, ponto de pedido) para o consumo mensal previsto."""
+    safety_stock = service_factor * 1.25 * deviation * (max(lead_time, 0) / DAYS_PER_MONTH) ** 0.5
+    return safety_stock, monthly_demand / DAYS_PER_MONTH * lead_time + safety_stock
+
+
+def refresh_reorder_points(reference_date=None, full=False, alpha=ALPHA, service_factor=SERVICE_FACTOR, db_manager=None):
+    """
+    Incorpora os meses fechados (anteriores ao mês de reference_date) ainda não
+    processados. Retorna {"periodo": último mês incorporado, "itens": itens atualizados}.
+    Sem db_manager, usa a conexão da aplicação.
+    """
+    db_manager = db_manager or get_db_manager()
+    conn = db_manager.get_connection()
+    reference = date.fromisoformat(str(reference_date)[:10]) if reference_date else date.today()
+    last_closed = reference.year * 12 + reference.month - 2
+    first_window = last_closed - HISTORY_MONTHS + 1
+
+    stored = {row[0]: tuple(row[1:]) for row in conn.execute(
+        "SELECT ID_ITEM, PERIODO, DEMANDA_MENSAL, DESVIO_MEDIO, PRAZO_DIAS FROM PARAMETRO_REPOSICAO")}
+    pending = {}
+    for (item_id,) in conn.execute("SELECT ID FROM ITEM"):
+        period, level, deviation, lead_time = stored.get(item_id, (None, None, None, DEFAULT_LEAD_TIME))
+        if full or period is None:
+            pending[item_id] = (first_window, None, None, lead_time)
+        elif _month_key(period) < last_closed:
+            if not level and not deviation:
+                level = deviation = None  # ainda sem consumo: começa pelo primeiro mês com consumo
+            pending[item_id] = (max(_month_key(period) + 1, first_window), level, deviation, lead_time)
+    if not pending:
+        return {"periodo": _period(last_closed), "itens": 0}
+
+    window_start = min(start for start, *_ in pending.values())
+    span = last_closed - window_start + 1
+    positions = {item_id: position for position, item_id in enumerate(pending)}
+    demand = [[0.0] * span for _ in pending]
+    source = db_manager.history_sources("MOVIMENTO", date_from=f"{_period(window_start)}-01")["MOVIMENTO"]
+    rows = conn.execute(f"""
+        SELECT ID_ITEM, substr(DATA_MOVIMENTO, 1, 7) AS mes, SUM(ABS(QUANTIDADE))
+        FROM {source}
+        WHERE TIPO_MOVIMENTO IN (?, ?) AND DATA_MOVIMENTO >= ? AND DATA_MOVIMENTO < ?
+        GROUP BY ID_ITEM, mes
+    """, (*CONSUMPTION_TYPES, f"{_period(window_start)}-01", f"{_period(last_closed + 1)}-01"))
+    for item_id, period, quantity in rows:
+        position = positions.get(item_id)
+        if position is not None:
+            demand[position][_month_key(period) - window_start] = quantity
+
+    states = list(pending.values())
+    levels, deviations = _smooth(demand, [start - window_start for start, *_ in states],
+                                 [level for _, level, _, _ in states], [deviation for _, _, deviation, _ in states], alpha)
+
+    closed = _period(last_closed)
+    values = []
+    for item_id, level, deviation, (_, _, _, lead_time) in zip(pending, levels, deviations, states):
+        safety_stock, reorder_point = reorder_levels(level, deviation, lead_time, service_factor)
+        values.append((item_id, closed, level, deviation, safety_stock, reorder_point))
+    with db_manager.transaction():
+        conn.executemany("""
+            INSERT INTO PARAMETRO_REPOSICAO (ID_ITEM, PERIODO, DEMANDA_MENSAL, DESVIO_MEDIO, ESTOQUE_SEGURANCA, PONTO_PEDIDO)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (ID_ITEM) DO UPDATE SET
+                PERIODO = excluded.PERIODO, DEMANDA_MENSAL = excluded.DEMANDA_MENSAL, DESVIO_MEDIO = excluded.DESVIO_MEDIO,
+                ESTOQUE_SEGURANCA = excluded.ESTOQUE_SEGURANCA, PONTO_PEDIDO = excluded.PONTO_PEDIDO
+        """, values)
+        db_manager.publish("PARAMETRO_REPOSICAO", events.UPDATE, list(pending))
+    return {"periodo": closed, "itens": len(values)}
+
+
+def set_lead_time(item_id, days, service_factor=SERVICE_FACTOR):
+    """Define o prazo de reposição do item e recalcula seu estoque de segurança e ponto de pedido."""
+    db_manager = get_db_manager()
+    conn = db_manager.get_connection()
+    row = conn.execute("SELECT DEMANDA_MENSAL, DESVIO_MEDIO FROM PARAMETRO_REPOSICAO WHERE ID_ITEM = ?", (item_id,)).fetchone()
+    level, deviation = (row[0], row[1]) if row else (0.0, 0.0)
+    safety_stock, reorder_point = reorder_levels(level, deviation, days, service_factor)
+    with db_manager.transaction():
+        conn.execute("""
+            INSERT INTO PARAMETRO_REPOSICAO (ID_ITEM, PRAZO_DIAS, ESTOQUE_SEGURANCA, PONTO_PEDIDO) VALUES (?, ?, ?, ?)
+            ON CONFLICT (ID_ITEM) DO UPDATE SET
+                PRAZO_DIAS = excluded.PRAZO_DIAS, ESTOQUE_SEGURANCA = excluded.ESTOQUE_SEGURANCA,
+                PONTO_PEDIDO = excluded.PONTO_PEDIDO
+        """, (item_id, days, safety_stock, reorder_point))
+        db_manager.publish("PARAMETRO_REPOSICAO", events.UPDATE, [item_id])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Previsão de consumo e ponto de pedido.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Incorpora os meses fechados ainda não processados.")
+    refresh_parser.add_argument("--full", action="store_true", help="Recalcula todos os itens do zero.")
+    refresh_parser.add_argument("--date", help="Data de referência (AAAA-MM-DD).")
+
+    lead_time_parser = subparsers.add_parser("lead-time", help="Define o prazo de reposição de um item.")
+    lead_time_parser.add_argument("item", type=int)
+    lead_time_parser.add_argument("days", type=float)
+
+    args = parser.parse_args(argv)
+    if args.command == "refresh":
+        print(json.dumps(refresh_reorder_points(args.date, full=args.full), ensure_ascii=False))
+    else:
+        set_lead_time(args.item, args.days)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 # app/stock/service.py
 from app.stock.stock_repository import StockRepository
+from app.stock import costing
+from app.database import archive
+from app.database.versioning import ConcurrencyError
 
 class StockService:
     def __init__(self):
@@ -18,15 +21,23 @@ class StockService:
         except Exception as e:
             return {"success": False, "message": f"Erro inesperado: {e}"}
 
-    def update_entry(self, entry_id, entry_date, typing_date, note_number, observacao, items):
+    def update_entry(self, entry_id, entry_date, typing_date, note_number, observacao, items, version=None):
+        """version: VERSAO lida com a nota; se outro terminal gravou depois, nada é gravado (conflict)."""
         if not all([entry_id, entry_date, typing_date, note_number]):
             return {"success": False, "message": "Todos os campos do cabeçalho são obrigatórios."}
         
         try:
             total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
-            self.stock_repository.update_entry_master(entry_id, entry_date, typing_date, note_number, observacao, total_value)
-            self.stock_repository.update_entry_items(entry_id, items)
-            return {"success": True, "message": "Nota de entrada atualizada com sucesso."}
+            # Cabeçalho e itens gravados juntos: se os itens falharem, o cabeçalho é desfeito
+            with self.stock_repository.db_manager.transaction():
+                new_version = self.stock_repository.update_entry_master(
+                    entry_id, entry_date, typing_date, note_number, observacao, total_value, version)
+                if not (new_version and self.stock_repository.update_entry_items(entry_id, items)):
+                    raise RuntimeError("falha ao gravar no banco de dados")
+            return {"success": True, "data": new_version, "message": "Nota de entrada atualizada com sucesso."}
+        except ConcurrencyError:
+            return {"success": False, "conflict": True,
+                    "message": "Esta nota de entrada foi alterada em outro terminal. Recarregue-a e tente novamente."}
         except Exception as e:
             return {"success": False, "message": f"Erro ao atualizar nota de entrada: {e}"}
             
@@ -66,13 +77,22 @@ class StockService:
             return {"success": False, "message": "Esta nota de entrada já foi finalizada."}
         if not details['items']:
             return {"success": False, "message": "Não é possível finalizar uma entrada sem itens."}
+        if archive.is_closed(details['master']['DATA_ENTRADA']):
+            return {"success": False, "message": f"O período até {archive.closed_until()} está fechado. Altere a data de entrada."}
 
         try:
-            success, total_value = self.stock_repository.finalize_entry(entry_id)
+            # Finalização e reprocessamento de nota retroativa: uma transação
+            with self.stock_repository.db_manager.transaction():
+                success, total_value = self.stock_repository.finalize_entry(entry_id)
+                if success:
+                    self._recompute_if_backdated(details)
             if success:
                 return {"success": True, "message": f"Entrada #{entry_id} finalizada com sucesso. Valor total: {total_value:.2f}"}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao finalizar a entrada."}
+        except ConcurrencyError:
+            return {"success": False, "conflict": True,
+                    "message": "Esta nota de entrada foi alterada em outro terminal. Recarregue-a e tente novamente."}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
 
@@ -88,14 +108,23 @@ class StockService:
             if details['master']['STATUS'] != 'Finalizada':
                 return {"success": False, "message": "Apenas notas finalizadas podem ser reabertas."}
 
-            success = self.stock_repository.reopen_entry(entry_id)
+            with self.stock_repository.db_manager.transaction():
+                success = self.stock_repository.reopen_entry(entry_id)
+                if success:
+                    self._recompute_if_backdated(details)
             if success:
                 return {"success": True, "message": f"Entrada #{entry_id} reaberta com sucesso. O estoque foi estornado."}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao tentar reabrir a entrada."}
+        except ConcurrencyError:
+            return {"success": False, "conflict": True,
+                    "message": "Esta nota de entrada foi alterada em outro terminal. Recarregue-a e tente novamente."}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
 
+    def _recompute_if_backdated(self, details):
+        costing.recompute_if_backdated([item['ID_INSUMO'] for item in details['items']], details['master']['DATA_ENTRADA'])
+
     def delete_entry(self, entry_id):
         if not entry_id:
             return {"success": False, "message": "ID da nota de entrada não fornecido."}
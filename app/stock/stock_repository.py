@@ -1,6 +1,11 @@
 # app/stock/stock_repository.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.child_sync import sync_child_rows
+from app.database.queries import SEARCH_QUERIES, as_record, fetch_all
+from app.database.versioning import update_versioned
+from app.models import EntryLine
+from app import events
 
 class StockRepository:
     def __init__(self):
@@ -9,43 +14,45 @@ class StockRepository:
     def create_entry(self, entry_date, typing_date, note_number, observacao):
         conn = self.db_manager.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, ?, ?, 'Em Aberto', 0.0)",
-                (entry_date, typing_date, note_number, observacao)
-            )
-            entry_id = cursor.lastrowid
-            conn.commit()
+            with self.db_manager.transaction():
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, ?, ?, 'Em Aberto', 0.0)",
+                    (entry_date, typing_date, note_number, observacao)
+                )
+                entry_id = cursor.lastrowid
+                self.db_manager.publish("ENTRADANOTA", events.INSERT, [entry_id])
             return entry_id
         except sqlite3.Error as e:
-            conn.rollback()
             print(f"Database error in create_entry: {e}")
             return None
 
-    def update_entry_master(self, entry_id, entry_date, typing_date, note_number, observacao, total_value):
+    def update_entry_master(self, entry_id, entry_date, typing_date, note_number, observacao, total_value, expected_version=None):
+        """Retorna a nova versão da nota (False em erro); ConcurrencyError se expected_version não confere."""
         conn = self.db_manager.get_connection()
         try:
-            conn.execute(
-                "UPDATE ENTRADANOTA SET DATA_ENTRADA = ?, DATA_DIGITACAO = ?, NUMERO_NOTA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
-                (entry_date, typing_date, note_number, observacao, total_value, entry_id)
-            )
-            conn.commit()
-            return True
+            with self.db_manager.transaction():
+                version = update_versioned(
+                    conn, "ENTRADANOTA", entry_id,
+                    "DATA_ENTRADA = ?, DATA_DIGITACAO = ?, NUMERO_NOTA = ?, OBSERVACAO = ?, VALOR_TOTAL = ?",
+                    (entry_date, typing_date, note_number, observacao, total_value), expected_version
+                )
+                self.db_manager.publish("ENTRADANOTA", events.UPDATE, [entry_id])
+            return version or False
         except sqlite3.Error:
-            conn.rollback()
             return False
 
     def update_entry_items(self, entry_id, items):
         conn = self.db_manager.get_connection()
         try:
-            with conn:
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
-                cursor.execute("DELETE FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (entry_id,))
-                if items:
-                    cursor.executemany(
-                        "INSERT INTO ENTRADANOTA_ITENS (ID_ENTRADA, ID_INSUMO, ID_FORNECEDOR, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?, ?)",
-                        [(entry_id, item['id_insumo'], item['id_fornecedor'], item['quantidade'], item['valor_unitario']) for item in items]
-                    )
+                sync_child_rows(
+                    cursor, "ENTRADANOTA_ITENS", "ID_ENTRADA", entry_id,
+                    ["ID_INSUMO"], ["ID_FORNECEDOR", "QUANTIDADE", "VALOR_UNITARIO"],
+                    [(item['id_insumo'], item['id_fornecedor'], item['quantidade'], item['valor_unitario']) for item in items or []]
+                )
+                self.db_manager.publish("ENTRADANOTA_ITENS", events.UPDATE, [entry_id])
             return True
         except sqlite3.Error:
             return False
@@ -55,55 +62,26 @@ class StockRepository:
         master = conn.execute("SELECT * FROM ENTRADANOTA WHERE ID = ?", (entry_id,)).fetchone()
         if not master:
             return None
-        items = conn.execute("""
+        items = fetch_all(conn, """
             SELECT tei.ID, tei.ID_INSUMO, tei.ID_FORNECEDOR, f.NOME_FANTASIA as FORNECEDOR, i.DESCRICAO, u.SIGLA, tei.QUANTIDADE, tei.VALOR_UNITARIO
             FROM ENTRADANOTA_ITENS tei
             JOIN ITEM i ON tei.ID_INSUMO = i.ID
             JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
             JOIN FORNECEDOR f ON tei.ID_FORNECEDOR = f.ID
             WHERE tei.ID_ENTRADA = ?
-        """, (entry_id,)).fetchall()
-        return {"master": dict(master), "items": [dict(row) for row in items]}
+        """, (entry_id,), as_record(EntryLine))
+        return {"master": dict(master), "items": items}
 
     def list_entries(self, search_term="", search_field="ID"):
         conn = self.db_manager.get_connection()
-        query = """
-            SELECT T.ID, T.DATA_ENTRADA, T.DATA_DIGITACAO, T.NUMERO_NOTA, T.VALOR_TOTAL, T.STATUS 
-            FROM ENTRADANOTA T
-        """
-        params = ()
-        if search_term:
-            # Mapeamento dos campos da UI para as colunas do banco de dados
-            field_map = {
-                "ID": "T.ID", 
-                "Nº Nota": "T.NUMERO_NOTA", 
-                "Data Entrada": "T.DATA_ENTRADA",
-                "Valor Total": "T.VALOR_TOTAL",
-                "Status": "T.STATUS"
-            }
-            column = field_map.get(search_field, "T.ID")
-
-            # Tratamento especial para cada tipo de campo
-            if search_field == "ID":
-                if search_term.isdigit():
-                    query += f" WHERE {column} = ?"
-                    params = (int(search_term),)
-                else: # Se o ID não for um número, não retorna nada
-                    return []
-            elif search_field == "Valor Total":
-                try:
-                    # Permite pesquisar valores aproximados
-                    query += f" WHERE {column} >= ? AND {column} < ?"
-                    val = float(search_term.replace(',', '.'))
-                    params = (val, val + 1)
-                except ValueError:
-                    return [] # Se não for um número válido, não retorna nada
-            else: # Para Nº Nota, Data Entrada, Status
-                query += f" WHERE {column} LIKE ?"
-                params = (f'%{search_term}%',)
-                
-        query += " ORDER BY T.ID DESC"
-        return [dict(row) for row in conn.execute(query, params).fetchall()]
+        search = SEARCH_QUERIES["stock_entries"]
+        if not search_term:
+            return fetch_all(conn, f"{search.sql} {search.suffix}")
+        try:
+            query, params = search.build(search_field if search_field in search.fields else "ID", search_term)
+        except ValueError:
+            return []
+        return fetch_all(conn, query, params)
 
     def finalize_entry(self, entry_id):
         conn = self.db_manager.get_connection()
@@ -112,25 +90,29 @@ class StockRepository:
             return False, 0
         
         try:
-            with conn:
+            movement_ids = []
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
-                total_value = 0
+                total_value = sum(item['QUANTIDADE'] * item['VALOR_UNITARIO'] for item in details['items'])
+                # A nota só é finalizada se ninguém a alterou (ou finalizou) depois da leitura
+                update_versioned(cursor, "ENTRADANOTA", entry_id, "VALOR_TOTAL = ?, STATUS = 'Finalizada'",
+                                 (total_value,), details['master']['VERSAO'])
                 for item in details['items']:
                     insumo_id, quantity, unit_cost = item['ID_INSUMO'], item['QUANTIDADE'], item['VALOR_UNITARIO']
-                    total_value += quantity * unit_cost
-                    current_item = cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (insumo_id,)).fetchone()
+                    current_item = cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO, VERSAO FROM ITEM WHERE ID = ?", (insumo_id,)).fetchone()
                     old_balance, old_avg_cost = current_item['SALDO_ESTOQUE'], current_item['CUSTO_MEDIO']
                     new_balance = old_balance + quantity
                     new_avg_cost = ((old_balance * old_avg_cost) + (quantity * unit_cost)) / new_balance if new_balance > 0 else 0
-                    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_balance, new_avg_cost, insumo_id))
+                    update_versioned(cursor, "ITEM", insumo_id, "SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?",
+                                     (new_balance, new_avg_cost), current_item['VERSAO'])
                     cursor.execute(
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Entrada por Nota', ?, ?, ?)",
                         (insumo_id, quantity, unit_cost, details['master']['DATA_ENTRADA'])
                     )
-                cursor.execute("UPDATE ENTRADANOTA SET VALOR_TOTAL = ?, STATUS = 'Finalizada' WHERE ID = ?", (total_value, entry_id))
+                    movement_ids.append(cursor.lastrowid)
+                self._publish_stock_change(entry_id, details, movement_ids)
             return True, total_value
         except sqlite3.Error:
-            conn.rollback()
             return False, 0
             
     def reopen_entry(self, entry_id):
@@ -140,13 +122,16 @@ class StockRepository:
             return False
             
         try:
-            with conn:
+            movement_ids = []
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
+                # Muda o status da nota para 'Em Aberto', se ninguém a alterou depois da leitura
+                update_versioned(cursor, "ENTRADANOTA", entry_id, "STATUS = 'Em Aberto'", (), details['master']['VERSAO'])
                 for item in details['items']:
                     insumo_id, quantity, unit_cost = item['ID_INSUMO'], item['QUANTIDADE'], item['VALOR_UNITARIO']
                     
                     # Estorna o estoque
-                    current_item = cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (insumo_id,)).fetchone()
+                    current_item = cursor.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO, VERSAO FROM ITEM WHERE ID = ?", (insumo_id,)).fetchone()
                     old_balance, old_avg_cost = current_item['SALDO_ESTOQUE'], current_item['CUSTO_MEDIO']
                     
                     new_balance = old_balance - quantity
@@ -156,35 +141,39 @@ class StockRepository:
                     # Se o saldo zerar, o custo médio também zera.
                     new_avg_cost = ((old_balance * old_avg_cost) - (quantity * unit_cost)) / new_balance if new_balance > 0 else 0
                     
-                    cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_balance, new_avg_cost, insumo_id))
+                    update_versioned(cursor, "ITEM", insumo_id, "SALDO_ESTOQUE = ?, CUSTO_MEDIO = ?",
+                                     (new_balance, new_avg_cost), current_item['VERSAO'])
 
                     # Adiciona um movimento de estorno para rastreabilidade
                     cursor.execute(
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Estorno de Entrada', ?, ?, ?)",
                         (insumo_id, -quantity, unit_cost, details['master']['DATA_ENTRADA'])
                     )
-
-                # Muda o status da nota para 'Em Aberto'
-                cursor.execute("UPDATE ENTRADANOTA SET STATUS = 'Em Aberto' WHERE ID = ?", (entry_id,))
+                    movement_ids.append(cursor.lastrowid)
+                self._publish_stock_change(entry_id, details, movement_ids)
             return True
         except sqlite3.Error as e:
             print(f"Database error in reopen_entry: {e}")
-            conn.rollback()
             return False
 
+    def _publish_stock_change(self, entry_id, details, movement_ids):
+        self.db_manager.publish("ENTRADANOTA", events.UPDATE, [entry_id])
+        self.db_manager.publish("ITEM", events.UPDATE, {item['ID_INSUMO'] for item in details['items']})
+        self.db_manager.publish("MOVIMENTO", events.INSERT, movement_ids)
+
     def delete_entry(self, entry_id):
         conn = self.db_manager.get_connection()
         try:
-            with conn:
+            with self.db_manager.transaction():
                 cursor = conn.cursor()
                 # Primeiro, deleta os itens da nota
                 cursor.execute("DELETE FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (entry_id,))
                 # Depois, deleta a nota principal
                 cursor.execute("DELETE FROM ENTRADANOTA WHERE ID = ?", (entry_id,))
+                self.db_manager.publish("ENTRADANOTA", events.DELETE, [entry_id])
             return True
         except sqlite3.Error as e:
             print(f"Database error in delete_entry: {e}")
-            conn.rollback()
             return False
 
     def get_item_details(self, item_id):
@@ -5,8 +5,7 @@ from PySide6.QtWidgets import (
     QLabel, QDateEdit, QAbstractItemView, QDateTimeEdit
 )
 from PySide6.QtCore import QDate, Qt, QDateTime, QEvent
-from app.stock.service import StockService
-from app.supplier.service import SupplierService
+from app.server import backend
 from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db, format_qdatetime_for_db
 from app.item.ui_search_window import ItemSearchWindow
 from app.supplier.ui_search_window import SupplierSearchWindow
@@ -42,9 +41,10 @@ class EntryEditWindow(QWidget):
     def __init__(self, entry_id=None):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.stock_service = StockService()
-        self.supplier_service = SupplierService()
+        self.stock_service = backend.service("StockService")
+        self.supplier_service = backend.service("SupplierService")
         self.current_entry_id = entry_id
+        self.current_version = None
         self.selected_supplier_id = None
         self.search_item_window = None
         self.search_supplier_window = None
@@ -154,6 +154,7 @@ class EntryEditWindow(QWidget):
 
     def new_entry(self):
         self.current_entry_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Entrada de Insumo")
         self.entry_id_display.setText("(Nova)")
         self.date_input.setDate(QDate.currentDate())
@@ -181,11 +182,15 @@ class EntryEditWindow(QWidget):
             })
 
         if self.current_entry_id:
-            response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items)
+            response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items,
+                                                       self.current_version)
             if response["success"]:
+                self.current_version = response["data"]
                 show_success_message(self, "Sucesso", response["message"])
             else:
                 show_error_message(self, "Error", response["message"])
+                if response.get("conflict"):
+                    self.load_entry_data()
         else:
             # Primeiro, cria a entrada mestre para obter um ID
             create_response = self.stock_service.create_entry(entry_date, typing_date, note_number, observacao)
@@ -195,6 +200,7 @@ class EntryEditWindow(QWidget):
                 # Agora, chama o update para salvar os itens e o valor total
                 update_response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items)
                 if update_response["success"]:
+                    self.current_version = update_response["data"]
                     self.setWindowTitle(f"Editando Entrada #{self.current_entry_id}")
                     self.entry_id_display.setText(str(self.current_entry_id))
                     show_success_message(self, "Sucesso", "Nota de entrada criada e salva com sucesso.")
@@ -213,6 +219,7 @@ class EntryEditWindow(QWidget):
 
         details = response["data"]
         master = details['master']
+        self.current_version = master.get('VERSAO')
         self.entry_id_display.setText(str(master['ID']))
         self.date_input.setDate(QDate.fromString(master['DATA_ENTRADA'], "yyyy-MM-dd"))
         self.typing_date_input.setDateTime(QDateTime.fromString(master['DATA_DIGITACAO'], "yyyy-MM-dd HH:mm:ss"))
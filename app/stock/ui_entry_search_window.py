@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtCore import Qt
-from app.stock.service import StockService
+from app.server import backend
 from app.utils.ui_utils import show_error_message, configure_table_columns
 from app.stock.ui_entry_edit_window import EntryEditWindow
 from app.utils.date_utils import format_date_for_display
@@ -27,7 +27,7 @@ class EntrySearchWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.stock_service = StockService()
+        self.stock_service = backend.service("StockService")
         self.edit_window = None
         self.setWindowTitle("Pesquisa de Entradas de Insumo")
         self.setGeometry(200, 200, 900, 700)
@@ -22,9 +22,9 @@ class SupplierService:
         except Exception as e:
             return {"success": False, "message": f"Erro ao adicionar fornecedor: {e}"}
 
-    def get_all_suppliers(self):
+    def get_all_suppliers(self, ids=None):
         try:
-            suppliers = self.supplier_repository.get_all()
+            suppliers = self.supplier_repository.get_all(ids)
             return {"success": True, "data": suppliers}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar fornecedores: {e}"}
@@ -69,9 +69,9 @@ class SupplierService:
         except Exception as e:
             return {"success": False, "message": f"Erro no banco de dados ao tentar excluir o fornecedor: {e}"}
 
-    def search_suppliers(self, search_field, search_text):
+    def search_suppliers(self, search_field, search_text, ids=None):
         try:
-            suppliers = self.supplier_repository.search(search_text, search_field)
+            suppliers = self.supplier_repository.search(search_text, search_field, ids)
             return {"success": True, "data": suppliers}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar fornecedores: {e}"}
@@ -1,6 +1,8 @@
 # app/supplier/supplier_repository.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.queries import SEARCH_QUERIES
+from app import events
 
 class SupplierRepository:
     def __init__(self):
@@ -9,24 +11,30 @@ class SupplierRepository:
     def add(self, razao_social, nome_fantasia, cnpj, phone, email, address, status):
         conn = self.db_manager.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """INSERT INTO FORNECEDOR 
-                   (RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF, CEP, STATUS) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (razao_social, nome_fantasia, cnpj, phone, email, address['logradouro'], address['numero'], address['complemento'], 
-                 address['bairro'], address['cidade'], address['uf'], address['cep'], status)
-            )
-            new_id = cursor.lastrowid
-            conn.commit()
+            with self.db_manager.transaction():
+                cursor = conn.cursor()
+                cursor.execute(
+                    """INSERT INTO FORNECEDOR 
+                       (RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF, CEP, STATUS) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (razao_social, nome_fantasia, cnpj, phone, email, address['logradouro'], address['numero'], address['complemento'], 
+                     address['bairro'], address['cidade'], address['uf'], address['cep'], status)
+                )
+                new_id = cursor.lastrowid
+                self.db_manager.publish("FORNECEDOR", events.INSERT, [new_id])
             return new_id
         except sqlite3.IntegrityError:
-            conn.rollback()
             return None
 
-    def get_all(self):
+    def get_all(self, ids=None):
+        """Todos os fornecedores ou, com ids, apenas os informados (atualização incremental das janelas)."""
         conn = self.db_manager.get_connection()
-        return conn.execute("SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR ORDER BY NOME_FANTASIA").fetchall()
+        query = "SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR"
+        params = ()
+        if ids is not None:
+            query += f" WHERE ID IN ({', '.join('?' * len(ids))})"
+            params = tuple(ids)
+        return conn.execute(query + " ORDER BY NOME_FANTASIA", params).fetchall()
 
     def get_by_id(self, supplier_id):
         conn = self.db_manager.get_connection()
@@ -35,30 +43,31 @@ class SupplierRepository:
     def update(self, supplier_id, razao_social, nome_fantasia, cnpj, phone, email, address, status):
         conn = self.db_manager.get_connection()
         try:
-            conn.execute(
-                """UPDATE FORNECEDOR 
-                   SET RAZAO_SOCIAL = ?, NOME_FANTASIA = ?, CNPJ = ?, TELEFONE = ?, EMAIL = ?, 
-                       LOGRADOURO = ?, NUMERO = ?, COMPLEMENTO = ?, BAIRRO = ?, 
-                       CIDADE = ?, UF = ?, CEP = ?, STATUS = ?
-                   WHERE ID = ?""",
-                (razao_social, nome_fantasia, cnpj, phone, email, address['logradouro'], address['numero'], address['complemento'], 
-                 address['bairro'], address['cidade'], address['uf'], address['cep'], status, supplier_id)
-            )
-            conn.commit()
+            with self.db_manager.transaction():
+                conn.execute(
+                    """UPDATE FORNECEDOR 
+                       SET RAZAO_SOCIAL = ?, NOME_FANTASIA = ?, CNPJ = ?, TELEFONE = ?, EMAIL = ?, 
+                           LOGRADOURO = ?, NUMERO = ?, COMPLEMENTO = ?, BAIRRO = ?, 
+                           CIDADE = ?, UF = ?, CEP = ?, STATUS = ?
+                       WHERE ID = ?""",
+                    (razao_social, nome_fantasia, cnpj, phone, email, address['logradouro'], address['numero'], address['complemento'], 
+                     address['bairro'], address['cidade'], address['uf'], address['cep'], status, supplier_id)
+                )
+                self.db_manager.publish("FORNECEDOR", events.UPDATE, [supplier_id])
             return True
         except sqlite3.IntegrityError:
-            conn.rollback()
             return False
 
     def delete(self, supplier_id):
         conn = self.db_manager.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM FORNECEDOR WHERE ID = ?", (supplier_id,))
-            conn.commit()
+            with self.db_manager.transaction():
+                cursor.execute("DELETE FROM FORNECEDOR WHERE ID = ?", (supplier_id,))
+                if cursor.rowcount > 0:
+                    self.db_manager.publish("FORNECEDOR", events.DELETE, [supplier_id])
             return cursor.rowcount > 0
         except sqlite3.Error:
-            conn.rollback()
             return False
 
     def is_referenced_by_items(self, supplier_id):
@@ -73,22 +82,8 @@ class SupplierRepository:
         cursor.execute("SELECT 1 FROM ENTRADANOTA_ITENS WHERE ID_FORNECEDOR = ?", (supplier_id,))
         return cursor.fetchone() is not None
             
-    def search(self, search_text, search_field):
+    def search(self, search_text, search_field, ids=None):
         conn = self.db_manager.get_connection()
-        
-        field_map = {
-            "Razão Social": "RAZAO_SOCIAL",
-            "Nome Fantasia": "NOME_FANTASIA",
-            "CNPJ": "CNPJ"
-        }
-        
-        column = field_map.get(search_field, "NOME_FANTASIA")
-        
-        if column == 'CNPJ':
-            query = f"SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR WHERE {column} = ?"
-            params = (search_text,)
-        else:
-            query = f"SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR WHERE {column} LIKE ?"
-            params = (f'%{search_text}%',)
-            
+        search = SEARCH_QUERIES["suppliers"]
+        query, params = search.build(search_field if search_field in search.fields else "Nome Fantasia", search_text, ids)
         return conn.execute(query, params).fetchall()
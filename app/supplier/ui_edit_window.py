@@ -6,7 +6,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QRegularExpressionValidator
 from PySide6.QtCore import QRegularExpression
-from app.supplier.service import SupplierService
+from app.server import backend
 from app.utils.ui_utils import (
     show_error_message, show_success_message, 
     show_confirmation_message
@@ -33,7 +33,7 @@ class SupplierEditWindow(QWidget):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
 
-        self.supplier_service = SupplierService()
+        self.supplier_service = backend.service("SupplierService")
         self.current_supplier_id = supplier_id
         
         title = f"Editando Fornecedor #{supplier_id}" if supplier_id else "Novo Fornecedor"
@@ -3,10 +3,10 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLineEdit,
     QPushButton, QTableView, QHeaderView, QAbstractItemView, QComboBox
 )
-from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtCore import Signal, Qt
-from app.supplier.service import SupplierService
-from app.utils.ui_utils import show_error_message, configure_table_columns
+from app.server import backend
+from app.utils.ui_utils import show_error_message, configure_table_columns, ChangeEventRelay
+from app.utils.table_models import RecordTableModel, RawSortProxyModel, TableColumn
 from app.supplier.ui_edit_window import SupplierEditWindow
 
 from app.styles.buttons_styles import (
@@ -35,7 +35,7 @@ class SupplierSearchWindow(QWidget):
     def __init__(self, selection_mode=False):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.supplier_service = SupplierService()
+        self.supplier_service = backend.service("SupplierService")
         self.edit_window = None
         self.selection_mode = selection_mode
 
@@ -46,6 +46,10 @@ class SupplierSearchWindow(QWidget):
         self.setup_ui()
         self.load_suppliers()
 
+        # Alterações gravadas em outras janelas atualizam apenas as linhas afetadas
+        self.change_relay = ChangeEventRelay(("FORNECEDOR",), self)
+        self.change_relay.changed.connect(self.on_data_changed)
+
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
 
@@ -80,9 +84,17 @@ class SupplierSearchWindow(QWidget):
         results_group = QGroupBox("Fornecedores Cadastrados")
         results_layout = QVBoxLayout()
         self.table_view = QTableView()
-        self.table_model = QStandardItemModel()
-        self.table_model.setHorizontalHeaderLabels(["ID", "Razão Social", "Nome Fantasia", "CNPJ", "Telefone", "Email", "Status"])
-        self.table_view.setModel(self.table_model)
+        self.table_model = RecordTableModel([
+            TableColumn("ID", "ID"),
+            TableColumn("Razão Social", "RAZAO_SOCIAL"),
+            TableColumn("Nome Fantasia", "NOME_FANTASIA"),
+            TableColumn("CNPJ", "CNPJ"),
+            TableColumn("Telefone", "TELEFONE"),
+            TableColumn("Email", "EMAIL"),
+            TableColumn("Status", "STATUS"),
+        ], parent=self)
+        self.proxy_model = RawSortProxyModel(self.table_model, self)
+        self.table_view.setModel(self.proxy_model)
         self.table_view.setAlternatingRowColors(True)
         self.table_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -92,6 +104,8 @@ class SupplierSearchWindow(QWidget):
         header = self.table_view.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
         header.setStretchLastSection(False)
+        self.table_view.setSortingEnabled(True)
+        header.setSortIndicator(-1, Qt.AscendingOrder)  # mantém a ordem da consulta até o usuário ordenar
         self.table_view.doubleClicked.connect(self.handle_double_click)
         results_layout.addWidget(self.table_view)
         results_group.setLayout(results_layout)
@@ -101,50 +115,56 @@ class SupplierSearchWindow(QWidget):
         super().showEvent(event)
         configure_table_columns(self.table_view, total_width=self.table_view.viewport().width())
 
-    def load_suppliers(self):
-        self.table_model.removeRows(0, self.table_model.rowCount())
-        search_text = self.search_input.text()
-        search_field = self.search_field_combo.currentText()
-
+    def _fetch_suppliers(self, ids=None):
+        """Executa a pesquisa atual, opcionalmente restrita a ids."""
+        search_field, search_text = self.current_search
         if search_text:
-            response = self.supplier_service.search_suppliers(search_field, search_text)
-        else:
-            response = self.supplier_service.get_all_suppliers()
-            
-        if response["success"]:
-            for supplier in response["data"]:
-                supplier_data = {
-                    'ID': supplier['ID'],
-                    'RAZAO_SOCIAL': _safe_str(supplier['RAZAO_SOCIAL']),
-                    'NOME_FANTASIA': _safe_str(supplier['NOME_FANTASIA']),
-                    'CNPJ': _safe_str(supplier['CNPJ']),
-                    'TELEFONE': _safe_str(supplier['TELEFONE']),
-                    'EMAIL': _safe_str(supplier['EMAIL'])
-                }
-
-                id_item = QStandardItem(str(supplier['ID']))
-                id_item.setData(supplier_data, Qt.UserRole)
-                
-                row = [
-                    id_item,
-                    QStandardItem(supplier_data['RAZAO_SOCIAL']),
-                    QStandardItem(supplier_data['NOME_FANTASIA']),
-                    QStandardItem(supplier_data['CNPJ']),
-                    QStandardItem(supplier_data['TELEFONE']),
-                    QStandardItem(supplier_data['EMAIL']),
-                    QStandardItem(supplier['STATUS'])
-                ]
-                self.table_model.appendRow(row)
+            response = self.supplier_service.search_suppliers(search_field, search_text, ids)
         else:
+            response = self.supplier_service.get_all_suppliers(ids)
+
+        if not response["success"]:
             show_error_message(self, "Error", response["message"])
-            
+            return None
+        return response["data"]
+
+    def load_suppliers(self):
+        self.current_search = (self.search_field_combo.currentText(), self.search_input.text())
+        self.table_model.set_rows(self._fetch_suppliers() or [])
+
+    def on_data_changed(self, event):
+        """Atualiza, inclui ou remove somente as linhas dos fornecedores alterados."""
+        if not event.ids:
+            self.load_suppliers()
+            return
+        suppliers = self._fetch_suppliers(list(event.ids))
+        if suppliers is None:
+            return
+        current = {supplier['ID']: supplier for supplier in suppliers}
+        for supplier_id in event.ids:
+            row = self.table_model.find(supplier_id)
+            if supplier_id not in current:
+                if row is not None:
+                    self.table_model.remove_row(row)
+            elif row is None:
+                self.table_model.append_row(current[supplier_id])
+            else:
+                self.table_model.update_row(row, current[supplier_id])
+
     def handle_double_click(self, model_index):
-        item_data = self.table_model.item(model_index.row(), 0).data(Qt.UserRole)
+        supplier = self.proxy_model.row_data(model_index)
         if self.selection_mode:
-            self.supplier_selected.emit(item_data)
+            self.supplier_selected.emit({
+                'ID': supplier['ID'],
+                'RAZAO_SOCIAL': _safe_str(supplier['RAZAO_SOCIAL']),
+                'NOME_FANTASIA': _safe_str(supplier['NOME_FANTASIA']),
+                'CNPJ': _safe_str(supplier['CNPJ']),
+                'TELEFONE': _safe_str(supplier['TELEFONE']),
+                'EMAIL': _safe_str(supplier['EMAIL'])
+            })
             self.close()
         else:
-            self.open_edit_supplier_window(item_data['ID'])
+            self.open_edit_supplier_window(supplier['ID'])
 
     def open_new_supplier_window(self):
         self.show_edit_window(supplier_id=None)
@@ -167,22 +187,5 @@ class SupplierSearchWindow(QWidget):
         self.edit_window.show()
 
     def on_edit_window_closed(self):
+        """Limpa a referência da janela de edição (as alterações chegam por on_data_changed)."""
         self.edit_window = None
-        self.load_suppliers()
-
-    def search_suppliers(self, search_field, search_text):
-        response = self.supplier_service.search_suppliers(search_field, search_text)
-        if response["success"]:
-            self.table_model.removeRows(0, self.table_model.rowCount())
-            for supplier in response["data"]:
-                row = [
-                    QStandardItem(str(supplier['ID'])),
-                    QStandardItem(supplier['RAZAO_SOCIAL']),
-                    QStandardItem(supplier['NOME_FANTASIA']),
-                    QStandardItem(supplier['CNPJ']),
-                    QStandardItem(supplier['TELEFONE']),
-                    QStandardItem(supplier['EMAIL'])
-                ]
-                self.table_model.appendRow(row)
-        else:
-            show_error_message(self, "Error", response["message"])
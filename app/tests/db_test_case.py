@@ -0,0 +1,55 @@
+import sys
+import os
+import tempfile
+import shutil
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database.db import DatabaseManager
+from app.benchmark.synthetic_data import generate_dataset
+
+# Tipos de movimento que a aplicação grava com quantidade negativa
+NEGATIVE_MOVEMENTS = ('Saída por Venda', 'Estorno de Entrada')
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Base dos testes com banco: DADOS.DB em uma pasta temporária, singleton recriado a cada
+    teste. Com `seed`, o banco recebe o conjunto sintético "tiny" gerado com essa semente.
+    """
+
+    seed = None
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+        self.db_path = os.path.join(self.work_dir, "DADOS.DB")
+        DatabaseManager.reset_instance()
+        self.db_manager = self.open_database()
+        self.conn = self.db_manager.get_connection()
+        if self.seed is not None:
+            generate_dataset(self.conn, "tiny", seed=self.seed)
+            self.conn.commit()
+
+    def tearDown(self):
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def open_database(self):
+        return DatabaseManager(self.db_path)
+
+    def add_item(self, description, balance, monthly_demand=(), cost=1.0, movement_type='Saída por OP', day=10):
+        """Insumo com uma saída por mês de 2024 (zeros são pulados), gravada com o sinal da aplicação."""
+        sign = -1 if movement_type in NEGATIVE_MOVEMENTS else 1
+        unit = self.conn.execute("SELECT MIN(ID) FROM UNIDADE").fetchone()[0]
+        item_id = self.conn.execute(
+            "INSERT INTO ITEM (DESCRICAO, TIPO_ITEM, ID_UNIDADE, SALDO_ESTOQUE, CUSTO_MEDIO) VALUES (?, 'Insumo', ?, ?, ?)",
+            (description, unit, balance, cost)).lastrowid
+        for month, quantity in enumerate(monthly_demand, start=1):
+            if quantity:
+                self.conn.execute(
+                    "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, DATA_MOVIMENTO) VALUES (?, ?, ?, ?)",
+                    (item_id, movement_type, sign * quantity, f"2024-{month:02d}-{day:02d}"))
+        self.conn.commit()
+        return item_id
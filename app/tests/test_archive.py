@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.database import archive
+from app.stock import costing
+
+class TestArchive(DatabaseTestCase):
+
+    seed = 5
+
+    def setUp(self):
+        super().setUp()
+        costing.rebuild_costs(workers=1)
+
+    def _snapshot(self):
+        return {
+            "movements": sorted(map(tuple, (r.values() for r in self.db_manager.get_stock_movements({})))),
+            "entries": len(self.db_manager.get_stock_entries({})),
+            "orders": len(self.db_manager.get_production_orders({})),
+            "profit": self.db_manager.get_profit_by_period({}),
+        }
+
+    def test_close_period_keeps_reports_and_balances(self):
+        before = self._snapshot()
+        recent = self.db_manager.get_stock_movements({"periodo_de": "2024-12-01"})
+
+        summary = archive.close_period("2024-11-15")
+        self.assertIn(2024, summary)
+        self.assertGreater(summary[2024]["MOVIMENTO"], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.work_dir, "DADOS_2024.DB")))
+        old_hot = self.conn.execute(
+            "SELECT COUNT(*) FROM MOVIMENTO WHERE DATA_MOVIMENTO < '2024-11-15' AND TIPO_MOVIMENTO <> 'Saldo Inicial'").fetchone()[0]
+        self.assertEqual(old_hot, 0)
+
+        # Períodos abertos não anexam os arquivos; o histórico completo continua igual
+        self.assertEqual(self.db_manager.history_sources("MOVIMENTO", date_from="2024-12-01"), {"MOVIMENTO": "MOVIMENTO"})
+        self.assertEqual(self.db_manager.get_stock_movements({"periodo_de": "2024-12-01"}), recent)
+        after = self._snapshot()
+        self.assertEqual(after["movements"], before["movements"])
+        self.assertEqual(after["entries"], before["entries"])
+        self.assertEqual(after["orders"], before["orders"])
+        self.assertAlmostEqual(after["profit"]["total_vendas"], before["profit"]["total_vendas"])
+
+        # O saldo inicial reproduz saldo e custo médio no recálculo a partir do período aberto
+        self.assertEqual(costing.rebuild_costs(workers=1, dry_run=True), [])
+
+        archive.close_period("2024-12-01")
+        self.assertEqual(self._snapshot()["movements"], before["movements"])
+        self.assertEqual(costing.rebuild_costs(workers=1, dry_run=True), [])
+        with self.assertRaises(ValueError):
+            archive.close_period("2024-10-01")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+
+import sys
+import os
+import json
+import tempfile
+import shutil
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database.db import DatabaseManager
+from app.benchmark.synthetic_data import generate_dataset
+from app.benchmark.run_benchmark import run_size, report_methods, compare
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+
+    def tearDown(self):
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_generate_dataset_is_consistent(self):
+        DatabaseManager.reset_instance()
+        db_manager = DatabaseManager(os.path.join(self.work_dir, "DADOS.DB"))
+        conn = db_manager.get_connection()
+        generated = generate_dataset(conn, "tiny", seed=1)
+
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM ITEM").fetchone()[0], generated["items"])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM MOVIMENTO").fetchone()[0], generated["movements"])
+        self.assertGreaterEqual(generated["movements"], 50)
+        # Movimentos de venda são gravados com quantidade negativa, como em finalize_sale
+        positive_sales = conn.execute(
+            "SELECT COUNT(*) FROM MOVIMENTO WHERE TIPO_MOVIMENTO = 'Saída por Venda' AND QUANTIDADE > 0").fetchone()[0]
+        self.assertEqual(positive_sales, 0)
+
+    def test_run_size_covers_every_report_method(self):
+        result = run_size("tiny", repeat=1, work_dir=self.work_dir)
+
+        operations = {r["operation"] for r in result["results"]}
+        DatabaseManager.reset_instance()
+        db_manager = DatabaseManager(os.path.join(self.work_dir, "OUTRO.DB"))
+        for name in report_methods(db_manager):
+            self.assertIn(f"report.{name}", operations)
+        self.assertIn("repository.stock.entry_cycle", operations)
+        json.dumps(result)
+
+    def test_compare_reports_ratio(self):
+        baseline = {"runs": [{"results": [{"size": "tiny", "operation": "report.x", "median_ms": 2.0}]}]}
+        current = {"runs": [{"results": [{"size": "tiny", "operation": "report.x", "median_ms": 1.0}]}]}
+
+        rows = compare(current, baseline)
+
+        self.assertEqual(rows, [("tiny", "report.x", 2.0, 1.0, 0.5)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import csv
+import json
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database import cdc, maintenance
+from app.tests.db_test_case import DatabaseTestCase
+from app.item.service import ItemService
+
+class TestChangeDataCapture(DatabaseTestCase):
+
+    seed = 7
+
+    def _read_jsonl(self, directory, table):
+        with open(os.path.join(directory, f"{table}.jsonl"), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_first_extract_is_a_full_load(self):
+        output = os.path.join(self.work_dir, "carga")
+        manifest = cdc.extract(self.db_manager, output, "csv", consumer="dw")
+        self.assertTrue(manifest["completa"])
+        self.assertEqual(manifest["ate"], cdc.last_change_id(self.conn))
+        items = self.conn.execute("SELECT COUNT(*) FROM ITEM").fetchone()[0]
+        self.assertEqual(manifest["arquivos"]["ITEM"]["linhas"], items)
+        with open(os.path.join(output, "ITEM.csv"), encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        self.assertEqual(rows[0][:5], ["CDC_ID", "CDC_OPERACAO", "CDC_ID_LINHA", "CDC_VERSAO", "ID"])
+        self.assertEqual(len(rows), items + 1)
+
+    def test_incremental_extract_and_compaction(self):
+        cdc.acknowledge(self.db_manager, "dw", cdc.last_change_id(self.conn))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM CDC_LOG").fetchone()[0], 0)
+
+        material_id = self.conn.execute("SELECT ID FROM ITEM WHERE TIPO_ITEM = 'Insumo' ORDER BY ID LIMIT 1").fetchone()[0]
+        self.assertTrue(ItemService().manual_input_material(material_id, 5, 50.0)["success"])
+        self.assertTrue(ItemService().manual_input_material(material_id, 2, 20.0)["success"])
+        with self.db_manager.transaction():
+            unit_id = self.conn.execute("INSERT INTO UNIDADE (NOME, SIGLA) VALUES ('Caixa', 'cx')").lastrowid
+            self.conn.execute("DELETE FROM UNIDADE WHERE ID = ?", (unit_id,))
+
+        output = os.path.join(self.work_dir, "incremental")
+        manifest = cdc.extract(self.db_manager, output, "jsonl", consumer="dw")
+        self.assertFalse(manifest["completa"])
+        self.assertEqual(set(manifest["arquivos"]), {"ITEM", "MOVIMENTO", "UNIDADE"})
+        # Duas alterações do mesmo item: uma linha, com os valores atuais
+        [item] = self._read_jsonl(output, "ITEM")
+        stored = self.conn.execute("SELECT SALDO_ESTOQUE, VERSAO FROM ITEM WHERE ID = ?", (material_id,)).fetchone()
+        self.assertEqual((item["CDC_OPERACAO"], item["ID"], item["SALDO_ESTOQUE"]), ("U", material_id, stored[0]))
+        self.assertEqual(item["CDC_VERSAO"], stored[1])
+        self.assertEqual(len(self._read_jsonl(output, "MOVIMENTO")), 2)
+        [unit] = self._read_jsonl(output, "UNIDADE")
+        self.assertEqual((unit["CDC_OPERACAO"], unit["CDC_ID_LINHA"], unit["ID"]), ("D", unit_id, None))
+
+        removed = cdc.acknowledge(self.db_manager, "dw", manifest["ate"])
+        self.assertGreater(removed, 0)
+        self.assertEqual(cdc.extract(self.db_manager, output, "jsonl", consumer="dw")["arquivos"], {})
+        with self.assertRaises(ValueError):
+            cdc.extract(self.db_manager, output, "jsonl", since=0)
+
+    def test_log_is_bounded_without_consumers(self):
+        last = cdc.last_change_id(self.conn)
+        self.assertGreater(last, 0)
+        self.conn.execute("UPDATE CDC_LOG SET DATA = datetime('now', '-30 days') WHERE ID <= ?", (last // 2,))
+        self.conn.execute("UPDATE CDC_LOG SET DATA = datetime('now', '-200 days') WHERE ID <= ?", (last // 4,))
+        self.conn.commit()
+
+        # Sem consumidores: ficam só os últimos RETENTION_DAYS dias
+        self.assertEqual(maintenance.compact_change_log(self.db_path), last // 2)
+        self.assertEqual(cdc.first_change_id(self.conn), last // 2 + 1)
+        self.assertEqual(cdc.last_change_id(self.conn), last)
+
+        # Consumidor parado: retém o log, mas só até MAX_RETENTION_DAYS
+        cdc.acknowledge(self.db_manager, "dw", 0)
+        self.conn.execute("UPDATE CDC_LOG SET DATA = datetime('now', '-200 days') WHERE ID <= ?", (last * 3 // 4,))
+        self.conn.execute("UPDATE CDC_LOG SET DATA = datetime('now', '-30 days') WHERE ID > ?", (last * 3 // 4,))
+        self.conn.commit()
+        self.assertEqual(maintenance.compact_change_log(self.db_path), last * 3 // 4 - last // 2)
+        with self.assertRaises(ValueError):
+            cdc.extract(self.db_manager, os.path.join(self.work_dir, "atrasada"), "jsonl", consumer="dw")
+
+if __name__ == '__main__':
+    unittest.main()
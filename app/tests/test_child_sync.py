@@ -0,0 +1,49 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.database.child_sync import sync_child_rows
+from app.stock.stock_repository import StockRepository
+
+class TestChildSync(DatabaseTestCase):
+
+    seed = 4
+
+    def test_only_changed_rows_are_written(self):
+        products = [row[0] for row in self.conn.execute("SELECT ID FROM ITEM ORDER BY ID LIMIT 4")]
+        line_id = self.conn.execute("INSERT INTO LINHAPRODUCAO (NOME) VALUES ('Linha Teste')").lastrowid
+        cursor = self.conn.cursor()
+        self.assertEqual(sync_child_rows(cursor, "LINHAPRODUCAO_ITEMS", "ID_LINHA_PRODUCAO", line_id,
+                                         ["ID_PRODUTO"], ["QUANTIDADE"], [(p, 1.0) for p in products[:3]]), (3, 0, 0))
+        original_ids = {row[0]: row[1] for row in self.conn.execute(
+            "SELECT ID_PRODUTO, ID FROM LINHAPRODUCAO_ITEMS WHERE ID_LINHA_PRODUCAO = ?", (line_id,))}
+
+        result = sync_child_rows(cursor, "LINHAPRODUCAO_ITEMS", "ID_LINHA_PRODUCAO", line_id, ["ID_PRODUTO"], ["QUANTIDADE"],
+                                 [(products[0], 1.0), (products[1], 5.0), (products[3], 2.0)])
+        self.assertEqual(result, (1, 1, 1))
+        rows = {row[0]: (row[1], row[2]) for row in self.conn.execute(
+            "SELECT ID_PRODUTO, ID, QUANTIDADE FROM LINHAPRODUCAO_ITEMS WHERE ID_LINHA_PRODUCAO = ?", (line_id,))}
+        self.assertEqual(set(rows), {products[0], products[1], products[3]})
+        self.assertEqual(rows[products[0]][0], original_ids[products[0]])
+        self.assertEqual(rows[products[1]], (original_ids[products[1]], 5.0))
+
+    def test_update_entry_items_touches_one_row(self):
+        entry_id = self.conn.execute(
+            "SELECT ID_ENTRADA FROM ENTRADANOTA_ITENS GROUP BY ID_ENTRADA ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        items = [{"id_insumo": row['ID_INSUMO'], "id_fornecedor": row['ID_FORNECEDOR'],
+                  "quantidade": row['QUANTIDADE'], "valor_unitario": row['VALOR_UNITARIO']}
+                 for row in self.conn.execute("SELECT * FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (entry_id,))]
+        self.assertGreater(len(items), 1)
+        items[0]["quantidade"] += 1
+
+        before = self.conn.total_changes
+        self.assertTrue(StockRepository().update_entry_items(entry_id, items))
+        # Uma linha alterada e o seu registro em CDC_LOG (app/database/cdc.py)
+        self.assertEqual(self.conn.total_changes - before, 2)
+
+if __name__ == '__main__':
+    unittest.main()
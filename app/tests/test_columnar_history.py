@@ -0,0 +1,60 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.reports import columnar_history
+from app.reports.sales_analytics import SalesAnalyticsCache
+
+@unittest.skipUnless(columnar_history.available(), "duckdb e pyarrow não instalados")
+class TestColumnarHistory(DatabaseTestCase):
+
+    seed = 11
+
+    def setUp(self):
+        super().setUp()
+        # Outubro e novembro de 2024 no Parquet; dezembro na cauda viva
+        self.history = columnar_history.ColumnarHistory(self.db_manager, os.path.join(self.work_dir, "Historico"),
+                                                        cutoff="2024-12")
+
+    def _assert_same_as_cache(self):
+        self.history.refresh(force=True)
+        cache = SalesAnalyticsCache(self.db_manager)
+        cache.refresh()
+        for filters in ({}, {"periodo_de": "2024-10-15", "periodo_ate": "2024-12-10"}):
+            expected = cache.profit_by_product(filters)
+            result = self.history.profit_by_product(filters)
+            self.assertEqual([row["produto"] for row in result], [row["produto"] for row in expected])
+            for row, other in zip(result, expected):
+                self.assertAlmostEqual(row["lucro_total"], other["lucro_total"], places=6)
+        period = {"data_inicial": "2024-10-01", "data_final": "2024-12-31"}
+        self.assertAlmostEqual(self.history.profit_by_period(period)["lucro_final"],
+                               cache.profit_by_period(period)["lucro_final"], places=6)
+
+    def test_reports_match_sqlite(self):
+        exported = self.history.refresh(force=True)
+        self.assertEqual(exported["vendas"], ["2024-10", "2024-11"])
+        self._assert_same_as_cache()
+
+        filters = {"periodo_de": "2024-10-01", "periodo_ate": "2024-12-31 23:59:59"}
+        columns, rows = self.history.production_by_period(filters)
+        expected = self.db_manager.run_query("production_by_period", filters)
+        self.assertEqual(rows, [(row["produto"], row["quantidade_produzida"], row["data_producao"]) for row in expected])
+
+    def test_changes_to_closed_months_are_reexported(self):
+        self.history.refresh(force=True)
+        self.assertEqual(self.history.refresh(force=True), {})
+        sale_id = self.conn.execute(
+            "SELECT ID FROM SAIDA WHERE STATUS = 'Finalizada' AND DATA_SAIDA < '2024-11' ORDER BY ID LIMIT 1").fetchone()[0]
+        with self.db_manager.transaction():
+            self.conn.execute("UPDATE SAIDA_ITENS SET QUANTIDADE = QUANTIDADE + 3 WHERE ID_SAIDA = ?", (sale_id,))
+            # Documento movido de mês: os dois meses são reexportados
+            self.conn.execute("UPDATE SAIDA SET DATA_SAIDA = '2024-11-20' WHERE ID = ?", (sale_id,))
+        self.assertEqual(self.history.refresh(force=True)["vendas"], ["2024-10", "2024-11"])
+        self._assert_same_as_cache()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.benchmark.synthetic_data import generate_dataset
+from app.stock import costing
+from app.stock.service import StockService
+from app.sales.sale_service import SaleService
+
+class TestCosting(DatabaseTestCase):
+
+    def _add_material(self):
+        cursor = self.conn.execute(
+            "INSERT INTO ITEM (CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE) VALUES ('MP1', 'Farinha', 'Insumo', 1)")
+        supplier = self.conn.execute(
+            "INSERT INTO FORNECEDOR (RAZAO_SOCIAL, NOME_FANTASIA) VALUES ('Moinho', 'Moinho')").lastrowid
+        self.conn.commit()
+        return cursor.lastrowid, supplier
+
+    def _finalized_entry(self, service, entry_date, item_id, supplier, quantity, unit_cost):
+        entry_id = service.create_entry(entry_date, entry_date, f"NF-{entry_date}", None)["data"]
+        service.update_entry_items(entry_id, [{"id_insumo": item_id, "id_fornecedor": supplier,
+                                               "quantidade": quantity, "valor_unitario": unit_cost}])
+        self.assertTrue(service.finalize_entry(entry_id)["success"])
+        return entry_id
+
+    def test_replay_rules(self):
+        movements = [
+            ('Entrada por Nota', 10, 2.0, '2024-01-05'),
+            ('Saída por OP', 4, 2.0, '2024-01-10'),       # gravada positiva
+            ('Entrada Manual', 6, 4.0, '2024-02-01'),
+            ('Saída por Venda', -2, 9.0, '2024-02-03'),   # preço de venda não afeta o custo
+            ('Estorno de Entrada', -6, 4.0, '2024-03-01'),
+        ]
+        balance, cost, checkpoints = costing.replay(movements, open_period='2024-03')
+        self.assertAlmostEqual(balance, 4)
+        self.assertAlmostEqual(cost, (10 * 3.0 - 24) / 4)
+        self.assertEqual([c[0] for c in checkpoints], ['2024-01', '2024-02'])
+        self.assertAlmostEqual(checkpoints[1][2], 3.0)
+
+    def test_backdated_entry_recomputes_following_cost(self):
+        item_id, supplier = self._add_material()
+        service = StockService()
+        self._finalized_entry(service, "2024-01-10", item_id, supplier, 10, 2.0)
+        costing.rebuild_costs(workers=1)
+        self.conn.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - 10 WHERE ID = ?", (item_id,))
+        self.conn.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) "
+                          "VALUES (?, 'Saída por OP', 10, 2.0, '2024-03-01')", (item_id,))
+        self._finalized_entry(service, "2024-04-01", item_id, supplier, 5, 6.0)
+
+        # Nota retroativa: entra antes da saída de março, que consome 10 das 20 unidades
+        self._finalized_entry(service, "2024-02-01", item_id, supplier, 10, 4.0)
+
+        item = self.conn.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (item_id,)).fetchone()
+        self.assertAlmostEqual(item['SALDO_ESTOQUE'], 15)
+        self.assertAlmostEqual(item['CUSTO_MEDIO'], (10 * 3.0 + 5 * 6.0) / 15)
+        periods = [row[0] for row in self.conn.execute(
+            "SELECT PERIODO FROM CHECKPOINT_CUSTO WHERE ID_ITEM = ? ORDER BY PERIODO", (item_id,))]
+        self.assertEqual(periods, ['2024-01', '2024-02', '2024-03', '2024-04'])
+
+    def test_backdated_sale_recomputes_following_cost(self):
+        item_id, supplier = self._add_material()
+        service = StockService()
+        self._finalized_entry(service, "2024-01-10", item_id, supplier, 10, 2.0)
+        self._finalized_entry(service, "2024-04-01", item_id, supplier, 10, 6.0)
+
+        # Venda retroativa de fevereiro: a entrada de abril passa a encontrar só 5 unidades a 2,00
+        sales = SaleService()
+        sale_id = sales.create_sale("2024-02-15", None, [{"id_produto": item_id, "quantidade": 5, "valor_unitario": 9.0}])["data"]
+        self.assertTrue(sales.finalize_sale(sale_id)["success"])
+        item = self.conn.execute("SELECT SALDO_ESTOQUE, CUSTO_MEDIO FROM ITEM WHERE ID = ?", (item_id,)).fetchone()
+        self.assertAlmostEqual(item['SALDO_ESTOQUE'], 15)
+        self.assertAlmostEqual(item['CUSTO_MEDIO'], (5 * 2.0 + 10 * 6.0) / 15)
+
+    def test_failed_recompute_undoes_the_finalization(self):
+        item_id, supplier = self._add_material()
+        service = StockService()
+        self._finalized_entry(service, "2024-03-01", item_id, supplier, 10, 2.0)
+        entry_id = service.create_entry("2024-02-01", "2024-02-01", "NF-retroativa", None)["data"]
+        service.update_entry_items(entry_id, [{"id_insumo": item_id, "id_fornecedor": supplier,
+                                               "quantidade": 5, "valor_unitario": 4.0}])
+
+        with mock.patch.object(costing, "recompute_from", side_effect=RuntimeError("falha no reprocessamento")):
+            self.assertFalse(service.finalize_entry(entry_id)["success"])
+        status = self.conn.execute("SELECT STATUS FROM ENTRADANOTA WHERE ID = ?", (entry_id,)).fetchone()[0]
+        self.assertEqual(status, "Em Aberto")
+        item = self.conn.execute("SELECT SALDO_ESTOQUE FROM ITEM WHERE ID = ?", (item_id,)).fetchone()[0]
+        self.assertAlmostEqual(item, 10)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM MOVIMENTO WHERE ID_ITEM = ?", (item_id,)).fetchone()[0], 1)
+
+    def test_parallel_rebuild_matches_serial(self):
+        generate_dataset(self.conn, "tiny", seed=3)
+        serial = costing.rebuild_costs(workers=1, dry_run=True)
+        parallel = costing.rebuild_costs(workers=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(costing.rebuild_costs(workers=2, dry_run=True), [])
+        negative = self.conn.execute("SELECT COUNT(*) FROM ITEM WHERE CUSTO_MEDIO < 0").fetchone()[0]
+        self.assertEqual(negative, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+import gc
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import events
+from app.tests.db_test_case import DatabaseTestCase
+from app.benchmark.synthetic_data import generate_dataset
+from app.item.item_repository import ItemRepository
+from app.stock.service import StockService
+
+class Listener:
+    def __init__(self):
+        self.received = []
+
+    def on_change(self, event):
+        self.received.append(event)
+
+class TestEvents(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.listener = Listener()
+        events.subscribe(events.ALL_TABLES, self.listener.on_change)
+
+    def tearDown(self):
+        events.unsubscribe(self.listener.on_change)
+        super().tearDown()
+
+    def test_bus_drops_collected_subscribers(self):
+        bus = events.EventBus()
+        listener = Listener()
+        bus.subscribe("ITEM", listener.on_change)
+        bus.publish("ITEM", events.UPDATE, [1, 2])
+        bus.publish("FORNECEDOR", events.UPDATE, [1])
+        self.assertEqual(listener.received, [events.ChangeEvent("ITEM", events.UPDATE, (1, 2))])
+        del listener
+        gc.collect()
+        bus.publish("ITEM", events.DELETE, [1])
+        self.assertEqual(bus._subscribers["ITEM"], [])
+
+    def test_repositories_publish_after_commit(self):
+        repository = ItemRepository()
+        item_id = repository.add("MP1", "Farinha", "Insumo", 1, None)
+        self.assertEqual(self.listener.received[-1], events.ChangeEvent("ITEM", events.INSERT, (item_id,)))
+
+        supplier = self.conn.execute(
+            "INSERT INTO FORNECEDOR (RAZAO_SOCIAL, NOME_FANTASIA) VALUES ('Moinho', 'Moinho')").lastrowid
+        self.conn.commit()
+        self.listener.received.clear()
+        service = StockService()
+        entry_id = service.create_entry("2024-01-10", "2024-01-10", "NF-1", None)["data"]
+        service.update_entry_items(entry_id, [{"id_insumo": item_id, "id_fornecedor": supplier,
+                                               "quantidade": 5, "valor_unitario": 2.0}])
+        self.assertTrue(service.finalize_entry(entry_id)["success"])
+        item_events = [e for e in self.listener.received if e.table == "ITEM"]
+        self.assertTrue(item_events)
+        self.assertTrue(all(e.ids == (item_id,) for e in item_events))
+        self.assertIn(events.ChangeEvent("ENTRADANOTA", events.UPDATE, (entry_id,)), self.listener.received)
+
+    def test_sales_analytics_refreshes_only_after_changes(self):
+        generate_dataset(self.conn, "tiny", seed=9)
+        cache = self.db_manager.enable_sales_analytics()
+        cache.refresh()
+        statements = []
+        self.db_manager.get_report_connection().set_trace_callback(statements.append)
+        cache.refresh()
+        self.assertEqual(statements, [])
+        events.publish("ITEM", events.UPDATE, [1])
+        cache.refresh()
+        self.assertEqual(len(statements), 1)
+        self.db_manager.get_report_connection().set_trace_callback(None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.benchmark.synthetic_data import generate_dataset
+from app.reports import inventory_analytics
+
+class TestInventoryAnalytics(DatabaseTestCase):
+
+    def test_classes_from_consumption_value_and_variability(self):
+        sale = dict(movement_type='Saída por Venda', day=15)
+        self.add_item("Farinha", 120, [10] * 12, 20.0, **sale)         # 2400 de consumo, demanda estável
+        self.add_item("Açúcar", 30, [10, 50] * 6, 1.0, **sale)         # 360, variação de 0,67
+        self.add_item("Sal", 5, [0] * 11 + [120], 1.0, **sale)         # 120, demanda concentrada
+        self.add_item("Fermento", 50, [0] * 12, 3.0, **sale)           # sem consumo
+
+        columns, rows = inventory_analytics.analyze_inventory(self.db_manager, "2024-12-31", dead_days=30)
+        result = {row[1]: dict(zip(columns, row)) for row in rows}
+        self.assertEqual([row[1] for row in rows], ["Farinha", "Açúcar", "Sal", "Fermento"])
+        self.assertEqual([result[d]["classe_abc"] for d in ("Farinha", "Açúcar", "Sal", "Fermento")], ["A", "B", "C", "C"])
+        self.assertEqual([result[d]["classe_xyz"] for d in ("Farinha", "Açúcar", "Sal", "Fermento")], ["X", "Y", "Z", "Z"])
+        self.assertAlmostEqual(result["Farinha"]["giro"], 1.0)
+        self.assertAlmostEqual(result["Farinha"]["dias_cobertura"], 120 / (120 / 366))
+        self.assertAlmostEqual(result["Sal"]["participacao_acumulada"], 1.0)
+        self.assertEqual((result["Farinha"]["dias_sem_movimento"], result["Farinha"]["sem_giro"]), (16, False))
+        self.assertTrue(result["Fermento"]["sem_giro"])
+
+        with mock.patch.object(inventory_analytics, "np", None):
+            _, python_rows = inventory_analytics.analyze_inventory(self.db_manager, "2024-12-31", dead_days=30)
+        self.assertEqual([row[:11] for row in python_rows], [row[:11] for row in rows])
+        self.assertEqual([row[12] for row in python_rows], [row[12] for row in rows])
+
+    def test_reference_date_ignores_later_movements(self):
+        self.add_item("Farinha", 120, [10] * 12, 20.0, movement_type='Saída por Venda', day=15)
+        self.add_item("Fermento", 50, [5] + [0] * 10 + [5], 3.0, movement_type='Saída por Venda', day=15)
+        columns, rows = inventory_analytics.analyze_inventory(self.db_manager, "2024-06-30", dead_days=30)
+        result = {row[1]: dict(zip(columns, row)) for row in rows}
+        self.assertEqual(result["Farinha"]["ultima_movimentacao"], "2024-06-15")
+        self.assertEqual(result["Farinha"]["dias_sem_movimento"], 15)
+        self.assertEqual(result["Fermento"]["ultima_movimentacao"], "2024-01-15")
+        self.assertTrue(result["Fermento"]["sem_giro"])
+
+    def test_inactive_report_matches_last_movement_query(self):
+        generate_dataset(self.conn, "tiny", seed=4)
+        expected = [tuple(row) for row in self.conn.execute("""
+            SELECT i.DESCRICAO, i.SALDO_ESTOQUE, MAX(m.DATA_MOVIMENTO) as ultima_movimentacao
+            FROM ITEM i
+            LEFT JOIN MOVIMENTO m ON i.ID = m.ID_ITEM AND m.TIPO_MOVIMENTO <> 'Saldo Inicial'
+            GROUP BY i.ID
+            HAVING ultima_movimentacao < date('now', '-30 days') OR ultima_movimentacao IS NULL""")]
+        report = self.db_manager.get_inactive_items_report(30)
+        self.assertEqual([tuple(row.values()) for row in report], expected)
+        self.assertEqual(len(self.db_manager.get_abc_curve_report()), self.conn.execute("SELECT COUNT(*) FROM ITEM").fetchone()[0])
+
+if __name__ == '__main__':
+    unittest.main()
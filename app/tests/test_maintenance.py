@@ -0,0 +1,67 @@
+import sys
+import os
+import sqlite3
+import unittest
+from concurrent.futures import Future
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.database import maintenance
+
+class TestMaintenance(DatabaseTestCase):
+
+    seed = 2
+
+    def _count(self, path, table):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_stepped_backup_while_connection_is_open(self):
+        steps = []
+        destination = os.path.join(self.work_dir, "copia.DB")
+        maintenance.backup_database(destination, self.db_path, pages=4, pause=0,
+                                    progress=lambda done, total: steps.append((done, total)))
+        self.assertGreater(len(steps), 1)
+        self.assertEqual(steps[-1][0], steps[-1][1])
+        self.assertEqual(self._count(destination, "MOVIMENTO"), self._count(self.db_path, "MOVIMENTO"))
+        self.assertFalse(os.path.exists(destination + ".tmp"))
+
+    def test_snapshot_retention_and_compaction(self):
+        backup_dir = os.path.join(self.work_dir, "Backups")
+        os.makedirs(backup_dir)
+        for name in ("DADOS_20240101_000000.DB", "DADOS_20240102_000000.DB", "DADOS_20240103_000000.DB"):
+            open(os.path.join(backup_dir, name), "wb").close()
+        compacted = maintenance.create_snapshot(backup_dir, keep=2, db_path=self.db_path, compact=True)
+
+        snapshots = maintenance.list_snapshots(backup_dir)
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[-1], compacted)
+        self.assertEqual(self._count(compacted, "ITEM"), self._count(self.db_path, "ITEM"))
+        maintenance.optimize_database(self.db_path, analyze=True)
+        self.assertIn("free_ratio", maintenance.database_stats(self.db_path))
+
+    def test_service_keeps_running_after_a_failed_task(self):
+        finished = []
+        service = maintenance.MaintenanceService(self.db_path, os.path.join(self.work_dir, "Backups"),
+                                                 on_finished=lambda task, success, message: finished.append((task, success)))
+        try:
+            failing = lambda: service.submit("falha", maintenance.optimize_database, os.path.join(self.work_dir, "x", "y.DB"))
+            service._run_tasks(failing, service.backup_now, service.compact_now)
+        finally:
+            service.stop()
+        self.assertEqual(finished, [("falha", False), ("backup", True), ("compactação", True)])
+        # Backup e cópia compactada no mesmo segundo: dois arquivos
+        self.assertEqual(len(maintenance.list_snapshots(service.backup_dir)), 2)
+
+        cancelled = Future()
+        cancelled.cancel()
+        service._finished("backup", cancelled)
+        self.assertEqual(len(finished), 3)
+
+if __name__ == '__main__':
+    unittest.main()
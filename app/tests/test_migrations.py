@@ -0,0 +1,104 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database import migrations
+from app.database.db import DatabaseManager, create_tables
+
+ORDERS = 1200
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+        self.db_path = os.path.join(self.work_dir, "DADOS.DB")
+        DatabaseManager.reset_instance()
+        DatabaseManager(self.db_path)
+        DatabaseManager.reset_instance()
+        # Banco na versão 1: ORDEMPRODUCAO ainda com o status 'Planejada'
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            DROP TABLE MIGRACAO_LOG;
+            DROP TABLE ORDEMPRODUCAO;
+            CREATE TABLE ORDEMPRODUCAO (
+                ID INTEGER PRIMARY KEY AUTOINCREMENT, NUMERO TEXT, DATA_CRIACAO TEXT NOT NULL, DATA_PREVISTA TEXT,
+                STATUS TEXT NOT NULL CHECK(STATUS IN ('Planejada', 'Em Andamento', 'Concluída')));
+            CREATE INDEX IDX_OP_NUMERO ON ORDEMPRODUCAO (NUMERO);
+            PRAGMA user_version = 1;
+            PRAGMA application_id = 0;
+        """)
+        conn.executemany("INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, STATUS) VALUES (?, '2024-01-01', ?)",
+                         [(f"OP{i}", "Planejada" if i % 2 else "Concluída") for i in range(ORDERS)])
+        conn.commit()
+        self.conn = conn
+
+    def tearDown(self):
+        self.conn.close()
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _check_migrated(self, conn):
+        self.assertEqual(migrations.current_version(conn), migrations.LATEST_VERSION)
+        statuses = dict(conn.execute("SELECT STATUS, COUNT(*) FROM ORDEMPRODUCAO GROUP BY STATUS").fetchall())
+        self.assertEqual(statuses, {"Em Andamento": ORDERS // 2, "Concluída": ORDERS // 2})
+        self.assertEqual(conn.execute("SELECT MAX(ID) FROM ORDEMPRODUCAO").fetchone()[0], ORDERS)
+        self.assertIn("ID_LINHA_PRODUCAO", {row[1] for row in conn.execute("PRAGMA table_info(ORDEMPRODUCAO)")})
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"IDX_OP_NUMERO", "IDX_MOVIMENTO_OP"} <= indexes)
+
+    def test_startup_copies_in_batches_and_logs_steps(self):
+        calls = []
+        db_manager = DatabaseManager(self.db_path, migration_progress=lambda *args: calls.append(args))
+        conn = db_manager.get_connection()
+        self._check_migrated(conn)
+        self.assertEqual(calls, [(2, "ORDEMPRODUCAO: copiar linhas", ORDERS, ORDERS)])
+        log = {(row[0], row[1]): row[2] for row in conn.execute("SELECT VERSAO, PASSO, LINHAS FROM MIGRACAO_LOG")}
+        self.assertEqual(log[(2, "ORDEMPRODUCAO: copiar linhas")], ORDERS)
+        self.assertEqual({version for version, _ in log}, set(range(2, migrations.LATEST_VERSION + 1)))
+
+    def test_interrupted_copy_resumes(self):
+        def interrupt(version, step, done, total):
+            if done >= 500:
+                raise KeyboardInterrupt
+        create_tables(self.conn)
+        with self.assertRaises(KeyboardInterrupt):
+            migrations.run_pending(self.conn, interrupt, batch_size=250)
+        self.assertEqual(migrations.current_version(self.conn), 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM ORDEMPRODUCAO_NOVA").fetchone()[0], 500)
+
+        calls = []
+        steps = migrations.run_pending(self.conn, lambda *args: calls.append(args[2]), batch_size=250)
+        self.assertEqual(calls, [750, 1000, 1200])
+        self.assertNotIn("ORDEMPRODUCAO: criar tabela nova", [step["passo"] for step in steps])
+        self._check_migrated(self.conn)
+
+    def test_swap_interrupted_before_logging_is_not_repeated(self):
+        create_tables(self.conn)
+        migrations.run_pending(self.conn)
+        # Queda entre o commit da troca e o registro do passo
+        self.conn.execute("DELETE FROM MIGRACAO_LOG WHERE PASSO = 'ORDEMPRODUCAO: substituir tabela'")
+        self.conn.execute("PRAGMA user_version = 1")
+        self.conn.commit()
+
+        steps = migrations.run_pending(self.conn)
+        self.assertEqual([(step["passo"], step["linhas"]) for step in steps], [("ORDEMPRODUCAO: substituir tabela", None)])
+        self._check_migrated(self.conn)
+
+    def test_dry_run_leaves_database_untouched(self):
+        result = migrations.dry_run(self.db_path, batch_size=500)
+        self.assertEqual((result["versao"], result["versao_final"]), (1, migrations.LATEST_VERSION))
+        copy = next(step for step in result["passos"] if step["passo"] == "ORDEMPRODUCAO: copiar linhas")
+        self.assertEqual(copy["linhas"], ORDERS)
+        self.assertEqual(migrations.current_version(self.conn), 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM ORDEMPRODUCAO WHERE STATUS = 'Planejada'").fetchone()[0],
+                         ORDERS // 2)
+        self.assertEqual(os.listdir(self.work_dir), ["DADOS.DB"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.item.item_repository import ItemRepository
+from app.models import Item
+from app.stock.stock_repository import StockRepository
+
+class TestModels(DatabaseTestCase):
+
+    seed = 11
+
+    def test_record_supports_column_access(self):
+        item = Item(1, None, "Farinha", "Insumo", "kg", 10.0, 2.5)
+        self.assertEqual(item['SALDO_ESTOQUE'], 10.0)
+        self.assertIsNone(item.get('CODIGO_INTERNO'))
+        self.assertEqual(item.get('INEXISTENTE', 'x'), 'x')
+        self.assertIn('SIGLA', item)
+        self.assertEqual(dict(item), item.as_dict())
+        self.assertFalse(hasattr(item, '__dict__'))
+        with self.assertRaises(KeyError):
+            item['INEXISTENTE']
+
+    def test_repositories_return_records(self):
+        items = ItemRepository().get_all()
+        self.assertTrue(items)
+        self.assertIsInstance(items[0], Item)
+        row = self.conn.execute("SELECT DESCRICAO, SALDO_ESTOQUE FROM ITEM WHERE ID = ?", (items[0].id,)).fetchone()
+        self.assertEqual((items[0]['DESCRICAO'], items[0]['SALDO_ESTOQUE']), tuple(row))
+
+        entry_id = self.conn.execute("SELECT MIN(ID_ENTRADA) FROM ENTRADANOTA_ITENS").fetchone()[0]
+        lines = StockRepository().get_entry_details(entry_id)["items"]
+        self.assertTrue(lines)
+        self.assertEqual(lines[0]['ID_INSUMO'], lines[0].id_insumo)
+
+if __name__ == '__main__':
+    unittest.main()
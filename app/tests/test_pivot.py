@@ -0,0 +1,77 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.reports import pivot
+
+class TestPivot(DatabaseTestCase):
+
+    seed = 4
+
+    def _cells(self, table):
+        values = table.values.tolist() if hasattr(table.values, "tolist") else table.values
+        return {(row_key[0], column_key[0]): value
+                for row_key, row in zip(table.row_keys, values)
+                for column_key, value in zip(table.column_keys, row) if value}
+
+    def test_product_by_month_matches_sql(self):
+        expected = {(row[0], row[1]): row[2] for row in self.conn.execute("""
+            SELECT i.DESCRICAO, substr(s.DATA_SAIDA, 1, 7), SUM(si.QUANTIDADE * si.VALOR_UNITARIO)
+            FROM SAIDA s JOIN SAIDA_ITENS si ON s.ID = si.ID_SAIDA JOIN ITEM i ON i.ID = si.ID_PRODUTO
+            GROUP BY 1, 2""")}
+        table = pivot.pivot(self.db_manager, "vendas", ["produto"], ["mes"], "receita")
+        cells = self._cells(table)
+        self.assertEqual(set(cells), set(expected))
+        for key, value in expected.items():
+            self.assertAlmostEqual(cells[key], value, places=6)
+
+        with mock.patch.object(pivot, "np", None):
+            plain = pivot.pivot(self.db_manager, "vendas", ["produto"], ["mes"], "receita")
+        self.assertEqual(plain.row_keys, table.row_keys)
+        self.assertEqual(plain.column_keys, table.column_keys)
+        for key, value in self._cells(plain).items():
+            self.assertAlmostEqual(cells[key], value, places=6)
+
+    def test_result_has_totals_and_respects_period(self):
+        table = pivot.pivot(self.db_manager, "movimentos", ["item"], ["mes"], "registros", "2024-11-01", "2024-11-30")
+        self.assertEqual([key[0] for key in table.column_keys], ["2024-11"])
+        result = table.as_result()
+        self.assertEqual(result.headers, ["Item", "2024-11", "Total"])
+        total = self.conn.execute("""
+            SELECT COUNT(*) FROM MOVIMENTO WHERE TIPO_MOVIMENTO <> 'Saldo Inicial'
+            AND DATA_MOVIMENTO BETWEEN '2024-11-01' AND '2024-11-30 23:59:59'""").fetchone()[0]
+        self.assertEqual(result.rows[-1][0], "Total")
+        self.assertEqual(result.rows[-1][-1], total)
+        self.assertEqual(len(result), len(table.row_keys) + 1)
+
+        with self.assertRaises(ValueError):
+            pivot.pivot(self.db_manager, "movimentos", ["linha"], [], "quantidade")
+
+    def test_movement_measures_follow_movement_direction(self):
+        item_id = self.add_item("Misto", 0)
+        # Saída por OP é gravada positiva; Saída por Venda e Estorno de Entrada, negativas
+        for movement_type, quantity, unit_value in (('Entrada por Nota', 10, 2.0), ('Entrada Manual', 4, 2.5),
+                                                    ('Saída por OP', 3, 2.0), ('Saída por Venda', -2, 2.0),
+                                                    ('Estorno de Entrada', -1, 2.0), ('Retorno por OP', 1, None)):
+            self.conn.execute(
+                "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, ?)",
+                (item_id, movement_type, quantity, unit_value, "2024-05-10"))
+        self.conn.commit()
+
+        quantity = self._cells(pivot.pivot(self.db_manager, "movimentos", ["item"], ["tipo"], "quantidade"))
+        self.assertEqual(quantity[("Misto", "Saída por OP")], -3)
+        self.assertEqual(quantity[("Misto", "Saída por Venda")], -2)
+        self.assertEqual(quantity[("Misto", "Estorno de Entrada")], -1)
+        table = pivot.pivot(self.db_manager, "movimentos", ["item"], [], "quantidade", "2024-05-10", "2024-05-10")
+        self.assertEqual(dict(zip((key[0] for key in table.row_keys), table.row_totals()))["Misto"], 9)
+        value = pivot.pivot(self.db_manager, "movimentos", ["item"], [], "valor", "2024-05-10", "2024-05-10")
+        self.assertAlmostEqual(dict(zip((key[0] for key in value.row_keys), value.row_totals()))["Misto"],
+                               20 + 10 - 6 - 4 - 2)
+
+if __name__ == '__main__':
+    unittest.main()
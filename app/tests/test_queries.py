@@ -0,0 +1,96 @@
+import sys
+import os
+import unittest
+from dataclasses import dataclass
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database.db import DatabaseManager
+from app.tests.db_test_case import DatabaseTestCase
+from app.database.queries import REPORT_QUERIES, SEARCH_QUERIES, as_tuple, as_namedtuple, as_record
+from app.reports.cli import run_report
+from app.reports import registry
+from app.item.item_repository import ItemRepository
+from app.sales.sale_repository import SaleRepository
+from app.supplier.supplier_repository import SupplierRepository
+
+@dataclass(slots=True)
+class StockRow:
+    descricao: str
+    saldo: float
+    custo: float
+
+class TestQueries(DatabaseTestCase):
+
+    seed = 5
+
+    def open_database(self):
+        return DatabaseManager(self.db_path, cached_statements=32)
+
+    def test_build_applies_only_filled_filters(self):
+        query = REPORT_QUERIES["production_orders"]
+        sql, params = query.build(self.db_manager, {"status": "Andamento", "id_de": "", "periodo_ate": "2024-12-31"})
+        self.assertIn("WHERE op.STATUS LIKE ? AND op.DATA_CRIACAO <= ?", sql)
+        self.assertEqual(params, ["%Andamento%", "2024-12-31"])
+        # mesma combinação de filtros, mesmo texto: a instrução preparada é reaproveitada
+        self.assertEqual(query.build(self.db_manager, {"status": "X", "periodo_ate": "2025-01-01"})[0], sql)
+
+    def test_row_shapes_return_the_same_data(self):
+        filters = {"periodo_de": "2024-01-01"}
+        dicts = self.db_manager.get_stock_movements(filters)
+        tuples = self.db_manager.get_stock_movements(filters, row_factory=as_tuple)
+        named = self.db_manager.get_stock_movements(filters, row_factory=as_namedtuple)
+        self.assertTrue(dicts)
+        self.assertEqual([tuple(row.values()) for row in dicts], tuples)
+        self.assertEqual(named[0]._fields, tuple(dicts[0].keys()))
+        self.assertEqual([tuple(row) for row in named], tuples)
+
+        records = self.db_manager.get_current_stock(row_factory=as_record(StockRow))
+        self.assertEqual([(r.descricao, r.saldo, r.custo) for r in records],
+                         self.db_manager.get_current_stock(row_factory=as_tuple))
+
+    def test_cli_uses_named_rows(self):
+        headers, rows = run_report(self.db_manager, "inactive_report", {"dias": "0"})
+        self.assertEqual(headers, ["DESCRICAO", "SALDO_ESTOQUE", "ultima_movimentacao"])
+        self.assertEqual(len(rows), len(self.db_manager.get_inactive_items_report(0)))
+        headers, rows = run_report(self.db_manager, "profit_by_period_report")
+        self.assertEqual(headers, ["total_vendas", "custo_total", "lucro_final"])
+
+    def test_registry_runs_every_report(self):
+        for report_id, report in registry.REPORTS.items():
+            result = registry.execute(self.db_manager, report_id, {"dias": "0"} if report_id == "inactive_report" else {})
+            self.assertTrue(all(len(row) == len(report.columns) for row in result.rows), report_id)
+            self.assertEqual(len(result.formatted()), len(result), report_id)
+        movements = registry.execute(self.db_manager, "stock_movement_report").rows
+        self.assertEqual([row[4] for row in movements], sorted(row[4] for row in movements))
+        self.assertEqual(len(movements), len(self.db_manager.get_stock_movements({})))
+
+    def test_search_queries_accept_only_registered_fields(self):
+        sql, params = SEARCH_QUERIES["items"].build("DESCRICAO", "Sint", ids=[3, 4])
+        self.assertIn("WHERE i.DESCRICAO LIKE ? AND i.ID IN (?, ?) ORDER BY i.DESCRICAO", sql)
+        self.assertEqual(params, ["%Sint%", 3, 4])
+        with self.assertRaises(ValueError):
+            SEARCH_QUERIES["sales"].build("1=1 OR ID", "x")
+        sql, params = SEARCH_QUERIES["stock_entries"].build("Valor Total", "12,5")
+        self.assertIn("WHERE T.VALOR_TOTAL >= ? AND T.VALOR_TOTAL < ?", sql)
+        self.assertEqual(params, [12.5, 13.5])
+
+        items = ItemRepository()
+        first = items.search("ID", "1")
+        self.assertEqual([item.id for item in first], [1])
+        self.assertEqual(items.search("ID", "abc"), [])
+        self.assertEqual(items.search("PRECO", "1"), [])
+        sales = SaleRepository()
+        self.assertEqual(sales.list_sales("1", "id")[0]["ID"], 1)
+        self.assertEqual(sales.list_sales("x", "1=1 OR ID"), [])
+        suppliers = SupplierRepository()
+        first, second = suppliers.get_all()[:2]
+        self.assertEqual([row["ID"] for row in suppliers.get_all([second["ID"]])], [second["ID"]])
+        self.assertEqual(suppliers.search(first["NOME_FANTASIA"], "Nome Fantasia", [second["ID"]]), [])
+        finalized = sales.list_sales("Finalizada", "status")
+        self.assertTrue(finalized)
+        self.assertTrue(all(sale["STATUS"] == "Finalizada" for sale in finalized))
+
+if __name__ == '__main__':
+    unittest.main()
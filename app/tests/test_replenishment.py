@@ -0,0 +1,71 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.benchmark.synthetic_data import generate_dataset
+from app.stock import replenishment
+from app.database import maintenance
+
+class TestReplenishment(DatabaseTestCase):
+
+    def _parameters(self):
+        return {row[0]: tuple(row[1:]) for row in self.conn.execute(
+            "SELECT ID_ITEM, PERIODO, DEMANDA_MENSAL, DESVIO_MEDIO, ESTOQUE_SEGURANCA, PONTO_PEDIDO FROM PARAMETRO_REPOSICAO")}
+
+    def test_reorder_point_from_smoothed_consumption(self):
+        steady = self.add_item("Farinha", 40, [30] * 6)
+        idle = self.add_item("Embalagem", 5, [])
+        result = replenishment.refresh_reorder_points("2024-07-05")
+        self.assertEqual(result, {"periodo": "2024-06", "itens": 2})
+
+        period, level, deviation, safety_stock, reorder_point = self._parameters()[steady]
+        self.assertEqual((period, level, deviation, safety_stock), ("2024-06", 30.0, 0.0, 0.0))
+        self.assertAlmostEqual(reorder_point, 30 / (365 / 12) * replenishment.DEFAULT_LEAD_TIME)
+
+        # Estoque baixo: Farinha pelo ponto de pedido (~14,8), Embalagem (sem consumo) pelo limite fixo
+        low = {row["DESCRICAO"] for row in self.db_manager.run_query("low_stock", {"limite": 10})}
+        self.assertEqual(low, {"Embalagem"})
+        replenishment.set_lead_time(steady, 45)
+        low = {row["DESCRICAO"] for row in self.db_manager.run_query("low_stock", {"limite": 10})}
+        self.assertEqual(low, {"Farinha", "Embalagem"})
+        self.assertEqual(self._parameters()[idle][1:3], (0.0, 0.0))
+
+    def test_reports_only_read_and_maintenance_refreshes(self):
+        self.add_item("Farinha", 40, [30] * 6)
+        self.db_manager.get_low_stock_report()
+        self.db_manager.get_material_requirements_report()
+        self.assertEqual(self._parameters(), {})
+        self.assertFalse(self.conn.in_transaction)
+
+        result = maintenance.refresh_reorder_points(self.db_path, "2024-07-05")
+        self.assertEqual(result, {"periodo": "2024-06", "itens": 1})
+        self.assertEqual([values[0] for values in self._parameters().values()], ["2024-06"])
+
+    def test_incremental_refresh_matches_full_recalculation(self):
+        generate_dataset(self.conn, "tiny", seed=6)
+        self.add_item("Sazonal", 0, [0, 0, 0, 0, 0, 0, 0, 0, 0, 50, 5, 80])
+        replenishment.refresh_reorder_points("2024-10-15")
+        self.assertEqual(replenishment.refresh_reorder_points("2024-10-31")["itens"], 0)
+        replenishment.refresh_reorder_points("2025-01-02")
+        incremental = self._parameters()
+
+        replenishment.refresh_reorder_points("2025-01-02", full=True)
+        full = self._parameters()
+        with mock.patch.object(replenishment, "np", None):
+            replenishment.refresh_reorder_points("2025-01-02", full=True)
+        python = self._parameters()
+
+        self.assertEqual(incremental.keys(), full.keys())
+        for item_id, values in full.items():
+            self.assertEqual(incremental[item_id][0], values[0])
+            for expected, incremental_value, python_value in zip(values[1:], incremental[item_id][1:], python[item_id][1:]):
+                self.assertAlmostEqual(incremental_value, expected)
+                self.assertAlmostEqual(python_value, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import csv
+import json
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from openpyxl import load_workbook
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.reports import cli
+from app.reports.registry import execute
+
+class TestReportCli(DatabaseTestCase):
+
+    seed = 3
+
+    def _expected(self, report_id, filters=None):
+        result = execute(self.db_manager, report_id, filters)
+        return result.headers, result.rows
+
+    def test_batch_job_file_in_worker_processes(self):
+        output_dir = os.path.join(self.work_dir, "saida")
+        job_file = os.path.join(self.work_dir, "jobs.json")
+        with open(job_file, "w", encoding="utf-8") as f:
+            json.dump({"output_dir": output_dir, "jobs": [
+                {"report": "current_stock_report", "format": "csv", "output": "estoque.csv"},
+                {"report": "stock_movement_report", "filters": {"periodo_de": "2024-11-01"}, "format": "xlsx",
+                 "output": "movimentos.xlsx"},
+                {"report": "relatorio_inexistente", "format": "csv"},
+            ]}, f)
+
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            exit_code = cli.main(["--db", self.db_path, "batch", job_file, "--workers", "2"])
+        self.assertEqual(exit_code, 1)
+        results = {result["report"]: result for result in map(json.loads, stdout.getvalue().splitlines())}
+        self.assertIn("error", results["relatorio_inexistente"])
+
+        headers, rows = self._expected("current_stock_report")
+        with open(os.path.join(output_dir, "estoque.csv"), encoding="utf-8-sig", newline="") as f:
+            written = list(csv.reader(f, delimiter=";"))
+        self.assertEqual(written[0], headers)
+        self.assertEqual(written[1:], [[str(value) for value in row] for row in rows])
+        self.assertEqual(results["current_stock_report"]["rows"], len(rows))
+
+        headers, rows = self._expected("stock_movement_report", {"periodo_de": "2024-11-01"})
+        sheet = load_workbook(os.path.join(output_dir, "movimentos.xlsx"), read_only=True).worksheets[0]
+        written = [list(row) for row in sheet.iter_rows(values_only=True)]
+        self.assertEqual(written[0], headers)
+        self.assertEqual(len(written) - 1, len(rows))
+        for written_row, row in zip(written[1:], rows):
+            for written_value, value in zip(written_row, row):
+                if isinstance(value, float):
+                    self.assertAlmostEqual(written_value, value, places=6)
+                else:
+                    self.assertEqual(written_value, value)
+        self.assertGreater(len(rows), 0)
+
+if __name__ == '__main__':
+    unittest.main()
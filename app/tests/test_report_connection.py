@@ -0,0 +1,47 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.sales.sale_repository import SaleRepository
+
+class TestReportConnection(DatabaseTestCase):
+
+    seed = 6
+
+    def _post_sale(self):
+        product = self.conn.execute("SELECT ID FROM ITEM WHERE TIPO_ITEM <> 'Insumo' LIMIT 1").fetchone()[0]
+        repository = SaleRepository()
+        sale_id = repository.create_sale("2024-12-31", None, 5.0)
+        repository.update_sale_items(sale_id, [{"id_produto": product, "quantidade": 1.0, "valor_unitario": 5.0}])
+        return repository.finalize_sale(sale_id)
+
+    def test_readonly_reports_do_not_block_writes(self):
+        self.db_manager.set_report_mode("readonly")
+        report_conn = self.db_manager.get_report_connection()
+        self.assertIsNot(report_conn, self.conn)
+        self.assertEqual(self.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        # Leitura em andamento (cursor aberto) enquanto uma venda é gravada
+        cursor = report_conn.execute("SELECT * FROM MOVIMENTO")
+        cursor.fetchone()
+        before = len(self.db_manager.get_stock_movements({}))
+        self.assertTrue(self._post_sale())
+        cursor.fetchall()
+        self.assertEqual(len(self.db_manager.get_stock_movements({})), before + 1)
+        with self.assertRaises(Exception):
+            report_conn.execute("DELETE FROM MOVIMENTO")
+
+    def test_replica_is_refreshed_on_demand(self):
+        self.db_manager.set_report_mode("replica", replica_refresh_seconds=3600)
+        before = self.db_manager.get_stock_movements({})
+        self.assertTrue(self._post_sale())
+        self.assertEqual(self.db_manager.get_stock_movements({}), before)
+        self.db_manager.refresh_replica()
+        self.assertEqual(len(self.db_manager.get_stock_movements({})), len(before) + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import os
+import threading
+import unittest
+from unittest import mock
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.reports import scheduler
+
+class TestReportScheduler(DatabaseTestCase):
+
+    seed = 5
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = os.path.join(self.work_dir, "Relatorios")
+
+    def test_cron_next_run(self):
+        # 01/11/2024 é uma sexta-feira
+        after = datetime(2024, 11, 1, 9, 50)
+        self.assertEqual(scheduler.CronSpec("*/15 8-9 * * 1-5").next_run(after), datetime(2024, 11, 4, 8, 0))
+        self.assertEqual(scheduler.CronSpec("0 7 1 * 0").next_run(after), datetime(2024, 11, 3, 7, 0))
+        self.assertEqual(scheduler.CronSpec("@monthly").next_run(after), datetime(2024, 12, 1, 0, 0))
+        self.assertEqual(scheduler.CronSpec("30 6 * * 7").next_run(after), datetime(2024, 11, 3, 6, 30))
+        for invalid in ("61 * * * *", "* * *", "0 0 30 2 *", "a * * * *"):
+            with self.assertRaises(ValueError):
+                scheduler.CronSpec(invalid).next_run(after)
+
+    def test_runs_only_when_tables_change(self):
+        scheduler.add_job(self.conn, "estoque", "current_stock_report", "0 * * * *", fmt="csv")
+        # Minuto fixo: now + 1 minuto não pode alcançar a próxima hora
+        now = (datetime.now() + timedelta(days=1)).replace(minute=5, second=0, microsecond=0)
+        first = scheduler.run_due(self.db_path, self.output_dir, now)
+        self.assertEqual([outcome["situacao"] for outcome in first], [scheduler.OK])
+        self.assertEqual(os.path.dirname(first[0]["arquivo"]),
+                         os.path.join(self.output_dir, now.strftime("%Y-%m-%d")))
+        self.assertTrue(os.path.exists(first[0]["arquivo"]))
+
+        # Ainda não venceu: nada a executar
+        self.assertEqual(scheduler.run_due(self.db_path, self.output_dir, now + timedelta(minutes=1)), [])
+
+        later = now + timedelta(hours=2)
+        skipped = scheduler.run_due(self.db_path, self.output_dir, later)
+        self.assertEqual([outcome["situacao"] for outcome in skipped], [scheduler.UNCHANGED])
+
+        self.conn.execute("UPDATE ITEM SET CUSTO_MEDIO = CUSTO_MEDIO + 1 WHERE ID = (SELECT MIN(ID) FROM ITEM)")
+        self.conn.commit()
+        changed = scheduler.run_due(self.db_path, self.output_dir, later + timedelta(hours=1))
+        self.assertEqual([outcome["situacao"] for outcome in changed], [scheduler.OK])
+        job = scheduler.list_jobs(self.conn)[0]
+        self.assertEqual(job["ULTIMO_ARQUIVO"], changed[0]["arquivo"])
+        self.assertGreater(job["PROXIMA_EXECUCAO"], (later + timedelta(hours=1)).strftime(scheduler.DATE_FORMAT))
+
+    def test_due_job_runs_in_only_one_process(self):
+        scheduler.add_job(self.conn, "estoque", "current_stock_report", "@daily", fmt="csv", only_changed=False)
+        now = datetime.now() + timedelta(days=1)
+        # Os dois verificadores leem o agendamento vencido antes de qualquer um reservá-lo
+        barrier = threading.Barrier(2, timeout=10)
+        cron_spec = scheduler.CronSpec
+
+        def spec_after_both_read(text):
+            barrier.wait()
+            return cron_spec(text)
+
+        results = []
+        with mock.patch.object(scheduler, "CronSpec", spec_after_both_read):
+            threads = [threading.Thread(target=lambda: results.append(scheduler.run_due(self.db_path, self.output_dir, now)))
+                       for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(len(outcomes) for outcomes in results), [0, 1])
+        self.assertEqual(len(os.listdir(os.path.join(self.output_dir, now.strftime("%Y-%m-%d")))), 1)
+
+        # Pedido pelo nome, roda mesmo sem estar vencido
+        forced = scheduler.run_due(self.db_path, self.output_dir, now, names=["estoque"])
+        self.assertEqual([outcome["situacao"] for outcome in forced], [scheduler.OK])
+
+    def test_retention_removes_old_outputs(self):
+        scheduler.add_job(self.conn, "estoque", "current_stock_report", "@daily", fmt="csv", retention_days=7)
+        now = datetime.now() + timedelta(days=1)
+        old_folder = os.path.join(self.output_dir, (now - timedelta(days=10)).strftime("%Y-%m-%d"))
+        os.makedirs(old_folder)
+        for name in ("estoque_070000.csv", "estoque_070000_2.csv", "estoque_diario_070000.csv", "outro_070000.csv"):
+            open(os.path.join(old_folder, name), "w").close()
+
+        scheduler.run_due(self.db_path, self.output_dir, now)
+        self.assertEqual(sorted(os.listdir(old_folder)), ["estoque_diario_070000.csv", "outro_070000.csv"])
+        for name in os.listdir(old_folder):
+            os.remove(os.path.join(old_folder, name))
+        scheduler.prune_outputs(self.output_dir, "estoque", 7, now.date())
+        self.assertFalse(os.path.exists(old_folder))
+
+    def test_runs_in_the_same_second_keep_both_outputs(self):
+        scheduler.add_job(self.conn, "estoque", "current_stock_report", "@daily", fmt="csv", only_changed=False)
+        now = (datetime.now() + timedelta(days=1)).replace(microsecond=0)
+        paths = [scheduler.run_due(self.db_path, self.output_dir, now, names=["estoque"])[0]["arquivo"] for _ in range(3)]
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         [f"estoque_{now:%H%M%S}.csv", f"estoque_{now:%H%M%S}_2.csv", f"estoque_{now:%H%M%S}_3.csv"])
+
+        finished = []
+        report_scheduler = scheduler.ReportScheduler(self.db_path, self.output_dir, poll_seconds=0,
+                                                     on_finished=lambda *args: finished.append(args))
+        cancelled = Future()
+        cancelled.cancel()
+        report_scheduler._finished(cancelled)
+        self.assertEqual(finished, [])
+        report_scheduler.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.reports import sales_analytics
+
+FILTERS = [
+    {},
+    {"periodo_de": "2024-11-01", "periodo_ate": "2024-11-30", "data_inicial": "2024-11-01", "data_final": "2024-11-30"},
+    {"produto_de": "Item Sintético 000003", "produto_ate": "Item Sintético 000008"},
+]
+
+class TestSalesAnalytics(DatabaseTestCase):
+
+    seed = 12
+
+    def _assert_same_rows(self, cached, expected):
+        self.assertEqual(len(cached), len(expected))
+        for cached_row, row in zip(cached, expected):
+            self.assertEqual(set(cached_row), set(row))
+            for key, value in row.items():
+                if isinstance(value, str) or value is None:
+                    self.assertEqual(cached_row[key], value, key)
+                else:
+                    self.assertAlmostEqual(cached_row[key], value, places=6, msg=key)
+
+    def test_cache_matches_sql(self):
+        # Uma venda em aberto não entra em nenhum dos dois caminhos
+        self.conn.execute("UPDATE SAIDA SET STATUS = 'Em Aberto' WHERE ID = (SELECT MIN(ID) FROM SAIDA)")
+        self.conn.commit()
+        cache = sales_analytics.SalesAnalyticsCache(self.db_manager)
+        cache.refresh()
+        for filters in FILTERS:
+            with self.subTest(filters=filters):
+                self._assert_same_rows(cache.profit_by_product(filters), self.db_manager.get_profit_by_product(filters))
+                self._assert_same_rows([cache.profit_by_period(filters)], [self.db_manager.get_profit_by_period(filters)])
+                with mock.patch.object(sales_analytics, "np", None):
+                    self._assert_same_rows(cache.profit_by_product(filters),
+                                           self.db_manager.get_profit_by_product(filters))
+
+        self.db_manager.enable_sales_analytics()
+        self.assertEqual(self.db_manager.get_profit_by_period({})["total_vendas"],
+                         cache.profit_by_period({})["total_vendas"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database import db
+from app.database.db import DatabaseManager
+
+class TestSchemaFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+        self.db_path = os.path.join(self.work_dir, "DADOS.DB")
+        DatabaseManager.reset_instance()
+        DatabaseManager(self.db_path)
+        DatabaseManager.reset_instance()
+
+    def tearDown(self):
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _pragmas(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT user_version, application_id FROM pragma_user_version, pragma_application_id").fetchone()
+        finally:
+            conn.close()
+
+    def test_new_database_stores_fingerprint(self):
+        self.assertEqual(self._pragmas(), (db.SCHEMA_VERSION, db.schema_fingerprint()))
+        self.assertNotEqual(db.schema_fingerprint(), 0)
+
+    def test_matching_fingerprint_skips_schema_setup(self):
+        with mock.patch.object(DatabaseManager, "_create_tables") as create_tables, \
+                mock.patch.object(DatabaseManager, "_run_migrations") as run_migrations:
+            DatabaseManager(self.db_path)
+        create_tables.assert_not_called()
+        run_migrations.assert_not_called()
+
+    def test_changed_fingerprint_runs_full_setup(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA application_id = 0")
+        conn.commit()
+        conn.close()
+        with mock.patch.object(DatabaseManager, "_create_tables", autospec=True,
+                               side_effect=DatabaseManager._create_tables) as create_tables:
+            DatabaseManager(self.db_path)
+        create_tables.assert_called_once()
+        self.assertEqual(self._pragmas(), (db.SCHEMA_VERSION, db.schema_fingerprint()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import sys
+import os
+import tempfile
+import shutil
+import threading
+import time
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import events
+from app.database.db import DatabaseManager
+from app.benchmark.synthetic_data import generate_dataset
+from app.models import Item
+from app.server.client import RemoteBackend, RemoteError
+from app.server.server import Server
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+        db_path = os.path.join(self.work_dir, "DADOS.DB")
+        DatabaseManager.reset_instance()
+        generate_dataset(DatabaseManager(db_path).get_connection(), "tiny", seed=8)
+        DatabaseManager.reset_instance()
+        self.server = Server(db_path)
+        self.host, self.port = self.server.start(port=0)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.stop()
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _client(self):
+        client = RemoteBackend(self.host, self.port)
+        self.clients.append(client)
+        return client
+
+    def _wait_until(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_services_and_reports_keep_their_types(self):
+        client = self._client()
+        items = client.service("ItemService").get_all_items()
+        self.assertTrue(items["success"])
+        self.assertIsInstance(items["data"][0], Item)
+        self.assertEqual(items["data"][0]["DESCRICAO"], items["data"][0].descricao)
+        ops = client.service("order_operations").list_ops()
+        self.assertTrue(ops and "STATUS" in ops[0])
+        stock = client.service("reports").get_current_stock()
+        self.assertEqual(len(stock), len(items["data"]))
+        with self.assertRaises(RemoteError):
+            client.service("order_operations").get_db_manager()
+        with self.assertRaises(RemoteError):
+            client.service("reports").get_connection()
+
+    def test_concurrent_terminals_share_one_group_commit(self):
+        holding, release = threading.Event(), threading.Event()
+        self.server._executor.submit(lambda: holding.set() or release.wait())  # segura a thread do banco
+        holding.wait()
+        results = {}
+
+        def post(terminal):
+            description = "Duplicado" if terminal in (4, 5) else f"Terminal {terminal}"
+            results[terminal] = self._client().service("ItemService").add_item(None, description, "Insumo", 1, None)
+
+        threads = [threading.Thread(target=post, args=(terminal,)) for terminal in range(6)]
+        # O primeiro pedido forma sozinho o primeiro grupo, parado atrás da thread do banco...
+        try:
+            threads[0].start()
+            self._wait_until(lambda: self.server._executor._work_queue.qsize() == 1)
+            # ...e os outros cinco se acumulam na fila até ela ser liberada
+            for thread in threads[1:]:
+                thread.start()
+            self._wait_until(lambda: self.server._queue.qsize() == 5)
+        finally:
+            release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.stats, {"grupos": 2, "pedidos": 6})
+        self.assertEqual(sum(result["success"] for result in results.values()), 5)
+        found = self._client().service("ItemService").search_items("DESCRICAO", "Terminal")["data"]
+        self.assertEqual(len(found), 4)
+
+    def test_reports_do_not_wait_for_the_write_thread(self):
+        release = threading.Event()
+        self.server._executor.submit(release.wait)  # segura a thread das gravações
+        try:
+            stock = self._client().service("reports").get_current_stock()
+            self.assertTrue(stock)
+            self.assertEqual(self.server.stats["grupos"], 0)
+            self.assertEqual(self.server.report_manager.report_mode, "readonly")
+        finally:
+            release.set()
+        client = self._client()
+        client.service("ItemService").add_item(None, "Novo insumo", "Insumo", 1, None)
+        self.assertEqual(len(client.service("reports").get_current_stock()), len(stock) + 1)
+
+    def test_change_events_reach_other_terminals(self):
+        received = threading.Event()
+
+        def on_change(event):
+            if threading.current_thread().name == "server-events" and event.ids:
+                received.set()
+        events.subscribe("ITEM", on_change)
+        try:
+            listener = self._client()
+            listener.listen_events()
+            time.sleep(0.2)
+            self._client().service("ItemService").add_item(None, "Novo insumo", "Insumo", 1, None)
+            self.assertTrue(received.wait(5))
+        finally:
+            events.unsubscribe(on_change)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import tempfile
+import shutil
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.database import site_sync
+from app.database.db import DatabaseManager
+from app.reports import pivot
+from app.benchmark.synthetic_data import generate_dataset
+
+class TestSiteSync(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="minisis_test_")
+        self.bundles = os.path.join(self.work_dir, "pacotes")
+        self.path_a = os.path.join(self.work_dir, "A", "DADOS.DB")
+        self.path_b = os.path.join(self.work_dir, "B", "DADOS.DB")
+        db = self._open(self.path_b)
+        self.site_b = site_sync.local_site(db, "Planta B")
+        db = self._open(self.path_a)
+        generate_dataset(db.get_connection(), "tiny", seed=9)
+        db.get_connection().commit()
+        self.site_a = site_sync.local_site(db, "Planta A")
+        site_sync.add_peer(db, self.site_b, "Planta B")
+        db = self._open(self.path_b)
+        site_sync.add_peer(db, self.site_a, "Planta A")
+
+    def tearDown(self):
+        DatabaseManager.reset_instance()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _open(self, path):
+        DatabaseManager.reset_instance()
+        return DatabaseManager(path)
+
+    def _export(self, path, peer, **options):
+        return site_sync.export_bundle(self._open(path), peer, self.bundles, **options)
+
+    def _import(self, path, bundle):
+        return site_sync.import_bundle(self._open(path), bundle["arquivo"], batch_size=50)
+
+    def _scalar(self, path, sql, params=()):
+        return self._open(path).get_connection().execute(sql, params).fetchone()[0]
+
+    def test_full_bundle_copies_master_data_and_movements(self):
+        bundle = self._export(self.path_a, "Planta B")
+        self.assertTrue(bundle["completo"])
+        result = self._import(self.path_b, bundle)
+        self.assertEqual(result["conflitos"], 0)
+        self.assertEqual(result["movimentos_sem_item"], 0)
+
+        for table in ("ITEM", "FORNECEDOR", "COMPOSICAO"):
+            self.assertEqual(self._scalar(self.path_b, f"SELECT COUNT(*) FROM {table}"),
+                             self._scalar(self.path_a, f"SELECT COUNT(*) FROM {table}"), table)
+        movements = self._scalar(self.path_a, "SELECT COUNT(*) FROM MOVIMENTO")
+        self.assertEqual(self._scalar(self.path_b, "SELECT COUNT(*) FROM MOVIMENTO_REMOTO"), movements)
+        self.assertEqual(self._scalar(self.path_b, "SELECT COUNT(*) FROM MOVIMENTO"), 0)
+        self.assertEqual(self._scalar(self.path_b, "SELECT SUM(ABS(SALDO_ESTOQUE)) FROM ITEM"), 0)
+
+        # Reaplicar o pacote não duplica nada
+        self.assertEqual(self._import(self.path_b, bundle)["aplicadas"], 0)
+        self.assertEqual(self._scalar(self.path_b, "SELECT COUNT(*) FROM MOVIMENTO_REMOTO"), movements)
+
+    def test_consolidated_pivot_reads_remote_movements(self):
+        self._import(self.path_b, self._export(self.path_a, "Planta B"))
+        db = self._open(self.path_b)
+        with db.transaction():
+            db.get_connection().execute(
+                "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) "
+                "VALUES ((SELECT MIN(ID) FROM ITEM), 'Entrada Manual', 3, 1.5, '2030-01-01 10:00:00')")
+
+        table = pivot.pivot(db, "plantas", ["planta"], [], "registros")
+        values = table.values.tolist() if hasattr(table.values, "tolist") else table.values
+        counts = {row_key[0]: row[0] for row_key, row in zip(table.row_keys, values)}
+        remote = self._scalar(self.path_a, "SELECT COUNT(*) FROM MOVIMENTO WHERE TIPO_MOVIMENTO <> 'Saldo Inicial'")
+        self.assertEqual(counts, {"Planta A": remote, "Planta B": 1})
+
+    def test_concurrent_edits_converge_by_version(self):
+        self._import(self.path_b, self._export(self.path_a, "Planta B"))
+        # Pacote completo de volta: tudo já está na mesma versão em A
+        echo = self._import(self.path_a, self._export(self.path_b, "Planta A"))
+        self.assertEqual(echo["aplicadas"], 0)
+
+        item_id, description = self._open(self.path_a).get_connection().execute(
+            "SELECT ID, DESCRICAO FROM ITEM ORDER BY ID LIMIT 1").fetchone()
+        for path, suffix in ((self.path_a, "A"), (self.path_b, "B")):
+            db = self._open(path)
+            with db.transaction():
+                db.get_connection().execute("UPDATE ITEM SET DESCRICAO = ? WHERE DESCRICAO = ?",
+                                            (f"{description} {suffix}", description))
+        db = self._open(self.path_a)
+        with db.transaction():
+            db.get_connection().execute(
+                "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) "
+                "VALUES (?, 'Entrada Manual', 3, 1.5, '2030-01-01 10:00:00')", (item_id,))
+
+        to_b = self._export(self.path_a, "Planta B")
+        to_a = self._export(self.path_b, "Planta A")
+        self.assertFalse(to_b["completo"])
+        self.assertEqual(to_b["linhas"]["MOVIMENTO"], 1)
+        self._import(self.path_b, to_b)
+        self._import(self.path_a, to_a)
+
+        winner = f"{description} {'A' if self.site_a > self.site_b else 'B'}"
+        for path in (self.path_a, self.path_b):
+            self.assertEqual(self._scalar(path, "SELECT COUNT(*) FROM ITEM WHERE DESCRICAO = ?", (winner,)), 1)
+        self.assertEqual(self._scalar(self.path_b, "SELECT COUNT(*) FROM MOVIMENTO_REMOTO WHERE DATA_MOVIMENTO >= '2030'"), 1)
+
+    def test_bundle_after_a_missing_one_is_refused(self):
+        self._import(self.path_b, self._export(self.path_a, "Planta B"))
+        db = self._open(self.path_a)
+        bundles = []
+        for name in ("Fornecedor X", "Fornecedor Y"):
+            with db.transaction():
+                db.get_connection().execute("INSERT INTO FORNECEDOR (RAZAO_SOCIAL) VALUES (?)", (name,))
+            bundles.append(site_sync.export_bundle(db, "Planta B", self.bundles))
+        with self.assertRaises(ValueError):
+            self._import(self.path_b, bundles[1])
+        self.assertEqual(self._import(self.path_b, bundles[0])["aplicadas"], 1)
+        self.assertEqual(self._import(self.path_b, bundles[1])["aplicadas"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
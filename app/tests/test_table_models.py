@@ -0,0 +1,56 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from PySide6.QtCore import QCoreApplication, Qt
+
+from app.models import Item
+from app.utils.table_models import RecordTableModel, RawSortProxyModel, TableColumn, decimal_2, SORT_ROLE
+
+class TestTableModels(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.model = RecordTableModel([
+            TableColumn("ID", "ID"),
+            TableColumn("Descrição", "DESCRICAO"),
+            TableColumn("Quantidade", "SALDO_ESTOQUE", decimal_2),
+        ], batch_size=4)
+        self.model.set_rows([Item(i, None, f"Item {i}", "Insumo", "kg", float(i * 7 % 10), 1.0) for i in range(1, 11)])
+
+    def test_rows_are_fetched_in_batches(self):
+        self.assertEqual(self.model.rowCount(), 4)
+        self.assertTrue(self.model.canFetchMore())
+        self.model.fetchMore()
+        self.model.fetchMore()
+        self.assertEqual(self.model.rowCount(), 10)
+        self.assertFalse(self.model.canFetchMore())
+        self.assertEqual(self.model.index(2, 2).data(), "1.00")
+        self.assertEqual(self.model.index(2, 2).data(SORT_ROLE), 1.0)
+
+    def test_proxy_sorts_all_rows_by_raw_value(self):
+        proxy = RawSortProxyModel(self.model)
+        proxy.sort(2, Qt.DescendingOrder)
+        values = [proxy.index(row, 2).data(SORT_ROLE) for row in range(proxy.rowCount())]
+        self.assertEqual(len(values), 10)
+        self.assertEqual(values, sorted(values, reverse=True))
+        self.assertEqual(proxy.row_data(proxy.index(0, 0)).saldo_estoque, 9.0)
+
+    def test_partial_updates(self):
+        row = self.model.find(3)
+        self.model.update_row(row, Item(3, None, "Alterado", "Insumo", "kg", 5.0, 1.0))
+        self.assertEqual(self.model.index(row, 1).data(), "Alterado")
+        self.model.remove_row(self.model.find(9))  # ainda não entregue à view
+        self.model.append_row(Item(11, None, "Novo", "Insumo", "kg", 0.0, 1.0))
+        self.assertEqual((len(self.model), self.model.rowCount()), (10, 4))
+        self.assertIsNone(self.model.find(9))
+        self.assertEqual(self.model.find(11), 9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import sqlite3
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import events
+from app.tests.db_test_case import DatabaseTestCase
+from app.item.service import ItemService
+
+class TestTransactions(DatabaseTestCase):
+
+    seed = 4
+
+    def setUp(self):
+        super().setUp()
+        self.statements = []
+        self.received = []
+        events.subscribe(events.ALL_TABLES, self.on_change)
+
+    def tearDown(self):
+        events.unsubscribe(self.on_change)
+        self.conn.set_trace_callback(None)
+        super().tearDown()
+
+    def on_change(self, event):
+        self.received.append(event)
+
+    def _material(self):
+        return self.conn.execute(
+            "SELECT ID, SALDO_ESTOQUE FROM ITEM WHERE TIPO_ITEM = 'Insumo' ORDER BY ID LIMIT 1").fetchone()
+
+    def _movements(self):
+        return self.conn.execute("SELECT COUNT(*) FROM MOVIMENTO").fetchone()[0]
+
+    def test_nested_failure_rolls_back_only_its_savepoint(self):
+        with self.db_manager.transaction():
+            self.conn.execute("UPDATE UNIDADE SET NOME = 'Externa' WHERE ID = 1")
+            self.db_manager.publish("UNIDADE", events.UPDATE, [1])
+            with self.assertRaises(sqlite3.IntegrityError):
+                with self.db_manager.transaction():
+                    self.conn.execute("UPDATE UNIDADE SET NOME = 'Interna' WHERE ID = 2")
+                    self.db_manager.publish("UNIDADE", events.UPDATE, [2])
+                    self.conn.execute("INSERT INTO UNIDADE (NOME, SIGLA) SELECT NOME, SIGLA FROM UNIDADE WHERE ID = 1")
+            self.assertEqual(self.received, [])
+        self.assertFalse(self.conn.in_transaction)
+        names = dict(self.conn.execute("SELECT ID, NOME FROM UNIDADE WHERE ID IN (1, 2)").fetchall())
+        self.assertEqual(names[1], "Externa")
+        self.assertNotEqual(names[2], "Interna")
+        self.assertEqual(self.received, [events.ChangeEvent("UNIDADE", events.UPDATE, (1,))])
+
+    def test_manual_input_commits_once(self):
+        material = self._material()
+        self.conn.set_trace_callback(self.statements.append)
+        result = ItemService().manual_input_material(material['ID'], 5, 50.0)
+        self.conn.set_trace_callback(None)
+        self.assertTrue(result["success"])
+        self.assertEqual([s for s in self.statements if s.upper() in ("COMMIT", "BEGIN IMMEDIATE")],
+                         ["BEGIN IMMEDIATE", "COMMIT"])
+        self.assertEqual(self._material()['SALDO_ESTOQUE'], material['SALDO_ESTOQUE'] + 5)
+        self.assertEqual({event.table for event in self.received}, {"ITEM", "MOVIMENTO"})
+
+    def test_manual_input_is_atomic(self):
+        material = self._material()
+        movements = self._movements()
+        service = ItemService()
+
+        def fail(*args):
+            raise sqlite3.OperationalError("disco cheio")
+        service.item_repository.add_stock_movement = fail
+        result = service.manual_input_material(material['ID'], 5, 50.0)
+        self.assertFalse(result["success"])
+        self.assertEqual(self._material()['SALDO_ESTOQUE'], material['SALDO_ESTOQUE'])
+        self.assertEqual(self._movements(), movements)
+        self.assertEqual(self.received, [])
+
+if __name__ == '__main__':
+    unittest.main()
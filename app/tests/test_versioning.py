@@ -0,0 +1,82 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.tests.db_test_case import DatabaseTestCase
+from app.database.versioning import ConcurrencyError, update_versioned
+from app.production import order_operations
+from app.stock.service import StockService
+
+class TestVersioning(DatabaseTestCase):
+
+    seed = 6
+
+    def _open_entry(self):
+        service = StockService()
+        entry_id = service.create_entry("2024-06-10", "2024-06-10 08:00:00", "NF-1", "")["data"]
+        supplier_id = self.conn.execute("SELECT ID FROM FORNECEDOR ORDER BY ID LIMIT 1").fetchone()[0]
+        items = [{'id_insumo': row[0], 'id_fornecedor': supplier_id, 'quantidade': 5.0, 'valor_unitario': 2.0}
+                 for row in self.conn.execute("SELECT ID FROM ITEM WHERE TIPO_ITEM = 'Insumo' ORDER BY ID LIMIT 2")]
+        self.assertTrue(service.update_entry(entry_id, "2024-06-10", "2024-06-10 08:00:00", "NF-1", "", items)["success"])
+        return service.get_entry_details(entry_id)["data"]['master'], items
+
+    def _save_entry(self, master, items, note_number, version):
+        return StockService().update_entry(master['ID'], master['DATA_ENTRADA'], master['DATA_DIGITACAO'],
+                                           note_number, master['OBSERVACAO'], items, version)
+
+    def test_stale_entry_save_is_rejected(self):
+        master, items = self._open_entry()
+        first = self._save_entry(master, items, "TERMINAL-1", master['VERSAO'])
+        self.assertTrue(first["success"])
+        self.assertEqual(first["data"], master['VERSAO'] + 1)
+
+        second = self._save_entry(master, items[:1], "TERMINAL-2", master['VERSAO'])
+        self.assertFalse(second["success"])
+        self.assertTrue(second["conflict"])
+        stored = self.conn.execute("SELECT NUMERO_NOTA, VERSAO FROM ENTRADANOTA WHERE ID = ?", (master['ID'],)).fetchone()
+        self.assertEqual(tuple(stored), ("TERMINAL-1", master['VERSAO'] + 1))
+        count = self.conn.execute("SELECT COUNT(*) FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (master['ID'],)).fetchone()[0]
+        self.assertEqual(count, len(items))
+
+    def test_finalize_after_concurrent_change_is_rejected(self):
+        master, items = self._open_entry()
+        service = StockService()
+        repository = service.stock_repository
+        read_details = repository.get_entry_details
+
+        def details_then_concurrent_edit(entry_id):
+            details = read_details(entry_id)
+            # Outro terminal grava a nota entre a leitura e a finalização
+            update_versioned(self.conn, "ENTRADANOTA", entry_id, "OBSERVACAO = ?", ("outro terminal",))
+            self.conn.commit()
+            return details
+        balances = dict(self.conn.execute("SELECT ID, SALDO_ESTOQUE FROM ITEM").fetchall())
+        repository.get_entry_details = details_then_concurrent_edit
+        result = service.finalize_entry(master['ID'])
+        self.assertFalse(result["success"])
+        self.assertTrue(result["conflict"])
+        self.assertEqual(dict(self.conn.execute("SELECT ID, SALDO_ESTOQUE FROM ITEM").fetchall()), balances)
+        status = self.conn.execute("SELECT STATUS FROM ENTRADANOTA WHERE ID = ?", (master['ID'],)).fetchone()[0]
+        self.assertEqual(status, "Em Aberto")
+
+    def test_balance_writes_bump_item_version(self):
+        op = self.conn.execute("SELECT ID, VERSAO FROM ORDEMPRODUCAO WHERE STATUS = 'Em Andamento' ORDER BY ID LIMIT 1").fetchone()
+        details = order_operations.get_op_details(op['ID'])
+        lines = [{'id_produto': item.id_produto, 'quantidade': item.quantidade_produzir} for item in details['items']]
+        self.assertEqual(order_operations.update_op(op['ID'], "OP-1", "2030-01-01", lines, op['VERSAO'])[0], True)
+        self.assertEqual(order_operations.update_op(op['ID'], "OP-2", "2030-01-01", lines, op['VERSAO']),
+                         (False, order_operations.CONFLICT_MESSAGE))
+
+        item_id, version = self.conn.execute("SELECT ID, VERSAO FROM ITEM ORDER BY ID LIMIT 1").fetchone()
+        with self.db_manager.transaction():
+            self.assertEqual(update_versioned(self.conn, "ITEM", item_id, "SALDO_ESTOQUE = ?", (10,), version), version + 1)
+        with self.assertRaises(ConcurrencyError):
+            with self.db_manager.transaction():
+                update_versioned(self.conn, "ITEM", item_id, "SALDO_ESTOQUE = ?", (20,), version)
+        self.assertEqual(self.conn.execute("SELECT SALDO_ESTOQUE FROM ITEM WHERE ID = ?", (item_id,)).fetchone()[0], 10)
+
+if __name__ == '__main__':
+    unittest.main()
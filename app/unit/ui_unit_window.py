@@ -6,7 +6,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QStandardItemModel, QStandardItem
-from app.unit.unit_service import UnitService
+from app.server import backend
 from app.utils.ui_utils import (
     show_error_message, 
     show_confirmation_message, show_warning_message,
@@ -53,7 +53,7 @@ class UnitEditDialog(QDialog):
 class UnitWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.unit_service = UnitService()
+        self.unit_service = backend.service("UnitService")
         self.setWindowTitle("Cadastro de Unidades de Medida")
         self.setGeometry(200, 200, 500, 400)
         self.setStyleSheet(window_style(LIGHT))
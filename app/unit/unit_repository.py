@@ -1,6 +1,7 @@
 import sqlite3
 # app/item/unit_repository.py
 from app.database.db import get_db_manager
+from app import events
 
 class UnitRepository:
     def __init__(self):
@@ -10,14 +11,14 @@ class UnitRepository:
     def add(self, name, abbreviation):
         cursor = self.connection.cursor()
         try:
-            cursor.execute(
-                "INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)",
-                (name, abbreviation)
-            )
-            self.connection.commit()
+            with self.db_manager.transaction():
+                cursor.execute(
+                    "INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)",
+                    (name, abbreviation)
+                )
+                self.db_manager.publish("UNIDADE", events.INSERT, [cursor.lastrowid])
             return cursor.lastrowid
         except sqlite3.IntegrityError:
-            self.connection.rollback()
             return None
 
     def get_all(self):
@@ -28,20 +29,22 @@ class UnitRepository:
     def update(self, unit_id, name, abbreviation):
         cursor = self.connection.cursor()
         try:
-            cursor.execute(
-                "UPDATE UNIDADE SET NOME = ?, SIGLA = ? WHERE ID = ?",
-                (name, abbreviation, unit_id)
-            )
-            self.connection.commit()
+            with self.db_manager.transaction():
+                cursor.execute(
+                    "UPDATE UNIDADE SET NOME = ?, SIGLA = ? WHERE ID = ?",
+                    (name, abbreviation, unit_id)
+                )
+                self.db_manager.publish("UNIDADE", events.UPDATE, [unit_id])
             return True
         except sqlite3.IntegrityError:
-            self.connection.rollback()
             return False
 
     def delete(self, unit_id):
         cursor = self.connection.cursor()
-        cursor.execute("DELETE FROM UNIDADE WHERE ID = ?", (unit_id,))
-        self.connection.commit()
+        with self.db_manager.transaction():
+            cursor.execute("DELETE FROM UNIDADE WHERE ID = ?", (unit_id,))
+            if cursor.rowcount > 0:
+                self.db_manager.publish("UNIDADE", events.DELETE, [unit_id])
         return cursor.rowcount > 0
 
     def is_unit_in_use(self, unit_id):
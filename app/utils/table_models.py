@@ -0,0 +1,155 @@
+# app/utils/table_models.py
+"""
+Modelos de tabela apoiados diretamente no resultado da consulta.
+
+RecordTableModel guarda as linhas como vieram do repositório (tuplas,
+sqlite3.Row ou registros de app/models.py) e monta o texto de cada célula só
+quando a view pede, em vez de criar um QStandardItem por célula. As linhas são
+entregues à view em lotes (canFetchMore/fetchMore) conforme a rolagem.
+
+RawSortProxyModel ordena pelos valores brutos (SORT_ROLE), de modo que números
+formatados continuam ordenados como números.
+"""
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+SORT_ROLE = Qt.UserRole + 1
+BATCH_SIZE = 256
+
+
+def decimal_2(value):
+    return f"{value:.2f}" if value is not None else ""
+
+
+def upper_text(value):
+    return value.upper() if value else ""
+
+
+class TableColumn:
+    __slots__ = ("header", "field", "formatter")
+
+    def __init__(self, header, field, formatter=None):
+        self.header = header
+        self.field = field
+        self.formatter = formatter
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    `columns` é uma lista de TableColumn (cabeçalho, campo da linha, formatador).
+    `key_field` identifica a linha nas atualizações parciais (find/update_row).
+    """
+
+    def __init__(self, columns, key_field="ID", batch_size=BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.columns = [column if isinstance(column, TableColumn) else TableColumn(*column) for column in columns]
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self._rows = []
+        self._loaded = 0
+
+    # --- leitura ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        value = self._rows[index.row()][column.field]
+        if role == Qt.DisplayRole:
+            if column.formatter is not None:
+                return column.formatter(value)
+            return "" if value is None else value
+        if role == SORT_ROLE:
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return None
+
+    def row_data(self, row):
+        return self._rows[row]
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --- carga incremental ---
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        """Entrega à view todas as linhas ainda não carregadas (usado antes de ordenar)."""
+        if self._loaded < len(self._rows):
+            self.beginInsertRows(QModelIndex(), self._loaded, len(self._rows) - 1)
+            self._loaded = len(self._rows)
+            self.endInsertRows()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._loaded = min(self.batch_size, len(self._rows))
+        self.endResetModel()
+
+    # --- atualizações parciais ---
+    def find(self, key):
+        """Posição da linha cuja chave é `key`, ou None."""
+        for position, row in enumerate(self._rows):
+            if row[self.key_field] == key:
+                return position
+        return None
+
+    def update_row(self, position, row):
+        self._rows[position] = row
+        if position < self._loaded:
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.columns) - 1))
+
+    def append_row(self, row):
+        if self._loaded == len(self._rows):
+            self.beginInsertRows(QModelIndex(), self._loaded, self._loaded)
+            self._rows.append(row)
+            self._loaded += 1
+            self.endInsertRows()
+        else:
+            self._rows.append(row)
+
+    def remove_row(self, position):
+        if position < self._loaded:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self._rows[position]
+            self._loaded -= 1
+            self.endRemoveRows()
+        else:
+            del self._rows[position]
+
+
+class RawSortProxyModel(QSortFilterProxyModel):
+    """Ordena pelos valores brutos; antes de ordenar, carrega todas as linhas da origem."""
+
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source_model)
+        self.setSortRole(SORT_ROLE)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column >= 0:
+            self.sourceModel().fetch_all()
+        super().sort(column, order)
+
+    def row_data(self, proxy_index):
+        return self.sourceModel().row_data(self.mapToSource(proxy_index).row())
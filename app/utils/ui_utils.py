@@ -1,8 +1,9 @@
 # app/utils/ui_utils.py
 from PySide6.QtWidgets import QMessageBox, QTableWidgetItem, QFileDialog
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, Signal
 from PySide6.QtGui import QFontMetrics
 from app.styles.buttons_styles import button_style, GREEN, RED, YELLOW
+from app import events
 
 
 def configure_table_columns(table_view, total_width=None, padding=36):
@@ -118,3 +119,21 @@ def get_save_filename(parent, caption, filter):
     """
     filename, selected_filter = QFileDialog.getSaveFileName(parent, caption, filter=filter)
     return filename, selected_filter
+
+class ChangeEventRelay(QObject):
+    """
+    Repassa os eventos de alteração (app/events.py) das tabelas informadas para a
+    thread da interface pelo sinal `changed`. A assinatura termina com o objeto.
+    """
+    changed = Signal(object)
+
+    def __init__(self, tables, parent=None):
+        super().__init__(parent)
+        events.subscribe(tables, self._forward)
+        self.destroyed.connect(lambda *_, forward=self._forward: events.unsubscribe(forward))
+
+    def _forward(self, event):
+        try:
+            self.changed.emit(event)
+        except RuntimeError:
+            pass  # objeto Qt já destruído
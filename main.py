@@ -10,7 +10,7 @@ from PySide6.QtWidgets import (
     QToolBar,
 )
 from PySide6.QtGui import QAction, QIcon, QPixmap
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, Signal
 from functools import partial
 
 from app.styles.windows_style import (
@@ -18,9 +18,13 @@ from app.styles.windows_style import (
 )
 
 class MainWindow(QMainWindow):
+    # Emitido pela thread de manutenção; a conexão enfileirada entrega a mensagem na thread da interface
+    maintenance_finished = Signal(str)
+
     def __init__(self):
         super().__init__()
         self.windows = {}
+        self.setup_maintenance()
         self.setWindowTitle("GP - MiniSis")
         self.setWindowIcon(QIcon(self._resolve_icon('home.svg')))
         self.setGeometry(100, 100, 1200, 820)
@@ -30,6 +34,29 @@ class MainWindow(QMainWindow):
         self.setup_central_widget()
         self.statusBar().showMessage("Pronto")
 
+    def setup_maintenance(self):
+        from app.server import backend
+        if backend.is_remote():
+            # backup, otimização e relatórios agendados ficam com a máquina do servidor
+            self.maintenance = self.report_scheduler = None
+            return
+        from app.database.maintenance import MaintenanceService
+        self.maintenance_finished.connect(lambda message: self.statusBar().showMessage(message, 10000))
+        self.maintenance = MaintenanceService(
+            on_finished=lambda task, success, message: self.maintenance_finished.emit(message))
+        self.maintenance.start()
+        from app.reports.scheduler import ReportScheduler
+        self.report_scheduler = ReportScheduler(
+            on_finished=lambda job, success, message: self.maintenance_finished.emit(message))
+        self.report_scheduler.start()
+
+    def closeEvent(self, event):
+        if self.maintenance is not None:
+            self.maintenance.stop()
+        if self.report_scheduler is not None:
+            self.report_scheduler.stop()
+        super().closeEvent(event)
+
     def _resolve_icon(self, icon_name):
         project_root = os.path.abspath(os.path.dirname(__file__))
         # Tenta primeiro em app/images/icons
@@ -98,39 +125,26 @@ class MainWindow(QMainWindow):
         # Menu Relatórios
         reports_menu = menu_bar.addMenu("&Relatórios")
         
-        # Submenu Cadastros
-        general_reports_menu = reports_menu.addMenu("Cadastros")
-        from app.reports.ui.general_reports import GeneralReportWindow
-        self._add_menu_action(general_reports_menu, "Fornecedores", "suppliers_report", lambda: GeneralReportWindow("Fornecedores"))
-        self._add_menu_action(general_reports_menu, "Itens", "items_report", lambda: GeneralReportWindow("Itens"))
-
-        # Submenu Estoque
-        stock_reports_menu = reports_menu.addMenu("Estoque")
-        from app.reports.ui.stock_reports import StockReportWindow
-        self._add_menu_action(stock_reports_menu, "Entradas (Compras)", "stock_entry_report", lambda: StockReportWindow("Entradas (Compras)"))
-        self._add_menu_action(stock_reports_menu, "Itens da Nota de Entrada", "entry_items_report", lambda: StockReportWindow("Itens da Nota de Entrada"))
-        self._add_menu_action(stock_reports_menu, "Movimentação de Estoque", "stock_movement_report", lambda: StockReportWindow("Movimentação de Estoque"))
-        self._add_menu_action(stock_reports_menu, "Estoque Atual", "current_stock_report", lambda: StockReportWindow("Estoque Atual"))
-        self._add_menu_action(stock_reports_menu, "Estoque Baixo", "low_stock_report", lambda: StockReportWindow("Estoque Baixo"))
-        self._add_menu_action(stock_reports_menu, "Curva ABC de Estoque", "abc_report", lambda: StockReportWindow("Curva ABC de Estoque"))
-        self._add_menu_action(stock_reports_menu, "Itens Sem Giro", "inactive_report", lambda: StockReportWindow("Itens Sem Giro"))
-
-        # Submenu Produção
-        production_reports_menu = reports_menu.addMenu("Produção")
-        from app.reports.ui.production_reports import ProductionReportWindow
-        self._add_menu_action(production_reports_menu, "Ordens de Produção", "production_orders_report", lambda: ProductionReportWindow("Ordens de Produção"))
-        self._add_menu_action(production_reports_menu, "Produção por Período", "production_by_period_report", lambda: ProductionReportWindow("Produção por Período"))
-        self._add_menu_action(production_reports_menu, "Produção por Linha", "production_by_line_report", lambda: ProductionReportWindow("Produção por Linha"))
-        self._add_menu_action(production_reports_menu, "Composição de Produto", "product_composition_report", lambda: ProductionReportWindow("Composição / Estrutura de Produto"))
-        self._add_menu_action(production_reports_menu, "Rendimento de OP", "yield_report", lambda: ProductionReportWindow("Rendimento de OP"))
-        self._add_menu_action(production_reports_menu, "Necessidade de Insumos", "requirements_report", lambda: ProductionReportWindow("Necessidade de Insumos"))
-
-        # Submenu Financeiro
-        financial_reports_menu = reports_menu.addMenu("Financeiro")
-        from app.reports.ui.financial_reports import FinancialReportWindow
-        self._add_menu_action(financial_reports_menu, "Custo do Produto", "product_cost_report", lambda: FinancialReportWindow("Custo do Produto"))
-        self._add_menu_action(financial_reports_menu, "Lucro por Produto", "profit_by_product_report", lambda: FinancialReportWindow("Lucro por Produto"))
-        self._add_menu_action(financial_reports_menu, "Lucro por Período", "profit_by_period_report", lambda: FinancialReportWindow("Lucro por Período"))
+        # Um submenu por grupo do registro de relatórios (Cadastros, Estoque, Produção, Financeiro)
+        from app.reports import registry
+        from app.reports.ui.report_window import ReportWindow
+        for group in registry.GROUPS:
+            group_menu = reports_menu.addMenu(group)
+            for report in registry.reports_in_group(group):
+                self._add_menu_action(group_menu, report.menu, report.id, partial(ReportWindow, report.id))
+
+        from app.reports.ui.pivot_window import PivotWindow
+        reports_menu.addSeparator()
+        self._add_menu_action(reports_menu, "Tabela Dinâmica", "pivot_window", PivotWindow)
+
+        # Menu Manutenção
+        if self.maintenance is not None:
+            maintenance_menu = menu_bar.addMenu("Ma&nutenção")
+            self._add_maintenance_action(maintenance_menu, "Fazer Backup Agora", self.maintenance.backup_now)
+            self._add_maintenance_action(maintenance_menu, "Gerar Cópia Compactada", self.maintenance.compact_now)
+            self._add_maintenance_action(maintenance_menu, "Otimizar Banco de Dados", self.maintenance.optimize_now)
+            self._add_maintenance_action(maintenance_menu, "Atualizar Pontos de Pedido",
+                                         self.maintenance.refresh_reorder_points_now)
 
         # Menu Configurações
         # settings_menu = menu_bar.addMenu("&Configurações")
@@ -144,6 +158,15 @@ class MainWindow(QMainWindow):
         action.triggered.connect(partial(self._open_window, window_name, window_class))
         menu.addAction(action)
 
+    def _add_maintenance_action(self, menu, text, task):
+        action = QAction(text, self)
+        action.triggered.connect(partial(self._run_maintenance, text, task))
+        menu.addAction(action)
+
+    def _run_maintenance(self, text, task):
+        task()
+        self.statusBar().showMessage(f"{text}: em execução...")
+
     def _open_window(self, window_name, window_class):
         if window_name not in self.windows:
             self.windows[window_name] = window_class() if callable(window_class) else window_class
@@ -237,12 +260,49 @@ logging.basicConfig(level=logging.INFO, filename='app.log', filemode='w',
 
 import traceback
 
+def open_database():
+    """Abre o banco; migrações demoradas mostram o progresso em um diálogo."""
+    from PySide6.QtWidgets import QProgressDialog
+    from app.database.db import DatabaseManager
+    dialog = None
+
+    def progress(version, step, done, total):
+        nonlocal dialog
+        if dialog is None:
+            dialog = QProgressDialog("Atualizando o banco de dados...", None, 0, 0)
+            dialog.setWindowTitle("GP - MiniSis")
+            dialog.setMinimumDuration(0)
+        dialog.setLabelText(f"Atualizando o banco de dados (versão {version})\n{step}: {done} de {total}")
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+        QApplication.processEvents()
+
+    db_manager = DatabaseManager(migration_progress=progress)
+    if dialog is not None:
+        dialog.close()
+    return db_manager
+
+
 def main():
     try:
-        from app.database.db import get_db_manager
-        get_db_manager()
-
         app = QApplication(sys.argv)
+        server = os.environ.get("MINISIS_SERVIDOR")  # ex.: 192.168.0.10:8765 (app/server/server.py)
+        if server:
+            from app.server import backend
+            host, _, port = server.partition(":")
+            backend.use_remote(host, int(port) if port else None)
+        else:
+            db_manager = open_database()
+            # Conexão separada para os relatórios, opcional: "readonly" passa o banco para o modo WAL,
+            # que não funciona em pastas compartilhadas da rede; "replica" usa uma cópia em memória
+            report_mode = os.environ.get("MINISIS_RELATORIOS")
+            if report_mode:
+                db_manager.set_report_mode(report_mode)
+            from app.reports import columnar_history
+            if columnar_history.available():
+                # Meses fechados dos relatórios de lucro e produção lidos dos arquivos Parquet
+                db_manager.enable_columnar_history()
+
         main_window = MainWindow()
         main_window.showMaximized()
         sys.exit(app.exec())